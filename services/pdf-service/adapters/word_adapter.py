@@ -1,35 +1,29 @@
-import os
-import tempfile
+import io
 import pathlib
 from typing import Tuple
-from rise.generate_certificate import parse_word_form, generate_certificate
+from rise.generate_certificate import parse_word_form
+from render_backend import render_backend
 
 async def draft_from_form_and_template(form_file, template_file) -> Tuple[bytes, str]:
     """Generate draft certificate from Word form and PDF template."""
-    with tempfile.TemporaryDirectory() as td:
-        # Save uploaded form file
-        form_path = os.path.join(td, form_file.filename)
-        with open(form_path, "wb") as f:
-            f.write(await form_file.read())
-
-        # Save uploaded template file
-        template_path = os.path.join(td, template_file.filename)
-        with open(template_path, "wb") as f:
-            f.write(await template_file.read())
-
-        # Parse the Word form to extract values
-        values = parse_word_form(form_path)
-        
-        # Generate output filename
-        out_name = pathlib.Path(form_file.filename).with_suffix(".pdf").name
-        out_path = os.path.join(td, out_name)
-        
-        # Generate the certificate using your existing function
-        generate_certificate(template_path, out_path, values)
-
-        # Read the generated PDF and return
-        with open(out_path, "rb") as f:
-            return f.read(), out_name
+    # ✅ UPDATED: Form and template are read from memory and the render returns bytes, so
+    # concurrent drafts never share (or derive from upload names) any path on disk
+    values = parse_word_form(io.BytesIO(await form_file.read()))
+    
+    # Generate output filename
+    out_name = pathlib.Path(form_file.filename).with_suffix(".pdf").name
+    
+    # Generate the certificate on the configured render backend
+    result = await render_backend.run({
+        "kind": "certificate",
+        "template": await template_file.read(),
+        "template_name": f"custom_{template_file.filename}",
+        "values": values,
+        "template_type": "standard",
+    })
+    if not result.get("pdf"):
+        raise RuntimeError(result.get("error") or "Render produced no PDF")
+    return result["pdf"], out_name
 
 async def convert_single_word(file) -> Tuple[bytes, str]:
     """Convert a single Word file to PDF (placeholder for future implementation)."""
@@ -0,0 +1,499 @@
+"""
+Durable background job queue for long soft copy / printable runs.
+
+A job is a list of spreadsheet rows (plus the logos they share) submitted once and
+rendered in the background, so a browser refresh or proxy timeout no longer loses work.
+Jobs, rows and logos live in a local SQLite database; rendered PDFs and final artifacts
+live in a per-job directory next to it. A claimed row records the claiming process and a
+lease the worker keeps renewing; rows left "running" by a crashed or restarted worker are put
+back in the queue on startup, when the pre-fork supervisor reaps the worker, or once their
+lease expires. Finished jobs (their rows, logos and files) are pruned once they are older
+than the retention period.
+
+The queue itself knows nothing about templates or rendering: main.py registers, per job
+kind, a coroutine that renders one row and a function that assembles the final artifact.
+
+Configure with:
+    JOBS_DB_PATH            SQLite database (default <tmp>/pdf_service_jobs/jobs.sqlite3)
+    JOBS_ARTIFACT_DIR       Row PDFs and artifacts (default <tmp>/pdf_service_jobs/artifacts)
+    JOBS_CONCURRENCY        Rows rendered at the same time per worker (default 4)
+    JOBS_RETENTION_SECONDS  How long finished jobs are kept (default 86400)
+    JOBS_PRUNE_INTERVAL     Seconds between pruning passes (default 600)
+    JOBS_LEASE_SECONDS      How long a claimed row stays running without a renewal (default 120)
+"""
+
+import asyncio
+import json
+import os
+import logging
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    artifact_path TEXT,
+    artifact_name TEXT,
+    media_type TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_rows (
+    job_id TEXT NOT NULL,
+    row_index INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    status TEXT NOT NULL,
+    template_name TEXT,
+    overflow_warnings TEXT,
+    error TEXT,
+    pdf_path TEXT,
+    worker_pid INTEGER,
+    claimed_at REAL,
+    PRIMARY KEY (job_id, row_index)
+);
+CREATE INDEX IF NOT EXISTS job_rows_status ON job_rows (status, job_id, row_index);
+CREATE TABLE IF NOT EXISTS job_logos (
+    job_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (job_id, filename)
+);
+"""
+
+# ✅ ADDED: Columns added after the first release, for databases created before them
+JOB_ROWS_MIGRATIONS = {
+    "worker_pid": "ALTER TABLE job_rows ADD COLUMN worker_pid INTEGER",
+    "claimed_at": "ALTER TABLE job_rows ADD COLUMN claimed_at REAL",
+}
+
+
+class JobQueue:
+    """SQLite-backed job queue drained by a bounded pool of async row workers."""
+
+    def __init__(self, db_path: str, artifact_dir: str, concurrency: int = 4, retention_seconds: float = 86400,
+                 prune_interval: float = 600, lease_seconds: float = 120):
+        """
+        Args:
+            db_path: SQLite database file holding jobs, rows and logos
+            artifact_dir: Directory for per-row PDFs and finished job artifacts
+            concurrency: Maximum number of rows rendered at the same time
+            retention_seconds: How long a finished (done or failed) job is kept
+            prune_interval: Seconds between pruning passes
+            lease_seconds: How long a claimed row stays running without a renewal before it is requeued
+        """
+        self.db_path = db_path
+        self.artifact_dir = artifact_dir
+        self.concurrency = concurrency
+        self.retention_seconds = retention_seconds
+        self.prune_interval = prune_interval
+        self.lease_seconds = lease_seconds
+        self.pruned = 0
+        self.requeued = 0
+        self._renderers = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        self._wakeup = None
+        self._workers = []
+        self._pruner = None
+        self._leases = None
+        self._logo_cache = {}
+        # Turned off by the pre-fork server: with several workers sharing the database, a
+        # restarting worker must not requeue rows its siblings are still rendering
+        self.requeue_on_start = True
+
+    # ---- storage ---------------------------------------------------------
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            os.makedirs(self.artifact_dir, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(job_rows)").fetchall()}
+            for column, statement in JOB_ROWS_MIGRATIONS.items():
+                if column not in columns:
+                    self._conn.execute(statement)
+        return self._conn
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.artifact_dir, job_id)
+
+    def register_renderer(self, kind: str, render_row, finalize):
+        """
+        Register how rows of a job kind are rendered and how the job's artifact is built.
+
+        Args:
+            kind: Job kind accepted by submit(), e.g. "softcopy" or "printable"
+            render_row: async (row_index, row, logos) -> {"pdf": bytes, "filename": str, "template_name": str,
+                "overflow_warnings": list}
+            finalize: (rows, artifact_file) -> (artifact_name, media_type); writes the artifact into the open
+                binary artifact_file (streamed to disk, never held whole in memory by the queue); rows are
+                dicts in row order with row_index, status, template_name, overflow_warnings, error and pdf_path
+        """
+        self._renderers[kind] = (render_row, finalize)
+
+    def submit(self, kind: str, rows: list, logos: dict | None = None) -> str:
+        """Persist a new job and wake the workers. Returns the job id."""
+        if kind not in self._renderers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN")
+            db.execute(
+                "INSERT INTO jobs (id, kind, status, total, created_at, updated_at) VALUES (?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, len(rows), now, now),
+            )
+            db.executemany(
+                "INSERT INTO job_rows (job_id, row_index, data, status) VALUES (?, ?, ?, 'queued')",
+                [(job_id, index, json.dumps(row)) for index, row in enumerate(rows)],
+            )
+            db.executemany(
+                "INSERT INTO job_logos (job_id, filename, data) VALUES (?, ?, ?)",
+                [(job_id, filename, data) for filename, data in (logos or {}).items()],
+            )
+            db.execute("COMMIT")
+        os.makedirs(self._job_dir(job_id), exist_ok=True)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    def status(self, job_id: str) -> dict | None:
+        """Job status and progress, including per-row warnings and errors."""
+        with self._lock:
+            db = self._db()
+            job = db.execute(
+                "SELECT id, kind, status, total, completed, failed, error, created_at, updated_at, artifact_name "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if job is None:
+                return None
+            rows = db.execute(
+                "SELECT row_index, status, template_name, overflow_warnings, error FROM job_rows "
+                "WHERE job_id = ? ORDER BY row_index", (job_id,)
+            ).fetchall()
+        keys = ("id", "kind", "status", "total", "completed", "failed", "error", "created_at", "updated_at", "artifact_name")
+        result = dict(zip(keys, job))
+        done = result["completed"] + result["failed"]
+        result["progress"] = round(done / result["total"], 4) if result["total"] else 1.0
+        result["rows"] = [
+            {
+                "row": row_index,
+                "status": status,
+                "template_name": template_name,
+                "overflow_warnings": json.loads(warnings) if warnings else [],
+                "error": error,
+            }
+            for row_index, status, template_name, warnings, error in rows
+        ]
+        return result
+
+    def artifact(self, job_id: str) -> tuple[str, str, str] | None:
+        """(path, filename, media_type) of a finished job's artifact, or None if not ready."""
+        with self._lock:
+            job = self._db().execute(
+                "SELECT status, artifact_path, artifact_name, media_type FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if job is None or job[0] != "done" or not job[1]:
+            return None
+        return job[1], job[2], job[3]
+
+    def delete(self, job_id: str) -> bool:
+        """Remove a job, its rows, logos and files."""
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN")
+            deleted = db.execute("DELETE FROM jobs WHERE id = ?", (job_id,)).rowcount
+            db.execute("DELETE FROM job_rows WHERE job_id = ?", (job_id,))
+            db.execute("DELETE FROM job_logos WHERE job_id = ?", (job_id,))
+            db.execute("COMMIT")
+        self._logo_cache.pop(job_id, None)
+        shutil.rmtree(self._job_dir(job_id), ignore_errors=True)
+        return bool(deleted)
+
+    def prune(self, now: float | None = None) -> list:
+        """Delete finished jobs older than the retention period. Returns the job ids removed."""
+        cutoff = (now or time.time()) - self.retention_seconds
+        with self._lock:
+            expired = [job_id for (job_id,) in self._db().execute(
+                "SELECT id FROM jobs WHERE status IN ('done', 'failed') AND updated_at < ?", (cutoff,)
+            ).fetchall()]
+        for job_id in expired:
+            self.delete(job_id)
+        if expired:
+            self.pruned += len(expired)
+            logger.info("✅ [JOBS] Pruned %s finished jobs older than %ss", len(expired), self.retention_seconds)
+        return expired
+
+    # ---- workers ---------------------------------------------------------
+
+    def _claim_row(self):
+        """Atomically take the oldest queued row and mark it running, leased to this process."""
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            claimed = db.execute(
+                "SELECT r.job_id, r.row_index, r.data, j.kind FROM job_rows r JOIN jobs j ON j.id = r.job_id "
+                "WHERE r.status = 'queued' ORDER BY j.created_at, r.row_index LIMIT 1"
+            ).fetchone()
+            if claimed is not None:
+                db.execute(
+                    "UPDATE job_rows SET status = 'running', worker_pid = ?, claimed_at = ? "
+                    "WHERE job_id = ? AND row_index = ?",
+                    (os.getpid(), time.time(), claimed[0], claimed[1]),
+                )
+                db.execute(
+                    "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ? AND status = 'queued'",
+                    (time.time(), claimed[0]),
+                )
+            db.execute("COMMIT")
+        return claimed
+
+    def _release_row(self, job_id: str, row_index: int):
+        """Put a row this process claimed back in the queue."""
+        with self._lock:
+            self._db().execute(
+                "UPDATE job_rows SET status = 'queued', worker_pid = NULL, claimed_at = NULL "
+                "WHERE job_id = ? AND row_index = ? AND status = 'running' AND worker_pid = ?",
+                (job_id, row_index, os.getpid()),
+            )
+
+    def _job_logos(self, job_id: str) -> dict:
+        logos = self._logo_cache.get(job_id)
+        if logos is None:
+            with self._lock:
+                logos = dict(self._db().execute(
+                    "SELECT filename, data FROM job_logos WHERE job_id = ?", (job_id,)
+                ).fetchall())
+            self._logo_cache[job_id] = logos
+        return logos
+
+    def _finish_row(self, job_id: str, row_index: int, template_name, warnings, error, pdf_path) -> bool:
+        """Record a row result. Returns True when it was the job's last outstanding row."""
+        with self._lock:
+            db = self._db()
+            db.execute("BEGIN IMMEDIATE")
+            updated = db.execute(
+                "UPDATE job_rows SET status = ?, template_name = ?, overflow_warnings = ?, error = ?, pdf_path = ? "
+                "WHERE job_id = ? AND row_index = ? AND status = 'running'",
+                ("failed" if error else "done", template_name, json.dumps(warnings or []), error, pdf_path,
+                 job_id, row_index),
+            ).rowcount
+            remaining = None
+            if updated:
+                # Only the worker that actually completed the row counts it (guards against double renders)
+                column = "failed" if error else "completed"
+                db.execute(
+                    f"UPDATE jobs SET {column} = {column} + 1, updated_at = ? WHERE id = ?",
+                    (time.time(), job_id),
+                )
+                remaining = db.execute(
+                    "SELECT COUNT(*) FROM job_rows WHERE job_id = ? AND status IN ('queued', 'running')", (job_id,)
+                ).fetchone()[0]
+            db.execute("COMMIT")
+        return remaining == 0
+
+    def _finalize_job(self, job_id: str, kind: str):
+        """Build the job artifact from its rendered rows."""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT row_index, status, template_name, overflow_warnings, error, pdf_path FROM job_rows "
+                "WHERE job_id = ? ORDER BY row_index", (job_id,)
+            ).fetchall()
+        rows = [
+            {
+                "row_index": row_index,
+                "status": status,
+                "template_name": template_name,
+                "overflow_warnings": json.loads(warnings) if warnings else [],
+                "error": error,
+                "pdf_path": pdf_path,
+            }
+            for row_index, status, template_name, warnings, error, pdf_path in rows
+        ]
+        _, finalize = self._renderers[kind]
+        job_dir = self._job_dir(job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=job_dir, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as artifact_file:
+                artifact_name, media_type = finalize(rows, artifact_file)
+            artifact_path = os.path.join(job_dir, artifact_name)
+            os.replace(tmp_path, artifact_path)
+            update = ("done", artifact_path, artifact_name, media_type, None)
+        except Exception as finalize_error:
+            logger.error("❌ [JOBS] Job %s could not be finalized: %s", job_id, finalize_error)
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            update = ("failed", None, None, None, str(finalize_error))
+        with self._lock:
+            self._db().execute(
+                "UPDATE jobs SET status = ?, artifact_path = ?, artifact_name = ?, media_type = ?, error = ?, "
+                "updated_at = ? WHERE id = ?",
+                (*update, time.time(), job_id),
+            )
+        self._logo_cache.pop(job_id, None)
+        logger.info("✅ [JOBS] Job %s finished: %s", job_id, update[0])
+
+    async def _worker(self):
+        while True:
+            # SQLite calls (BEGIN IMMEDIATE can wait on other workers' writes) stay off the event loop
+            claiming = asyncio.ensure_future(asyncio.to_thread(self._claim_row))
+            try:
+                claimed = await asyncio.shield(claiming)
+            except asyncio.CancelledError:
+                # Stopped while the claim was in flight: hand the row back instead of leaving it running
+                claimed = await claiming
+                if claimed is not None:
+                    await asyncio.to_thread(self._release_row, claimed[0], claimed[1])
+                raise
+            if claimed is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            job_id, row_index, data, kind = claimed
+            render_row, _ = self._renderers[kind]
+            template_name, warnings, error, pdf_path = None, [], None, None
+            try:
+                logos = await asyncio.to_thread(self._job_logos, job_id)
+                result = await render_row(row_index, json.loads(data), logos)
+                template_name = result.get("template_name")
+                warnings = result.get("overflow_warnings", [])
+                pdf_path = os.path.join(self._job_dir(job_id), result.get("filename") or f"{row_index + 1:04d}.pdf")
+                os.makedirs(self._job_dir(job_id), exist_ok=True)
+                with open(pdf_path, "wb") as pdf_file:
+                    pdf_file.write(result["pdf"])
+            except asyncio.CancelledError:
+                # Shutting down mid-render: leave the row for the next start
+                await asyncio.to_thread(self._release_row, job_id, row_index)
+                raise
+            except Exception as row_error:
+                logger.error("❌ [JOBS] Job %s row %s failed: %s", job_id, row_index + 1, row_error)
+                error = str(row_error)
+
+            # Shielded so stopping now can't record the row without building a finished job's artifact
+            await asyncio.shield(self._complete_row(job_id, kind, row_index, template_name, warnings, error, pdf_path))
+
+    async def _complete_row(self, job_id: str, kind: str, row_index: int, template_name, warnings, error, pdf_path):
+        if await asyncio.to_thread(self._finish_row, job_id, row_index, template_name, warnings, error, pdf_path):
+            await asyncio.to_thread(self._finalize_job, job_id, kind)
+
+    async def _prune_periodically(self):
+        while True:
+            try:
+                await asyncio.to_thread(self.prune)
+            except Exception as prune_error:
+                logger.warning("⚠️ [JOBS] Pruning finished jobs failed: %s", prune_error)
+            await asyncio.sleep(self.prune_interval)
+
+    def _requeue(self, condition: str, params: tuple = ()) -> int:
+        with self._lock:
+            requeued = self._db().execute(
+                "UPDATE job_rows SET status = 'queued', worker_pid = NULL, claimed_at = NULL "
+                f"WHERE status = 'running'{condition}", params
+            ).rowcount
+        self.requeued += requeued
+        return requeued
+
+    def requeue_interrupted(self) -> int:
+        """Put rows left "running" by a crashed or restarted worker back in the queue."""
+        requeued = self._requeue("")
+        if requeued:
+            logger.debug("🔍 [JOBS] Requeued %s interrupted rows", requeued)
+        return requeued
+
+    def requeue_worker(self, pid: int) -> int:
+        """Put rows claimed by a worker process that has exited back in the queue."""
+        requeued = self._requeue(" AND worker_pid = ?", (pid,))
+        if requeued:
+            logger.warning("⚠️ [JOBS] Requeued %s rows left running by exited worker %s", requeued, pid)
+        return requeued
+
+    def requeue_expired(self, now: float | None = None) -> int:
+        """Put running rows whose lease was not renewed in time back in the queue."""
+        requeued = self._requeue(" AND (claimed_at IS NULL OR claimed_at < ?)",
+                                 ((now or time.time()) - self.lease_seconds,))
+        if requeued:
+            logger.warning("⚠️ [JOBS] Requeued %s rows whose lease expired after %ss", requeued, self.lease_seconds)
+        return requeued
+
+    def renew_leases(self) -> int:
+        """Extend the lease of every row this process is rendering."""
+        with self._lock:
+            return self._db().execute(
+                "UPDATE job_rows SET claimed_at = ? WHERE status = 'running' AND worker_pid = ?",
+                (time.time(), os.getpid()),
+            ).rowcount
+
+    async def _keep_leases(self):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 4)
+            try:
+                await asyncio.to_thread(self.renew_leases)
+                await asyncio.to_thread(self.requeue_expired)
+            except Exception as lease_error:
+                logger.warning("⚠️ [JOBS] Renewing row leases failed: %s", lease_error)
+
+    def close(self):
+        """Close this process's database connection (reopened on next use)."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def start(self):
+        """Requeue interrupted rows (unless requeue_on_start is off) and start the workers, pruner and lease keeper."""
+        if self.requeue_on_start:
+            self.requeue_interrupted()
+        self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._pruner = asyncio.create_task(self._prune_periodically())
+        self._leases = asyncio.create_task(self._keep_leases())
+
+    async def stop(self):
+        """Cancel the workers, pruner and lease keeper; unfinished rows stay queued in the database."""
+        tasks = self._workers + [task for task in (self._pruner, self._leases) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._pruner = None
+        self._leases = None
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._db().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+        return {"workers": len(self._workers), "jobs": counts, "retention_seconds": self.retention_seconds,
+                "pruned": self.pruned, "lease_seconds": self.lease_seconds, "requeued": self.requeued}
+
+
+_default_dir = os.path.join(tempfile.gettempdir(), "pdf_service_jobs")
+
+# Process-wide queue shared by the job endpoints in this worker
+job_queue = JobQueue(
+    db_path=os.getenv("JOBS_DB_PATH", os.path.join(_default_dir, "jobs.sqlite3")),
+    artifact_dir=os.getenv("JOBS_ARTIFACT_DIR", os.path.join(_default_dir, "artifacts")),
+    concurrency=int(os.getenv("JOBS_CONCURRENCY", "4")),
+    retention_seconds=float(os.getenv("JOBS_RETENTION_SECONDS", "86400")),
+    prune_interval=float(os.getenv("JOBS_PRUNE_INTERVAL", "600")),
+    lease_seconds=float(os.getenv("JOBS_LEASE_SECONDS", "120")),
+)
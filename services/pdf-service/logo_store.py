@@ -0,0 +1,151 @@
+"""
+Content-addressed logo store.
+
+Logos are uploaded once to /logos and stored by the SHA-256 of their bytes, with an
+index from filename to hash. Render requests then reference logos by hash or filename
+(the "logo_refs" form field) instead of re-uploading every logo with every row.
+
+Worker processes share the store directory: index updates, and deleting an object nothing
+points at any more, happen under a file lock (index.lock) so they never interleave.
+"""
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class LogoStore:
+    """Logo bytes on disk under objects/<sha256>, plus a filename -> hash index."""
+
+    def __init__(self, root_dir: str):
+        """
+        Args:
+            root_dir: Directory holding objects/ and index.json
+        """
+        self.root_dir = root_dir
+        self.objects_dir = os.path.join(root_dir, "objects")
+        self.index_path = os.path.join(root_dir, "index.json")
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_mtime = None
+
+    def _load_index(self) -> dict:
+        # Reload when another worker process has rewritten the index
+        mtime = os.path.getmtime(self.index_path) if os.path.exists(self.index_path) else None
+        if self._index is None or mtime != self._index_mtime:
+            os.makedirs(self.objects_dir, exist_ok=True)
+            if mtime is not None:
+                with open(self.index_path, "r") as index_file:
+                    self._index = json.load(index_file)
+            else:
+                self._index = {}
+            self._index_mtime = mtime
+        return self._index
+
+    def _save_index(self):
+        # Write-then-rename so a crash never leaves a truncated index behind
+        fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, suffix=".json")
+        with os.fdopen(fd, "w") as index_file:
+            json.dump(self._index, index_file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+        self._index_mtime = os.path.getmtime(self.index_path)
+
+    @contextlib.contextmanager
+    def _updating(self):
+        """Hold the in-process and the cross-process lock around an index read-modify-write."""
+        with self._lock:
+            os.makedirs(self.objects_dir, exist_ok=True)
+            with open(os.path.join(self.root_dir, "index.lock"), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    # Another worker may have written since our last read
+                    self._index = None
+                    yield self._load_index()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest)
+
+    def put(self, filename: str, data: bytes) -> str:
+        """Store a logo (deduplicated by content) and point its filename at it. Returns the SHA-256."""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._updating() as index:
+            object_path = self._object_path(digest)
+            if not os.path.exists(object_path):
+                fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir)
+                with os.fdopen(fd, "wb") as object_file:
+                    object_file.write(data)
+                os.replace(tmp_path, object_path)
+            if index.get(filename) != digest:
+                index[filename] = digest
+                self._save_index()
+        return digest
+
+    def resolve(self, ref: str) -> tuple[str, str] | None:
+        """Resolve a hash or filename to (filename, sha256), or None if unknown."""
+        with self._lock:
+            return self._resolve(self._load_index(), ref.strip())
+
+    def _resolve(self, index: dict, ref: str) -> tuple[str, str] | None:
+        if ref in index:
+            return ref, index[ref]
+        lowered = ref.lower()
+        if SHA256_PATTERN.match(lowered) and os.path.exists(self._object_path(lowered)):
+            # Prefer a filename that points at this content so logo matching still works
+            filename = next((name for name, digest in index.items() if digest == lowered), lowered)
+            return filename, lowered
+        return None
+
+    def get(self, ref: str) -> tuple[str, bytes] | None:
+        """Return (filename, bytes) for a hash or filename, or None if unknown."""
+        resolved = self.resolve(ref)
+        if resolved is None:
+            return None
+        filename, digest = resolved
+        try:
+            with open(self._object_path(digest), "rb") as object_file:
+                return filename, object_file.read()
+        except FileNotFoundError:
+            # Deleted by another worker since it was resolved
+            return None
+
+    def list(self) -> list[dict]:
+        """All indexed logos with their hash and size."""
+        with self._lock:
+            index = dict(self._load_index())
+        return [
+            {"filename": filename, "sha256": digest, "size": os.path.getsize(self._object_path(digest))}
+            for filename, digest in sorted(index.items())
+            if os.path.exists(self._object_path(digest))
+        ]
+
+    def delete(self, ref: str) -> bool:
+        """Drop filename entries for a hash or filename; the object goes once nothing points at it."""
+        ref = ref.strip()
+        with self._updating() as index:
+            resolved = self._resolve(index, ref)
+            if resolved is None:
+                return False
+            _, digest = resolved
+            if ref in index:
+                del index[ref]
+            else:
+                for filename in [name for name, value in index.items() if value == digest]:
+                    del index[filename]
+            self._save_index()
+            # Still under the lock: a put deduplicating against this object can't slip in between
+            if digest not in index.values() and os.path.exists(self._object_path(digest)):
+                os.unlink(self._object_path(digest))
+        return True
+
+
+# Process-wide store shared by the logo and render endpoints
+logo_store = LogoStore(os.getenv("LOGO_STORE_DIR", os.path.join(tempfile.gettempdir(), "pdf_service_logos")))
@@ -1,12 +1,35 @@
 import os
+import logging
+import re
 import json
+import asyncio
+import collections
+import zipfile
 import tempfile
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, FileResponse
 from rise.generate_certificate import parse_word_form, parse_pdf_form, generate_certificate
+from adapters.word_adapter import draft_from_form_and_template, convert_single_word
+from template_store import template_store
+from template_source import template_source
+from storage_client import storage_client
+from render_backend import render_backend
+from job_queue import job_queue
+from logo_store import logo_store
+from rise.pdf_utils import merge_pdfs, PdfMerger, resolve_save_profile, SAVE_PROFILES, DEFAULT_SAVE_PROFILES
+from rise.logo_cache import logo_cache
+from rise.layout_cache import layout_cache
+from rise.template_geometry import geometry_registry
+from rise.service_logging import configure_logging, logging_stats
+from rise.text_prep import text_prep_stats
+from template_resolver import template_resolver
+from upload_limits import UploadRoute, upload_limits
 from datetime import datetime, timedelta
 
+logger = logging.getLogger(__name__)
+
 # Load environment variables from .env.local
 def load_env_file():
     # Look for .env.local in the Craft App root directory (2 levels up from pdf-service)
@@ -38,19 +61,25 @@ def load_env_file():
 # Load environment variables
 load_env_file()
 
+# ✅ ADDED: Leveled, queued logging (LOG_LEVEL / LOG_LEVELS / LOG_FORMAT may come from .env.local)
+configure_logging()
+
 # Get environment variables after loading
 SUPABASE_URL = os.getenv("NEXT_PUBLIC_SUPABASE_URL")
 SUPABASE_ANON_KEY = os.getenv("NEXT_PUBLIC_SUPABASE_ANON_KEY")
 INTERNAL_TOKEN = os.getenv("INTERNAL_TOKEN")
 
 # Validate required environment variables
-if not SUPABASE_URL or not SUPABASE_ANON_KEY:
+# ✅ UPDATED: Supabase is only needed when templates can come from it (TEMPLATE_SOURCE, see template_source)
+if template_source.uses_supabase and (not SUPABASE_URL or not SUPABASE_ANON_KEY):
     raise ValueError("NEXT_PUBLIC_SUPABASE_URL and NEXT_PUBLIC_SUPABASE_ANON_KEY must be set")
 
 if not INTERNAL_TOKEN:
     raise ValueError("INTERNAL_TOKEN must be set")
 
 app = FastAPI(title="PDF/Certificate Service", version="1.0.0")
+# ✅ ADDED: Every route parses its multipart body once, streaming, within the upload limits
+app.router.route_class = UploadRoute
 
 # Add CORS middleware
 app.add_middleware(
@@ -61,29 +90,184 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def start_render_backend():
+    """Start the render worker pool (pre-initialised with fonts) and the job queue before serving requests."""
+    # ✅ ADDED: Refuse to serve with a broken template geometry spec
+    geometry_problems = geometry_registry.validate()
+    if geometry_problems:
+        raise RuntimeError(f"Invalid template geometry: {'; '.join(geometry_problems)}")
+    logger.info("✅ [GEOMETRY] Template geometry validated: %s", geometry_registry.stats())
+    # ✅ ADDED: Local templates (TEMPLATE_SOURCE local/layered) are mapped before the first request
+    template_source.load()
+    # ✅ UPDATED: Render workers start with the local templates loaded, so jobs for them don't ship the bytes
+    render_backend.start(template_source.templates())
+    await job_queue.start()
+    # ✅ ADDED: Keep stored templates fresh in the background (one worker per node refreshes at a time)
+    if template_source.uses_supabase:
+        app.state.template_refresher = asyncio.create_task(template_refresher())
+
+@app.on_event("shutdown")
+async def close_storage_client():
+    """Close pooled storage connections and stop render workers when the worker stops."""
+    refresher = getattr(app.state, "template_refresher", None)
+    if refresher is not None:
+        app.state.template_refresher = None
+        refresher.cancel()
+        await asyncio.gather(refresher, return_exceptions=True)
+    await job_queue.stop()
+    await storage_client.aclose()
+    render_backend.shutdown()
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "service": "PDF Service", "port": 8000, "endpoints": ["/extract-fields", "/generate-certificate", "/generate-softcopy", "/draft", "/convert", "/generate-certificate-json"]}
+    return {"status": "healthy", "service": "PDF Service", "port": 8000, "pid": os.getpid(), "endpoints": ["/extract-fields", "/generate-certificate", "/generate-softcopy", "/generate-softcopy/batch", "/generate-printable", "/generate-printable/batch", "/layout/check", "/templates/resolve", "/templates/store", "/jobs", "/logos", "/draft", "/convert", "/generate-certificate-json"], "template_source": template_source.stats(), "template_store": template_store.stats(), "render_backend": render_backend.stats(), "jobs": job_queue.stats(), "logo_cache": logo_cache.stats(), "layout_cache": layout_cache.stats(), "template_geometry": geometry_registry.stats(), "template_resolver": template_resolver.stats(), "logging": logging_stats(), "text_prep": text_prep_stats(), "save_profiles": {"profiles": list(SAVE_PROFILES), "defaults": {kind: resolve_save_profile(None, kind) for kind in DEFAULT_SAVE_PROFILES}}, "uploads": upload_limits.stats()}
+
+def sanitize_filename(filename):
+    """Sanitize filename by removing/replacing invalid characters"""
+    # Remove or replace invalid filename characters
+    # Windows: < > : " | ? * \ /
+    # Unix: / (forward slash)
+    # Common: \r \n \t (line breaks, tabs)
+    sanitized = re.sub(r'[<>:"|?*\\/\r\n\t]', '_', filename)
+    # Replace all non-ASCII characters (including em dash, en dash, etc.)
+    sanitized = re.sub(r'[^\x00-\x7F]', '_', sanitized)
+    # Replace multiple underscores with single underscore
+    sanitized = re.sub(r'_+', '_', sanitized)
+    # Remove leading/trailing underscores
+    sanitized = sanitized.strip('_')
+    # Ensure filename is not empty
+    if not sanitized:
+        sanitized = "company"
+    return sanitized
+
+async def read_logo_lookup(logo_lookup: dict) -> dict:
+    """Turn a filename -> UploadFile logo lookup into filename -> bytes so it can travel with a render job."""
+    logo_bytes = {}
+    for filename, logo_file in logo_lookup.items():
+        if isinstance(logo_file, (bytes, bytearray)):
+            # Already bytes (e.g. resolved from the logo store)
+            logo_bytes[filename] = logo_file
+            continue
+        await logo_file.seek(0)
+        logo_bytes[filename] = await logo_file.read()
+    return logo_bytes
 
-async def download_template_from_supabase(template_name: str) -> str:
-    """Download a PDF template from Supabase storage."""
+def resolve_logo_refs(logo_refs) -> dict:
+    """Resolve the "logo_refs" form field (JSON list or comma-separated hashes/filenames) against the logo store.
+
+    Returns a filename -> bytes lookup; unknown references are logged and skipped.
+    """
+    if not logo_refs or not str(logo_refs).strip():
+        return {}
     try:
-        # Construct the download URL
-        download_url = f"{SUPABASE_URL}/storage/v1/object/public/certificate-templates/{template_name}.pdf"
-        
+        refs = json.loads(logo_refs)
+        if isinstance(refs, str):
+            refs = [refs]
+    except json.JSONDecodeError:
+        refs = str(logo_refs).split(",")
+
+    logo_lookup = {}
+    for ref in refs:
+        if not isinstance(ref, str) or not ref.strip():
+            continue
+        stored = logo_store.get(ref)
+        if stored is None:
+            logger.warning("⚠️ [LOGOS] Unknown logo reference '%s'", ref.strip())
+            continue
+        filename, data = stored
+        logo_lookup[filename] = data
+    return logo_lookup
+
+def template_url(template_name: str) -> str:
+    return f"{SUPABASE_URL}/storage/v1/object/public/certificate-templates/{template_name}.pdf"
+
+async def download_template_from_supabase(template_name: str) -> memoryview:
+    """Fetch a PDF template from the configured source: the local template directory and/or
+    Supabase storage, served from the node's template store when possible.
+
+    Returns the template PDF bytes (a read-only view of the local file or stored copy), which
+    generate_certificate/generate_softcopy open directly from memory. A stale stored copy is
+    returned straight away and revalidated in the background.
+    """
+    # ✅ ADDED: Local directory first (TEMPLATE_SOURCE local/layered) - no network at all
+    local = template_source.get_local(template_name)
+    if local is not None:
+        return local
+    if not template_source.uses_supabase:
+        raise Exception(f"Failed to download template {template_name}: not found in {template_source.directory}")
+
+    try:
+        # ✅ UPDATED: Shared on-disk store (see template_store) - stale copies are served while revalidating.
+        # Store calls (manifest reads, flock waits, fsync/rename, mmap) run off the event loop
+        stored = await asyncio.to_thread(template_store.get, template_name)
+        if stored is not None:
+            if not template_store.is_fresh(stored):
+                revalidate_in_background(template_name)
+            return stored.content
+
         # Download the template
-        response = requests.get(download_url)
+        # ✅ UPDATED: Non-blocking fetch through the shared keep-alive pool (see storage_client)
+        response = await storage_client.get(template_url(template_name))
         response.raise_for_status()
-        
-        # Save to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-            tmp_file.write(response.content)
-            return tmp_file.name
-            
+        stored = await asyncio.to_thread(template_store.put, template_name, response.content, response.headers.get("ETag"))
+        return stored.content
+
     except Exception as e:
         raise Exception(f"Failed to download template {template_name}: {str(e)}")
 
+# Revalidations in flight in this worker, keyed by template name
+_revalidations = {}
+
+async def revalidate_template(template_name: str):
+    """Ask Supabase whether a stale stored template changed (If-None-Match) and store the answer."""
+    stored = await asyncio.to_thread(template_store.get, template_name)
+    if stored is None or template_store.is_fresh(stored):
+        # Pinned, invalidated, or already revalidated by another worker
+        return
+    headers = {"If-None-Match": stored.etag} if stored.etag else {}
+    try:
+        response = await storage_client.get(template_url(template_name), headers=headers)
+        if response.status_code == 304:
+            await asyncio.to_thread(template_store.mark_revalidated, template_name)
+            return
+        response.raise_for_status()
+        entry = await asyncio.to_thread(template_store.put, template_name, response.content, response.headers.get("ETag"))
+        if entry.digest != stored.digest:
+            logger.info("✅ [TEMPLATES] %s changed in storage: %s -> %s", template_name, stored.digest[:12], entry.digest[:12])
+    except Exception as e:
+        logger.warning("⚠️ [TEMPLATES] Revalidating %s failed, still serving the stored copy: %s", template_name, e)
+
+def revalidate_in_background(template_name: str) -> asyncio.Task:
+    """Start (or join) this worker's revalidation of a template without waiting for it."""
+    task = _revalidations.get(template_name)
+    if task is None:
+        task = asyncio.create_task(revalidate_template(template_name))
+        _revalidations[template_name] = task
+        task.add_done_callback(lambda _: _revalidations.pop(template_name, None))
+    return task
+
+async def refresh_stale_templates() -> int:
+    """Revalidate every stale stored template, unless another worker on the node is already doing it."""
+    with template_store.refresh_lock() as holder:
+        if not holder:
+            return 0
+        stale = template_store.stale_names()
+        await asyncio.gather(*(revalidate_in_background(template_name) for template_name in stale))
+        return len(stale)
+
+async def template_refresher():
+    """Background task: refresh stale templates every TEMPLATE_STORE_REFRESH_INTERVAL seconds."""
+    while True:
+        await asyncio.sleep(template_store.refresh_interval)
+        try:
+            refreshed = await refresh_stale_templates()
+            if refreshed:
+                logger.debug("🔍 [TEMPLATES] Revalidated %s stale templates", refreshed)
+        except Exception as e:
+            logger.error("❌ [TEMPLATES] Template refresh failed: %s", e)
+
 @app.middleware("http")
 async def verify_internal_token(request: Request, call_next):
     # Skip token check for health endpoint
@@ -93,15 +277,9 @@ async def verify_internal_token(request: Request, call_next):
     # Get token from request headers
     token = request.headers.get("x-internal-token")
     
-    # Debug logging
-    print(f"🔍 [AUTH] Request to: {request.url.path}")
-    print(f"🔍 [AUTH] Received token: '{token}'")
-    print(f"🔍 [AUTH] Expected token: '{INTERNAL_TOKEN}'")
-    print(f"🔍 [AUTH] Tokens match: {token == INTERNAL_TOKEN}")
-    
-    # Check if token matches environment variable
+    # Check if token matches environment variable (never log token values)
     if token != INTERNAL_TOKEN:
-        print(f"❌ [AUTH] Token mismatch - received: '{token}', expected: '{INTERNAL_TOKEN}'")
+        logger.error("❌ [AUTH] Rejected request to %s: %s token", request.url.path, 'missing' if token is None else 'invalid')
         raise HTTPException(status_code=401, detail="Unauthorized")
     
     return await call_next(request)
@@ -123,42 +301,61 @@ async def extract_fields(form: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="Form must be .docx, .pdf, .png, or .jpg format")
     
     try:
-        # Save uploaded file temporarily with appropriate extension
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_extension}") as tmp_file:
-            content = await form.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
-        
-        try:
+        # ✅ UPDATED: The parsers read from a path, so the upload gets a private work area that is
+        # always removed - concurrent extractions never share a file
+        with tempfile.TemporaryDirectory(prefix="extract_fields_") as work_dir:
+            form_path = os.path.join(work_dir, f"form.{file_extension}")
+            with open(form_path, "wb") as form_file:
+                form_file.write(await form.read())
+            
             # Extract fields based on file type
             if file_extension == "docx":
-                extracted_fields = parse_word_form(tmp_file_path)
+                extracted_fields = parse_word_form(form_path)
             elif file_extension in ["pdf", "png", "jpg", "jpeg"]:
-                extracted_fields = parse_pdf_form(tmp_file_path)
+                extracted_fields = parse_pdf_form(form_path)
             else:
                 raise HTTPException(status_code=400, detail=f"Unsupported file type: {file_extension}")
             
-            # Clean up temporary file
-            os.unlink(tmp_file_path)
-            
             return extracted_fields
             
-        except Exception as e:
-            # Clean up temporary file on error
-            if os.path.exists(tmp_file_path):
-                os.unlink(tmp_file_path)
-            raise e
-            
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Field extraction failed: {str(e)}")
 
+def select_certificate_template(values: dict, logo_lookup: dict) -> tuple[str, str]:
+    """Pick the Supabase draft certificate template (name, type) for a row's field data."""
+    return template_resolver.resolve("certificate", values, logo_lookup)
+
+
+# ✅ ADDED: Output profile chosen per request ("web" or "print"), reported back with the size
+def request_save_profile(profile: str, kind: str) -> str:
+    """Validate a request's output profile, falling back to the kind's default (400 if unknown)."""
+    try:
+        return resolve_save_profile(profile, kind)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def rendered_pdf(result: dict) -> bytes:
+    """PDF bytes of an in-memory render (raises when the render could not be serialised)."""
+    if not result.get("pdf"):
+        raise RuntimeError(result.get("error") or "Render produced no PDF")
+    return result["pdf"]
+
+
+def output_headers(pdf_bytes: bytes, save_profile: str) -> dict:
+    """Response headers reporting the size and output profile of a rendered PDF."""
+    return {"X-PDF-Size": str(len(pdf_bytes)), "X-PDF-Profile": save_profile}
+
+
 @app.post("/generate-certificate")
 async def generate_certificate_endpoint(
     request: Request,
     form: UploadFile = File(...),
-    fields: str = Form(...)
+    fields: str = Form(...),
+    profile: str = Form("")
 ):
     """Generate certificate from form and field data using Supabase template."""
+    save_profile = request_save_profile(profile, "certificate")
     # Validate file types
     file_extension = form.filename.lower().split('.')[-1] if '.' in form.filename else ""
     supported_extensions = ['docx', 'pdf', 'png', 'jpg', 'jpeg']
@@ -205,265 +402,100 @@ async def generate_certificate_endpoint(
         try:
             form_data = await request.form()
             logo_files = form_data.getlist("logo_files") if hasattr(form_data, 'getlist') else []
-            print(f"🔍 [CERTIFICATE] Received {len(logo_files)} logo files")
+            logger.debug("🔍 [CERTIFICATE] Received %s logo files", len(logo_files))
             
             # Create logo lookup dictionary
             for logo_file in logo_files:
                 if hasattr(logo_file, 'filename') and logo_file.filename:
                     logo_lookup[logo_file.filename] = logo_file
-                    print(f"🔍 [CERTIFICATE] Logo file: {logo_file.filename}")
+                    logger.debug("🔍 [CERTIFICATE] Logo file: %s", logo_file.filename)
+
+            # ✅ ADDED: Logos referenced from the /logos store; uploads win on a name clash
+            logo_lookup = {**resolve_logo_refs(form_data.get("logo_refs")), **logo_lookup}
             
             # Get logo field value for logging
             logo = field_data.get("Logo", "").strip()
-            print(f"🔍 [CERTIFICATE] Logo field value: '{logo}'")
+            logger.debug("🔍 [CERTIFICATE] Logo field value: '%s'", logo)
         except Exception as logo_error:
-            print(f"⚠️ [CERTIFICATE] Error extracting logo files: {logo_error}")
+            logger.warning("⚠️ [CERTIFICATE] Error extracting logo files: %s", logo_error)
             logo_lookup = {}
         
-        # Save uploaded file temporarily with appropriate extension
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_extension}") as tmp_file:
-            content = await form.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
+        # ✅ UPDATED: Download name for the Content-Disposition header, taken from the request
+        # (the PDF itself is rendered in memory, so no file is named after it)
+        output_filename = f"{sanitize_filename(field_data.get('Company Name', '') or 'generated')}_certificate.pdf"
         
-        try:
-            # Create output file path
-            output_filename = f"generated_certificate_{os.getpid()}.pdf"
-            output_path = os.path.join(tempfile.gettempdir(), output_filename)
-            
-            # ✅ NEW: Check for Extra Line presence FIRST (highest priority)
-            extra_line = field_data.get("Extra Line", "").strip()
-            
-            # Analyze Scope content, Size, Accreditation, Logo, and Country to determine template selection
-            scope_text = field_data.get("Scope", "")
-            scope_words = len(scope_text.split())
-            
-            # ✅ DEBUG: Size field processing
-            raw_size = field_data.get("Size", "")
-            size = raw_size.lower().strip()
-            
-            
-            accreditation = field_data.get("Accreditation", "").lower().strip()
-            country = field_data.get("Country", "").strip()  # ✅ ADDED: Country parameter
-            
-            # Calculate estimated lines for Scope (approximate calculation)
-            estimated_lines = max(1, (scope_words * 8) // 60)  # Rough estimate: 8 chars per word, 60 chars per line
-            
-            # DEBUG: Template selection analysis
-            
-            
-            # Determine template based on Size, Accreditation, Logo, Country, and content length
-            # ✅ UPDATED: Check if logo filename exists in logo lookup instead of "yes"/"no"
-            logo_filename = field_data.get("Logo", "").strip()
-            
-            # ✅ NEW: Template Override Logic - Extra Line forces large template
-            if extra_line:
-                print(f"🔍 [CERTIFICATE] Extra Line present - forcing large template selection")
-                
-                # Force large template based on other parameters
-                if country.lower() == "other":
-                    # Use logo template if logo files are present OR logo field matches
-                    if len(logo_lookup) > 0 or (logo_filename and logo_filename in logo_lookup):
-                        # Logo templates for Other country
-                        if accreditation == "no":
-                            template_name = "templateDraftLogoNonAccOther"
-                            template_type = "logo_nonaccredited_other"
-                        else:
-                            template_name = "templateDraftLogoOther"
-                            template_type = "logo_other"
-                        print(f"🔍 [CERTIFICATE] Extra Line + Logo files present ({len(logo_lookup)} files) - using Other logo template")
-                    elif accreditation == "no":
-                        template_name = "templateDraftLargeNonAccOther"
-                        template_type = "large_nonaccredited_other"
-                    elif size == "high":
-                        template_name = "template_draft_large_other"
-                        template_type = "large_other"
-                    else:
-                        template_name = "template_draft_large_other_eco"
-                        template_type = "large_other_eco"
-                else:  # Default country
-                    # Use logo template if logo files are present OR logo field matches
-                    if len(logo_lookup) > 0 or (logo_filename and logo_filename in logo_lookup):
-                        if accreditation == "no":
-                            template_name = "templateDraftLogoNonAcc"
-                            template_type = "logo_nonaccredited"
-                        else:
-                            template_name = "templateDraftLogo"
-                            template_type = "logo"
-                        print(f"🔍 [CERTIFICATE] Extra Line + Logo files present ({len(logo_lookup)} files) - using logo template")
-                    elif accreditation == "no":
-                        template_name = "templateDraftLargeNonAcc"
-                        template_type = "large_nonaccredited"
-                    elif size == "high":
-                        template_name = "template_draft_large"
-                        template_type = "large"
-                    else:
-                        template_name = "templateDraftLargeEco"
-                        template_type = "large_eco"
-                
-                print(f"🔍 [CERTIFICATE] Extra Line override: {template_name} ({template_type})")
-                
-            else:
-                # ✅ EXISTING: Normal template selection logic
-                # ✅ ADDED: Country = "Other" template logic with logo templates
-                if country.lower() == "other":
-                    # Use logo template if logo files are present OR logo field matches
-                    if len(logo_lookup) > 0 or (logo_filename and logo_filename in logo_lookup):
-                        # Logo templates for Other country
-                        if accreditation == "no":
-                            template_name = "templateDraftLogoNonAccOther"
-                            template_type = "logo_nonaccredited_other"
-                        else:
-                            template_name = "templateDraftLogoOther"
-                            template_type = "logo_other"
-                        print(f"🔍 [CERTIFICATE] Logo files present ({len(logo_lookup)} files) - using Other logo template")
-                    elif accreditation == "no":
-                        # Non-accredited templates for Other country
-                        if estimated_lines <= 11:
-                            template_name = "templateDraftStandardNonAccOther"
-                            template_type = "standard_nonaccredited_other"
-                        else:
-                            template_name = "templateDraftLargeNonAccOther"
-                            template_type = "large_nonaccredited_other"
-                        print(f"[DEBUG] [TEMPLATE SELECTION] Decision: OTHER COUNTRY NON-ACCREDITED TEMPLATE")
-                        print(f"[DEBUG] [TEMPLATE SELECTION] Reason: Country = 'Other' AND accreditation = 'no'")
-                    elif size == "high" and accreditation != "no":
-                        # High size with accreditation for Other country
-                        if estimated_lines <= 11:
-                            template_name = "template_draft_other"
-                            template_type = "standard_other"
-                        else:
-                            template_name = "template_draft_large_other"
-                            template_type = "large_other"
-                    else:
-                        # Size is blank/low and accreditation != no for Other country - use eco templates
-                        if estimated_lines <= 11:
-                            template_name = "template_draft_other_eco"
-                            template_type = "standard_other_eco"
-                        else:
-                            template_name = "template_draft_large_other_eco"
-                            template_type = "large_other_eco"
-                else:
-                    # ✅ ADDED: Logo handling logic (applies to both blank and Other country)
-                    # Use logo template if logo files are present OR logo field matches
-                    if len(logo_lookup) > 0 or (logo_filename and logo_filename in logo_lookup):
-                        # Logo templates take priority - single template regardless of content length
-                        if accreditation == "no":
-                            template_name = "templateDraftLogoNonAcc"
-                            template_type = "logo_nonaccredited"
-                        else:
-                            template_name = "templateDraftLogo"
-                            template_type = "logo"
-                        print(f"🔍 [CERTIFICATE] Logo files present ({len(logo_lookup)} files) - using logo template")
-                    elif logo_filename and logo_filename not in logo_lookup:
-                        print(f"⚠️ [CERTIFICATE] Logo specified but file not found: {logo_filename} - using regular template")
-                        # Continue with regular template selection logic
-                    elif accreditation == "no":
-                        # Non-accredited templates
-                        if estimated_lines <= 11:  # Standard template for ≤11 lines
-                            template_name = "templateDraftStandardNonAcc"
-                            template_type = "standard_nonaccredited"
-                        else:  # Large template for >11 lines
-                            template_name = "templateDraftLargeNonAcc"
-                            template_type = "large_nonaccredited"
-                    elif size == "high" and accreditation != "no":
-                        # High size with accreditation - use current templates
-                        if estimated_lines <= 11:  # Standard template for ≤11 lines
-                            template_name = "template_draft"
-                            template_type = "standard"
-                        else:  # Large template for >11 lines
-                            template_name = "template_draft_large"
-                            template_type = "large"
-                    else:
-                        # Size is blank/low and accreditation != no - use eco templates
-                        if estimated_lines <= 11:  # Standard template for ≤11 lines
-                            template_name = "templateDraftStandardEco"
-                            template_type = "standard_eco"
-                        else:  # Large template for >11 lines
-                            template_name = "templateDraftLargeEco"
-                            template_type = "large_eco"
-            
-            # ✅ ADDED: Apply Language S prefix logic AFTER template selection
-            if language == "s":
-                template_name = f"S_{template_name}"
-                print(f"🔍 [CERTIFICATE] Language: Spanish (S) - using template: {template_name}")
-            else:
-                print(f"🔍 [CERTIFICATE] Language: English (default) - using template: {template_name}")
-            
-            # Download template from Supabase storage
-            template_path = await download_template_from_supabase(template_name)
-            
-            # ✅ ADDED: Add logo lookup to field_data for the generation function
-            field_data["logo_lookup"] = logo_lookup
-            print(f"🔍 [CERTIFICATE] Added logo lookup to field data: {len(logo_lookup)} logo files")
-            
-            # ✅ ADDED: Add new optional fields to field data
-            field_data["Initial Registration Date"] = initial_registration_date
-            field_data["Surveillance Due Date"] = surveillance_due_date
-            field_data["Expiry Date"] = expiry_date
-            field_data["Certificate Number"] = certificate_number
-            field_data["Original Issue Date"] = original_issue_date
-            field_data["Issue Date"] = issue_date
-            field_data["Surveillance/ Expiry Date"] = surveillance_date
-            field_data["Recertification Date"] = recertification_date
-            # ✅ ADDED: Add Extra Line field to field data
-            field_data["Extra Line"] = extra_line
-            # ✅ ADDED: Add Language field to field data
-            field_data["Language"] = language
-            print(f"🔍 [CERTIFICATE] Added new optional fields to field data")
-            
-            # ✅ FIXED: Create a proper values dictionary like soft copy does
-            # This ensures field_data is never None and has all required fields
-            values = field_data.copy()
-            print(f"🔍 [CERTIFICATE] Created values dictionary with {len(values)} fields")
-
-            # Generate certificate with template type information
-            # Call the generate_certificate function and capture return value
-            # ✅ FIXED: Add safety check for values before calling generate_certificate
-            if values is None:
-                raise HTTPException(status_code=400, detail="Values is null - cannot generate certificate")
-            
-            result = generate_certificate(template_path, output_path, values, template_type)
-            
-            # Check for overflow warnings
-            if result.get("overflow_warnings"):
-                print(f"[CERTIFICATE] ===== OVERFLOW WARNINGS =====")
-                for warning in result["overflow_warnings"]:
-                    print(f"[CERTIFICATE] {warning['message']}")
-                print(f"[CERTIFICATE] ===== END OVERFLOW WARNINGS =====")
-            
-            # Read the generated PDF
-            with open(output_path, "rb") as f:
-                pdf_bytes = f.read()
-            
-            # Clean up temporary files
-            os.unlink(tmp_file_path)
-            if os.path.exists(output_path):
-                os.unlink(output_path)
-            if os.path.exists(template_path):
-                os.unlink(template_path)
-            
-            # Check if we have overflow warnings to include in response headers
-            warning_headers = {}
-            if 'result' in locals() and result.get("overflow_warnings"):
-                warning_messages = [w["message"] for w in result["overflow_warnings"]]
-                warning_header = " | ".join(warning_messages)
-                warning_headers["X-Overflow-Warnings"] = warning_header
-            
-            return Response(
-                pdf_bytes,
-                media_type="application/pdf",
-                headers={
-                    "Content-Disposition": f'attachment; filename="{output_filename}"',
-                    **warning_headers
-                }
-            )
-            
-        except Exception as e:
-            # Clean up temporary file on error
-            if os.path.exists(tmp_file_path):
-                os.unlink(tmp_file_path)
-            raise e
+        # ✅ NEW: Check for Extra Line presence FIRST (highest priority)
+        extra_line = field_data.get("Extra Line", "").strip()
+        
+        # Determine which Supabase template to use (shared with /layout/check)
+        template_name, template_type = select_certificate_template(field_data, logo_lookup)
+        
+        # Download template from Supabase storage (cached in memory per process)
+        template_bytes = await download_template_from_supabase(template_name)
+        
+        # ✅ ADDED: Add logo lookup to field_data for the generation function
+        field_data["logo_lookup"] = await read_logo_lookup(logo_lookup)
+        logger.debug("🔍 [CERTIFICATE] Added logo lookup to field data: %s logo files", len(logo_lookup))
+        
+        # ✅ ADDED: Add new optional fields to field data
+        field_data["Initial Registration Date"] = initial_registration_date
+        field_data["Surveillance Due Date"] = surveillance_due_date
+        field_data["Expiry Date"] = expiry_date
+        field_data["Certificate Number"] = certificate_number
+        field_data["Original Issue Date"] = original_issue_date
+        field_data["Issue Date"] = issue_date
+        field_data["Surveillance/ Expiry Date"] = surveillance_date
+        field_data["Recertification Date"] = recertification_date
+        # ✅ ADDED: Add Extra Line field to field data
+        field_data["Extra Line"] = extra_line
+        # ✅ ADDED: Add Language field to field data
+        field_data["Language"] = language
+        logger.debug("🔍 [CERTIFICATE] Added new optional fields to field data")
+        
+        # ✅ FIXED: Create a proper values dictionary like soft copy does
+        # This ensures field_data is never None and has all required fields
+        values = field_data.copy()
+        logger.debug("🔍 [CERTIFICATE] Created values dictionary with %s fields", len(values))
+
+        # Generate certificate with template type information
+        # Call the generate_certificate function and capture return value
+        # ✅ FIXED: Add safety check for values before calling generate_certificate
+        if values is None:
+            raise HTTPException(status_code=400, detail="Values is null - cannot generate certificate")
+        
+        # ✅ UPDATED: Render on the configured backend so the event loop stays free
+        result = await render_backend.run({
+            "kind": "certificate",
+            "template": template_bytes,
+            "template_name": template_name,
+            "values": values,
+            "template_type": template_type,
+            "save_profile": save_profile,
+        })
+        
+        # Check for overflow warnings
+        if result.get("overflow_warnings"):
+            for warning in result["overflow_warnings"]:
+                logger.warning("⚠️ [CERTIFICATE] Overflow: %s", warning['message'])
+        
+        pdf_bytes = rendered_pdf(result)
+        
+        # Check if we have overflow warnings to include in response headers
+        warning_headers = {}
+        if 'result' in locals() and result.get("overflow_warnings"):
+            warning_messages = [w["message"] for w in result["overflow_warnings"]]
+            warning_header = " | ".join(warning_messages)
+            warning_headers["X-Overflow-Warnings"] = warning_header
+        
+        return Response(
+            pdf_bytes,
+            media_type="application/pdf",
+            headers={
+                "Content-Disposition": f'attachment; filename="{output_filename}"',
+                **output_headers(pdf_bytes, save_profile),
+                **warning_headers
+            }
+        )
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Certificate generation failed: {str(e)}")
@@ -503,13 +535,119 @@ async def convert(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Conversion failed: {str(e)}")
 
+def build_softcopy_field_data(soft_copy_data: dict, logo_lookup: dict) -> dict:
+    """Map one spreadsheet row onto the field names expected by generate_softcopy."""
+    # Extract fields - FIXED: Use correct field names that match Next.js API
+    company_name = soft_copy_data.get("Company Name", "")
+    address = soft_copy_data.get("Address", "")
+    iso_standard = soft_copy_data.get("ISO Standard", "")
+    scope = soft_copy_data.get("Scope", "")
+    certificate_number = soft_copy_data.get("Certificate Number", "")
+    original_issue_date = soft_copy_data.get("Original Issue Date", "")
+    issue_date = soft_copy_data.get("Issue Date", "")
+    surveillance_date = soft_copy_data.get("Surveillance/ Expiry Date", "")
+    recertification_date = soft_copy_data.get("Recertification Date", "")
+    # ✅ ADDED: Extract Revision field
+    revision = soft_copy_data.get("Revision", "")
+    # ✅ ADDED: Extract the 3 new optional fields
+    initial_registration_date = soft_copy_data.get("Initial Registration Date", "")
+    surveillance_due_date = soft_copy_data.get("Surveillance Due Date", "")
+    expiry_date = soft_copy_data.get("Expiry Date", "")
+    # ✅ ADDED: Extract Extra Line field
+    extra_line = soft_copy_data.get("Extra Line", "")
+    size = soft_copy_data.get("Size", "")
+    accreditation = soft_copy_data.get("Accreditation", "")
+    logo = soft_copy_data.get("Logo", "")
+    # ✅ ADDED: Extract Country field
+    country = soft_copy_data.get("Country", "")
+    # ✅ ADDED: Extract Address alignment field
+    logger.debug("🔍 [SOFTCOPY-DEBUG] All Excel keys: %s", list(soft_copy_data.keys()))
+    address_alignment = soft_copy_data.get("Address alignment", "")
+    logger.debug("🔍 [SOFTCOPY-DEBUG] Raw Address alignment from Excel: '%s'", address_alignment)
+    # Try alternative field names
+    alt_address_alignment = soft_copy_data.get("Address Alignment", "")
+    logger.debug("🔍 [SOFTCOPY-DEBUG] Alternative 'Address Alignment': '%s'", alt_address_alignment)
+    alt_address_alignment2 = soft_copy_data.get("address alignment", "")
+    logger.debug("🔍 [SOFTCOPY-DEBUG] Alternative 'address alignment': '%s'", alt_address_alignment2)
+    # ✅ ADDED: Extract Language field (S or blank)
+    language = soft_copy_data.get("Language", "").strip().lower()
+
+
+    # Prepare values for soft copy generation
+    # Map to the exact field names expected by generate_softcopy function
+    values = {
+        "Company Name": company_name if company_name else "Company Name",
+        "Address": address if address else "Address", 
+        "ISO Standard": iso_standard if iso_standard else "ISO Standard",
+        "Scope": scope if scope else "Scope",
+        "Certificate Number": certificate_number if certificate_number else f"SOFT-{company_name[:3].upper()}-{os.getpid()}",
+        "Original Issue Date": original_issue_date if original_issue_date else "",
+        "Issue Date": issue_date if issue_date else "",
+        "Surveillance/ Expiry Date": surveillance_date if surveillance_date else "",
+        "Recertification Date": recertification_date if recertification_date else "",
+        "Revision": revision if revision else "",
+        # ✅ ADDED: Add Size and Accreditation fields
+        "Size": size if size else "",
+        "Accreditation": accreditation if accreditation else "",
+        # ✅ ADDED: Add Country field
+        "Country": country if country else "",
+        # ✅ ADDED: Add the 3 new optional fields
+        "Initial Registration Date": initial_registration_date if initial_registration_date else "",
+        "Surveillance Due Date": surveillance_due_date if surveillance_due_date else "",
+        "Expiry Date": expiry_date if expiry_date else "",
+        # ✅ ADDED: Add Address alignment field
+        "Address alignment": address_alignment if address_alignment else "",
+        # ✅ ADDED: Add Language field (S or blank)
+        "Language": language if language else "",
+        # ✅ FIXED: Add Extra Line field to values dictionary for template selection
+        "Extra Line": extra_line if extra_line else "",
+        # ✅ ADDED: Add logo lookup for filename matching
+        "logo_lookup": logo_lookup
+    }
+
+    # ✅ ADDED: Create field_data for consistency with certificate section
+    field_data = values.copy()
+
+    # ✅ ADDED: Add optional fields to field_data for the generation function
+    field_data["Initial Registration Date"] = initial_registration_date
+    field_data["Surveillance Due Date"] = surveillance_due_date
+    field_data["Expiry Date"] = expiry_date
+    field_data["Certificate Number"] = certificate_number
+    field_data["Original Issue Date"] = original_issue_date
+    field_data["Issue Date"] = issue_date
+    field_data["Surveillance/ Expiry Date"] = surveillance_date
+    field_data["Recertification Date"] = recertification_date
+    # ✅ ADDED: Add Extra Line field to field data
+    field_data["Extra Line"] = extra_line
+    # ✅ ADDED: Add Language field to field data
+    field_data["Language"] = language
+
+    # ✅ ADDED: Add Excel adjustment fields to field_data
+    field_data["Name Font Size"] = soft_copy_data.get("Name Font Size", "")
+    field_data["Name Adjustment"] = soft_copy_data.get("Name Adjustment", "")
+    field_data["Address Font Size"] = soft_copy_data.get("Address Font Size", "")
+    field_data["Address Adjustment"] = soft_copy_data.get("Address Adjustment", "")
+    field_data["Scope Font Size"] = soft_copy_data.get("Scope Font Size", "")
+    field_data["Scope Adjustment"] = soft_copy_data.get("Scope Adjustment", "")
+    # ✅ ADDED: Add Logo field to field_data so it's available in generate_softCopy
+    field_data["Logo"] = logo if logo else ""
+
+    return field_data
+
+def select_softcopy_template(values: dict, logo_lookup: dict) -> tuple[str, str]:
+    """Pick the Supabase softcopy template (name, type) for a row's field data."""
+    return template_resolver.resolve("softcopy", values, logo_lookup)
+
+
 @app.post("/generate-softcopy")
 async def generate_softcopy_endpoint(
     request: Request,
     data: str = Form(...),
-    template: UploadFile = File(None)
+    template: UploadFile = File(None),
+    profile: str = Form("")
 ):
     """Generate soft copy PDF from form data using Supabase template."""
+    save_profile = request_save_profile(profile, "softcopy")
     try:
         # ENHANCED LOGGING: Log raw data received
       
@@ -529,72 +667,42 @@ async def generate_softcopy_endpoint(
         
         # Extract fields - FIXED: Use correct field names that match Next.js API
         company_name = soft_copy_data.get("Company Name", "")
-        address = soft_copy_data.get("Address", "")
-        iso_standard = soft_copy_data.get("ISO Standard", "")
-        scope = soft_copy_data.get("Scope", "")
-        certificate_number = soft_copy_data.get("Certificate Number", "")
-        original_issue_date = soft_copy_data.get("Original Issue Date", "")
-        issue_date = soft_copy_data.get("Issue Date", "")
-        surveillance_date = soft_copy_data.get("Surveillance/ Expiry Date", "")
-        recertification_date = soft_copy_data.get("Recertification Date", "")
-        # ✅ ADDED: Extract Revision field
-        revision = soft_copy_data.get("Revision", "")
-        # ✅ ADDED: Extract the 3 new optional fields
-        initial_registration_date = soft_copy_data.get("Initial Registration Date", "")
-        surveillance_due_date = soft_copy_data.get("Surveillance Due Date", "")
-        expiry_date = soft_copy_data.get("Expiry Date", "")
-        # ✅ ADDED: Extract Extra Line field
-        extra_line = soft_copy_data.get("Extra Line", "")
-        size = soft_copy_data.get("Size", "")
-        accreditation = soft_copy_data.get("Accreditation", "")
         logo = soft_copy_data.get("Logo", "")
-        # ✅ ADDED: Extract Country field
-        country = soft_copy_data.get("Country", "")
-        # ✅ ADDED: Extract Address alignment field
-        print(f"🔍 [SOFTCOPY-DEBUG] All Excel keys: {list(soft_copy_data.keys())}")
-        address_alignment = soft_copy_data.get("Address alignment", "")
-        print(f"🔍 [SOFTCOPY-DEBUG] Raw Address alignment from Excel: '{address_alignment}'")
-        # Try alternative field names
-        alt_address_alignment = soft_copy_data.get("Address Alignment", "")
-        print(f"🔍 [SOFTCOPY-DEBUG] Alternative 'Address Alignment': '{alt_address_alignment}'")
-        alt_address_alignment2 = soft_copy_data.get("address alignment", "")
-        print(f"🔍 [SOFTCOPY-DEBUG] Alternative 'address alignment': '{alt_address_alignment2}'")
-        # ✅ ADDED: Extract Language field (S or blank)
-        language = soft_copy_data.get("Language", "").strip().lower()
 
         # ✅ ADDED: Extract logo files from form data
         try:
             form_data = await request.form()
             logo_files = form_data.getlist("logo_files") if hasattr(form_data, 'getlist') else []
-            print(f"🔍 [SOFTCOPY] Received {len(logo_files)} logo files")
+            logger.debug("🔍 [SOFTCOPY] Received %s logo files", len(logo_files))
             
             # ✅ ADDED: Create logo lookup dictionary
             logo_lookup = {}
             for logo_file in logo_files:
                 if hasattr(logo_file, 'filename') and logo_file.filename:
                     logo_lookup[logo_file.filename] = logo_file
-                    print(f"🔍 [SOFTCOPY] Logo file: {logo_file.filename} ({len(logo_file.file.read()) if hasattr(logo_file.file, 'read') else 'unknown'} bytes)")
-                    # Reset file pointer for later use
-                    if hasattr(logo_file.file, 'seek'):
-                        logo_file.file.seek(0)
+                    # ✅ UPDATED: Log the size the upload already knows instead of reading the whole file
+                    logger.debug("🔍 [SOFTCOPY] Logo file: %s (%s bytes)", logo_file.filename, logo_file.size if logo_file.size is not None else 'unknown')
+
+            # ✅ ADDED: Logos referenced from the /logos store; uploads win on a name clash
+            logo_lookup = {**resolve_logo_refs(form_data.get("logo_refs")), **logo_lookup}
             
             # ✅ ADDED: Debug logo matching logic with filename normalization
             if logo and logo.strip():
                 if logo in logo_lookup:
-                    print(f"✅ [SOFTCOPY] Logo '{logo}' found in logo_lookup")
+                    logger.info("✅ [SOFTCOPY] Logo '%s' found in logo_lookup", logo)
                 elif len(logo_lookup) > 0:
-                    print(f"⚠️ [SOFTCOPY] Logo '{logo}' not in logo_lookup, but {len(logo_lookup)} files available: {list(logo_lookup.keys())}")
+                    logger.warning("⚠️ [SOFTCOPY] Logo '%s' not in logo_lookup, but %s files available: %s", logo, len(logo_lookup), list(logo_lookup.keys()))
                     # Try to find partial match (filename without extension)
                     for filename in logo_lookup.keys():
                         if logo in filename or filename.split('.')[0] == logo:
-                            print(f"✅ [SOFTCOPY] Found partial match: '{logo}' matches '{filename}'")
+                            logger.info("✅ [SOFTCOPY] Found partial match: '%s' matches '%s'", logo, filename)
                             break
                 else:
-                    print(f"⚠️ [SOFTCOPY] Logo '{logo}' specified but no logo files received")
+                    logger.warning("⚠️ [SOFTCOPY] Logo '%s' specified but no logo files received", logo)
             elif len(logo_lookup) > 0:
-                print(f"🔍 [SOFTCOPY] Logo field empty but {len(logo_lookup)} logo files available: {list(logo_lookup.keys())}")
+                logger.debug("🔍 [SOFTCOPY] Logo field empty but %s logo files available: %s", len(logo_lookup), list(logo_lookup.keys()))
         except Exception as logo_error:
-            print(f"⚠️ [SOFTCOPY] Error extracting logo files: {logo_error}")
+            logger.warning("⚠️ [SOFTCOPY] Error extracting logo files: %s", logo_error)
             logo_lookup = {}
 
         # Validate required fields
@@ -602,263 +710,45 @@ async def generate_softcopy_endpoint(
             raise HTTPException(status_code=400, detail="Company name is required")
 
         # Prepare values for soft copy generation
-        # Map to the exact field names expected by generate_softcopy function
-        values = {
-            "Company Name": company_name if company_name else "Company Name",
-            "Address": address if address else "Address", 
-            "ISO Standard": iso_standard if iso_standard else "ISO Standard",
-            "Scope": scope if scope else "Scope",
-            "Certificate Number": certificate_number if certificate_number else f"SOFT-{company_name[:3].upper()}-{os.getpid()}",
-            "Original Issue Date": original_issue_date if original_issue_date else "",
-            "Issue Date": issue_date if issue_date else "",
-            "Surveillance/ Expiry Date": surveillance_date if surveillance_date else "",
-            "Recertification Date": recertification_date if recertification_date else "",
-            "Revision": revision if revision else "",
-            # ✅ ADDED: Add Size and Accreditation fields
-            "Size": size if size else "",
-            "Accreditation": accreditation if accreditation else "",
-            # ✅ ADDED: Add Country field
-            "Country": country if country else "",
-            # ✅ ADDED: Add the 3 new optional fields
-            "Initial Registration Date": initial_registration_date if initial_registration_date else "",
-            "Surveillance Due Date": surveillance_due_date if surveillance_due_date else "",
-            "Expiry Date": expiry_date if expiry_date else "",
-            # ✅ ADDED: Add Address alignment field
-            "Address alignment": address_alignment if address_alignment else "",
-            # ✅ ADDED: Add Language field (S or blank)
-            "Language": language if language else "",
-            # ✅ FIXED: Add Extra Line field to values dictionary for template selection
-            "Extra Line": extra_line if extra_line else "",
-            # ✅ ADDED: Add logo lookup for filename matching
-            "logo_lookup": logo_lookup
-        }
-        
-        # ✅ ADDED: Create field_data for consistency with certificate section
-        field_data = values.copy()
-        
-        # ✅ ADDED: Add optional fields to field_data for the generation function
-        field_data["Initial Registration Date"] = initial_registration_date
-        field_data["Surveillance Due Date"] = surveillance_due_date
-        field_data["Expiry Date"] = expiry_date
-        field_data["Certificate Number"] = certificate_number
-        field_data["Original Issue Date"] = original_issue_date
-        field_data["Issue Date"] = issue_date
-        field_data["Surveillance/ Expiry Date"] = surveillance_date
-        field_data["Recertification Date"] = recertification_date
-        # ✅ ADDED: Add Extra Line field to field data
-        field_data["Extra Line"] = extra_line
-        # ✅ ADDED: Add Language field to field data
-        field_data["Language"] = language
-        
-        # ✅ ADDED: Add Excel adjustment fields to field_data
-        field_data["Name Font Size"] = soft_copy_data.get("Name Font Size", "")
-        field_data["Name Adjustment"] = soft_copy_data.get("Name Adjustment", "")
-        field_data["Address Font Size"] = soft_copy_data.get("Address Font Size", "")
-        field_data["Address Adjustment"] = soft_copy_data.get("Address Adjustment", "")
-        field_data["Scope Font Size"] = soft_copy_data.get("Scope Font Size", "")
-        field_data["Scope Adjustment"] = soft_copy_data.get("Scope Adjustment", "")
-        # ✅ ADDED: Add Logo field to field_data so it's available in generate_softCopy
-        field_data["Logo"] = logo if logo else ""
+        field_data = build_softcopy_field_data(soft_copy_data, logo_lookup)
         
         
         # Determine template path and type
         if template:
-            # Use uploaded custom template
-            import tempfile
-            template_path = os.path.join(tempfile.gettempdir(), f"uploaded_template_{template.filename}")
-            with open(template_path, "wb") as buffer:
-                content = await template.read()
-                buffer.write(content)
+            # ✅ UPDATED: Use uploaded custom template straight from memory
+            template_bytes = await template.read()
             template_type = "standard"
             template_name = f"custom_{template.filename}"
         else:
-            # Determine which Supabase template to use based on content length and Size/Accreditation
-            # Use the SAME LOGIC as certificate generation
-            scope_words = len(scope.split()) if scope else 0
-            estimated_lines = max(1, (scope_words * 8) // 60)  # 8 chars per word, 60 chars per line
-            
-            # Get Size, Accreditation, Logo, and Country from the form data
-            # Note: Logo is already extracted from Excel data (soft_copy_data) above, don't overwrite it
-            size = values.get("Size", "").lower().strip()
-            accreditation = values.get("Accreditation", "").lower().strip()
-            # logo is already set from soft_copy_data.get("Logo", "") on line 552, don't overwrite
-            country = values.get("Country", "").strip()  # ✅ ADDED: Country parameter
-            
-            # ✅ NEW: Check for Extra Line presence FIRST (highest priority)
-            extra_line = values.get("Extra Line", "").strip()
-            
-            # ✅ NEW: Template Override Logic - Extra Line forces large template
-            if extra_line:
-                print(f"🔍 [SOFTCOPY] Extra Line present - forcing large template selection")
-                
-                # Force large template based on other parameters
-                if country.lower() == "other":
-                    # Use logo template if logo files are present OR logo field matches
-                    if len(logo_lookup) > 0 or (logo and logo.strip() and logo in logo_lookup):
-                        # Logo templates for Other country
-                        if accreditation == "no":
-                            template_name = "templateSoftCopyLogoOtherNonAcc"
-                            template_type = "logo_other_nonaccredited"
-                        else:
-                            template_name = "templateSoftCopyLogoOther"
-                            template_type = "logo_other"
-                        print(f"🔍 [SOFTCOPY] Extra Line + Logo files present ({len(logo_lookup)} files) - using Other logo template")
-                    elif accreditation == "no":
-                        template_name = "templateSoftCopyLargeNonAccOther"
-                        template_type = "large_nonaccredited_other"
-                    elif size == "high":
-                        template_name = "template_softCopy_large_other"
-                        template_type = "large_other"
-                    else:
-                        template_name = "template_softCopy_large_other_eco"
-                        template_type = "large_other_eco"
-                else:  # Default country
-                    # Use logo template if logo files are present OR logo field matches
-                    if len(logo_lookup) > 0 or (logo and logo.strip() and logo in logo_lookup):
-                        # Logo templates for Default country
-                        if accreditation == "no":
-                            template_name = "templateSoftCopyLogoNonAcc"
-                            template_type = "logo_nonaccredited"
-                        else:
-                            template_name = "templateSoftCopyLogo"
-                            template_type = "logo"
-                    elif accreditation == "no":
-                        template_name = "templateSoftCopyLargeNonAcc"
-                        template_type = "large_nonaccredited"
-                    elif size == "high":
-                        template_name = "template_SoftCopy_large"
-                        template_type = "large"
-                    else:
-                        template_name = "templateSoftCopyLargeEco"
-                        template_type = "large_eco"
-                
-                print(f"🔍 [SOFTCOPY] Extra Line override: {template_name} ({template_type})")
-                
-            else:
-                # ✅ EXISTING: Normal template selection logic
-                # ✅ UPDATED: Template selection logic with Country parameter (simplified - no separate logo templates)
-                if country.lower() == "other":
-                    # Country = "Other" template logic
-                    # Use logo template if logo files are present OR logo field matches
-                    if len(logo_lookup) > 0 or (logo and logo.strip() and logo in logo_lookup):
-                        # Logo templates for Other country
-                        if accreditation == "no":
-                            template_name = "templateSoftCopyLogoOtherNonAcc"
-                            template_type = "logo_other_nonaccredited"
-                        else:
-                            template_name = "templateSoftCopyLogoOther"
-                            template_type = "logo_other"
-                        print(f"🔍 [SOFTCOPY] Logo files present ({len(logo_lookup)} files) - using Other logo template")
-                    elif accreditation == "no":
-                        # Non-accredited templates for Other country
-                        if estimated_lines <= 11:
-                            template_name = "templateSoftCopyStandardNonAccOther"
-                            template_type = "standard_nonaccredited_other"
-                        else:
-                            template_name = "templateSoftCopyLargeNonAccOther"
-                            template_type = "large_nonaccredited_other"
-                    elif size == "high" and accreditation != "no":
-                        # High size with accreditation for Other country
-                        if estimated_lines <= 11:
-                            template_name = "template_softCopy_other"
-                            template_type = "standard_other"
-                        else:
-                            template_name = "template_softCopy_large_other"
-                            template_type = "large_other"
-                    else:
-                        # Size is blank/low and accreditation != no for Other country - use eco templates
-                        if estimated_lines <= 11:
-                            template_name = "template_softCopy_other_eco"
-                            template_type = "standard_other_eco"
-                        else:
-                            template_name = "template_softCopy_large_other_eco"
-                            template_type = "large_other_eco"
-                else:
-                    # ✅ ADDED: Logo handling logic (applies to both blank and Other country)
-                    # Use logo template if logo files are present OR logo field matches
-                    if len(logo_lookup) > 0 or (logo and logo.strip() and logo in logo_lookup):
-                        # Logo templates take priority - single template regardless of content length
-                        if accreditation == "no":
-                            template_name = "templateSoftCopyLogoNonAcc"
-                            template_type = "logo_nonaccredited"
-                        else:
-                            template_name = "templateSoftCopyLogo"
-                            template_type = "logo"
-                        print(f"🔍 [SOFTCOPY] Logo files present ({len(logo_lookup)} files) - using logo template")
-                    elif logo and logo.strip() and logo not in logo_lookup:
-                        print(f"⚠️ [SOFTCOPY] Logo specified but file not found: {logo} - using regular template")
-                    elif accreditation == "no":
-                        # Non-accredited templates
-                        if estimated_lines <= 11:  # Standard template for ≤11 lines
-                            template_name = "templateSoftCopyStandardNonAcc"
-                            template_type = "standard_nonaccredited"
-                        else:  # Large template for >11 lines
-                            template_name = "templateSoftCopyLargeNonAcc"
-                            template_type = "large_nonaccredited"
-                    elif size == "high" and accreditation != "no":
-                        # High size with accreditation - use current templates
-                        if estimated_lines <= 11:  # Standard template for ≤11 lines
-                            template_name = "template_softCopy"
-                            template_type = "standard"
-                        else:  # Large template for >11 lines
-                            template_name = "template_SoftCopy_large"
-                            template_type = "large"
-                    else:
-                        # Size is blank/low and accreditation != no - use eco templates
-                        if estimated_lines <= 11:  # Standard template for ≤11 lines
-                            template_name = "templateSoftCopyStandardEco"
-                            template_type = "standard_eco"
-                        else:  # Large template for >11 lines
-                            template_name = "templateSoftCopyLargeEco"
-                            template_type = "large_eco"
-            
-            # ✅ ADDED: Apply Language S prefix logic AFTER template selection
-            if language == "s":
-                template_name = f"S_{template_name}"
-                print(f"🔍 [SOFTCOPY] Language: Spanish (S) - using template: {template_name}")
-            else:
-                print(f"🔍 [SOFTCOPY] Language: English (default) - using template: {template_name}")
+            # Determine which Supabase template to use (shared with /generate-softcopy/batch)
+            template_name, template_type = select_softcopy_template(field_data, logo_lookup)
             
-            # Download template from Supabase storage
+            # Download template from Supabase storage (cached in memory per process)
             try:
-                template_path = await download_template_from_supabase(template_name)
+                template_bytes = await download_template_from_supabase(template_name)
             except Exception as template_error:
                 raise HTTPException(status_code=500, detail=f"Template download failed: {str(template_error)}")
 
         # Generate output filename with proper sanitization
-        def sanitize_filename(filename):
-            """Sanitize filename by removing/replacing invalid characters"""
-            import re
-            # Remove or replace invalid filename characters
-            # Windows: < > : " | ? * \ /
-            # Unix: / (forward slash)
-            # Common: \r \n \t (line breaks, tabs)
-            sanitized = re.sub(r'[<>:"|?*\\/\r\n\t]', '_', filename)
-            # Replace all non-ASCII characters (including em dash, en dash, etc.)
-            sanitized = re.sub(r'[^\x00-\x7F]', '_', sanitized)
-            # Replace multiple underscores with single underscore
-            sanitized = re.sub(r'_+', '_', sanitized)
-            # Remove leading/trailing underscores
-            sanitized = sanitized.strip('_')
-            # Ensure filename is not empty
-            if not sanitized:
-                sanitized = "company"
-            return sanitized
-        
         clean_company_name = sanitize_filename(company_name)
         output_filename = f"{clean_company_name}_softcopy.pdf"
-        # Use Windows-compatible temporary directory
-        import tempfile
-        output_path = os.path.join(tempfile.gettempdir(), output_filename)
 
         # Generate the soft copy using the dedicated soft copy generation function
         
         # Use the dedicated soft copy generation function
         try:
-            from rise.generate_softCopy import generate_softcopy
+            # ✅ UPDATED: Logos travel as bytes and the render runs on the configured backend
+            field_data["logo_lookup"] = await read_logo_lookup(logo_lookup)
             
             # Call the unified generate_softcopy function with softcopy mode
-            result = generate_softcopy(template_path, output_path, field_data, template_type, "softcopy")
+            result = await render_backend.run({
+                "kind": "softcopy",
+                "template": template_bytes,
+                "template_name": template_name,
+                "values": field_data,
+                "template_type": template_type,
+                "save_profile": save_profile,
+            })
             
             # Check for overflow warnings
             if result.get("overflow_warnings"):
@@ -867,23 +757,12 @@ async def generate_softcopy_endpoint(
         except Exception as gen_error:
             raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(gen_error)}")
 
-        # Read the generated PDF
+        # ✅ UPDATED: The PDF comes back from the render as bytes - no temporary files to read or clean up
         try:
-            with open(output_path, "rb") as pdf_file:
-                pdf_content = pdf_file.read()
+            pdf_content = rendered_pdf(result)
         except Exception as read_error:
             raise HTTPException(status_code=500, detail=f"PDF read failed: {str(read_error)}")
 
-        # Clean up temporary files AFTER reading the content
-        if template and os.path.exists(template_path):
-            os.unlink(template_path)
-        elif not template and os.path.exists(template_path):
-            os.unlink(template_path)
-        
-        # Clean up output file after reading
-        if os.path.exists(output_path):
-            os.unlink(output_path)
-
         # Check if we have overflow warnings to include in response headers
         warning_headers = {}
         if 'result' in locals() and result.get("overflow_warnings"):
@@ -896,6 +775,7 @@ async def generate_softcopy_endpoint(
             media_type="application/pdf",
             headers={
                 "Content-Disposition": f"attachment; filename={output_filename}",
+                **output_headers(pdf_content, save_profile),
                 **warning_headers
             }
         )
@@ -903,6 +783,306 @@ async def generate_softcopy_endpoint(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate soft copy: {str(e)}")
 
+def prepare_row(kind: str, row: dict, logo_lookup: dict) -> tuple[dict, str, str]:
+    """Build a spreadsheet row's field data and resolve its template, as the render endpoints do.
+
+    Args:
+        kind: "softcopy", "printable" or "certificate"
+        row: Row data keyed by spreadsheet column names
+        logo_lookup: Shared filename -> logo mapping (only the names affect the template)
+
+    Returns:
+        Tuple of (field data, template_name, template_type)
+    """
+    if kind == "certificate":
+        values = dict(row)
+        values["Extra Line"] = values.get("Extra Line", "").strip()
+        values["Language"] = values.get("Language", "").strip().lower()
+        template_name, template_type = select_certificate_template(values, logo_lookup)
+    elif kind == "printable":
+        values = build_printable_field_data(row, logo_lookup)
+        template_name, template_type = select_printable_template(values, row.get("Logo", ""), logo_lookup)
+    else:
+        values = build_softcopy_field_data(row, logo_lookup)
+        template_name, template_type = select_softcopy_template(values, logo_lookup)
+    return values, template_name, template_type
+
+async def render_row_pdf(kind: str, index: int, row: dict, logo_lookup: dict, save_profile: str | None = None) -> dict:
+    """Render one spreadsheet row as a "softcopy" or "printable" PDF for the batch and job endpoints.
+
+    Args:
+        kind: "softcopy" or "printable"
+        index: Zero-based row number (used for the output filename)
+        row: Row data keyed by spreadsheet column names
+        logo_lookup: Shared filename -> logo bytes mapping
+        save_profile: Output profile ("web" or "print"); defaults per kind
+
+    Returns:
+        Dict with pdf bytes, filename, template_name, template_type,
+        overflow_warnings, output_size and save_profile
+    """
+    company_name = row.get("Company Name", "")
+    if not company_name:
+        raise ValueError("Company name is required")
+
+    field_data, template_name, template_type = prepare_row(kind, row, logo_lookup)
+
+    template_bytes = await download_template_from_supabase(template_name)
+    filename = f"{index + 1:04d}_{sanitize_filename(company_name)}_{kind}.pdf"
+    result = await render_backend.run({
+        "kind": kind,
+        "template": template_bytes,
+        "template_name": template_name,
+        "values": field_data,
+        "template_type": template_type,
+        # Printable runs share few templates across many rows - parse once, clone per row
+        "clone_template": kind == "printable",
+        "save_profile": save_profile,
+    })
+    pdf_content = rendered_pdf(result)
+
+    return {
+        "pdf": pdf_content,
+        "filename": filename,
+        "template_name": template_name,
+        "template_type": template_type,
+        "overflow_warnings": result.get("overflow_warnings", []),
+        "output_size": len(pdf_content),
+        "save_profile": result.get("save_profile"),
+    }
+
+async def render_rows_in_order(render_row, rows: list, window: int | None = None):
+    """Render rows with at most `window` in flight, yielding (index, result) in row order.
+
+    Keeps a sliding window of render tasks (sized to the render backend's workers by default),
+    so a large batch never queues every row at once or holds more than `window` finished
+    results while the consumer catches up. render_row(index, row) is awaited per row.
+    """
+    window = max(1, window or render_backend.workers)
+    pending = collections.deque()
+    next_rows = iter(enumerate(rows))
+    try:
+        while True:
+            while len(pending) < window:
+                queued = next(next_rows, None)
+                if queued is None:
+                    break
+                pending.append((queued[0], asyncio.ensure_future(render_row(*queued))))
+            if not pending:
+                return
+            index, task = pending.popleft()
+            yield index, await task
+    finally:
+        # Consumer stopped early (client went away) - stop outstanding renders
+        for _, task in pending:
+            task.cancel()
+
+class ZipStreamSink:
+    """Write-only sink that lets zipfile build an archive chunk by chunk for streaming."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+@app.post("/generate-softcopy/batch")
+async def generate_softcopy_batch_endpoint(
+    request: Request,
+    rows: str = Form(...),
+    profile: str = Form("")
+):
+    """Generate soft copies for many spreadsheet rows in one request.
+
+    Logos are uploaded once (logo_files) and shared by every row. The response streams a ZIP
+    with one PDF per row, in row order, plus a manifest.json holding the per-row template,
+    output size, overflow warnings and errors. Only a window of rows renders at a time.
+    """
+    save_profile = request_save_profile(profile, "softcopy")
+    # Parse the JSON rows
+    if not rows or rows.strip() == "":
+        raise HTTPException(status_code=400, detail="Rows are empty or missing")
+    try:
+        batch_rows = json.loads(rows)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid rows format")
+    if not isinstance(batch_rows, list) or not all(isinstance(row, dict) for row in batch_rows):
+        raise HTTPException(status_code=400, detail="Rows must be a JSON array of objects")
+    # ✅ ADDED: Bounded batch size (longer runs go through /jobs)
+    upload_limits.check_rows(len(batch_rows))
+
+    # Read the shared logo set exactly once for the whole batch
+    try:
+        form_data = await request.form()
+        logo_files = form_data.getlist("logo_files") if hasattr(form_data, 'getlist') else []
+        logo_lookup = {
+            logo_file.filename: logo_file
+            for logo_file in logo_files
+            if hasattr(logo_file, 'filename') and logo_file.filename
+        }
+        logo_lookup = {**resolve_logo_refs(form_data.get("logo_refs")), **logo_lookup}
+        logo_lookup = await read_logo_lookup(logo_lookup)
+    except Exception as logo_error:
+        logger.warning("⚠️ [SOFTCOPY-BATCH] Error extracting logo files: %s", logo_error)
+        logo_lookup = {}
+    logger.debug("🔍 [SOFTCOPY-BATCH] %s rows, %s shared logo files", len(batch_rows), len(logo_lookup))
+
+    async def render_row(index: int, row: dict) -> dict:
+        """Render one row and return its manifest entry plus the PDF bytes."""
+        company_name = row.get("Company Name", "")
+        entry = {"row": index, "company_name": company_name, "filename": None, "template_name": None,
+                 "template_type": None, "output_size": None, "overflow_warnings": [], "error": None}
+        try:
+            rendered = await render_row_pdf("softcopy", index, row, logo_lookup, save_profile)
+            entry["template_name"] = rendered["template_name"]
+            entry["template_type"] = rendered["template_type"]
+            entry["filename"] = rendered["filename"]
+            entry["output_size"] = rendered["output_size"]
+            entry["overflow_warnings"] = rendered["overflow_warnings"]
+            return {**entry, "pdf": rendered["pdf"]}
+        except Exception as row_error:
+            logger.error("❌ [SOFTCOPY-BATCH] Row %s failed: %s", index + 1, row_error)
+            entry["error"] = str(row_error)
+            return {**entry, "pdf": None}
+
+    async def stream_archive():
+        manifest = []
+        sink = ZipStreamSink()
+        # ✅ UPDATED: Bounded window of in-flight rows, written to the archive in row order
+        rendered_rows = render_rows_in_order(render_row, batch_rows)
+        try:
+            with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                async for _, entry in rendered_rows:
+                    pdf_content = entry.pop("pdf")
+                    if pdf_content is not None:
+                        archive.writestr(entry["filename"], pdf_content)
+                    manifest.append(entry)
+                    yield sink.drain()
+
+                archive.writestr("manifest.json", json.dumps({
+                    "rows": len(batch_rows),
+                    "rendered": sum(1 for item in manifest if item["error"] is None),
+                    "failed": sum(1 for item in manifest if item["error"] is not None),
+                    "save_profile": save_profile,
+                    "output_bytes": sum(item["output_size"] or 0 for item in manifest),
+                    "results": manifest,
+                }, indent=2, default=str))
+            yield sink.drain()
+        finally:
+            # Client went away or batch finished - stop outstanding renders
+            await rendered_rows.aclose()
+
+    return StreamingResponse(
+        stream_archive(),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="softcopies.zip"'}
+    )
+
+def build_printable_field_data(row: dict, logo_lookup: dict) -> dict:
+    """Map one printable row (spreadsheet column names) onto the field names expected by generate_softcopy."""
+    company_name = row.get("Company Name", "")
+    address = row.get("Address", "")
+    iso_standard = row.get("ISO Standard", "")
+    scope = row.get("Scope", "")
+    certificate_number = row.get("Certificate Number", "")
+    original_issue_date = row.get("Original Issue Date", "")
+    issue_date = row.get("Issue Date", "")
+    surveillance_date = row.get("Surveillance/ Expiry Date", "")
+    recertification_date = row.get("Recertification Date", "")
+    revision = row.get("Revision", "")
+    size = row.get("Size", "")
+    accreditation = row.get("Accreditation", "")
+    country = row.get("Country", "")
+    initial_registration_date = row.get("Initial Registration Date", "")
+    surveillance_due_date = row.get("Surveillance Due Date", "")
+    expiry_date = row.get("Expiry Date", "")
+    extra_line = row.get("Extra Line", "")
+    address_alignment = row.get("Address alignment", "")
+    name_font_size = row.get("Name Font Size", "")
+    name_adjustment = row.get("Name Adjustment", "")
+    address_font_size = row.get("Address Font Size", "")
+    address_adjustment = row.get("Address Adjustment", "")
+    scope_font_size = row.get("Scope Font Size", "")
+    scope_adjustment = row.get("Scope Adjustment", "")
+
+    # Prepare values for printable generation
+    # Map to the exact field names expected by generate_printable function
+    values = {
+        "Company Name": company_name if company_name else "Company Name",
+        "Address": address if address else "Address", 
+        "ISO Standard": iso_standard if iso_standard else "ISO Standard",
+        "Scope": scope if scope else "Scope",
+        "Certificate Number": certificate_number if certificate_number else f"PRINT-{company_name[:3].upper()}-{os.getpid()}",
+        "Original Issue Date": original_issue_date if original_issue_date else "",
+        "Issue Date": issue_date if issue_date else "",
+        "Surveillance/ Expiry Date": surveillance_date if surveillance_date else "",
+        "Recertification Date": recertification_date if recertification_date else "",
+        "Revision": revision if revision else "",
+        "Size": size if size else "",
+        "Accreditation": accreditation if accreditation else "",
+        # ✅ ADDED: Country field for template selection
+        "Country": country if country else "",
+        # ✅ ADDED: Add the 3 new optional fields
+        "Initial Registration Date": initial_registration_date if initial_registration_date else "",
+        "Surveillance Due Date": surveillance_due_date if surveillance_due_date else "",
+        "Expiry Date": expiry_date if expiry_date else "",
+        # ✅ ADDED: Add Extra Line field
+        "Extra Line": extra_line if extra_line else "",
+        # ✅ ADDED: Add Address alignment field
+        "Address alignment": address_alignment if address_alignment else "",
+        # ✅ ADDED: Add font size and adjustment fields
+        "Name Font Size": name_font_size if name_font_size else "",
+        "Name Adjustment": name_adjustment if name_adjustment else "",
+        "Address Font Size": address_font_size if address_font_size else "",
+        "Address Adjustment": address_adjustment if address_adjustment else "",
+        "Scope Font Size": scope_font_size if scope_font_size else "",
+        "Scope Adjustment": scope_adjustment if scope_adjustment else "",
+        # ✅ ADDED: Add logo lookup for filename matching
+        "logo_lookup": logo_lookup
+    }
+
+    # ✅ ADDED: Create field_data for consistency with certificate section
+    field_data = values.copy()
+
+    # ✅ ADDED: Add optional fields to field_data for the generation function
+    field_data["Initial Registration Date"] = initial_registration_date
+    field_data["Surveillance Due Date"] = surveillance_due_date
+    field_data["Expiry Date"] = expiry_date
+    field_data["Certificate Number"] = certificate_number
+    field_data["Original Issue Date"] = original_issue_date
+    field_data["Issue Date"] = issue_date
+    field_data["Surveillance/ Expiry Date"] = surveillance_date
+    field_data["Recertification Date"] = recertification_date
+    # ✅ ADDED: Add Extra Line field to field data
+    field_data["Extra Line"] = extra_line
+    # ✅ ADDED: Add font size and adjustment fields to field data
+    field_data["Name Font Size"] = name_font_size
+    field_data["Name Adjustment"] = name_adjustment
+    field_data["Address Font Size"] = address_font_size
+    field_data["Address Adjustment"] = address_adjustment
+    field_data["Scope Font Size"] = scope_font_size
+    field_data["Scope Adjustment"] = scope_adjustment
+    logger.debug("🔍 [PRINTABLE] Extra Line received: '%s'", extra_line)
+    logger.debug("🔍 [PRINTABLE] Extra Line length: %s", len(extra_line))
+    logger.debug("🔍 [PRINTABLE] Extra Line in field_data: '%s'", field_data.get('Extra Line', 'NOT_FOUND'))
+    logger.debug("🔍 [PRINTABLE] Added optional fields to field data")
+
+    return field_data
+
+def select_printable_template(values: dict, logo: str, logo_lookup: dict) -> tuple[str, str]:
+    """Pick the Supabase printable template (name, type) for a row's field data."""
+    return template_resolver.resolve("printable", values, logo_lookup, logo)
+
+
 @app.post("/generate-printable")
 async def generate_printable(
     request: Request,
@@ -936,11 +1116,13 @@ async def generate_printable(
     scope_font_size: str = Form(""),
     scope_adjustment: str = Form(""),
     logo: str = Form(""),
-    template: UploadFile = File(None)
+    template: UploadFile = File(None),
+    profile: str = Form("")
 ):
     """Generate printable certificate from form data."""
+    save_profile = request_save_profile(profile, "printable")
     try:
-        print(f"🔍 [PRINTABLE] Using individual form parameters")
+        logger.debug("🔍 [PRINTABLE] Using individual form parameters")
 
         # Validate required fields
         if not company_name:
@@ -950,288 +1132,102 @@ async def generate_printable(
         try:
             form_data = await request.form()
             logo_files = form_data.getlist("logo_files") if hasattr(form_data, 'getlist') else []
-            print(f"🔍 [PRINTABLE] Received {len(logo_files)} logo files")
+            logger.debug("🔍 [PRINTABLE] Received %s logo files", len(logo_files))
             
             # ✅ ADDED: Create logo lookup dictionary
             logo_lookup = {}
             for logo_file in logo_files:
                 if hasattr(logo_file, 'filename') and logo_file.filename:
                     logo_lookup[logo_file.filename] = logo_file
-                    print(f"🔍 [PRINTABLE] Logo file: {logo_file.filename} ({len(logo_file.file.read()) if hasattr(logo_file.file, 'read') else 'unknown'} bytes)")
-                    # Reset file pointer for later use
-                    if hasattr(logo_file.file, 'seek'):
-                        logo_file.file.seek(0)
+                    # ✅ UPDATED: Log the size the upload already knows instead of reading the whole file
+                    logger.debug("🔍 [PRINTABLE] Logo file: %s (%s bytes)", logo_file.filename, logo_file.size if logo_file.size is not None else 'unknown')
+
+            # ✅ ADDED: Logos referenced from the /logos store; uploads win on a name clash
+            logo_lookup = {**resolve_logo_refs(form_data.get("logo_refs")), **logo_lookup}
         except Exception as logo_error:
-            print(f"⚠️ [PRINTABLE] Error extracting logo files: {logo_error}")
+            logger.warning("⚠️ [PRINTABLE] Error extracting logo files: %s", logo_error)
             logo_lookup = {}
 
         # Prepare values for printable generation
-        # Map to the exact field names expected by generate_printable function
-        values = {
-            "Company Name": company_name if company_name else "Company Name",
-            "Address": address if address else "Address", 
-            "ISO Standard": iso_standard if iso_standard else "ISO Standard",
-            "Scope": scope if scope else "Scope",
-            "Certificate Number": certificate_number if certificate_number else f"PRINT-{company_name[:3].upper()}-{os.getpid()}",
-            "Original Issue Date": original_issue_date if original_issue_date else "",
-            "Issue Date": issue_date if issue_date else "",
-            "Surveillance/ Expiry Date": surveillance_date if surveillance_date else "",
-            "Recertification Date": recertification_date if recertification_date else "",
-            "Revision": revision if revision else "",
-            "Size": size if size else "",
-            "Accreditation": accreditation if accreditation else "",
-            # ✅ ADDED: Country field for template selection
-            "Country": country if country else "",
-            # ✅ ADDED: Add the 3 new optional fields
-            "Initial Registration Date": initial_registration_date if initial_registration_date else "",
-            "Surveillance Due Date": surveillance_due_date if surveillance_due_date else "",
-            "Expiry Date": expiry_date if expiry_date else "",
-            # ✅ ADDED: Add Extra Line field
-            "Extra Line": extra_line if extra_line else "",
-            # ✅ ADDED: Add Address alignment field
-            "Address alignment": address_alignment if address_alignment else "",
-            # ✅ ADDED: Add font size and adjustment fields
-            "Name Font Size": name_font_size if name_font_size else "",
-            "Name Adjustment": name_adjustment if name_adjustment else "",
-            "Address Font Size": address_font_size if address_font_size else "",
-            "Address Adjustment": address_adjustment if address_adjustment else "",
-            "Scope Font Size": scope_font_size if scope_font_size else "",
-            "Scope Adjustment": scope_adjustment if scope_adjustment else "",
-            # ✅ ADDED: Add logo lookup for filename matching
-            "logo_lookup": logo_lookup
-        }
-        
-        # ✅ ADDED: Create field_data for consistency with certificate section
-        field_data = values.copy()
-        
-        # ✅ ADDED: Add optional fields to field_data for the generation function
-        field_data["Initial Registration Date"] = initial_registration_date
-        field_data["Surveillance Due Date"] = surveillance_due_date
-        field_data["Expiry Date"] = expiry_date
-        field_data["Certificate Number"] = certificate_number
-        field_data["Original Issue Date"] = original_issue_date
-        field_data["Issue Date"] = issue_date
-        field_data["Surveillance/ Expiry Date"] = surveillance_date
-        field_data["Recertification Date"] = recertification_date
-        # ✅ ADDED: Add Extra Line field to field data
-        field_data["Extra Line"] = extra_line
-        # ✅ ADDED: Add font size and adjustment fields to field data
-        field_data["Name Font Size"] = name_font_size
-        field_data["Name Adjustment"] = name_adjustment
-        field_data["Address Font Size"] = address_font_size
-        field_data["Address Adjustment"] = address_adjustment
-        field_data["Scope Font Size"] = scope_font_size
-        field_data["Scope Adjustment"] = scope_adjustment
-        print(f"🔍 [PRINTABLE] Extra Line received: '{extra_line}'")
-        print(f"🔍 [PRINTABLE] Extra Line length: {len(extra_line)}")
-        print(f"🔍 [PRINTABLE] Extra Line in field_data: '{field_data.get('Extra Line', 'NOT_FOUND')}'")
-        print(f"🔍 [PRINTABLE] Added optional fields to field data")
+        field_data = build_printable_field_data({
+            "Company Name": company_name,
+            "Address": address,
+            "ISO Standard": iso_standard,
+            "Scope": scope,
+            "Certificate Number": certificate_number,
+            "Original Issue Date": original_issue_date,
+            "Issue Date": issue_date,
+            "Surveillance/ Expiry Date": surveillance_date,
+            "Recertification Date": recertification_date,
+            "Revision": revision,
+            "Size": size,
+            "Accreditation": accreditation,
+            "Country": country,
+            "Initial Registration Date": initial_registration_date,
+            "Surveillance Due Date": surveillance_due_date,
+            "Expiry Date": expiry_date,
+            "Extra Line": extra_line,
+            "Address alignment": address_alignment,
+            "Name Font Size": name_font_size,
+            "Name Adjustment": name_adjustment,
+            "Address Font Size": address_font_size,
+            "Address Adjustment": address_adjustment,
+            "Scope Font Size": scope_font_size,
+            "Scope Adjustment": scope_adjustment,
+        }, logo_lookup)
         
         # Determine template path and type
         if template:
-            # Use uploaded custom template
-            import tempfile
-            template_path = os.path.join(tempfile.gettempdir(), f"uploaded_template_{template.filename}")
-            with open(template_path, "wb") as buffer:
-                content = await template.read()
-                buffer.write(content)
+            # ✅ UPDATED: Use uploaded custom template straight from memory
+            template_bytes = await template.read()
             template_type = "standard"
             template_name = f"custom_{template.filename}"
-            print(f"🔍 [PRINTABLE] Using uploaded custom template: {template.filename}")
+            logger.debug("🔍 [PRINTABLE] Using uploaded custom template: %s", template.filename)
         else:
-            # Determine which Supabase template to use based on content length and Size/Accreditation
-            # Use the SAME LOGIC as certificate generation and soft copy
-            scope_words = len(scope.split()) if scope else 0
-            estimated_lines = max(1, (scope_words * 8) // 60)  # 8 chars per word, 60 chars per line
-            
-            # Get Size, Accreditation, Logo, and Country from the form data
-            size_lower = size.lower().strip() if size else ""
-            accreditation_lower = accreditation.lower().strip() if accreditation else ""
-            logo_lower = logo.lower().strip() if logo else ""
-            country_lower = country.lower().strip() if country else ""  # ✅ ADDED: Country parameter
-            
-            # ✅ NEW: Check for Extra Line presence FIRST (highest priority)
-            extra_line = values.get("Extra Line", "").strip()
-            
-            # ✅ NEW: Template Override Logic - Extra Line forces large template
-            if extra_line:
-                print(f"🔍 [PRINTABLE] Extra Line present - forcing large template selection")
-                
-                # Force large template based on other parameters
-                if country_lower == "other":
-                    if logo_lower and logo_lower.strip() and logo_lower in logo_lookup:
-                        # Logo templates for Other country
-                        if accreditation_lower == "no":
-                            template_name = "templatePrintableLogoOtherNonAcc"
-                            template_type = "logo_other_nonaccredited"
-                        else:
-                            template_name = "templatePrintableLogoOther"
-                            template_type = "logo_other"
-                    elif accreditation_lower == "no":
-                        template_name = "templateprintableLargeOtherNonAcc"
-                        template_type = "large_other_nonaccredited"
-                    elif size_lower == "high":
-                        template_name = "templateprintableLargeOther"
-                        template_type = "large_other"
-                    else:
-                        template_name = "templateprintableLargeOtherEco"
-                        template_type = "large_other_eco"
-                else:  # Default country
-                    if logo_lower and logo_lower.strip() and logo_lower in logo_lookup:
-                        # Logo templates for Default country
-                        if accreditation_lower == "no":
-                            template_name = "templatePrintableLogoNonAcc"
-                            template_type = "logo_nonaccredited"
-                        else:
-                            template_name = "templatePrintableLogo"
-                            template_type = "logo"
-                    elif accreditation_lower == "no":
-                        template_name = "templateprintableLargeNonAcc"
-                        template_type = "large_nonaccredited"
-                    elif size_lower == "high":
-                        template_name = "templateprintableLarge"
-                        template_type = "large"
-                    else:
-                        template_name = "templateprintableLargeEco"
-                        template_type = "large_eco"
-                
-                print(f"🔍 [PRINTABLE] Extra Line override: {template_name} ({template_type})")
-                
-            else:
-                # ✅ EXISTING: Normal template selection logic
-                # ✅ UPDATED: Template selection logic with correct template names
-                if country_lower == "other":
-                    # Country = "Other" template logic
-                    if logo_lower and logo_lower.strip() and logo_lower in logo_lookup:
-                        # Logo templates for Other country
-                        if accreditation_lower == "no":
-                            template_name = "templatePrintableLogoOtherNonAcc"
-                            template_type = "logo_other_nonaccredited"
-                        else:
-                            template_name = "templatePrintableLogoOther"
-                            template_type = "logo_other"
-                    elif accreditation_lower == "no":
-                        # Non-accredited templates for Other country
-                        if estimated_lines <= 11:
-                            template_name = "templatePrintableOtherNonAcc"
-                            template_type = "standard_other_nonaccredited"
-                        else:
-                            template_name = "templateprintableLargeOtherNonAcc"
-                            template_type = "large_other_nonaccredited"
-                    elif size_lower == "high" and accreditation_lower != "no":
-                        # High size with accreditation for Other country
-                        if estimated_lines <= 11:
-                            template_name = "templatePrintableStandardOther"
-                            template_type = "standard_other"
-                        else:
-                            template_name = "templateprintableLargeOther"
-                            template_type = "large_other"
-                    else:
-                        # Size is blank/low and accreditation != no for Other country - use eco templates
-                        if estimated_lines <= 11:
-                            template_name = "templatePrintableStandardOtherEco"
-                            template_type = "standard_other_eco"
-                        else:
-                            template_name = "templateprintableLargeOtherEco"
-                            template_type = "large_other_eco"
-                else:
-                    # Original template logic for blank country
-                    if logo_lower and logo_lower.strip() and logo_lower in logo_lookup:
-                        # Logo templates take priority - single template regardless of content length
-                        if accreditation_lower == "no":
-                            template_name = "templatePrintableLogoNonAcc"
-                            template_type = "logo_nonaccredited"
-                        else:
-                            template_name = "templatePrintableLogo"
-                            template_type = "logo"
-                    elif logo_lower and logo_lower.strip() and logo_lower not in logo_lookup:
-                        print(f"⚠️ [PRINTABLE] Logo specified but file not found: {logo_lower} - using regular template")
-                        # Continue with regular template selection logic
-                    elif accreditation_lower == "no":
-                        # Non-accredited templates
-                        if estimated_lines <= 11:  # Standard template for ≤11 lines
-                            template_name = "templatePrintableStandardNonAcc"
-                            template_type = "standard_nonaccredited"
-                        else:  # Large template for >11 lines
-                            template_name = "templateprintableLargeNonAcc"
-                            template_type = "large_nonaccredited"
-                    elif size_lower == "high" and accreditation_lower != "no":
-                        # High size with accreditation - use current templates
-                        if estimated_lines <= 11:  # Standard template for ≤11 lines
-                            template_name = "templatePrintableStandard"
-                            template_type = "standard"
-                        else:  # Large template for >11 lines
-                            template_name = "templateprintableLarge"
-                            template_type = "large"
-                    else:
-                        # Size is blank/low and accreditation != no - use eco templates
-                        if estimated_lines <= 11:  # Standard template for ≤11 lines
-                            template_name = "templatePrintableStandardEco"
-                            template_type = "standard_eco"
-                        else:  # Large template for >11 lines
-                            template_name = "templateprintableLargeEco"
-                            template_type = "large_eco"
-            
-            print(f"🔍 [PRINTABLE] Scope: {scope_words} words, ~{estimated_lines} lines, Size: '{size_lower}', Accreditation: '{accreditation_lower}', Logo: '{logo_lower}', Country: '{country_lower}', using {template_type} template: {template_name}.pdf")
+            # Determine which Supabase template to use (shared with /generate-printable/batch)
+            template_name, template_type = select_printable_template(field_data, logo, logo_lookup)
             
             # Download template from Supabase storage
-            print(f"🔍 [PRINTABLE] Downloading {template_name}.pdf from Supabase...")
+            logger.debug("🔍 [PRINTABLE] Downloading %s.pdf from Supabase...", template_name)
             try:
-                template_path = await download_template_from_supabase(template_name)
-                print(f"🔍 [PRINTABLE] Template downloaded to: {template_path}")
+                template_bytes = await download_template_from_supabase(template_name)
+                logger.debug("🔍 [PRINTABLE] Template loaded: %s.pdf (%s bytes)", template_name, len(template_bytes))
             except Exception as template_error:
-                print(f"❌ [PRINTABLE] Template download failed: {template_error}")
+                logger.error("❌ [PRINTABLE] Template download failed: %s", template_error)
                 raise HTTPException(status_code=500, detail=f"Template download failed: {str(template_error)}")
 
         # Generate output filename with proper sanitization
-        def sanitize_filename(filename):
-            """Sanitize filename by removing/replacing invalid characters"""
-            import re
-            # Remove or replace invalid filename characters
-            # Windows: < > : " | ? * \ /
-            # Unix: / (forward slash)
-            # Common: \r \n \t (line breaks, tabs)
-            sanitized = re.sub(r'[<>:"|?*\\/\r\n\t]', '_', filename)
-            # Replace all non-ASCII characters (including em dash, en dash, etc.)
-            sanitized = re.sub(r'[^\x00-\x7F]', '_', sanitized)
-            # Replace multiple underscores with single underscore
-            sanitized = re.sub(r'_+', '_', sanitized)
-            # Remove leading/trailing underscores
-            sanitized = sanitized.strip('_')
-            # Ensure filename is not empty
-            if not sanitized:
-                sanitized = "company"
-            return sanitized
-        
         clean_company_name = sanitize_filename(company_name)
         output_filename = f"{clean_company_name}_printable.pdf"
-        # Use Windows-compatible temporary directory
-        import tempfile
-        output_path = os.path.join(tempfile.gettempdir(), output_filename)
 
         # Generate the printable using the dedicated printable generation function
-        print(f"🔍 [PRINTABLE] Starting printable generation with {template_type} template...")
+        logger.debug("🔍 [PRINTABLE] Starting printable generation with %s template...", template_type)
         
         # Use the unified PDF generation function with printable mode
         try:
-            from rise.generate_softCopy import generate_softcopy
-            print(f"🔍 [PRINTABLE] Calling unified generate_softcopy with template: {template_path}")
-            print(f"🔍 [PRINTABLE] Output path: {output_path}")
-            result = generate_softcopy(template_path, output_path, field_data, template_type, "printable")
-            print(f"🔍 [PRINTABLE] PDF generation completed successfully")
+            logger.debug("🔍 [PRINTABLE] Calling unified generate_softcopy with template: %s", template_name)
+            # ✅ UPDATED: Logos travel as bytes and the render runs on the configured backend
+            field_data["logo_lookup"] = await read_logo_lookup(logo_lookup)
+            result = await render_backend.run({
+                "kind": "printable",
+                "template": template_bytes,
+                "template_name": template_name,
+                "values": field_data,
+                "template_type": template_type,
+                "save_profile": save_profile,
+            })
+            logger.debug("🔍 [PRINTABLE] PDF generation completed successfully")
             # Check for overflow warnings
             if result.get("overflow_warnings"):
-                print(f"⚠️ [PRINTABLE] Overflow warnings: {result['overflow_warnings']}")
+                logger.warning("⚠️ [PRINTABLE] Overflow warnings: %s", result['overflow_warnings'])
         except Exception as gen_error:
-            print(f"❌ [PRINTABLE] PDF generation failed: {gen_error}")
+            logger.error("❌ [PRINTABLE] PDF generation failed: %s", gen_error)
             raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(gen_error)}")
 
-        # Read the generated PDF
+        # ✅ UPDATED: The PDF comes back from the render as bytes - no temporary files to read or clean up
         try:
-            print(f"🔍 [PRINTABLE] Reading generated PDF from: {output_path}")
-            with open(output_path, "rb") as pdf_file:
-                pdf_content = pdf_file.read()
-            print(f"🔍 [PRINTABLE] PDF read successfully, size: {len(pdf_content)} bytes")
+            pdf_content = rendered_pdf(result)
+            logger.debug("🔍 [PRINTABLE] PDF rendered in memory, size: %s bytes", len(pdf_content))
             
             # Validate PDF content
             if len(pdf_content) == 0:
@@ -1242,28 +1238,9 @@ async def generate_printable(
                 raise ValueError("Generated file does not appear to be a valid PDF")
                 
         except Exception as read_error:
-            print(f"❌ [PRINTABLE] PDF read failed: {read_error}")
+            logger.error("❌ [PRINTABLE] PDF read failed: %s", read_error)
             raise HTTPException(status_code=500, detail=f"PDF read failed: {str(read_error)}")
 
-        # Clean up temporary files AFTER reading the content
-        try:
-            if template and os.path.exists(template_path):
-                os.unlink(template_path)
-                print(f"🔍 [PRINTABLE] Template file cleaned up: {template_path}")
-            elif not template and os.path.exists(template_path):
-                os.unlink(template_path)
-                print(f"🔍 [PRINTABLE] Template file cleaned up: {template_path}")
-        except Exception as cleanup_error:
-            print(f"⚠️ [PRINTABLE] Template cleanup warning: {cleanup_error}")
-        
-        # Clean up output file after reading (but before response)
-        try:
-            if os.path.exists(output_path):
-                os.unlink(output_path)
-                print(f"🔍 [PRINTABLE] Output file cleaned up: {output_path}")
-        except Exception as cleanup_error:
-            print(f"⚠️ [PRINTABLE] Output file cleanup warning: {cleanup_error}")
-
         # Set proper response headers for PDF download
         response_headers = {
             "Content-Disposition": f"attachment; filename={output_filename}",
@@ -1271,10 +1248,11 @@ async def generate_printable(
             "Content-Length": str(len(pdf_content)),
             "Cache-Control": "no-cache, no-store, must-revalidate",
             "Pragma": "no-cache",
-            "Expires": "0"
+            "Expires": "0",
+            **output_headers(pdf_content, save_profile)
         }
         
-        print(f"🔍 [PRINTABLE] Returning PDF response: {len(pdf_content)} bytes, filename: {output_filename}")
+        logger.debug("🔍 [PRINTABLE] Returning PDF response: %s bytes, filename: %s", len(pdf_content), output_filename)
         
         return Response(
             content=pdf_content,
@@ -1285,13 +1263,505 @@ async def generate_printable(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate printable: {str(e)}")
 
+@app.post("/generate-printable/batch")
+async def generate_printable_batch_endpoint(
+    request: Request,
+    rows: str = Form(...),
+    profile: str = Form("")
+):
+    """Generate one print-ready PDF holding a printable certificate for every row.
+
+    Rows use the spreadsheet column names. Logos are uploaded once (logo_files) and shared.
+    Each template is parsed once per render worker and its page cloned per row; a window of
+    rows renders in parallel and each finished page goes into the output in row order. Rows
+    that fail are left out and listed in the X-Failed-Rows header (500 only if every row fails).
+    """
+    save_profile = request_save_profile(profile, "printable")
+    # Parse the JSON rows
+    if not rows or rows.strip() == "":
+        raise HTTPException(status_code=400, detail="Rows are empty or missing")
+    try:
+        batch_rows = json.loads(rows)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid rows format")
+    if not isinstance(batch_rows, list) or not batch_rows or not all(isinstance(row, dict) for row in batch_rows):
+        raise HTTPException(status_code=400, detail="Rows must be a non-empty JSON array of objects")
+    # ✅ ADDED: Bounded batch size (longer runs go through /jobs)
+    upload_limits.check_rows(len(batch_rows))
+
+    missing = [index + 1 for index, row in enumerate(batch_rows) if not row.get("Company Name")]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Company name is required (rows {missing})")
+
+    # Read the shared logo set exactly once for the whole batch
+    try:
+        form_data = await request.form()
+        logo_files = form_data.getlist("logo_files") if hasattr(form_data, 'getlist') else []
+        logo_lookup = {
+            logo_file.filename: logo_file
+            for logo_file in logo_files
+            if hasattr(logo_file, 'filename') and logo_file.filename
+        }
+        logo_lookup = {**resolve_logo_refs(form_data.get("logo_refs")), **logo_lookup}
+        logo_lookup = await read_logo_lookup(logo_lookup)
+    except Exception as logo_error:
+        logger.warning("⚠️ [PRINTABLE-BATCH] Error extracting logo files: %s", logo_error)
+        logo_lookup = {}
+    logger.debug("🔍 [PRINTABLE-BATCH] %s rows, %s shared logo files", len(batch_rows), len(logo_lookup))
+
+    # ✅ UPDATED: Rows render through a bounded window and their pages go into one output
+    # document in row order; a failed row is reported instead of failing the batch
+    async def render_row(index: int, row: dict):
+        try:
+            return await render_row_pdf("printable", index, row, logo_lookup, save_profile)
+        except Exception as row_error:
+            logger.error("❌ [PRINTABLE-BATCH] Row %s failed: %s", index + 1, row_error)
+            return row_error
+
+    # The merged document lives on one thread of its own (MuPDF documents must not be shared
+    # across threads) and pages are copied there, off the event loop, while later rows render
+    loop = asyncio.get_running_loop()
+    merge_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="merge")
+    merger = await loop.run_in_executor(merge_thread, PdfMerger)
+    rendered_rows = render_rows_in_order(render_row, batch_rows)
+    warning_messages = []
+    failures = []
+    try:
+        async for index, result in rendered_rows:
+            if isinstance(result, Exception):
+                failures.append(f"row {index + 1}: {result}")
+                continue
+            await loop.run_in_executor(merge_thread, merger.add, result["pdf"])
+            warning_messages.extend(f"Row {index + 1}: {warning['message']}" for warning in result["overflow_warnings"])
+        if not merger.pages:
+            raise HTTPException(status_code=500, detail=f"Printable batch failed - {'; '.join(failures)}")
+        pdf_content = await loop.run_in_executor(merge_thread, merger.tobytes, save_profile)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to generate printable batch: {str(e)}")
+    finally:
+        await rendered_rows.aclose()
+        await loop.run_in_executor(merge_thread, merger.close)
+        merge_thread.shutdown(wait=False)
+
+    response_headers = {
+        "Content-Disposition": "attachment; filename=printables.pdf",
+        "Content-Length": str(len(pdf_content)),
+        "Cache-Control": "no-cache, no-store, must-revalidate",
+        **output_headers(pdf_content, save_profile),
+    }
+    if warning_messages:
+        response_headers["X-Overflow-Warnings"] = " | ".join(warning_messages)
+    if failures:
+        logger.warning("⚠️ [PRINTABLE-BATCH] %s of %s rows failed: %s", len(failures), len(batch_rows), failures)
+        response_headers["X-Failed-Rows"] = " | ".join(failures)
+
+    logger.info("✅ [PRINTABLE-BATCH] Merged %s certificates: %s bytes", len(batch_rows) - len(failures), len(pdf_content))
+    return Response(content=pdf_content, media_type="application/pdf", headers=response_headers)
+
+# ✅ ADDED: Dry-run layout check - fit results for many rows without rendering PDFs
+LAYOUT_CHECK_KINDS = ("softcopy", "printable", "certificate")
+
+async def check_row_layout(kind: str, index: int, row: dict, logo_lookup: dict) -> dict:
+    """Resolve one row's template and run its text fitting without opening or saving a PDF.
+
+    Args:
+        kind: "softcopy", "printable" or "certificate"
+        index: Zero-based row number
+        row: Row data keyed by spreadsheet column names
+        logo_lookup: Shared filename -> logo bytes mapping (only the names affect the layout)
+
+    Returns:
+        Dict with the chosen template, per-field fit results and overflow warnings
+    """
+    company_name = row.get("Company Name", "")
+    if not company_name:
+        raise ValueError("Company name is required")
+
+    values, template_name, template_type = prepare_row(kind, row, logo_lookup)
+    if kind == "certificate":
+        values["logo_lookup"] = logo_lookup
+
+    result = await render_backend.run({
+        "kind": kind,
+        "template": None,
+        "template_name": template_name,
+        "output_path": None,
+        "values": values,
+        "template_type": template_type,
+        "dry_run": True,
+    })
+    return {
+        "row": index,
+        "company_name": company_name,
+        "template_name": template_name,
+        "template_type": template_type,
+        "fields": result.get("layout", {}),
+        "overflow_warnings": result.get("overflow_warnings", []),
+        "error": None,
+    }
+
+def layout_overflows(result: dict) -> bool:
+    """True when a checked row has overflow warnings or a field that did not fit its box."""
+    if result["overflow_warnings"]:
+        return True
+    return any(
+        field.get("overflow") or field.get("fits") is False
+        for field in result["fields"].values()
+    )
+
+@app.post("/layout/check")
+async def layout_check_endpoint(
+    request: Request,
+    rows: str = Form(...),
+    kind: str = Form("softcopy")
+):
+    """Report how every row would be laid out, without rendering any PDFs.
+
+    Rows use the spreadsheet column names (a JSON array, or a single object). Each row's
+    template is resolved exactly as the render endpoints do, then the usual fitting runs on
+    a blank page: the response holds font sizes, line counts, adjustments and overflow
+    warnings per field, so a whole spreadsheet can be checked before a batch render.
+    """
+    kind = (kind or "").strip().lower()
+    if kind not in LAYOUT_CHECK_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown kind '{kind}' - expected one of {', '.join(LAYOUT_CHECK_KINDS)}")
+
+    # Parse the JSON rows (a single object is checked as a one-row batch)
+    if not rows or rows.strip() == "":
+        raise HTTPException(status_code=400, detail="Rows are empty or missing")
+    try:
+        check_rows = json.loads(rows)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid rows format")
+    if isinstance(check_rows, dict):
+        check_rows = [check_rows]
+    if not isinstance(check_rows, list) or not check_rows or not all(isinstance(row, dict) for row in check_rows):
+        raise HTTPException(status_code=400, detail="Rows must be a JSON object or a non-empty array of objects")
+
+    # Logos only steer template selection here - read the shared set once
+    try:
+        form_data = await request.form()
+        logo_files = form_data.getlist("logo_files") if hasattr(form_data, 'getlist') else []
+        logo_lookup = {
+            logo_file.filename: logo_file
+            for logo_file in logo_files
+            if hasattr(logo_file, 'filename') and logo_file.filename
+        }
+        logo_lookup = {**resolve_logo_refs(form_data.get("logo_refs")), **logo_lookup}
+        logo_lookup = await read_logo_lookup(logo_lookup)
+    except Exception as logo_error:
+        logger.warning("⚠️ [LAYOUT-CHECK] Error extracting logo files: %s", logo_error)
+        logo_lookup = {}
+    logger.debug("🔍 [LAYOUT-CHECK] %s %s rows, %s shared logo files", len(check_rows), kind, len(logo_lookup))
+
+    outcomes = await asyncio.gather(
+        *(check_row_layout(kind, index, row, logo_lookup) for index, row in enumerate(check_rows)),
+        return_exceptions=True
+    )
+
+    # A bad row is reported in place rather than failing the whole check
+    results = []
+    for index, (row, outcome) in enumerate(zip(check_rows, outcomes)):
+        if isinstance(outcome, Exception):
+            outcome = {
+                "row": index,
+                "company_name": row.get("Company Name", ""),
+                "template_name": None,
+                "template_type": None,
+                "fields": {},
+                "overflow_warnings": [],
+                "error": str(outcome),
+            }
+        results.append(outcome)
+
+    failed = sum(1 for result in results if result["error"] is not None)
+    overflowing = sum(1 for result in results if result["error"] is None and layout_overflows(result))
+    logger.info("✅ [LAYOUT-CHECK] Checked %s rows (%s failed, %s overflowing)", len(results) - failed, failed, overflowing)
+    return {
+        "kind": kind,
+        "rows": len(results),
+        "checked": len(results) - failed,
+        "failed": failed,
+        "overflowing": overflowing,
+        "results": results,
+    }
+
+# ✅ ADDED: Batch template resolution - group rows by template before rendering
+@app.post("/templates/resolve")
+async def resolve_templates_endpoint(
+    request: Request,
+    rows: str = Form(...),
+    kind: str = Form("softcopy"),
+    prefetch: str = Form("false")
+):
+    """Resolve the template every row would be rendered with, without rendering anything.
+
+    Rows use the spreadsheet column names (a JSON array, or a single object) and go through
+    the same decision table as the render endpoints. The response lists each row's template
+    and groups row indices by template name, so a batch caller can fetch each template once
+    and render rows template by template. With prefetch=true the distinct templates are
+    also loaded into this worker's template cache.
+    """
+    kind = (kind or "").strip().lower()
+    if kind not in template_resolver.families:
+        raise HTTPException(status_code=400, detail=f"Unknown kind '{kind}' - expected one of {', '.join(template_resolver.families)}")
+
+    if not rows or rows.strip() == "":
+        raise HTTPException(status_code=400, detail="Rows are empty or missing")
+    try:
+        resolve_rows = json.loads(rows)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid rows format")
+    if isinstance(resolve_rows, dict):
+        resolve_rows = [resolve_rows]
+    if not isinstance(resolve_rows, list) or not resolve_rows or not all(isinstance(row, dict) for row in resolve_rows):
+        raise HTTPException(status_code=400, detail="Rows must be a JSON object or a non-empty array of objects")
+
+    # Only logo names steer template selection - uploads are not read
+    try:
+        form_data = await request.form()
+        logo_files = form_data.getlist("logo_files") if hasattr(form_data, 'getlist') else []
+        logo_lookup = {
+            logo_file.filename: logo_file
+            for logo_file in logo_files
+            if hasattr(logo_file, 'filename') and logo_file.filename
+        }
+        logo_lookup = {**resolve_logo_refs(form_data.get("logo_refs")), **logo_lookup}
+    except Exception as logo_error:
+        logger.warning("⚠️ [TEMPLATE-RESOLVE] Error extracting logo files: %s", logo_error)
+        logo_lookup = {}
+
+    try:
+        resolved, groups = template_resolver.resolve_batch(kind, resolve_rows, logo_lookup)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Template resolution failed: {str(e)}")
+
+    prefetched = {}
+    if prefetch.strip().lower() in ("true", "1", "yes"):
+        outcomes = await asyncio.gather(
+            *(download_template_from_supabase(template_name) for template_name in groups),
+            return_exceptions=True
+        )
+        for template_name, outcome in zip(groups, outcomes):
+            prefetched[template_name] = str(outcome) if isinstance(outcome, Exception) else "ok"
+
+    logger.info("✅ [TEMPLATE-RESOLVE] %s %s rows -> %s templates", len(resolved), kind, len(groups))
+    return {
+        "kind": kind,
+        "rows": len(resolved),
+        "templates": len(groups),
+        "results": [
+            {"row": index, "template_name": template_name, "template_type": template_type}
+            for index, (template_name, template_type) in enumerate(resolved)
+        ],
+        "groups": groups,
+        "prefetched": prefetched,
+    }
+
+# ✅ ADDED: Background jobs - long runs survive browser refreshes and proxy timeouts
+async def render_job_row(kind: str, index: int, row: dict, logos: dict) -> dict:
+    """Render one queued job row using the same path as the batch endpoints."""
+    return await render_row_pdf(kind, index, row, logos)
+
+def finalize_softcopy_job(rows: list, artifact_file) -> tuple[str, str]:
+    """Bundle a finished soft copy job into a ZIP with a manifest (same layout as /generate-softcopy/batch).
+
+    The archive is written straight into artifact_file, one row PDF at a time from disk.
+    """
+    with zipfile.ZipFile(artifact_file, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for row in rows:
+            if row["pdf_path"]:
+                archive.write(row["pdf_path"], os.path.basename(row["pdf_path"]))
+        archive.writestr("manifest.json", json.dumps({
+            "rows": len(rows),
+            "rendered": sum(1 for row in rows if row["error"] is None),
+            "failed": sum(1 for row in rows if row["error"] is not None),
+            "results": [
+                {
+                    "row": row["row_index"],
+                    "filename": os.path.basename(row["pdf_path"]) if row["pdf_path"] else None,
+                    "template_name": row["template_name"],
+                    "output_size": os.path.getsize(row["pdf_path"]) if row["pdf_path"] else None,
+                    "overflow_warnings": row["overflow_warnings"],
+                    "error": row["error"],
+                }
+                for row in rows
+            ],
+        }, indent=2, default=str))
+    return "softcopies.zip", "application/zip"
+
+def finalize_printable_job(rows: list, artifact_file) -> tuple[str, str]:
+    """Merge a finished printable job's certificates, in row order, into one PDF."""
+    rendered = [row["pdf_path"] for row in rows if row["pdf_path"]]
+    if not rendered:
+        raise ValueError("No rows rendered successfully")
+
+    def read_rows():
+        for pdf_path in rendered:
+            with open(pdf_path, "rb") as pdf_file:
+                yield pdf_file.read()
+
+    artifact_file.write(merge_pdfs(read_rows(), resolve_save_profile(None, "printable")))
+    return "printables.pdf", "application/pdf"
+
+job_queue.register_renderer("softcopy", lambda index, row, logos: render_job_row("softcopy", index, row, logos), finalize_softcopy_job)
+job_queue.register_renderer("printable", lambda index, row, logos: render_job_row("printable", index, row, logos), finalize_printable_job)
+
+@app.post("/jobs")
+async def submit_job(
+    request: Request,
+    kind: str = Form(...),
+    rows: str = Form(...)
+):
+    """Queue a soft copy or printable run and return its job id immediately.
+
+    Poll GET /jobs/{job_id} for progress and fetch GET /jobs/{job_id}/download when done.
+    """
+    kind = kind.strip().lower()
+    if kind not in ("softcopy", "printable"):
+        raise HTTPException(status_code=400, detail="Job kind must be 'softcopy' or 'printable'")
+    try:
+        job_rows = json.loads(rows)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid rows format")
+    if not isinstance(job_rows, list) or not job_rows or not all(isinstance(row, dict) for row in job_rows):
+        raise HTTPException(status_code=400, detail="Rows must be a non-empty JSON array of objects")
+
+    form_data = await request.form()
+    logo_files = form_data.getlist("logo_files") if hasattr(form_data, 'getlist') else []
+    logo_lookup = await read_logo_lookup({
+        **resolve_logo_refs(form_data.get("logo_refs")),
+        **{
+            logo_file.filename: logo_file
+            for logo_file in logo_files
+            if hasattr(logo_file, 'filename') and logo_file.filename
+        },
+    })
+
+    job_id = job_queue.submit(kind, job_rows, logo_lookup)
+    logger.debug("🔍 [JOBS] Queued %s job %s: %s rows, %s logo files", kind, job_id, len(job_rows), len(logo_lookup))
+    return {
+        "job_id": job_id,
+        "status": "queued",
+        "total": len(job_rows),
+        "status_url": f"/jobs/{job_id}",
+        "download_url": f"/jobs/{job_id}/download",
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Job status, progress and per-row overflow warnings/errors."""
+    status = await asyncio.to_thread(job_queue.status, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return status
+
+@app.get("/jobs/{job_id}/download")
+async def download_job_artifact(job_id: str):
+    """Download a finished job's artifact (ZIP of soft copies or merged printable PDF)."""
+    status = await asyncio.to_thread(job_queue.status, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    artifact = await asyncio.to_thread(job_queue.artifact, job_id)
+    if artifact is None:
+        raise HTTPException(status_code=409, detail=f"Job is {status['status']} - artifact not available")
+    artifact_path, artifact_name, media_type = artifact
+    return FileResponse(artifact_path, media_type=media_type, filename=artifact_name)
+
+@app.delete("/jobs/{job_id}")
+async def delete_job(job_id: str):
+    """Delete a job and its stored rows, logos and files."""
+    if not await asyncio.to_thread(job_queue.delete, job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"deleted": job_id}
+
+@app.post("/logos")
+async def upload_logos(logo_files: list[UploadFile] = File(...)):
+    """Store logos once so render requests can reference them by hash or filename (logo_refs)."""
+    try:
+        stored = []
+        for logo_file in logo_files:
+            if not logo_file.filename:
+                continue
+            data = await logo_file.read()
+            sha256 = logo_store.put(logo_file.filename, data)
+            stored.append({"filename": logo_file.filename, "sha256": sha256, "size": len(data)})
+            logger.info("✅ [LOGOS] Stored %s as %s (%s bytes)", logo_file.filename, sha256[:12], len(data))
+        return {"logos": stored}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to store logos: {str(e)}")
+
+@app.get("/logos")
+async def list_logos():
+    """List stored logos (filename, sha256, size)."""
+    return {"logos": logo_store.list()}
+
+@app.get("/logos/{ref}")
+async def get_logo(ref: str):
+    """Return a stored logo by hash or filename."""
+    stored = logo_store.get(ref)
+    if stored is None:
+        raise HTTPException(status_code=404, detail="Logo not found")
+    filename, data = stored
+    return Response(
+        content=data,
+        media_type="application/octet-stream",
+        headers={"Content-Disposition": f"attachment; filename={sanitize_filename(filename)}"},
+    )
+
+@app.delete("/logos/{ref}")
+async def delete_logo(ref: str):
+    """Remove a stored logo by hash or filename."""
+    if not logo_store.delete(ref):
+        raise HTTPException(status_code=404, detail="Logo not found")
+    return {"deleted": ref}
+
+@app.get("/templates/store")
+async def list_stored_templates():
+    """List the templates in the node's template store (name, sha256, size, ETag, age, pinned)."""
+    return {"templates": template_store.list(), "stats": template_store.stats()}
+
+@app.put("/templates/store/{template_name}")
+async def push_template(template_name: str, template: UploadFile = File(...)):
+    """Push a new version of a template to every worker on the node, without a restart.
+
+    The pushed version is pinned (not revalidated against Supabase) until it is invalidated.
+    """
+    if not re.match(r"^[A-Za-z0-9_-]+$", template_name):
+        raise HTTPException(status_code=400, detail="Invalid template name")
+    content = await template.read()
+    if not content.startswith(b"%PDF"):
+        raise HTTPException(status_code=400, detail="Template must be a PDF")
+    try:
+        entry = await asyncio.to_thread(template_store.put, template_name, content, pinned=True)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to store template: {str(e)}")
+    logger.info("✅ [TEMPLATES] Pushed %s as %s (%s bytes)", template_name, entry.digest[:12], len(content))
+    return {"name": template_name, "sha256": entry.digest, "size": len(content), "pinned": True}
+
+@app.delete("/templates/store/{template_name}")
+async def invalidate_template(template_name: str):
+    """Drop a template from the store; the next render downloads it from Supabase again."""
+    if not await asyncio.to_thread(template_store.invalidate, template_name):
+        raise HTTPException(status_code=404, detail="Template not found")
+    return {"invalidated": [template_name]}
+
+@app.delete("/templates/store")
+async def invalidate_all_templates():
+    """Drop every stored template."""
+    return {"invalidated": await asyncio.to_thread(template_store.invalidate)}
+
 # New endpoint: Generate certificate from JSON data (no Word file required)
 @app.post("/generate-certificate-json")
 async def generate_certificate_json_endpoint(
     request: Request,
-    fields: str = Form(...)
+    fields: str = Form(...),
+    profile: str = Form("")
 ):
     """Generate certificate from JSON field data using Supabase template (no Word file required)."""
+    save_profile = request_save_profile(profile, "certificate")
     try:
         # Parse field data
         if not fields or fields.strip() == "":
@@ -1314,8 +1784,11 @@ async def generate_certificate_json_endpoint(
             for logo_file in logo_files:
                 if hasattr(logo_file, 'filename') and logo_file.filename:
                     logo_lookup[logo_file.filename] = logo_file
+
+            # Logos referenced from the /logos store; uploads win on a name clash
+            logo_lookup = {**resolve_logo_refs(form_data.get("logo_refs")), **logo_lookup}
         except Exception as logo_error:
-            print(f"⚠️ [CERTIFICATE-JSON] Error extracting logo files: {logo_error}")
+            logger.warning("⚠️ [CERTIFICATE-JSON] Error extracting logo files: %s", logo_error)
             logo_lookup = {}
         
         # Extract all the same fields as the original endpoint
@@ -1331,174 +1804,45 @@ async def generate_certificate_json_endpoint(
         # ✅ ADDED: Extract Address alignment field
         address_alignment = field_data.get("Address alignment", "")
         
-        # Create output file path
-        output_filename = f"generated_certificate_{os.getpid()}.pdf"
-        output_path = os.path.join(tempfile.gettempdir(), output_filename)
-        
-        # Use the same template selection logic as the original endpoint
-        scope_text = field_data.get("Scope", "")
-        scope_words = len(scope_text.split())
-        raw_size = field_data.get("Size", "")
-        size = raw_size.lower().strip()
-        accreditation = field_data.get("Accreditation", "").lower().strip()
-        logo = field_data.get("Logo", "").lower().strip()
-        country = field_data.get("Country", "").strip()
-        estimated_lines = max(1, (scope_words * 8) // 60)
-        logo_filename = field_data.get("Logo", "").strip()
-        
-        # Template selection logic (same as original endpoint)
-        if extra_line:
-            print(f"🔍 [CERTIFICATE-JSON] Extra Line present - forcing large template selection")
-            
-            # Force large template based on other parameters
-            if country.lower() == "other":
-                # Use logo template if logo files are present OR logo field matches
-                if len(logo_lookup) > 0 or (logo_filename and logo_filename in logo_lookup):
-                    # Logo templates for Other country
-                    if accreditation == "no":
-                        template_name = "templateDraftLogoNonAccOther"
-                        template_type = "logo_nonaccredited_other"
-                    else:
-                        template_name = "templateDraftLogoOther"
-                        template_type = "logo_other"
-                    print(f"🔍 [CERTIFICATE-JSON] Extra Line + Logo files present ({len(logo_lookup)} files) - using Other logo template")
-                elif accreditation == "no":
-                    template_name = "templateDraftLargeNonAccOther"
-                    template_type = "large_nonaccredited_other"
-                elif size == "high":
-                    template_name = "template_draft_large_other"
-                    template_type = "large_other"
-                else:
-                    template_name = "template_draft_large_other_eco"
-                    template_type = "large_other_eco"
-            else:  # Default country
-                if logo_filename and logo_filename in logo_lookup:
-                    template_name = "templateDraftLogo"
-                    template_type = "logo"
-                elif accreditation == "no":
-                    template_name = "templateDraftLargeNonAcc"
-                    template_type = "large_nonaccredited"
-                elif size == "high":
-                    template_name = "template_draft_large"
-                    template_type = "large"
-                else:
-                    template_name = "templateDraftLargeEco"
-                    template_type = "large_eco"
-            
-            print(f"🔍 [CERTIFICATE-JSON] Extra Line override: {template_name} ({template_type})")
-        else:
-            # Regular template selection logic (same as main endpoint)
-            if country.lower() == "other":
-                # Use logo template if logo files are present OR logo field matches
-                if len(logo_lookup) > 0 or (logo_filename and logo_filename in logo_lookup):
-                    # Logo templates for Other country
-                    if accreditation == "no":
-                        template_name = "templateDraftLogoNonAccOther"
-                        template_type = "logo_nonaccredited_other"
-                    else:
-                        template_name = "templateDraftLogoOther"
-                        template_type = "logo_other"
-                    print(f"🔍 [CERTIFICATE-JSON] Logo files present ({len(logo_lookup)} files) - using Other logo template")
-                elif accreditation == "no":
-                    # Non-accredited templates for Other country
-                    if estimated_lines <= 11:
-                        template_name = "templateDraftStandardNonAccOther"
-                        template_type = "standard_nonaccredited_other"
-                    else:
-                        template_name = "templateDraftLargeNonAccOther"
-                        template_type = "large_nonaccredited_other"
-                elif size == "high" and accreditation != "no":
-                    # High size with accreditation for Other country
-                    if estimated_lines <= 11:
-                        template_name = "template_draft_other"
-                        template_type = "standard_other"
-                    else:
-                        template_name = "template_draft_large_other"
-                        template_type = "large_other"
-                else:
-                    # Size is blank/low and accreditation != no for Other country - use eco templates
-                    if estimated_lines <= 11:
-                        template_name = "template_draft_other_eco"
-                        template_type = "standard_other_eco"
-                    else:
-                        template_name = "template_draft_large_other_eco"
-                        template_type = "large_other_eco"
-            else:
-                # Logo handling logic (applies to both blank and Other country)
-                if logo_filename and logo_filename in logo_lookup:
-                    # Logo templates take priority - single template regardless of content length
-                    template_name = "templateDraftLogo"
-                    template_type = "logo"
-                elif logo_filename and logo_filename not in logo_lookup:
-                    print(f"⚠️ [CERTIFICATE-JSON] Logo specified but file not found: {logo_filename} - using regular template")
-                    # Continue with regular template selection logic
-                elif accreditation == "no":
-                    # Non-accredited templates
-                    if estimated_lines <= 11:  # Standard template for ≤11 lines
-                        template_name = "templateDraftStandardNonAcc"
-                        template_type = "standard_nonaccredited"
-                    else:  # Large template for >11 lines
-                        template_name = "templateDraftLargeNonAcc"
-                        template_type = "large_nonaccredited"
-                elif size == "high" and accreditation != "no":
-                    # High size with accreditation - use current templates
-                    if estimated_lines <= 11:  # Standard template for ≤11 lines
-                        template_name = "template_draft"
-                        template_type = "standard"
-                    else:  # Large template for >11 lines
-                        template_name = "template_draft_large"
-                        template_type = "large"
-                else:
-                    # Size is blank/low and accreditation != no - use eco templates
-                    if estimated_lines <= 11:  # Standard template for ≤11 lines
-                        template_name = "templateDraftStandardEco"
-                        template_type = "standard_eco"
-                    else:  # Large template for >11 lines
-                        template_name = "templateDraftLargeEco"
-                        template_type = "large_eco"
+        # ✅ UPDATED: Same template selection as /generate-certificate
+        template_name, template_type = select_certificate_template(field_data, logo_lookup)
         
-        # Download template from Supabase
-        template_path = await download_template_from_supabase(template_name)
+        # Download template from Supabase (cached in memory per process)
+        template_bytes = await download_template_from_supabase(template_name)
         
         # Prepare values for certificate generation
         values = field_data.copy()
-        values["logo_lookup"] = logo_lookup
+        values["logo_lookup"] = await read_logo_lookup(logo_lookup)
         
-        # Generate certificate using the same function
-        result = generate_certificate(template_path, output_path, values, template_type)
+        # Generate certificate using the same function, on the configured render backend
+        result = await render_backend.run({
+            "kind": "certificate",
+            "template": template_bytes,
+            "template_name": template_name,
+            "values": values,
+            "template_type": template_type,
+            "save_profile": save_profile,
+        })
         
         # Check for overflow warnings
         if result.get("overflow_warnings"):
-            print(f"[CERTIFICATE-JSON] ===== OVERFLOW WARNINGS =====")
             for warning in result["overflow_warnings"]:
-                print(f"[CERTIFICATE-JSON] {warning['message']}")
-            print(f"[CERTIFICATE-JSON] ===== END OVERFLOW WARNINGS =====")
-        
-        # Read the generated PDF
-        with open(output_path, "rb") as f:
-            pdf_bytes = f.read()
+                logger.warning("⚠️ [CERTIFICATE-JSON] Overflow: %s", warning['message'])
         
-        # Clean up temporary files
-        if os.path.exists(output_path):
-            os.unlink(output_path)
-        if os.path.exists(template_path):
-            os.unlink(template_path)
+        # ✅ UPDATED: Rendered in memory - nothing to read back or clean up
+        pdf_bytes = rendered_pdf(result)
         
         # Return PDF response
         return Response(
             content=pdf_bytes,
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename=certificate_{certificate_number or 'generated'}.pdf"
+                "Content-Disposition": f"attachment; filename=certificate_{certificate_number or 'generated'}.pdf",
+                **output_headers(pdf_bytes, save_profile)
             }
         )
         
     except Exception as e:
-        # Clean up temporary files on error
-        if 'output_path' in locals() and os.path.exists(output_path):
-            os.unlink(output_path)
-        if 'template_path' in locals() and os.path.exists(template_path):
-            os.unlink(template_path)
         raise HTTPException(status_code=500, detail=f"Certificate generation failed: {str(e)}")
 
 # Soft copy generation endpoint now integrated into main.py
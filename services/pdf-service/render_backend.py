@@ -0,0 +1,180 @@
+"""
+Pluggable execution backend for CPU-heavy certificate renders.
+
+Endpoints hand a render job (plain data only: template bytes, field values, logo bytes)
+to the configured backend instead of calling generate_softcopy/generate_certificate
+directly on the event loop:
+
+- "inline":  run in the calling thread (old behaviour, useful for debugging)
+- "thread":  run in a thread pool so the event loop keeps serving other requests
+- "process": run in a process pool so renders scale across CPU cores (default)
+
+PyMuPDF does not support rendering on several threads at once, so "process" is the
+default: every render gets its own interpreter and MuPDF context. "thread" stays available
+for single-core deployments and debugging, at the caller's risk.
+
+Workers are pre-initialised with fonts, glyph tables and the templates passed to start()
+(the local templates mapped by template_source); jobs for those templates don't ship the
+template bytes.
+
+Configure with RENDER_BACKEND and RENDER_WORKERS.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Templates handed to the worker initializer, keyed by template name
+_worker_templates = {}
+
+
+def _init_worker(templates: dict | None = None):
+    """Warm a render worker: import the rise modules, load fonts and keep preloaded templates."""
+    global _worker_templates
+    _worker_templates = dict(templates or {})
+
+    from rise import generate_softCopy, generate_certificate  # noqa: F401 - import cost paid once per worker
+    from rise.service_logging import configure_logging
+
+    # Spawned workers start without the parent's log handler (forked ones are reset on fork)
+    configure_logging()
+    from rise.font_registry import font_registry
+
+    # Base-14 and Bodoni fonts with their glyph advance tables, shared by all layout code
+    font_registry.preload()
+    font_registry.get("helv")
+    generate_softCopy.find_font_path("BOD_R.TTF")
+
+
+def run_render_job(job: dict) -> dict:
+    """
+    Execute one render job. Must stay a module-level function so process pools can pickle it.
+
+    Args:
+        job: Dict with keys:
+            kind: "softcopy", "printable" or "certificate"
+            template: Template PDF bytes or path (may be None when template_name was preloaded)
+            template_name: Name of the template (used to look up preloaded templates)
+            output_path: Optional; where the rendered PDF is written. Without it the PDF
+                comes back as bytes in the result ("pdf") and nothing touches disk
+            values: Field values; "logo_lookup" maps filename -> logo bytes
+            template_type: Template type used for coordinate selection
+            clone_template: Optional; when true the template is parsed once per worker and
+                cloned for each job (batch runs rendering many rows on the same template)
+            dry_run: Optional; when true only the layout is computed (no template needed,
+                nothing written to output_path)
+            save_profile: Optional output profile ("web" or "print"); defaults per kind
+
+    Returns:
+        Dict returned by generate_softcopy/generate_certificate
+    """
+    dry_run = bool(job.get("dry_run"))
+    template = job.get("template")
+    clone_key = None  # shipped bytes are keyed by content hash, so a changed template is re-parsed
+    if template is None and not dry_run:
+        template = _worker_templates[job["template_name"]]
+        clone_key = job["template_name"]
+    if job.get("clone_template") and not dry_run:
+        from rise.pdf_utils import clone_template
+        template = clone_template(template, key=clone_key)
+
+    if job["kind"] == "certificate":
+        from rise.generate_certificate import generate_certificate
+        return generate_certificate(template, job.get("output_path"), job["values"], job["template_type"], dry_run=dry_run,
+                                    save_profile=job.get("save_profile"))
+
+    from rise.generate_softCopy import generate_softcopy
+    mode = "printable" if job["kind"] == "printable" else "softcopy"
+    return generate_softcopy(template, job.get("output_path"), job["values"], job["template_type"], mode, dry_run=dry_run,
+                             save_profile=job.get("save_profile"))
+
+
+class RenderBackend:
+    """Runs render jobs inline, in a thread pool or in a process pool."""
+
+    KINDS = ("inline", "thread", "process")
+
+    def __init__(self, kind: str = "process", workers: int | None = None, start_method: str = "spawn"):
+        """
+        Args:
+            kind: "inline", "thread" or "process"
+            workers: Pool size (defaults to the number of CPUs)
+            start_method: multiprocessing start method for the process pool
+        """
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown render backend '{kind}' - expected one of {', '.join(self.KINDS)}")
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self.start_method = start_method
+        self._executor = None
+        self._preloaded = {}  # template name -> the content object workers were started with
+
+    def preload(self):
+        """Warm this process (rise modules, fonts, glyph tables) without starting a pool.
+
+        The pre-fork server calls this in its parent process so forked web workers inherit
+        the warm state; start() in each worker then finds everything already loaded.
+        """
+        _init_worker(_worker_templates)
+
+    def start(self, templates: dict | None = None):
+        """
+        Create the worker pool, pre-initialising every worker with fonts and the given templates.
+
+        Args:
+            templates: Optional template name -> bytes (or bytes view) every worker keeps loaded
+        """
+        if self._executor is not None or self.kind == "inline":
+            if self.kind == "inline":
+                _init_worker(templates)
+                self._preloaded = dict(templates or {})
+            return
+        templates = dict(templates or {})
+        self._preloaded = templates
+        if self.kind == "thread":
+            # Threads share module globals, so one initialisation covers the whole pool
+            _init_worker(templates)
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="render")
+        else:
+            # Views over mapped files don't pickle - each process worker gets its own copy once
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+                initializer=_init_worker,
+                initargs=({name: bytes(content) for name, content in templates.items()},),
+            )
+
+    async def run(self, job: dict) -> dict:
+        """Run a render job on the backend without blocking the event loop (except for "inline")."""
+        preloaded = self._preloaded.get(job.get("template_name"))
+        if preloaded is not None and job.get("template") is preloaded:
+            # Workers already hold this template - don't ship the bytes with every job
+            job = {**job, "template": None}
+        if self.kind == "inline":
+            return run_render_job(job)
+        if self.kind == "process" and isinstance(job.get("template"), memoryview):
+            # Views over template_store maps don't pickle - process workers get a copy
+            job = {**job, "template": bytes(job["template"])}
+        if self._executor is None:
+            self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, run_render_job, job)
+
+    def shutdown(self):
+        """Stop the worker pool, letting in-flight renders finish."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {"backend": self.kind, "workers": 1 if self.kind == "inline" else self.workers,
+                "preloaded_templates": len(self._preloaded)}
+
+
+# Process-wide backend shared by every endpoint in this worker
+render_backend = RenderBackend(
+    kind=os.getenv("RENDER_BACKEND", "process").strip().lower(),
+    workers=int(os.getenv("RENDER_WORKERS", "0")) or None,
+    start_method=os.getenv("RENDER_START_METHOD", "spawn"),
+)
@@ -0,0 +1,106 @@
+"""
+Font size fitting by bisection.
+
+Layout code used to find a font size with loops of the form
+
+    size = start
+    while size >= minimum:
+        if fits(size):
+            break
+        size -= step
+
+re-wrapping and re-measuring the text at every step. Every such constraint here (width of
+a line, number of wrapped lines, wrapped height) only gets easier as the font shrinks, so
+the first fitting size on that same grid can be found by bisection in O(log n) checks, and
+single-line width constraints have a closed form from the text's width at 1 pt.
+
+Results are identical to the loops, including the value the loop leaves behind when
+nothing fits (the first grid value below the minimum).
+"""
+
+import math
+
+
+def candidate_font_sizes(start: float, minimum: float, step: float) -> tuple[list[float], float]:
+    """
+    The sizes a decrement loop would try, generated the same way (repeated subtraction).
+
+    Returns:
+        tuple: (sizes tried from largest to smallest, size left behind when none fits)
+    """
+    sizes = []
+    size = start
+    while size >= minimum:
+        sizes.append(size)
+        size -= step
+    return sizes, size
+
+
+def fit_font_size(start: float, minimum: float, step: float, fits) -> tuple[float, bool]:
+    """
+    Largest size on the start, start - step, ... grid (down to minimum) for which fits(size) holds.
+
+    fits must be monotone: if it holds at some size it holds at every smaller size.
+
+    Args:
+        start: First (largest) size tried
+        minimum: Smallest size allowed
+        step: Grid step between candidate sizes
+        fits: Callable taking a size and returning True when the text fits at that size
+
+    Returns:
+        tuple: (size, found) - when nothing fits, size is the first grid value below minimum
+    """
+    sizes, exhausted = candidate_font_sizes(start, minimum, step)
+    if not sizes:
+        return exhausted, False
+    # Most fields fit at their starting size - settle that with a single check
+    if fits(sizes[0]):
+        return sizes[0], True
+
+    low, high = 1, len(sizes)  # first fitting index lies in [low, high]; len(sizes) means none
+    while low < high:
+        mid = (low + high) // 2
+        if fits(sizes[mid]):
+            high = mid
+        else:
+            low = mid + 1
+    if low == len(sizes):
+        return exhausted, False
+    return sizes[low], True
+
+
+def fit_single_line(width_at_1pt: float, max_width: float, start: float, minimum: float, step: float) -> tuple[float, bool]:
+    """
+    Closed-form fit_font_size for one unwrapped line: width_at_1pt * size <= max_width.
+
+    width_at_1pt * size is exactly what text_length(text, size) computes, so the chosen
+    size matches a loop that measures the text at every step.
+
+    Args:
+        width_at_1pt: Width of the text at 1 pt (FontMetrics.text_length(text, 1))
+        max_width: Maximum width in points
+        start, minimum, step: The size grid, as for fit_font_size
+
+    Returns:
+        tuple: (size, found), as for fit_font_size
+    """
+    sizes, exhausted = candidate_font_sizes(start, minimum, step)
+    if not sizes:
+        return exhausted, False
+
+    def fits(index):
+        return width_at_1pt * sizes[index] <= max_width
+
+    index = 0
+    if width_at_1pt > 0:
+        # First grid index at or below max_width / width
+        index = min(max(math.ceil((start - max_width / width_at_1pt) / step), 0), len(sizes))
+    # Nudge onto the exact boundary (the estimate can be off by one through rounding)
+    while index < len(sizes) and not fits(index):
+        index += 1
+    while index > 0 and fits(index - 1):
+        index -= 1
+    if index == len(sizes):
+        return exhausted, False
+    return sizes[index], True
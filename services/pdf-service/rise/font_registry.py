@@ -0,0 +1,132 @@
+"""
+Process-wide font registry for text measurement.
+
+Layout code measures text constantly (font size fitting, word wrapping, mixed bold runs),
+and used to build a new fitz.Font and call its text_length for every measurement. Each
+font here is loaded once and gets a per-character advance table, so measuring a string
+costs a dict lookup per character instead of a MuPDF call.
+
+Widths match fitz.Font.text_length exactly: the same per-glyph advances (with MuPDF's
+fallback fonts for missing glyphs) are summed in the same order and scaled by the size.
+"""
+
+import os
+import threading
+
+import fitz
+
+# Fonts warmed by preload(): the base-14 fonts plus the Bodoni faces shipped in ../fonts
+BASE14_FONTS = (
+    "Times-Roman", "Times-Bold", "Times-Italic", "Times-BoldItalic",
+    "Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique",
+    "Courier", "Courier-Bold", "Courier-Oblique", "Courier-BoldOblique",
+    "Symbol", "ZapfDingbats",
+)
+BODONI_FONT_FILES = ("BOD_R.TTF", "BOD_B.TTF", "BOD_I.TTF", "BOD_BI.TTF")
+FONTS_DIR = os.path.join(os.path.dirname(__file__), "..", "fonts")
+
+# Cached word widths per font before the cache is reset
+MAX_CACHED_WORDS = 65536
+
+# Code points measured up front: Latin-1, Latin Extended-A/B, general punctuation, euro sign
+_PRELOADED_CODEPOINTS = [*range(0x20, 0x250), *range(0x2000, 0x2070), 0x20AC]
+
+
+class FontMetrics:
+    """A loaded font and its glyph advance table (advances at 1 pt)."""
+
+    __slots__ = ("name", "font", "_advances", "_words", "_lock")
+
+    def __init__(self, name: str, font: fitz.Font):
+        self.name = name
+        self.font = font
+        self._lock = threading.Lock()
+        self._advances = {chr(code): font.glyph_advance(code) for code in _PRELOADED_CODEPOINTS}
+        self._words = {}
+
+    def glyph_advance(self, char: str) -> float:
+        """Advance width of one character at 1 pt."""
+        advance = self._advances.get(char)
+        if advance is None:
+            # MuPDF objects are not thread-safe - only touch the font under the lock
+            with self._lock:
+                advance = self._advances.get(char)
+                if advance is None:
+                    advance = self.font.glyph_advance(ord(char))
+                    self._advances[char] = advance
+        return advance
+
+    def text_length(self, text: str, fontsize: float = 11) -> float:
+        """Width of text at the given font size (same result as fitz.Font.text_length)."""
+        if not isinstance(text, str):
+            raise TypeError("bad type: 'text'")
+        advances = self._advances
+        width = 0
+        for char in text:
+            advance = advances.get(char)
+            if advance is None:
+                advance = self.glyph_advance(char)
+            width += advance
+        return width * fontsize
+
+    def word_width(self, word: str) -> float:
+        """Width of a word at 1 pt, cached - widths scale linearly with the font size."""
+        width = self._words.get(word)
+        if width is None:
+            width = self.text_length(word, 1)
+            if len(self._words) >= MAX_CACHED_WORDS:
+                self._words = {}
+            self._words[word] = width
+        return width
+
+
+class FontRegistry:
+    """Loads each font once per process and hands out shared FontMetrics."""
+
+    def __init__(self):
+        self._fonts = {}
+        self._lock = threading.Lock()
+
+    def get(self, fontname: str | None = None, fontfile: str | None = None) -> FontMetrics:
+        """
+        Return the metrics for a built-in font name or a font file, loading it on first use.
+
+        Args:
+            fontname: Base-14 or other built-in font name (as accepted by fitz.Font)
+            fontfile: Path to a TrueType/OpenType font file (takes precedence over fontname)
+
+        Returns:
+            FontMetrics: Shared, thread-safe metrics for the font
+        """
+        key = ("file", os.path.abspath(fontfile)) if fontfile else ("name", fontname)
+        metrics = self._fonts.get(key)
+        if metrics is None:
+            with self._lock:
+                metrics = self._fonts.get(key)
+                if metrics is None:
+                    # Raises like fitz.Font does for unknown names/files
+                    font = fitz.Font(fontfile=fontfile) if fontfile else fitz.Font(fontname=fontname)
+                    metrics = FontMetrics(fontfile or fontname, font)
+                    self._fonts[key] = metrics
+        return metrics
+
+    def preload(self):
+        """Load the base-14 fonts and the bundled Bodoni faces (called when a render worker starts)."""
+        for fontname in BASE14_FONTS:
+            self.get(fontname)
+        for filename in BODONI_FONT_FILES:
+            fontfile = os.path.join(FONTS_DIR, filename)
+            if os.path.exists(fontfile):
+                self.get(fontfile=fontfile)
+
+    def stats(self) -> dict:
+        return {"fonts": len(self._fonts)}
+
+
+# Process-wide registry shared by all layout code in rise
+font_registry = FontRegistry()
+
+
+def get_font(fontname: str | None = None, fontfile: str | None = None) -> FontMetrics:
+    """Shorthand for font_registry.get()."""
+    return font_registry.get(fontname=fontname, fontfile=fontfile)
@@ -3,10 +3,17 @@ Shared font calculation utilities for PDF generation.
 Ensures consistent font sizing between soft copy and certificate generation.
 """
 
-import fitz
+import logging
 
+from .font_registry import get_font
+from .text_wrap import WordWrapper
+from .fit_solver import fit_font_size, fit_single_line
+from .layout_cache import layout_cache, layout_key
 
-def calculate_optimal_font_size_with_line_breaks(text, rect, fontname, template_type, min_font_size=4, original_font_size=20):
+logger = logging.getLogger(__name__)
+
+
+def calculate_optimal_font_size_with_line_breaks(text, rect, fontname, line_spacing, min_font_size=4, original_font_size=20):
     """
     Enhanced font calculation that finds the minimum font size needed for the longest line,
     then applies that font size to the entire field to respect line break boundaries.
@@ -18,18 +25,27 @@ def calculate_optimal_font_size_with_line_breaks(text, rect, fontname, template_
         text: The text to render
         rect: The rectangle coordinates for the text
         fontname: The font name to use
-        template_type: The template type (affects line height calculation)
+        line_spacing: Line-spacing family from the template geometry: "tight" (1.1) or "loose" (1.2)
         min_font_size: Minimum allowed font size
         original_font_size: Starting font size before optimization
     
     Returns:
         tuple: (final_font_size, lines_list)
     """
+    # ✅ ADDED: Reuse the fit from an earlier render of the same text in the same box
+    key = layout_key("lines", text, rect, fontname, line_spacing, min_font_size, original_font_size)
+    font_size, lines = layout_cache.memoize(key, lambda: _fit_with_line_breaks(text, rect, fontname, line_spacing, min_font_size, original_font_size))
+    return font_size, list(lines)
+
+
+def _fit_with_line_breaks(text, rect, fontname, line_spacing, min_font_size, original_font_size):
+    """Uncached calculate_optimal_font_size_with_line_breaks; returns the lines as a tuple."""
     if '\n' not in text and '\r\n' not in text:
         # No line breaks - use standard logic
-        return calculate_standard_font_size(text, rect, fontname, template_type, min_font_size, original_font_size)
+        font_size, lines = calculate_standard_font_size(text, rect, fontname, line_spacing, min_font_size, original_font_size)
+        return font_size, tuple(lines)
     
-    print(f"🔍 [SHARED OPTIMIZATION] Line breaks detected - finding minimum font size for longest line")
+    logger.debug("🔍 [SHARED OPTIMIZATION] Line breaks detected - finding minimum font size for longest line")
     
     # Split by line breaks
     text_lines = text.split('\n')
@@ -42,26 +58,20 @@ def calculate_optimal_font_size_with_line_breaks(text, rect, fontname, template_
             min_font_for_lines.append(original_font_size)  # Empty line doesn't need font reduction
             continue
             
-        # Find minimum font size for this line
-        line_font = original_font_size
-        font_obj = fitz.Font(fontname=fontname)
-        
-        while line_font >= min_font_size:
-            line_width = font_obj.text_length(line, fontsize=line_font)
-            if line_width <= rect.width:
-                break
-            line_font -= 0.5
+        # Find minimum font size for this line (closed form on the 0.5pt grid)
+        font_obj = get_font(fontname=fontname)
+        line_font, _ = fit_single_line(font_obj.text_length(line, fontsize=1), rect.width, original_font_size, min_font_size, 0.5)
         
         min_font_for_lines.append(max(line_font, min_font_size))
-        print(f"🔍 [SHARED OPTIMIZATION] Line {line_idx + 1} needs minimum font: {min_font_for_lines[-1]:.1f}pt for '{line[:30]}...'")
+        logger.debug("🔍 [SHARED OPTIMIZATION] Line %s needs minimum font: %.1fpt for '%s...'", line_idx + 1, min_font_for_lines[-1], line[:30])
     
     # Use the lowest font size needed for any line
     optimal_font_size = min(min_font_for_lines)
-    print(f"🔍 [SHARED OPTIMIZATION] Using lowest font size: {optimal_font_size:.1f}pt for entire field")
+    logger.debug("🔍 [SHARED OPTIMIZATION] Using lowest font size: %.1fpt for entire field", optimal_font_size)
     
     # Step 2: Check if all lines fit at this font size
     lines = []
-    font_obj = fitz.Font(fontname=fontname)
+    font_obj = get_font(fontname=fontname)
     
     for line in text_lines:
         if not line.strip():
@@ -72,31 +82,13 @@ def calculate_optimal_font_size_with_line_breaks(text, rect, fontname, template_
         line_width = font_obj.text_length(line, fontsize=optimal_font_size)
         if line_width <= rect.width:
             lines.append(line)
-            print(f"🔍 [SHARED OPTIMIZATION] Line fits as-is at {optimal_font_size:.1f}pt")
+            logger.debug("🔍 [SHARED OPTIMIZATION] Line fits as-is at %.1fpt", optimal_font_size)
         else:
             # Line still too long - need to wrap
-            words = line.split()
-            wrapped_lines = []
-            current_line = ""
-            
-            for word in words:
-                test_line = current_line + (" " if current_line else "") + word
-                test_width = font_obj.text_length(test_line, fontsize=optimal_font_size)
-                
-                if test_width <= rect.width:
-                    current_line = test_line
-                else:
-                    if current_line:
-                        wrapped_lines.append(current_line)
-                    current_line = word
-            
-            if current_line:
-                wrapped_lines.append(current_line)
-            
-            lines.extend(wrapped_lines)
+            lines.extend(WordWrapper(line, fontname).wrap(optimal_font_size, rect.width))
     
     # Step 3: Check total height and optimize if needed
-    if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+    if line_spacing == "tight":
         line_height = optimal_font_size * 1.1
     else:
         line_height = optimal_font_size * 1.2
@@ -104,17 +96,17 @@ def calculate_optimal_font_size_with_line_breaks(text, rect, fontname, template_
     total_height = len(lines) * line_height
     
     if total_height <= rect.height:
-        print(f"✅ [SHARED OPTIMIZATION] All lines fit at {optimal_font_size:.1f}pt")
-        return optimal_font_size, lines
+        logger.debug("✅ [SHARED OPTIMIZATION] All lines fit at %.1fpt", optimal_font_size)
+        return optimal_font_size, tuple(lines)
     else:
         # Height overflow: search for the largest font size that fits total height with wrapping
-        print(f"⚠️ [SHARED OPTIMIZATION] Height overflow at {optimal_font_size:.1f}pt → searching for max font that fits")
+        logger.warning("⚠️ [SHARED OPTIMIZATION] Height overflow at %.1fpt → searching for max font that fits", optimal_font_size)
         utilization_pct = (total_height / rect.height) * 100.0 if rect.height else 100.0
         
         # Dynamically relax readability floor when utilization is extremely high
         if utilization_pct > 134.8:
             readable_floor = max(min_font_size, 7)
-            print(f"🔧 [SHARED OPTIMIZATION] High utilization {utilization_pct:.1f}% → lowering readability floor to {readable_floor}pt")
+            logger.debug("🔧 [SHARED OPTIMIZATION] High utilization %.1f%% → lowering readability floor to %spt", utilization_pct, readable_floor)
         else:
             readable_floor = max(min_font_size, 10)  # Default readability floor
             
@@ -123,12 +115,14 @@ def calculate_optimal_font_size_with_line_breaks(text, rect, fontname, template_
         best_fit_font = readable_floor
         best_fit_lines = lines
         
+        # Measure each line's words once; every candidate size re-wraps from cached widths
+        line_wrappers = {line: WordWrapper(line, fontname) for line in text_lines if line.strip()}
+        
         while high - low > 0.5:
             mid = (high + low) / 2.0
             # Re-wrap all lines at this candidate font size
             candidate_lines = []
             candidate_total = 0
-            font_obj_mid = fitz.Font(fontname=fontname)
             
             for line in text_lines:
                 if not line.strip():
@@ -136,30 +130,15 @@ def calculate_optimal_font_size_with_line_breaks(text, rect, fontname, template_
                     continue
                     
                 # Check if line fits as-is at this font size
-                line_width = font_obj_mid.text_length(line, fontsize=mid)
+                line_width = font_obj.text_length(line, fontsize=mid)
                 if line_width <= rect.width:
                     candidate_lines.append(line)
                 else:
                     # Line needs wrapping
-                    words = line.split()
-                    current_line = ""
-                    
-                    for word in words:
-                        test_line = current_line + (" " if current_line else "") + word
-                        test_width = font_obj_mid.text_length(test_line, fontsize=mid)
-                        
-                        if test_width <= rect.width:
-                            current_line = test_line
-                        else:
-                            if current_line:
-                                candidate_lines.append(current_line)
-                            current_line = word
-                    
-                    if current_line:
-                        candidate_lines.append(current_line)
+                    candidate_lines.extend(line_wrappers[line].wrap(mid, rect.width))
             
             # Calculate total height for this candidate
-            if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+            if line_spacing == "tight":
                 candidate_line_height = mid * 1.1
             else:
                 candidate_line_height = mid * 1.2
@@ -173,11 +152,11 @@ def calculate_optimal_font_size_with_line_breaks(text, rect, fontname, template_
             else:
                 high = mid
         
-        print(f"✅ [SHARED OPTIMIZATION] Selected font {best_fit_font:.1f}pt after height-fit search (min allowed: {readable_floor}pt)")
-        return best_fit_font, best_fit_lines
+        logger.debug("✅ [SHARED OPTIMIZATION] Selected font %.1fpt after height-fit search (min allowed: %spt)", best_fit_font, readable_floor)
+        return best_fit_font, tuple(best_fit_lines)
 
 
-def calculate_standard_font_size(text, rect, fontname, template_type, min_font_size=4, original_font_size=20):
+def calculate_standard_font_size(text, rect, fontname, line_spacing, min_font_size=4, original_font_size=20):
     """
     Standard font calculation for text without line breaks.
     
@@ -185,51 +164,27 @@ def calculate_standard_font_size(text, rect, fontname, template_type, min_font_s
         text: The text to render
         rect: The rectangle coordinates for the text
         fontname: The font name to use
-        template_type: The template type (affects line height calculation)
+        line_spacing: Line-spacing family from the template geometry: "tight" (1.1) or "loose" (1.2)
         min_font_size: Minimum allowed font size
         original_font_size: Starting font size before optimization
     
     Returns:
         tuple: (final_font_size, lines_list)
     """
-    font_size = original_font_size
-    lines = []
+    # Words are measured once at 1pt; each candidate size only re-runs the line breaking
+    wrapper = WordWrapper(text, fontname)
     
-    while font_size >= min_font_size:
-        # Process text with word wrapping
-        words = text.split()
-        current_lines = []
-        current_line = ""
-        
-        font_obj = fitz.Font(fontname=fontname)
-        
-        for word in words:
-            test_line = current_line + (" " if current_line else "") + word
-            test_width = font_obj.text_length(test_line, fontsize=font_size)
-            
-            if test_width <= rect.width:
-                current_line = test_line
-            else:
-                if current_line:
-                    current_lines.append(current_line)
-                current_line = word
-        
-        if current_line:
-            current_lines.append(current_line)
-        
+    def fits(font_size):
         # Check if all lines fit in height
-        if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+        if line_spacing == "tight":
             line_height = font_size * 1.1
         else:
             line_height = font_size * 1.2
-            
-        total_height = len(current_lines) * line_height
-        
-        if total_height <= rect.height:
-            lines = current_lines
-            break
-        
-        font_size -= 0.5
+        return len(wrapper.wrap(font_size, rect.width)) * line_height <= rect.height
+    
+    # Largest size on the 0.5pt grid that fits, found by bisection instead of stepping down
+    font_size, found = fit_font_size(original_font_size, min_font_size, 0.5, fits)
+    lines = wrapper.wrap(font_size, rect.width) if found else []
     
     return font_size, lines
 
@@ -1,10 +1,20 @@
+import logging
 from docx import Document
 import fitz  # PyMuPDF
 from typing import Dict
 from .font_utils import calculate_optimal_font_size_with_line_breaks
-import unidecode
-import ftfy
+from .pdf_utils import open_layout_scratch, open_template, resolve_save_profile, save_pdf, serialize_pdf
+from .logo_cache import logo_cache
+from .font_registry import get_font
+from .text_wrap import WordWrapper
+from .fit_solver import candidate_font_sizes, fit_font_size, fit_single_line
+from .layout_cache import layout_cache, layout_key
+from .template_geometry import get_geometry
+from .text_prep import safe_insert_text
 import chardet
+
+logger = logging.getLogger(__name__)
+
 #CraftApp - Copy
 def parse_excel_adjustment(value):
     """Parse Excel adjustment value (e.g., '-1', '+2', '3', '', None) and return numeric value."""
@@ -54,88 +64,6 @@ def parse_excel_font_size(value):
     except (ValueError, TypeError):
         return 0
 
-def safe_insert_text(page, position, text, **kwargs):
-    """Safely insert text handling Unicode characters that might cause ByteString errors."""
-    try:
-        # 🔍 DEBUG: Analyze text at start
-        # Check for any apostrophe-like character (regular apostrophe or smart quotes)
-        has_regular_apostrophe = "'" in text  # U+0027
-        # Check for smart quotes using their Unicode code points
-        has_right_single_quote = '\u2019' in text  # RIGHT SINGLE QUOTATION MARK
-        has_left_single_quote = '\u2018' in text   # LEFT SINGLE QUOTATION MARK
-        has_apostrophe = has_regular_apostrophe or has_right_single_quote or has_left_single_quote
-        
-        print(f"🔍 [SAFE_INSERT] Analyzing text: '{text[:50]}...'")
-        print(f"🔍 [SAFE_INSERT] Regular apostrophe ('): {has_regular_apostrophe}")
-        print(f"🔍 [SAFE_INSERT] Right quote (U+2019): {has_right_single_quote}")
-        print(f"🔍 [SAFE_INSERT] Left quote (U+2018): {has_left_single_quote}")
-        print(f"🔍 [SAFE_INSERT] Has apostrophe-like character: {has_apostrophe}")
-        
-        # First try with the original text
-        # 🔍 DEBUG: Check for special dash characters
-        if '–' in text or '—' in text or '·' in text:
-            for i, char in enumerate(text):
-                if char in ['–', '—', '·', '-', '−']:
-                    print(f"🔍 [SAFE_INSERT] Found dash/dot at pos {i}: '{char}' (Unicode: {ord(char)}) in text: '{text[:50]}...'")
-        
-        # 🔍 DEBUG: Check for apostrophes (regular or smart quotes)
-        if has_apostrophe:
-            print(f"🔍 [SAFE_INSERT] ✓ Apostrophe-like character found in text!")
-            for i, char in enumerate(text):
-                if char in ["'", '\u2019', '\u2018']:
-                    print(f"🔍 [SAFE_INSERT] Found apostrophe at pos {i}: '{char}' (Unicode: {ord(char)}) in text: '{text[:50]}...'")
-        else:
-            print(f"🔍 [SAFE_INSERT] ✗ No apostrophe found in text")
-        
-        # ✅ ENHANCED: Detect special characters that need special handling
-        special_chars = ['–', '—', '·', '\u2019', '\u2018', '"', '"', '…', '€', '£', '¥', '©', '®', '™']
-        has_special_chars = any(char in text for char in special_chars)
-        
-        if has_special_chars:
-            print(f"🔍 [SAFE_INSERT] Special characters detected in text: '{text[:50]}...'")
-            
-            # Fix text encoding issues first
-            fixed_text = ftfy.fix_text(text)
-            if fixed_text != text:
-                print(f"🔍 [SAFE_INSERT] Text encoding fixed: '{text[:30]}...' → '{fixed_text[:30]}...'")
-                text = fixed_text
-            
-            # ✅ CHANGED: Keep original font (Times-Bold) - special chars will be replaced with ASCII equivalents below
-            # No font switching needed since we replace special characters with ASCII equivalents
-            print(f"🔍 [SAFE_INSERT] Keeping original font '{kwargs.get('fontname', 'Times-Roman')}' - special chars will be replaced with ASCII equivalents")
-        elif has_apostrophe:
-            # ✅ CHANGED: Keep original font (Times-Bold) - apostrophes will be replaced with ASCII equivalents below
-            # No font switching needed since we replace apostrophes with ASCII equivalents
-            print(f"🔍 [SAFE_INSERT] Keeping original font '{kwargs.get('fontname', 'Times-Roman')}' - apostrophes will be replaced with ASCII equivalents")
-        
-        # Replace problematic Unicode characters with ASCII equivalents for Times font compatibility
-        text = text.replace('–', '-')  # En dash (U+2013) → hyphen
-        text = text.replace('—', '-')  # Em dash (U+2015) → hyphen
-        
-        # Replace smart quotes with straight apostrophes for better font compatibility
-        text = text.replace('\u2019', "'")  # Right single quotation mark (U+2019) → apostrophe
-        text = text.replace('\u2018', "'")  # Left single quotation mark (U+2018) → apostrophe
-        text = text.replace('\u201D', '"')  # Right double quotation mark (U+201D) → straight quote
-        text = text.replace('\u201C', '"')  # Left double quotation mark (U+201C) → straight quote
-        
-        page.insert_text(position, text, **kwargs)
-    except Exception as e:
-        if "ByteString" in str(e) or "character at index" in str(e):
-            print(f"⚠️ [CERTIFICATE] Unicode text error, using safe encoding: {e}")
-            # Try with UTF-8 encoding that ignores problematic characters
-            safe_text = text.encode('utf-8', errors='ignore').decode('utf-8')
-            try:
-                page.insert_text(position, safe_text, **kwargs)
-            except Exception as e2:
-                print(f"⚠️ [CERTIFICATE] UTF-8 encoding failed, using ASCII fallback: {e2}")
-                # Final fallback: Use unidecode for ASCII conversion
-                ascii_text = unidecode.unidecode(text)
-                print(f"🔍 [SAFE_INSERT] ASCII fallback text: '{ascii_text}'")
-                page.insert_text(position, ascii_text, **kwargs)
-        else:
-            # Re-raise if it's not a Unicode/ByteString error
-            raise e
-
 # ISO Standards Mapping - Convert short names to full versions with years
 ISO_STANDARDS_MAPPING = {
     # Quality & Management
@@ -335,8 +263,8 @@ def get_iso_standard_code(iso_standard: str) -> str:
     # Look up the code in the mapping
     return ISO_STANDARDS_CODES.get(expanded_iso, "")
 
-def parse_word_form(docx_path: str) -> Dict[str, str]:
-    """Parse the first table in a Word document and extract required fields."""
+def parse_word_form(docx_path) -> Dict[str, str]:
+    """Parse the first table in a Word document (a path or a binary file object) and extract required fields."""
     
     doc = Document(docx_path)
     
@@ -453,7 +381,7 @@ def extract_from_images(image_path: str) -> Dict[str, str]:
     import numpy as np
     from PIL import Image
     
-    print(f"🔍 [IMAGE-DEBUG] Starting OCR extraction from: {image_path}")
+    logger.debug("🔍 [IMAGE-DEBUG] Starting OCR extraction from: %s", image_path)
     
     try:
         # Load and preprocess image
@@ -467,21 +395,21 @@ def extract_from_images(image_path: str) -> Dict[str, str]:
         custom_config = r'--oem 3 --psm 6'  # Table detection mode
         text = pytesseract.image_to_string(processed_image, config=custom_config)
         
-        print(f"🔍 [IMAGE-DEBUG] OCR extracted text:")
-        print(f"🔍 [IMAGE-DEBUG] {text[:1000]}{'...' if len(text) > 1000 else ''}")
+        logger.debug("🔍 [IMAGE-DEBUG] OCR extracted text:")
+        logger.debug("🔍 [IMAGE-DEBUG] %s%s", text[:1000], '...' if len(text) > 1000 else '')
         
         # Try to detect table structure
         table_data = parse_ocr_text_as_table(text)
         if table_data:
-            print(f"🔍 [IMAGE-DEBUG] Table structure detected: {len(table_data)} rows")
+            logger.debug("🔍 [IMAGE-DEBUG] Table structure detected: %s rows", len(table_data))
             return process_table_data(table_data)
         
         # Fallback to text pattern matching
-        print(f"🔍 [IMAGE-DEBUG] No table structure found, using pattern matching")
+        logger.debug("🔍 [IMAGE-DEBUG] No table structure found, using pattern matching")
         return extract_fields_from_ocr_text(text)
         
     except Exception as e:
-        print(f"🔍 [IMAGE-DEBUG] Error in OCR extraction: {e}")
+        logger.debug("🔍 [IMAGE-DEBUG] Error in OCR extraction: %s", e)
         raise Exception(f"Failed to extract text from image: {str(e)}")
 
 def process_table_data(table_data):
@@ -494,19 +422,19 @@ def process_table_data(table_data):
             key = str(row[0]).strip() if row[0] else ""
             value = str(row[1]).strip() if row[1] else ""
             
-            print(f"🔍 [IMAGE-DEBUG] Row {i+1}: '{key}' -> '{value[:50]}{'...' if len(value) > 50 else ''}'")
+            logger.debug("🔍 [IMAGE-DEBUG] Row %s: '%s' -> '%s%s'", i + 1, key, value[:50], '...' if len(value) > 50 else '')
             
             # Check if this is a recognized field
             if key in ['Company Name', 'Address', 'ISO Standard Required', 'Scope']:
                 data[key] = value
                 last_recognized_field = key
-                print(f"🔍 [IMAGE-DEBUG] ✅ Found recognized field '{key}': '{value[:100]}{'...' if len(value) > 100 else ''}'")
+                logger.debug("🔍 [IMAGE-DEBUG] ✅ Found recognized field '%s': '%s%s'", key, value[:100], '...' if len(value) > 100 else '')
             elif key == "" and value and last_recognized_field:
                 # This is a continuation line (empty key, has value)
                 data[last_recognized_field] += " " + value
-                print(f"🔍 [IMAGE-DEBUG] 🔗 Appended continuation to '{last_recognized_field}': '{value[:50]}{'...' if len(value) > 50 else ''}'")
+                logger.debug("🔍 [IMAGE-DEBUG] 🔗 Appended continuation to '%s': '%s%s'", last_recognized_field, value[:50], '...' if len(value) > 50 else '')
             else:
-                print(f"🔍 [IMAGE-DEBUG] ⏭️ Skipping unrecognized field '{key}'")
+                logger.debug("🔍 [IMAGE-DEBUG] ⏭️ Skipping unrecognized field '%s'", key)
     
     return data
 
@@ -519,7 +447,7 @@ def parse_pdf_form(pdf_path: str) -> Dict[str, str]:
         
         if file_extension in ['png', 'jpg', 'jpeg']:
             # Phase 1: Try image extraction with OCR
-            print(f"🔍 [PDF-DEBUG] Detected image file, using OCR extraction")
+            logger.debug("🔍 [PDF-DEBUG] Detected image file, using OCR extraction")
             data = extract_from_images(pdf_path)
         else:
             # Phase 2: Try table extraction first
@@ -527,7 +455,7 @@ def parse_pdf_form(pdf_path: str) -> Dict[str, str]:
         
         # Phase 2: If table extraction fails or is incomplete, use text extraction
         if not data or len(data) < 4:
-            print(f"🔍 [PDF-DEBUG] Table extraction incomplete ({len(data) if data else 0}/4 fields), trying text extraction...")
+            logger.debug("🔍 [PDF-DEBUG] Table extraction incomplete (%s/4 fields), trying text extraction...", len(data) if data else 0)
             data = extract_from_text(pdf_path)
         
         # If still no data found, raise exception
@@ -545,9 +473,9 @@ def parse_pdf_form(pdf_path: str) -> Dict[str, str]:
             "Scope": data.get("Scope", "")
         }
         
-        print(f"🔍 [PDF-DEBUG] Final extracted fields:")
+        logger.debug("🔍 [PDF-DEBUG] Final extracted fields:")
         for key, value in result.items():
-            print(f"🔍 [PDF-DEBUG] {key}: '{value[:100]}{'...' if len(value) > 100 else ''}'")
+            logger.debug("🔍 [PDF-DEBUG] %s: '%s%s'", key, value[:100], '...' if len(value) > 100 else '')
         
         return result
         
@@ -571,13 +499,13 @@ def extract_from_tables(pdf_path: str) -> Dict[str, str]:
             tables_list = list(tables)
             
             if tables_list:
-                print(f"🔍 [PDF-DEBUG] Found {len(tables_list)} table(s) on page {page_num + 1}")
+                logger.debug("🔍 [PDF-DEBUG] Found %s table(s) on page %s", len(tables_list), page_num + 1)
                 
                 # Use the first table found
                 table = tables_list[0]
                 table_data = table.extract()
                 
-                print(f"🔍 [PDF-DEBUG] Table data extracted: {len(table_data)} rows")
+                logger.debug("🔍 [PDF-DEBUG] Table data extracted: %s rows", len(table_data))
                 
                 # Process each row as key-value pairs
                 last_recognized_field = None  # Track the last recognized field
@@ -587,27 +515,27 @@ def extract_from_tables(pdf_path: str) -> Dict[str, str]:
                         key = str(row[0]).strip() if row[0] else ""
                         value = str(row[1]).strip() if row[1] else ""
                         
-                        print(f"🔍 [PDF-DEBUG] Row {i+1}: '{key}' -> '{value[:50]}{'...' if len(value) > 50 else ''}'")
+                        logger.debug("🔍 [PDF-DEBUG] Row %s: '%s' -> '%s%s'", i + 1, key, value[:50], '...' if len(value) > 50 else '')
                         
                         # Check if this is a recognized field
                         if key in ['Company Name', 'Address', 'ISO Standard Required', 'Scope']:
                             data[key] = value
                             last_recognized_field = key  # Track the last recognized field
-                            print(f"🔍 [PDF-DEBUG] ✅ Found recognized field '{key}': '{value[:100]}{'...' if len(value) > 100 else ''}'")
+                            logger.debug("🔍 [PDF-DEBUG] ✅ Found recognized field '%s': '%s%s'", key, value[:100], '...' if len(value) > 100 else '')
                         elif key == "" and value and last_recognized_field:
                             # This is a continuation line (empty key, has value)
                             # Append to the last recognized field
                             data[last_recognized_field] += " " + value
-                            print(f"🔍 [PDF-DEBUG] 🔗 Appended continuation to '{last_recognized_field}': '{value[:50]}{'...' if len(value) > 50 else ''}'")
+                            logger.debug("🔍 [PDF-DEBUG] 🔗 Appended continuation to '%s': '%s%s'", last_recognized_field, value[:50], '...' if len(value) > 50 else '')
                         else:
-                            print(f"🔍 [PDF-DEBUG] ⏭️ Skipping unrecognized field '{key}'")
+                            logger.debug("🔍 [PDF-DEBUG] ⏭️ Skipping unrecognized field '%s'", key)
                 
                 # If we found data in tables, use it
                 if data:
-                    print(f"🔍 [PDF-DEBUG] Table extraction successful: {len(data)} fields found")
+                    logger.debug("🔍 [PDF-DEBUG] Table extraction successful: %s fields found", len(data))
                     break
             else:
-                print(f"🔍 [PDF-DEBUG] No tables found on page {page_num + 1}")
+                logger.debug("🔍 [PDF-DEBUG] No tables found on page %s", page_num + 1)
     
     finally:
         doc.close()
@@ -625,9 +553,9 @@ def extract_from_text(pdf_path: str) -> Dict[str, str]:
         for page in doc:
             text += page.get_text() + "\n"
         
-        print(f"🔍 [PDF-DEBUG] Extracted text from PDF:")
-        print(f"🔍 [PDF-DEBUG] {text[:1000]}{'...' if len(text) > 1000 else ''}")
-        print(f"🔍 [PDF-DEBUG] ===== END EXTRACTED TEXT =====")
+        logger.debug("🔍 [PDF-DEBUG] Extracted text from PDF:")
+        logger.debug("🔍 [PDF-DEBUG] %s%s", text[:1000], '...' if len(text) > 1000 else '')
+        logger.debug("🔍 [PDF-DEBUG] ===== END EXTRACTED TEXT =====")
         
         # Simple field extraction without regex - handle multi-line content properly
         lines = text.split('\n')
@@ -655,7 +583,7 @@ def extract_from_text(pdf_path: str) -> Dict[str, str]:
                 # Save previous field
                 if current_field and current_value:
                     data[current_field] = '\n'.join(current_value).strip()
-                    print(f"🔍 [PDF-DEBUG] Saved field '{current_field}': '{data[current_field][:100]}{'...' if len(data[current_field]) > 100 else ''}'")
+                    logger.debug("🔍 [PDF-DEBUG] Saved field '%s': '%s%s'", current_field, data[current_field][:100], '...' if len(data[current_field]) > 100 else '')
                 
                 # Start new field
                 current_field = detected_field
@@ -673,7 +601,7 @@ def extract_from_text(pdf_path: str) -> Dict[str, str]:
         # Save last field
         if current_field and current_value:
             data[current_field] = '\n'.join(current_value).strip()
-            print(f"🔍 [PDF-DEBUG] Saved final field '{current_field}': '{data[current_field][:100]}{'...' if len(data[current_field]) > 100 else ''}'")
+            logger.debug("🔍 [PDF-DEBUG] Saved final field '%s': '%s%s'", current_field, data[current_field][:100], '...' if len(data[current_field]) > 100 else '')
     
     finally:
         doc.close()
@@ -686,9 +614,9 @@ def extract_fields_from_text(text: str) -> Dict[str, str]:
     data = {}
     
     # Debug: Print the extracted text to understand the structure
-    print(f"🔍 [PDF-DEBUG] Extracted text from PDF:")
-    print(f"🔍 [PDF-DEBUG] {text[:500]}{'...' if len(text) > 500 else ''}")
-    print(f"🔍 [PDF-DEBUG] ===== END EXTRACTED TEXT =====")
+    logger.debug("🔍 [PDF-DEBUG] Extracted text from PDF:")
+    logger.debug("🔍 [PDF-DEBUG] %s%s", text[:500], '...' if len(text) > 500 else '')
+    logger.debug("🔍 [PDF-DEBUG] ===== END EXTRACTED TEXT =====")
     
     # Define patterns for field extraction - capture until next field or end
     patterns = {
@@ -721,27 +649,19 @@ def extract_fields_from_text(text: str) -> Dict[str, str]:
                 value = match.group(1).strip()
                 if value:
                     data[field_name] = value
-                    print(f"🔍 [PDF-DEBUG] Found {field_name}: '{value[:100]}{'...' if len(value) > 100 else ''}'")
+                    logger.debug("🔍 [PDF-DEBUG] Found %s: '%s%s'", field_name, value[:100], '...' if len(value) > 100 else '')
                     break
     
     return data
 
 def get_text_height(text: str, fontsize: float, fontname: str, max_width: float) -> float:
     """Estimate the height of a text block when wrapped to fit max_width."""
-    font = fitz.Font(fontname=fontname)
-    words = text.split()
-    lines = []
-    current_line = ""
-    for word in words:
-        test_line = current_line + (" " if current_line else "") + word
-        if font.text_length(test_line, fontsize) <= max_width:
-            current_line = test_line
-        else:
-            lines.append(current_line)
-            current_line = word
-    if current_line:
-        lines.append(current_line)
-    return len(lines) * fontsize * 1.2  # Approximate line height with spacing
+    wrapper = WordWrapper(text, fontname)
+    line_count = len(wrapper.wrap(fontsize, max_width))
+    # A first word that is already too wide has always been counted with an extra (empty) line
+    if wrapper.words and not wrapper.fits(0, 1, fontsize, max_width):
+        line_count += 1
+    return line_count * fontsize * 1.2  # Approximate line height with spacing
 
 def insert_centered_textbox(
     page: fitz.Page,
@@ -766,18 +686,29 @@ def insert_centered_textbox(
         align=1  # Centered
     )
 
-def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[str, str], template_type: str = "standard") -> Dict[str, any]:
+def generate_certificate(base_pdf_path: str | bytes, output_pdf_path: str | None, values: Dict[str, str], template_type: str = "standard", dry_run: bool = False, save_profile: str | None = None) -> Dict[str, any]:
     """Generate a certificate PDF by overlaying extracted values onto a template.
     
+    Args:
+        output_pdf_path: Where the PDF is saved, or None to return the PDF bytes in the
+            result ("pdf") without touching disk
+        dry_run: Only fit the fields - lay them out on a blank scratch page without reading
+            the template, placing the logo or writing output_pdf_path
+        save_profile: Output profile ("web" or "print"); defaults to the certificate profile
+    
     Returns:
-        Dict containing success status and overflow warnings
+        Dict containing success status, overflow warnings, the per-field layout and the
+        saved output size
     """
-    print("CERT DEBUG BUILD: 2025-09-10-14:20")
+    logger.debug("CERT DEBUG BUILD: 2025-09-10-14:20")
 
     
     # Initialize tracking for overflow warnings
     overflow_warnings = []
-    doc = fitz.open(base_pdf_path)
+    # ✅ ADDED: Chosen font sizes, line counts and adjustments per field (returned as "layout")
+    layout_report = {}
+    # ✅ ADDED: Template may be a file path or in-memory bytes from the template cache
+    doc = open_layout_scratch() if dry_run else open_template(base_pdf_path)
     page = doc[0]
 
     # Company/context snapshot for debugging runs (helps identify Kotec, etc.)
@@ -785,7 +716,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
         company_dbg = (values.get("Company Name") or values.get("company_name") or "").strip()
         country_dbg = (values.get("Country") or values.get("country") or "").strip()
         accred_dbg = (values.get("Accreditation") or values.get("accreditation") or "").strip()
-        print(f"[CHECK] Company='{company_dbg}' | Country='{country_dbg}' | Accreditation='{accred_dbg}' | Template='{template_type}'")
+        logger.debug("[CHECK] Company='%s' | Country='%s' | Accreditation='%s' | Template='%s'", company_dbg, country_dbg, accred_dbg, template_type)
     except Exception:
         pass
 
@@ -881,7 +812,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                 continue
                 
             # Calculate text width
-            font_obj = fitz.Font(fontname=font_name)
+            font_obj = get_font(fontname=font_name)
             text_width = font_obj.text_length(segment_text, font_size)
             
             # Check if we need to wrap (if max_width is specified)
@@ -910,7 +841,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
     logo_filename = values.get("Logo", "").strip()
     
     # Process logo if specified and available
-    logo_image = None
+    logo_data = None
     if logo_lookup and len(logo_lookup) > 0:
         try:
             # Convert uploaded file to PIL Image
@@ -928,7 +859,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                     if filename.lower() == logo_filename_lower:
                         logo_file = file
                         matched_filename = filename
-                        print(f"✅ [CERTIFICATE] Using exact logo match: '{logo_filename}' → '{filename}'")
+                        logger.debug("✅ [CERTIFICATE] Using exact logo match: '%s' → '%s'", logo_filename, filename)
                         break
                 
                 # If no exact match, try partial match (filename without extension or contains)
@@ -942,7 +873,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                         if logo_filename_lower in filename_lower or filename_base == logo_base:
                             logo_file = file
                             matched_filename = filename
-                            print(f"✅ [CERTIFICATE] Using partial logo match: '{logo_filename}' → '{filename}'")
+                            logger.debug("✅ [CERTIFICATE] Using partial logo match: '%s' → '%s'", logo_filename, filename)
                             break
             
             # Only use fallback if no match was found
@@ -953,95 +884,39 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                     if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
                         logo_file = file
                         matched_filename = filename
-                        print(f"⚠️ [CERTIFICATE] No match found for '{logo_filename}', using first valid image file: '{filename}'")
+                        logger.warning("⚠️ [CERTIFICATE] No match found for '%s', using first valid image file: '%s'", logo_filename, filename)
                         break
                 
                 if not logo_file:
-                    print(f"⚠️ [CERTIFICATE] No valid image files found in logo_lookup: {list(logo_lookup.keys())}")
+                    logger.warning("⚠️ [CERTIFICATE] No valid image files found in logo_lookup: %s", list(logo_lookup.keys()))
             else:
                 # Log which file was actually used
-                print(f"🔍 [CERTIFICATE] Selected logo file: '{matched_filename}' (requested: '{logo_filename}')")
-            
-            if logo_file and hasattr(logo_file, 'file'):
+                logger.debug("🔍 [CERTIFICATE] Selected logo file: '%s' (requested: '%s')", matched_filename, logo_filename)
+            
+            # ✅ UPDATED: Keep the raw bytes - decoding happens in logo_cache, only on a cache miss
+            if isinstance(logo_file, (bytes, bytearray, memoryview)):
+                # ✅ ADDED: Render jobs carry logos as plain bytes (see render_backend)
+                logo_data = bytes(logo_file)
+                logger.debug("✅ [CERTIFICATE] Logo image loaded successfully")
+            elif logo_file and hasattr(logo_file, 'file'):
                 # Reset file pointer
                 logo_file.file.seek(0)
                 # Read file content
-                logo_content = logo_file.file.read()
-                # Convert to PIL Image
-                logo_image = Image.open(io.BytesIO(logo_content))
-                print(f"✅ [CERTIFICATE] Logo image loaded successfully")
+                logo_data = logo_file.file.read()
+                logger.debug("✅ [CERTIFICATE] Logo image loaded successfully")
             else:
-                logo_image = None
-                print(f"⚠️ [CERTIFICATE] Logo file has no file attribute or is None")
+                logo_data = None
+                logger.warning("⚠️ [CERTIFICATE] Logo file has no file attribute or is None")
         except Exception as logo_error:
-            logo_image = None
-            print(f"❌ [CERTIFICATE] Error loading logo image: {logo_error}")
+            logo_data = None
+            logger.error("❌ [CERTIFICATE] Error loading logo image: %s", logo_error)
     else:
-        logo_image = None
-        print(f"🔍 [CERTIFICATE] No logo to process: logo_filename='{logo_filename}', logo_lookup_count={len(logo_lookup) if logo_lookup else 0}")
-    
-    # Standard template coordinates (current)
-    standard_coords = {
-        "management_system": fitz.Rect(87.9, 185, 580, 226.6),
-        "Company Name and Address": fitz.Rect(87.9, 239, 580, 315),  # Fixed: Match soft copy coordinates
-        "ISO Standard": fitz.Rect(194.9, 334, 460.3, 370),
-        "Scope": {
-            "short": fitz.Rect(87.9, 386, 580, 475),    # <24 lines
-            "long": fitz.Rect(87.9, 373, 580, 486)      # 24-30 lines
-        },
-        "certification_code": fitz.Rect(253, 757, 285, 762)  # ✅ UPDATED: Certification code coordinates
-    }
-    
-    # Large template coordinates (for >11 lines)
-    # All generation types use Y0=354
-    large_coords = {
-        "management_system": fitz.Rect(87.9, 185, 580, 226.6),  # Same as standard
-        "Company Name and Address": fitz.Rect(87.9, 229, 580, 295),  # Fixed: Match soft copy coordinates
-        "ISO Standard": fitz.Rect(194.9, 300, 460.3, 336),  # Same as standard
-        "Scope": fitz.Rect(85, 354, 577, 536),  # Y0=354 for all generation types
-        "certification_code": fitz.Rect(253, 757, 285, 762)  # ✅ UPDATED: Certification code coordinates
-    }
+        logo_data = None
+        logger.debug("🔍 [CERTIFICATE] No logo to process: logo_filename='%s', logo_lookup_count=%s", logo_filename, len(logo_lookup) if logo_lookup else 0)
     
-    # Logo template coordinates (when Logo = "yes")
-    logo_coords = {
-        "management_system": fitz.Rect(87.9, 175, 580, 216.6),  # Shifted up by 10pt from standard
-        "logo": fitz.Rect(87.9, 206.6, 580, 242.6),  # Logo area: below management_system, above company name
-        "Company Name and Address": fitz.Rect(87.9, 262.6, 580, 355),  # Lowered y-coordinates
-        "ISO Standard": fitz.Rect(194.9, 334, 460.3, 370),  # Same as standard (not lowered)
-        "Scope": {
-            "short": fitz.Rect(87.9, 386, 580, 475),    # Updated scope coordinates for logo template
-            "long": fitz.Rect(87.9, 373, 580, 486)      # Updated scope coordinates for logo template
-        },
-        "certification_code": fitz.Rect(253, 757, 285, 762)  # ✅ UPDATED: Certification code coordinates
-    }
-    
-    # ✅ ADDED: Defensive checks for coordinate dictionaries
-    if standard_coords is None:
-        print(f"⚠️ [CERTIFICATE] standard_coords is None - cannot continue")
-        raise ValueError("standard_coords is None - cannot generate certificate")
-    
-    if large_coords is None:
-        print(f"⚠️ [CERTIFICATE] large_coords is None - cannot continue")
-        raise ValueError("large_coords is None - cannot generate certificate")
-    
-    if logo_coords is None:
-        print(f"⚠️ [CERTIFICATE] logo_coords is None - cannot continue")
-        raise ValueError("logo_coords is None - cannot generate certificate")
-    
-    # Select coordinates based on template type
-    if template_type in ["standard", "standard_eco", "standard_nonaccredited"]:
-        coords = standard_coords
-    elif template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_nonaccredited_other"]:
-        coords = large_coords
-    elif template_type in ["logo", "logo_nonaccredited", "logo_other", "logo_nonaccredited_other"]:
-        coords = logo_coords
-    else:
-        # Default to standard coordinates
-        coords = standard_coords
-    
-    # ✅ ADDED: Defensive check for selected coords
-    if coords is None:
-        raise ValueError("Selected coords is None - cannot generate certificate")
+    # ✅ UPDATED: Template geometry comes from the compiled registry (see template_geometry.py)
+    geometry = get_geometry(template_type, "certificate")
+    coords = geometry.coords()
 
     
     font_starts = {
@@ -1061,51 +936,51 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
     
     # ✅ ADDED: Defensive check for Scope coordinates
     if "Scope" not in coords:
-        print(f"⚠️ [CERTIFICATE] Scope coordinates not found in coords - cannot continue")
+        logger.warning("⚠️ [CERTIFICATE] Scope coordinates not found in coords - cannot continue")
         raise ValueError("Scope coordinates not found - cannot generate certificate")
     
     # Determine which coordinate set to use (lines win over words)
-    if template_type in ["standard", "standard_eco", "standard_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_nonaccredited_other"]:
+    if geometry.scope_fit == "sized":
         # Standard template: dynamic coordinates based on content length
         if estimated_lines >= 24:  # Long content condition
             if "long" not in coords["Scope"]:
-                print(f"⚠️ [CERTIFICATE] Scope long coordinates not found - cannot continue")
+                logger.warning("⚠️ [CERTIFICATE] Scope long coordinates not found - cannot continue")
                 raise ValueError("Scope long coordinates not found - cannot generate certificate")
             scope_rect = coords["Scope"]["long"]
             scope_layout = "long"
-            print(f"🎯 [CERTIFICATE] Scope: {estimated_lines} lines (≥24) -> selected LONG scope coordinates")
+            logger.debug("🎯 [CERTIFICATE] Scope: %s lines (≥24) -> selected LONG scope coordinates", estimated_lines)
 
         else:  # Short content condition
             if "short" not in coords["Scope"]:
-                print(f"⚠️ [CERTIFICATE] Scope short coordinates not found - cannot continue")
+                logger.warning("⚠️ [CERTIFICATE] Scope short coordinates not found - cannot continue")
                 raise ValueError("Scope short coordinates not found - cannot generate certificate")
             scope_rect = coords["Scope"]["short"]
             scope_layout = "short"
-            print(f"🎯 [CERTIFICATE] Scope: {estimated_lines} lines (<24) -> selected SHORT scope coordinates")
+            logger.debug("🎯 [CERTIFICATE] Scope: %s lines (<24) -> selected SHORT scope coordinates", estimated_lines)
 
     else:
         # Large template: fixed large coordinates
         scope_rect = coords["Scope"]
         scope_layout = "large"
-        print(f"🎯 [CERTIFICATE] Scope: {estimated_lines} lines -> selected LARGE scope coordinates (fixed)")
+        logger.debug("🎯 [CERTIFICATE] Scope: %s lines -> selected LARGE scope coordinates (fixed)", estimated_lines)
     
-    print(f"🎯 [CERTIFICATE] Final scope coordinates: {scope_rect}")
-    print(f"[CHECK] template_type={template_type}, estimated_lines={estimated_lines}")
-    print(f"[CHECK] coords['Scope'] (pre-set) type={type(coords['Scope']).__name__}, value={coords['Scope']}")
-    print(f"[CHECK] scope_rect selected type={type(scope_rect).__name__}, value={scope_rect}")
+    logger.debug("🎯 [CERTIFICATE] Final scope coordinates: %s", scope_rect)
+    logger.debug("[CHECK] template_type=%s, estimated_lines=%s", template_type, estimated_lines)
+    logger.debug("[CHECK] coords['Scope'] (pre-set) type=%s, value=%s", type(coords['Scope']).__name__, coords['Scope'])
+    logger.debug("[CHECK] scope_rect selected type=%s, value=%s", type(scope_rect).__name__, scope_rect)
 
     # Store original scope coordinates before modification (for Extra Line processing)
     original_scope_coords = coords["Scope"].copy() if isinstance(coords["Scope"], dict) else coords["Scope"]
-    print(f"[CHECK] original_scope_coords type={type(original_scope_coords).__name__}")
+    logger.debug("[CHECK] original_scope_coords type=%s", type(original_scope_coords).__name__)
     
     # Add Scope coordinates to the main coords dictionary
     coords["Scope"] = scope_rect
-    print(f"[CHECK] coords['Scope'] (post-set) type={type(coords['Scope']).__name__}, value={coords['Scope']}")
+    logger.debug("[CHECK] coords['Scope'] (post-set) type=%s, value=%s", type(coords['Scope']).__name__, coords['Scope'])
     
     # ✅ NEW: Adjust scope coordinates when Extra Line is present with dynamic height logic
     extra_line = values.get("Extra Line", "").strip()
     if extra_line:
-        print(f"🔍 [CERTIFICATE] Extra Line present - using dynamic scope height based on content length")
+        logger.debug("🔍 [CERTIFICATE] Extra Line present - using dynamic scope height based on content length")
         
         # Calculate content length to determine appropriate scope height
         scope_text = values.get("Scope", "")
@@ -1114,89 +989,44 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
         
         if estimated_lines < 24:
             # Short scope: 89pt height (same as standard short scope)
-            scope_rect = fitz.Rect(87.9, 386, 580, 475)  # Height: 89pt
-            print(f"🔍 [CERTIFICATE] Extra Line - Short scope: {estimated_lines} lines, 89pt height")
+            scope_rect = geometry.extra_line_scopes["short"]  # Height: 89pt
+            logger.debug("🔍 [CERTIFICATE] Extra Line - Short scope: %s lines, 89pt height", estimated_lines)
         elif estimated_lines <= 30:
             # Long scope: 113pt height (same as standard long scope)
-            scope_rect = fitz.Rect(87.9, 373, 580, 486)  # Height: 113pt
-            print(f"🔍 [CERTIFICATE] Extra Line - Long scope: {estimated_lines} lines, 113pt height")
+            scope_rect = geometry.extra_line_scopes["long"]  # Height: 113pt
+            logger.debug("🔍 [CERTIFICATE] Extra Line - Long scope: %s lines, 113pt height", estimated_lines)
         else:
             # Large scope: 182pt height for >30 lines (same as large template)
-            scope_rect = fitz.Rect(85, 354, 577, 536)    # Height: 182pt
-            print(f"🔍 [CERTIFICATE] Extra Line - Large scope: {estimated_lines} lines, 182pt height")
+            scope_rect = geometry.extra_line_scopes["large"]  # Height: 182pt
+            logger.debug("🔍 [CERTIFICATE] Extra Line - Large scope: %s lines, 182pt height", estimated_lines)
         
         # Update the scope coordinates with dynamic height
         coords["Scope"] = scope_rect
-        print(f"🔍 [CERTIFICATE] Extra Line scope coordinates set to: {scope_rect}")
+        logger.debug("🔍 [CERTIFICATE] Extra Line scope coordinates set to: %s", scope_rect)
         
     else:
-        print(f"🔍 [CERTIFICATE] No Extra Line - using standard scope coordinates")
+        logger.debug("🔍 [CERTIFICATE] No Extra Line - using standard scope coordinates")
     
     # Function to insert logo with smart positioning
-    def insert_logo_with_smart_positioning(page, logo_image, logo_rect):
+    def insert_logo_with_smart_positioning(page, logo_data, logo_rect):
         """
         Smart logo insertion that handles different aspect ratios:
         - Square logos: Use full coordinates, maintain aspect ratio
         - Horizontal logos: Center horizontally, maintain aspect ratio
         - Vertical logos: Center vertically, maintain aspect ratio
         """
-        # Get logo dimensions
-        logo_width = logo_image.width
-        logo_height = logo_image.height
-        
-        # Calculate aspect ratios
-        logo_aspect = logo_width / logo_height
-        rect_aspect = logo_rect.width / logo_rect.height
-        
-        # Determine positioning strategy based on aspect ratio
-        if logo_aspect > rect_aspect:
-            # Logo is more horizontal than rectangle
-            # Scale to fit width, center vertically
-            scale_factor = logo_rect.width / logo_width
-            new_width = logo_rect.width
-            new_height = logo_height * scale_factor
-            
-            # Center vertically
-            x = logo_rect.x0
-            y = logo_rect.y0 + (logo_rect.height - new_height) / 2
-            
-        elif logo_aspect < rect_aspect:
-            # Logo is more vertical than rectangle
-            # Scale to fit height, center horizontally
-            scale_factor = logo_rect.height / logo_height
-            new_width = logo_width * scale_factor
-            new_height = logo_rect.height
-            
-            # Center horizontally
-            x = logo_rect.x0 + (logo_rect.width - new_width) / 2
-            y = logo_rect.y0
-            
-        else:
-            # Logo and rectangle have similar aspect ratios
-            # Scale to fit within rectangle, center both ways
-            scale_factor = min(logo_rect.width / logo_width, logo_rect.height / logo_height)
-            new_width = logo_width * scale_factor
-            new_height = logo_height * scale_factor
-            
-            # Center both horizontally and vertically
-            x = logo_rect.x0 + (logo_rect.width - new_width) / 2
-            y = logo_rect.y0 + (logo_rect.height - new_height) / 2
-        
-        # Convert PIL Image to PyMuPDF image
+        # ✅ UPDATED: Placement and PNG bytes come from logo_cache, so repeat renders of the
+        # same logo in the same rectangle skip the PIL decode/encode entirely
         try:
-            # Convert PIL Image to bytes
-            import io
-            img_buffer = io.BytesIO()
-            logo_image.save(img_buffer, format='PNG')
-            img_buffer.seek(0)
-            img_bytes = img_buffer.read()
+            prepared = logo_cache.prepare(logo_data, logo_rect, fit=True)
+            placement = prepared.rect
             
             # Insert into PDF
-            page.insert_image(fitz.Rect(x, y, x + new_width, y + new_height), stream=img_bytes)
-            print(f"🔍 [LOGO] Logo inserted with smart positioning: {new_width:.1f}x{new_height:.1f}")
+            page.insert_image(placement, stream=prepared.image_bytes)
+            logger.debug("🔍 [LOGO] Logo inserted with smart positioning: %.1fx%.1f", placement.width, placement.height)
             
         except Exception as e:
-            print(f"❌ [LOGO] Error inserting logo: {e}")
+            logger.error("❌ [LOGO] Error inserting logo: %s", e)
 
     # ✅ ADDED: Shared logo functions for better logo handling
     def insert_logo_into_pdf(page, logo_file, logo_rect):
@@ -1205,33 +1035,27 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
         """
         try:
             # Convert logo file to image
-            logo_image = convert_file_to_image(logo_file)
+            logo_data = read_logo_file_bytes(logo_file)
             # Use smart positioning logic
-            insert_logo_with_smart_positioning(page, logo_image, logo_rect)
-            print(f"✅ [LOGO] Logo inserted successfully: {logo_file.name if hasattr(logo_file, 'name') else 'unknown'}")
+            insert_logo_with_smart_positioning(page, logo_data, logo_rect)
+            logger.debug("✅ [LOGO] Logo inserted successfully: %s", logo_file.name if hasattr(logo_file, 'name') else 'unknown')
         except Exception as e:
-            print(f"❌ [LOGO] Failed to insert logo: {e}")
+            logger.error("❌ [LOGO] Failed to insert logo: %s", e)
 
-    def convert_file_to_image(file):
+    def read_logo_file_bytes(file):
         """
-        Convert uploaded file to PIL Image
+        Read the raw bytes of an uploaded logo file
         """
         try:
-            from PIL import Image
-            import io
-            
             if hasattr(file, 'file'):
                 # Reset file pointer
                 file.file.seek(0)
                 # Read file content
-                file_content = file.file.read()
-                # Convert to PIL Image
-                logo_image = Image.open(io.BytesIO(file_content))
-                return logo_image
+                return file.file.read()
             else:
                 raise ValueError("File object has no file attribute")
         except Exception as e:
-            print(f"❌ [LOGO] Error converting file to image: {e}")
+            logger.error("❌ [LOGO] Error reading logo file: %s", e)
             raise
 
     # ✅ ADDED: Render optional fields function
@@ -1241,15 +1065,15 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
         """
         # ✅ ADDED: Defensive checks for None values
         if values is None:
-            print(f"⚠️ [CERTIFICATE] Values dictionary is None in render_optional_fields - skipping")
+            logger.warning("⚠️ [CERTIFICATE] Values dictionary is None in render_optional_fields - skipping")
             return
         
         if key_coords is None or value_coords is None:
-            print(f"⚠️ [CERTIFICATE] Coordinates are None in render_optional_fields - skipping")
+            logger.warning("⚠️ [CERTIFICATE] Coordinates are None in render_optional_fields - skipping")
             return
         
         if font_settings is None:
-            print(f"⚠️ [CERTIFICATE] Font settings is None in render_optional_fields - skipping")
+            logger.warning("⚠️ [CERTIFICATE] Font settings is None in render_optional_fields - skipping")
             return
         # Define field order (top to bottom) and their display labels
         fields = [
@@ -1296,20 +1120,20 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
         language = values.get("Language", "").strip().lower()
         if language == "s":
             display_labels = spanish_field_labels
-            print(f"🔍 [CERTIFICATE] Using Spanish field labels")
+            logger.debug("🔍 [CERTIFICATE] Using Spanish field labels")
         else:
             display_labels = english_field_labels
-            print(f"🔍 [CERTIFICATE] Using English field labels")
+            logger.debug("🔍 [CERTIFICATE] Using English field labels")
 
         # Filter available fields (non-empty) with special handling for surveillance group
         available_fields = []
         
         # ✅ ADDED: Debug logging for values received
-        print(f"🔍 [CERTIFICATE] ===== OPTIONAL FIELDS DEBUG =====")
-        print(f"🔍 [CERTIFICATE] Values received: {list(values.keys())}")
-        print(f"🔍 [CERTIFICATE] Surveillance/ Expiry Date: '{values.get('Surveillance/ Expiry Date', '')}'")
-        print(f"🔍 [CERTIFICATE] Surveillance Due Date: '{values.get('Surveillance Due Date', '')}'")
-        print(f"🔍 [CERTIFICATE] Expiry Date: '{values.get('Expiry Date', '')}'")
+        logger.debug("🔍 [CERTIFICATE] ===== OPTIONAL FIELDS DEBUG =====")
+        logger.debug("🔍 [CERTIFICATE] Values received: %s", list(values.keys()))
+        logger.debug("🔍 [CERTIFICATE] Surveillance/ Expiry Date: '%s'", values.get('Surveillance/ Expiry Date', ''))
+        logger.debug("🔍 [CERTIFICATE] Surveillance Due Date: '%s'", values.get('Surveillance Due Date', ''))
+        logger.debug("🔍 [CERTIFICATE] Expiry Date: '%s'", values.get('Expiry Date', ''))
         
         for field in fields:
             if field == "Surveillance Group":
@@ -1317,31 +1141,31 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                 surveillance_value = None
                 surveillance_label = None
                 
-                print(f"🔍 [CERTIFICATE] Processing Surveillance Group...")
+                logger.debug("🔍 [CERTIFICATE] Processing Surveillance Group...")
                 for surveillance_field in surveillance_group_fields:
-                    print(f"🔍 [CERTIFICATE] Checking '{surveillance_field}': '{values.get(surveillance_field, '')}'")
+                    logger.debug("🔍 [CERTIFICATE] Checking '%s': '%s'", surveillance_field, values.get(surveillance_field, ''))
                     if surveillance_field in values and values[surveillance_field]:
                         surveillance_value = values[surveillance_field]
                         surveillance_label = surveillance_field
-                        print(f"🔍 [CERTIFICATE] Found surveillance field: '{surveillance_label}' = '{surveillance_value}'")
+                        logger.debug("🔍 [CERTIFICATE] Found surveillance field: '%s' = '%s'", surveillance_label, surveillance_value)
                         break
                 
                 if surveillance_value and surveillance_label:
                     available_fields.append((surveillance_label, surveillance_value))
-                    print(f"🔍 [CERTIFICATE] Added surveillance field to available fields")
+                    logger.debug("🔍 [CERTIFICATE] Added surveillance field to available fields")
                 else:
-                    print(f"🔍 [CERTIFICATE] No surveillance field found or all are empty")
+                    logger.debug("🔍 [CERTIFICATE] No surveillance field found or all are empty")
             else:
                 value = values.get(field, "").strip()
                 if value:  # Only include non-empty fields
                     available_fields.append((field, value))
-                    print(f"🔍 [CERTIFICATE] Added field '{field}' = '{value}' to available fields")
+                    logger.debug("🔍 [CERTIFICATE] Added field '%s' = '%s' to available fields", field, value)
                 else:
-                    print(f"🔍 [CERTIFICATE] Field '{field}' is empty, skipping")
+                    logger.debug("🔍 [CERTIFICATE] Field '%s' is empty, skipping", field)
         
-        print(f"🔍 [CERTIFICATE] Total available fields: {len(available_fields)}")
-        print(f"🔍 [CERTIFICATE] Available fields: {available_fields}")
-        print(f"🔍 [CERTIFICATE] ===== END OPTIONAL FIELDS DEBUG =====")
+        logger.debug("🔍 [CERTIFICATE] Total available fields: %s", len(available_fields))
+        logger.debug("🔍 [CERTIFICATE] Available fields: %s", available_fields)
+        logger.debug("🔍 [CERTIFICATE] ===== END OPTIONAL FIELDS DEBUG =====")
 
         # Calculate starting position using formula: (6 - available_count) + 1
         total_fields = 6
@@ -1349,7 +1173,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
         starting_position = (6 - available_count) + 1
 
         # Essential logging only
-        print(f"🔍 [CERTIFICATE] Optional fields: {available_count}/{total_fields} available")
+        logger.debug("🔍 [CERTIFICATE] Optional fields: %s/%s available", available_count, total_fields)
 
         # Render from starting position
         for i, (field, value) in enumerate(available_fields):
@@ -1361,7 +1185,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                 value_text = f":{value}"            # Colon + value (no space)
 
                 # Essential field logging
-                print(f"🔍 [CERTIFICATE] Rendering: {field}")
+                logger.debug("🔍 [CERTIFICATE] Rendering: %s", field)
 
                 # Extract (x, y) coordinates from rectangles
                 key_x = key_coords[coord_index].x0
@@ -1393,50 +1217,12 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                     color=color
                 )
 
-                print(f"   ✅ Rendered successfully at position {coord_index + 1}")
+                logger.debug("   ✅ Rendered successfully at position %s", coord_index + 1)
             else:
-                print(f"⚠️ [CERTIFICATE] Warning: Coordinate index {coord_index} out of bounds")
-
-        print(f"🔍 [CERTIFICATE] ===== END OPTIONAL FIELDS ANALYSIS =====\n")
-
-    # ✅ ADDED: Optional field coordinates for large template
-    large_optional_key_coordinates = [
-        fitz.Rect(175.5, 522, 343, 530),    # Row 1: Certificate Number
-        fitz.Rect(175.5, 538, 343, 548),    # Row 2: Initial Registration Date
-        fitz.Rect(175.5, 556, 343, 566),    # Row 3: Original Issue Date
-        fitz.Rect(175.5, 574, 343, 584),    # Row 4: Issue Date
-        fitz.Rect(175.5, 592, 343, 602),    # Row 5: Surveillance Group (only 1 field)
-        fitz.Rect(175.5, 610, 343, 620)     # Row 6: Recertification Date
-    ]
-    
-    large_optional_value_coordinates = [
-        fitz.Rect(362.1, 522, 446.4, 530),  # Row 1: Certificate Number value
-        fitz.Rect(362.1, 538, 446.4, 548),  # Row 2: Initial Registration Date value
-        fitz.Rect(362.1, 556, 446.4, 566),  # Row 3: Original Issue Date value
-        fitz.Rect(362.1, 574, 446.4, 584),  # Row 4: Issue Date value
-        fitz.Rect(362.1, 592, 446.4, 602),  # Row 5: Surveillance Group value (only 1 field)
-        fitz.Rect(362.1, 610, 446.4, 620)   # Row 6: Recertification Date value
-    ]
-    
-    # ✅ ADDED: Optional field coordinates for standard template
-    standard_optional_key_coordinates = [
-        fitz.Rect(175.5, 499.1, 343, 509.1),    # Row 1: Certificate Number
-        fitz.Rect(175.5, 516.9, 343, 526.9),    # Row 2: Initial Registration Date
-        fitz.Rect(175.5, 535.1, 343, 545.1),    # Row 3: Original Issue Date
-        fitz.Rect(175.5, 553.9, 343, 563.9),    # Row 4: Issue Date
-        fitz.Rect(175.5, 571.6, 343, 581.6),    # Row 5: Surveillance Group (only 1 field)
-        fitz.Rect(175.5, 589.3, 343, 599.3)     # Row 6: Recertification Date
-    ]
-    
-    standard_optional_value_coordinates = [
-        fitz.Rect(362.1, 499.1, 446.4, 509.1),  # Row 1: Certificate Number value
-        fitz.Rect(362.1, 516.9, 446.4, 526.9),  # Row 2: Initial Registration Date value
-        fitz.Rect(362.1, 535.1, 446.4, 545.1),  # Row 3: Original Issue Date value
-        fitz.Rect(362.1, 553.9, 446.4, 563.9),  # Row 4: Issue Date value
-        fitz.Rect(362.1, 571.6, 446.4, 581.6),  # Row 5: Surveillance Group value (only 1 field)
-        fitz.Rect(362.1, 589.3, 446.4, 599.3)   # Row 6: Recertification Date value
-    ]
-    
+                logger.warning("⚠️ [CERTIFICATE] Warning: Coordinate index %s out of bounds", coord_index)
+
+        logger.debug("🔍 [CERTIFICATE] ===== END OPTIONAL FIELDS ANALYSIS =====\n")
+
     # ✅ UPDATED: Font settings for optional fields (matching soft copy)
     optional_font_settings = {
         "fontname": "Times-Roman",  # Same as soft copy
@@ -1448,19 +1234,16 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
     initial_registration_date = values.get("Initial Registration Date", "")
     if initial_registration_date and initial_registration_date.strip():
         # When Initial Registration Date is present, reduce scope height to accommodate the extra field
-        print(f"🔍 [CERTIFICATE] Initial Registration Date present - adjusting scope coordinates for large template")
-        if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_nonaccredited_other"]:
-            # Adjust large template scope coordinates
-            coords["Scope"] = fitz.Rect(85, 351, 577, 520)  # Reduced height by 16 units
-            print(f"🔍 [CERTIFICATE] Adjusted large template scope coordinates for Initial Registration Date")
+        logger.debug("🔍 [CERTIFICATE] Initial Registration Date present - adjusting scope coordinates for large template")
+        if geometry.initial_registration_scope is not None:
+            # Adjust large template scope coordinates (reduced height by 16 units)
+            coords["Scope"] = geometry.initial_registration_scope
+            logger.debug("🔍 [CERTIFICATE] Adjusted large template scope coordinates for Initial Registration Date")
     else:
-        print(f"🔍 [CERTIFICATE] Using standard scope coordinates (Initial Registration Date not present)")
+        logger.debug("🔍 [CERTIFICATE] Using standard scope coordinates (Initial Registration Date not present)")
 
-    # Process optional fields
-    if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_nonaccredited_other"]:
-        render_optional_fields(page, values, large_optional_key_coordinates, large_optional_value_coordinates, optional_font_settings)
-    else:
-        render_optional_fields(page, values, standard_optional_key_coordinates, standard_optional_value_coordinates, optional_font_settings)
+    # Process optional fields (key/value rows from the template geometry)
+    render_optional_fields(page, values, geometry.optional_keys, geometry.optional_values, optional_font_settings)
 
     # Calculate optional fields count for field processing
     optional_fields_count = 0
@@ -1470,7 +1253,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             if values.get(field, "").strip():
                 optional_fields_count += 1
     else:
-        print(f"⚠️ [CERTIFICATE] Values is None during optional fields calculation - using 0")
+        logger.warning("⚠️ [CERTIFICATE] Values is None during optional fields calculation - using 0")
     
     # Process each field with enhanced text handling
     # ✅ FIELD CLASSIFICATION SYSTEM:
@@ -1490,7 +1273,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
     
     # ✅ ADDED: Defensive check for values before main field processing
     if values is None:
-        print(f"⚠️ [CERTIFICATE] Values dictionary is None in main field processing - cannot continue")
+        logger.warning("⚠️ [CERTIFICATE] Values dictionary is None in main field processing - cannot continue")
         raise ValueError("Values dictionary is None - cannot generate certificate")
     
     # Scope text now uses justification (left and right alignment) for professional appearance
@@ -1547,40 +1330,40 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             
             if address_alignment_column == "center":
                 address_alignment = "center"
-                print(f"🔍 [CERTIFICATE] Address: Excel column specifies CENTERED alignment")
+                logger.debug("🔍 [CERTIFICATE] Address: Excel column specifies CENTERED alignment")
             elif address_alignment_column == "left":
                 address_alignment = "left"
-                print(f"🔍 [CERTIFICATE] Address: Excel column specifies LEFT alignment")
+                logger.debug("🔍 [CERTIFICATE] Address: Excel column specifies LEFT alignment")
             else:
                 # Default logic: always center unless Excel column specifies otherwise
                 address_alignment = "center"  # Default: always center
-                print(f"🔍 [CERTIFICATE] Address: No Excel column value - using CENTERED alignment (default)")
+                logger.debug("🔍 [CERTIFICATE] Address: No Excel column value - using CENTERED alignment (default)")
             
             # ✅ ADDED: Defensive check for coords dictionary
             if coords is None:
-                print(f"⚠️ [CERTIFICATE] Coords dictionary is None - cannot continue")
+                logger.warning("⚠️ [CERTIFICATE] Coords dictionary is None - cannot continue")
                 raise ValueError("Coords dictionary is None - cannot generate certificate")
             
             if "Company Name and Address" not in coords:
-                print(f"⚠️ [CERTIFICATE] Company Name and Address coordinates not found - cannot continue")
+                logger.warning("⚠️ [CERTIFICATE] Company Name and Address coordinates not found - cannot continue")
                 raise ValueError("Company Name and Address coordinates not found - cannot generate certificate")
             
             rect = coords["Company Name and Address"]
             
             # Check if address text is empty or None
             if not safe_address_text:
-                print(f"[WARNING] [COMPANY ADDRESS] WARNING: Address text is empty or None!")
+                logger.warning("[WARNING] [COMPANY ADDRESS] WARNING: Address text is empty or None!")
             elif safe_address_text.strip() == "":
-                print(f"[WARNING] [COMPANY ADDRESS] WARNING: Address text is only whitespace!")
+                logger.warning("[WARNING] [COMPANY ADDRESS] WARNING: Address text is only whitespace!")
             else:
-                print(f"[SUCCESS] [COMPANY ADDRESS] Address text is valid and non-empty")
+                logger.debug("[SUCCESS] [COMPANY ADDRESS] Address text is valid and non-empty")
             
             # Combine text with natural spacing (single line break)
             combined_text = f"{company_text}\n{safe_address_text}"  # \n creates ~2-3pt spacing
             
             # ✅ ADDED: Defensive check for font_starts dictionary
             if font_starts is None:
-                print(f"⚠️ [CERTIFICATE] Font_starts dictionary is None - using default")
+                logger.warning("⚠️ [CERTIFICATE] Font_starts dictionary is None - using default")
                 start_size = 30
             else:
                 start_size = font_starts.get("Company Name and Address", 30)
@@ -1597,10 +1380,10 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             # Set initial font size based on line count
             if company_lines_count <= 1:
                 company_font_size = 35  # Single line - start with 35pt
-                print(f"🔍 [CERTIFICATE] Company Name: Single line detected, starting with {company_font_size}pt")
+                logger.debug("🔍 [CERTIFICATE] Company Name: Single line detected, starting with %spt", company_font_size)
             else:
                 company_font_size = 30  # Multiple lines - start with 30pt
-                print(f"🔍 [CERTIFICATE] Company Name: {company_lines_count} lines detected, starting with {company_font_size}pt")
+                logger.debug("🔍 [CERTIFICATE] Company Name: %s lines detected, starting with %spt", company_lines_count, company_font_size)
             
             address_font_size = 13.6
             
@@ -1608,75 +1391,69 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             final_company_lines = []
             final_address_lines = []
             
-            # ✅ IMPROVED: Different logic for single line vs multi-line company names
-            if company_lines_count <= 1:
-                # NO cmd+enter in Excel: Force single line, use font reduction only
-                print(f"🔍 [CERTIFICATE] No cmd+enter detected - forcing single line with font reduction")
+            # ✅ UPDATED: Company Name fit is memoised - later renders of the same record reuse it
+            def fit_company_name(company_font_size):
+                final_company_lines = []
                 
-                while company_font_size >= 8:  # Minimum font size
-                    # Check if entire company name fits in one line at current font size
-                    font_obj = fitz.Font(fontname=fontname)
-                    text_width = font_obj.text_length(company_text, company_font_size)
-                    
-                    if text_width <= rect.width - 10:  # Leave margin
+                # ✅ IMPROVED: Different logic for single line vs multi-line company names
+                if company_lines_count <= 1:
+                    # NO cmd+enter in Excel: Force single line, use font reduction only
+                    logger.debug("🔍 [CERTIFICATE] No cmd+enter detected - forcing single line with font reduction")
+                
+                    # ✅ UPDATED: Solve for the largest fitting size (1pt steps, min 8pt) from the 1pt width
+                    font_obj = get_font(fontname=fontname)
+                    starting_company_font_size = company_font_size
+                    company_font_size, company_fits = fit_single_line(font_obj.text_length(company_text, 1), rect.width - 10, company_font_size, 8, 1)  # Leave margin
+                    if company_fits:
                         # Text fits in one line - use this font size
                         final_company_lines = [company_text]  # Single line
-                        print(f"✅ [CERTIFICATE] Company name fits in one line at {company_font_size}pt (width: {text_width:.1f}pt)")
-                        break
-                    else:
-                        # Text too wide - reduce font size and try again
-                        print(f"🔍 [CERTIFICATE] Company name too wide at {company_font_size}pt (width: {text_width:.1f}pt > {rect.width - 10:.1f}pt), reducing to {company_font_size - 1}pt")
-                        company_font_size -= 1
+                        if company_font_size != starting_company_font_size:
+                            logger.debug("🔍 [CERTIFICATE] Company name too wide at %spt, reduced to %spt", starting_company_font_size, company_font_size)
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("✅ [CERTIFICATE] Company name fits in one line at %spt (width: %.1fpt)", company_font_size, font_obj.text_length(company_text, company_font_size))
                 
-                # If we reached minimum font size and still doesn't fit, use the minimum
-                if company_font_size < 8:
-                    company_font_size = 8
-                    final_company_lines = [company_text]
-                    print(f"⚠️ [CERTIFICATE] Company name forced to minimum font size 8pt")
+                    # If we reached minimum font size and still doesn't fit, use the minimum
+                    if company_font_size < 8:
+                        company_font_size = 8
+                        final_company_lines = [company_text]
+                        logger.warning("⚠️ [CERTIFICATE] Company name forced to minimum font size 8pt")
                 
-            else:
-                # cmd+enter present in Excel: Allow word wrapping up to 2 lines
-                print(f"🔍 [CERTIFICATE] cmd+enter detected - allowing word wrapping up to 2 lines")
+                else:
+                    # cmd+enter present in Excel: Allow word wrapping up to 2 lines
+                    logger.debug("🔍 [CERTIFICATE] cmd+enter detected - allowing word wrapping up to 2 lines")
                 
-            while company_font_size >= 8:  # Minimum font size
-                company_lines = []
+                # ✅ ADDED: Measure each company line's words once for all candidate sizes
+                company_wrappers = {line: WordWrapper(line, fontname) for line in company_processed_lines if line.strip()}
+            
+                def wrap_company(font_size):
+                    company_lines = []
                 
-                # Process each pre-processed line with word wrapping
-                for processed_line in company_processed_lines:
-                    if not processed_line.strip():  # Empty line - preserve it
-                        company_lines.append("")  # Add empty line to maintain spacing
-                        continue
-                    
-                    # Non-empty line - apply word wrapping
-                    words = processed_line.split()
-                    current_line = ""
-                    
-                    for word in words:
-                        test_line = current_line + (" " if current_line else "") + word
-                        font_obj = fitz.Font(fontname=fontname)
-                        if font_obj.text_length(test_line, company_font_size) <= rect.width - 10:  # Leave margin
-                            current_line = test_line
-                        else:
-                            if current_line:
-                                company_lines.append(current_line)
-                            current_line = word
+                    # Process each pre-processed line with word wrapping
+                    for processed_line in company_processed_lines:
+                        if not processed_line.strip():  # Empty line - preserve it
+                            company_lines.append("")  # Add empty line to maintain spacing
+                            continue
                     
-                    if current_line:
-                        company_lines.append(current_line)
-                
-                # ✅ UPDATED: Allow Company Name to use up to 2 lines (after line breaks + word wrapping)
-                if len(company_lines) <= 2:
-                    final_company_lines = company_lines.copy()
-                    break
-                
-                # Reduce Company Name font size
-                company_font_size -= 1
+                        # Non-empty line - apply word wrapping
+                        company_lines.extend(company_wrappers[processed_line].wrap(font_size, rect.width - 10))  # Leave margin
+                    return company_lines
+            
+                # ✅ UPDATED: Allow Company Name to use up to 2 lines (after line breaks + word wrapping),
+                # bisecting over the 1pt size steps (min 8pt) instead of trying each one
+                company_font_size, company_fits = fit_font_size(company_font_size, 8, 1, lambda size: len(wrap_company(size)) <= 2)
+                if company_fits:
+                    final_company_lines = wrap_company(company_font_size)
+                return company_font_size, tuple(final_company_lines)
+            
+            company_key = layout_key("certificate_company", company_processed_lines, rect, fontname, None, company_font_size)
+            company_font_size, final_company_lines = layout_cache.memoize(company_key, lambda: fit_company_name(company_font_size))
+            final_company_lines = list(final_company_lines)
             
             # ✅ UPDATED: Apply Excel font size adjustment AFTER optimization (user override)
             if name_font_size_adjustment != 0:
                 optimized_company_font = company_font_size
                 company_font_size += name_font_size_adjustment
-                print(f"🔍 [CERTIFICATE DEBUG] Company Name Font Size adjustment AFTER optimization: {optimized_company_font}pt + {name_font_size_adjustment}pt = {company_font_size}pt")
+                logger.debug("🔍 [CERTIFICATE DEBUG] Company Name Font Size adjustment AFTER optimization: %spt + %spt = %spt", optimized_company_font, name_font_size_adjustment, company_font_size)
             
             # ✅ PHASE 0: Address Line Count-Based Height Allocation
             # Determine if company name is single-line or multi-line
@@ -1685,14 +1462,14 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             
             if has_multiple_company_lines:
                 # Multi-line company: Use fixed height allocation based on template and address lines
-                if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_nonaccredited_other", "large_nonaccredited_other"]:
+                if geometry.company_block == "large":
                     if address_lines_count == 1:
                         company_height = 42  # Name +8, Address -5
                     elif address_lines_count == 2:
                         company_height = 33  # Name +8, Address -5 (was 25pt - FIXED)
                     else:  # 3+ lines
                         company_height = 19  # Name 19pt, Address 37pt (fits in 56pt total)
-                elif template_type in ["standard", "standard_eco", "standard_nonaccredited", "standard_other", "standard_other_eco", "standard_nonaccredited_other"]:
+                elif geometry.company_block == "standard":
                     if address_lines_count == 1:
                         company_height = 45  # Match single-line allocation
                     else:
@@ -1707,14 +1484,14 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                         company_height = 19  # Name 19pt, Address 37pt (same as large)
             else:
                 # Single line company: dynamic height based on template and address lines
-                if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_nonaccredited_other", "large_nonaccredited_other"]:
+                if geometry.company_block == "large":
                     if address_lines_count == 1:
                         company_height = 42  # Match softCopy allocation
                     elif address_lines_count == 2:
                         company_height = 33  # Same as multi-line for 2 address lines
                     else:  # 3+ lines
                         company_height = 19  # Match softCopy allocation
-                elif template_type in ["standard", "standard_eco", "standard_nonaccredited", "standard_other", "standard_other_eco", "standard_nonaccredited_other"]:
+                elif geometry.company_block == "standard":
                     if address_lines_count == 1:
                         company_height = 45
                     else:
@@ -1728,7 +1505,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                     else:  # 3+ lines
                         company_height = 19  # Name 19pt, Address 37pt (same as large)
             
-            print(f"🔍 [CERTIFICATE DEBUG] Company height allocation: {company_height}pt (company lines: {len(final_company_lines)}, address lines: {address_lines_count}, template: {template_type})")
+            logger.debug("🔍 [CERTIFICATE DEBUG] Company height allocation: %spt (company lines: %s, address lines: %s, template: %s)", company_height, len(final_company_lines), address_lines_count, template_type)
             
             # ✅ ENHANCED: Height-Aware Font Reduction for Company Name
             # Apply the same sophisticated font reduction logic as soft copy
@@ -1740,7 +1517,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                 required_font_size = company_height / (1.002 * len(final_company_lines))
                 if required_font_size < company_font_size:
                     company_font_size = required_font_size
-                    print(f"🔍 [CERTIFICATE DEBUG] Multi-line font reduced to {company_font_size:.1f}pt to fit {company_height}pt height")
+                    logger.debug("🔍 [CERTIFICATE DEBUG] Multi-line font reduced to %.1fpt to fit %spt height", company_font_size, company_height)
             else:
                 # Single line: Calculate required font size to fit allocated height
                 # Single line needs: font_size * 1.0 (no spacing)
@@ -1748,12 +1525,12 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                 required_font_size = company_height
                 if required_font_size < company_font_size:
                     company_font_size = required_font_size
-                    print(f"🔍 [CERTIFICATE DEBUG] Single line font reduced to {company_font_size:.1f}pt to fit {company_height}pt height")
+                    logger.debug("🔍 [CERTIFICATE DEBUG] Single line font reduced to %.1fpt to fit %spt height", company_font_size, company_height)
             
             # Ensure minimum font size
             if company_font_size < 8:
                 company_font_size = 8
-                print(f"🔍 [CERTIFICATE DEBUG] Company font size set to minimum 8pt")
+                logger.debug("🔍 [CERTIFICATE DEBUG] Company font size set to minimum 8pt")
             
             # ✅ REMOVED: Name Font Size adjustment now applied BEFORE optimization (see above)
             
@@ -1762,94 +1539,112 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             remaining_height = rect.height - company_height  # No margin - address starts immediately
 
             
-            address_font_size_attempts = 0
-            while address_font_size >= 6:  # Minimum font size
-                address_font_size_attempts += 1
+            max_address_width = rect.width - 10  # Leave margin
 
+            # ✅ UPDATED: Address fit is memoised - later renders of the same record reuse it
+            def fit_address(address_font_size):
+                # ✅ ADDED: Measure each address line's words once for all candidate sizes
+                address_wrappers = {line: WordWrapper(line, fontname) for line in address_processed_lines if line.strip()}
+                address_layouts = {}
+
+                def layout_address(font_size):
+                    """Wrapped address lines and their height at font_size (each size is laid out once)."""
+                    if font_size in address_layouts:
+                        return address_layouts[font_size]
+                    # Process Address using pre-processed lines with word wrapping
+                    address_lines = []
+
+                    # Process each pre-processed address line with word wrapping
+                    for line_idx, processed_line in enumerate(address_processed_lines):
+                        if not processed_line.strip():  # Empty line - preserve it
+                            address_lines.append("")  # Add empty line to maintain spacing
+                            continue
+
+                        # Non-empty line - apply word wrapping
+                        wrapped_lines = address_wrappers[processed_line].wrap(font_size, max_address_width)
+                        font_obj = address_wrappers[processed_line].metrics
+                        for wrapped_idx, current_line in enumerate(wrapped_lines):
+                            line_width = font_obj.text_length(current_line, font_size)
+                            if wrapped_idx < len(wrapped_lines) - 1:
+                                logger.debug("🔍 [ADDRESS WIDTH] Line wrapped at %.1fpt: '%s%s' (width: %.1fpt <= %.1fpt)", font_size, current_line[:50], '...' if len(current_line) > 50 else '', line_width, max_address_width)
+                            elif len(wrapped_lines) > 1 or line_width > max_address_width:
+                                # Log final line of this processed segment only if it was wrapped or might overflow
+                                logger.debug("🔍 [ADDRESS WIDTH] Final line segment at %.1fpt: '%s%s' (width: %.1fpt)", font_size, current_line[:50], '...' if len(current_line) > 50 else '', line_width)
+                            if " " not in current_line and line_width > max_address_width:
+                                logger.warning("⚠️ [ADDRESS WIDTH] Single word exceeds width: '%s' (width: %.1fpt > %.1fpt) - will be truncated", current_line, line_width, max_address_width)
+                        address_lines.extend(wrapped_lines)
+
+                    # Calculate Address height
+                    # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
+                    if geometry.address_spacing == "tight":
+                        address_height = len(address_lines) * font_size * 1.1  # Tight spacing for large/logo templates
+                    else:  # standard templates
+                        address_height = len(address_lines) * font_size * 1.2  # Loose spacing for standard templates
+
+                    address_layouts[font_size] = (address_lines, address_height)
+                    return address_lines, address_height
+
+                def address_fits(font_size):
+                    address_lines, address_height = layout_address(font_size)
+                    # Check if Address fits in remaining space
+                    if address_height <= remaining_height:
+                        return True
+                    logger.error("[ERROR] [COMPANY ADDRESS] Address too tall: %.1fpt > %.1fpt, reducing font size", address_height, remaining_height)
+                    return False
+
+                # ✅ UPDATED: Bisect over the 0.5pt size steps (min 6pt) instead of laying out every size
+                address_sizes, _ = candidate_font_sizes(address_font_size, 6, 0.5)
+                address_font_size, address_found = fit_font_size(address_font_size, 6, 0.5, address_fits)
+                if address_found:
+                    address_lines, address_height = layout_address(address_font_size)
+                elif address_sizes:
+                    # Nothing fits - keep the smallest size's layout, as the old decrement loop did
+                    address_lines, address_height = layout_address(address_sizes[-1])
+                else:
+                    return address_font_size, False, None, None
+                return address_font_size, address_found, tuple(address_lines), address_height
+
+            address_family = "tight" if geometry.address_spacing == "tight" else "loose"
+            address_key = layout_key("certificate_address", address_processed_lines, rect, fontname, address_family, address_font_size, remaining_height)
+            address_font_size, address_found, address_lines, address_height = layout_cache.memoize(address_key, lambda: fit_address(address_font_size))
+            if address_found:
+                final_address_lines = list(address_lines)
                 
-                # Process Address using pre-processed lines with word wrapping
-                address_lines = []
-                max_address_width = rect.width - 10  # Leave margin
-                
-                # Process each pre-processed address line with word wrapping
-                for line_idx, processed_line in enumerate(address_processed_lines):
-                    if not processed_line.strip():  # Empty line - preserve it
-                        address_lines.append("")  # Add empty line to maintain spacing
-                        continue
-                    
-                    # Non-empty line - apply word wrapping
-                    words = processed_line.split()
-                    current_line = ""
-                    original_line_wrapped = False
-                    
-                    for word in words:
-                        test_line = current_line + (" " if current_line else "") + word
-                        font_obj = fitz.Font(fontname=fontname)
-                        test_width = font_obj.text_length(test_line, address_font_size)
-                        if test_width <= max_address_width:  # Leave margin
-                            current_line = test_line
+                # ✅ ADDED: Final width check for all address lines (only when solution found)
+                font_obj = get_font(fontname=fontname)
+                overflow_detected = False
+                logger.debug("🔍 [ADDRESS WIDTH] Final width check at %.1fpt (max width: %.1fpt):", address_font_size, max_address_width)
+                for line_idx, line in enumerate(final_address_lines):
+                    if line.strip():  # Only check non-empty lines
+                        line_width = font_obj.text_length(line, address_font_size)
+                        if line_width > max_address_width:
+                            overflow_detected = True
+                            logger.error("  ❌ Line %s exceeds: '%s%s' (width: %.1fpt > %.1fpt)", line_idx + 1, line[:50], '...' if len(line) > 50 else '', line_width, max_address_width)
                         else:
-                            # Line too wide - wrap it
-                            if current_line:
-                                # Log the wrapped line before adding it
-                                line_width = font_obj.text_length(current_line, address_font_size)
-                                print(f"🔍 [ADDRESS WIDTH] Line wrapped at {address_font_size:.1f}pt: '{current_line[:50]}{'...' if len(current_line) > 50 else ''}' (width: {line_width:.1f}pt <= {max_address_width:.1f}pt)")
-                                address_lines.append(current_line)
-                                original_line_wrapped = True
-                            # Check if single word itself is too wide
-                            word_width = font_obj.text_length(word, address_font_size)
-                            if word_width > max_address_width:
-                                print(f"⚠️ [ADDRESS WIDTH] Single word exceeds width: '{word}' (width: {word_width:.1f}pt > {max_address_width:.1f}pt) - will be truncated")
-                            current_line = word
-                    
-                    if current_line:
-                        # Log final line of this processed segment only if it was wrapped or might overflow
-                        line_width = font_obj.text_length(current_line, address_font_size)
-                        if original_line_wrapped or line_width > max_address_width:
-                            print(f"🔍 [ADDRESS WIDTH] Final line segment at {address_font_size:.1f}pt: '{current_line[:50]}{'...' if len(current_line) > 50 else ''}' (width: {line_width:.1f}pt)")
-                        address_lines.append(current_line)
+                            logger.debug("  ✅ Line %s fits: '%s%s' (width: %.1fpt <= %.1fpt)", line_idx + 1, line[:50], '...' if len(line) > 50 else '', line_width, max_address_width)
                 
-                # Calculate Address height
-                # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
-                if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_nonaccredited_other", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
-                    address_height = len(address_lines) * address_font_size * 1.1  # Tight spacing for large/logo templates
-                else:  # standard templates
-                    address_height = len(address_lines) * address_font_size * 1.2  # Loose spacing for standard templates
-
+                if overflow_detected:
+                    logger.warning("⚠️ [ADDRESS WIDTH] ⚠️ WARNING: Some address lines exceed available width at %.1fpt", address_font_size)
                 
-                # Check if Address fits in remaining space
-                if address_height <= remaining_height:
-                    final_address_lines = address_lines.copy()
-                    
-                    # ✅ ADDED: Final width check for all address lines (only when solution found)
-                    font_obj = fitz.Font(fontname=fontname)
-                    overflow_detected = False
-                    print(f"🔍 [ADDRESS WIDTH] Final width check at {address_font_size:.1f}pt (max width: {max_address_width:.1f}pt):")
-                    for line_idx, line in enumerate(final_address_lines):
-                        if line.strip():  # Only check non-empty lines
-                            line_width = font_obj.text_length(line, address_font_size)
-                            if line_width > max_address_width:
-                                overflow_detected = True
-                                print(f"  ❌ Line {line_idx + 1} exceeds: '{line[:50]}{'...' if len(line) > 50 else ''}' (width: {line_width:.1f}pt > {max_address_width:.1f}pt)")
-                            else:
-                                print(f"  ✅ Line {line_idx + 1} fits: '{line[:50]}{'...' if len(line) > 50 else ''}' (width: {line_width:.1f}pt <= {max_address_width:.1f}pt)")
-                    
-                    if overflow_detected:
-                        print(f"⚠️ [ADDRESS WIDTH] ⚠️ WARNING: Some address lines exceed available width at {address_font_size:.1f}pt")
-                    
-                    print(f"[SUCCESS] [COMPANY ADDRESS] Address fits! Final font size: {address_font_size}pt")
-                    break
-                else:
-                    print(f"[ERROR] [COMPANY ADDRESS] Address too tall: {address_height:.1f}pt > {remaining_height:.1f}pt, reducing font size")
-                
-                # Reduce Address font size
-                address_font_size -= 0.5
+                logger.debug("[SUCCESS] [COMPANY ADDRESS] Address fits! Final font size: %spt", address_font_size)
             
             # ✅ UPDATED: Apply Excel font size adjustment AFTER optimization (user override)
             if address_font_size_adjustment != 0:
                 optimized_address_font = address_font_size
                 address_font_size += address_font_size_adjustment
-                print(f"🔍 [CERTIFICATE DEBUG] Address Font Size adjustment AFTER optimization: {optimized_address_font}pt + {address_font_size_adjustment}pt = {address_font_size}pt")
+                logger.debug("🔍 [CERTIFICATE DEBUG] Address Font Size adjustment AFTER optimization: %spt + %spt = %spt", optimized_address_font, address_font_size_adjustment, address_font_size)
+            
+            layout_report["Company Name"] = {
+                "font_size": company_font_size,
+                "lines": len(final_company_lines),
+                "adjustments": {"font_size": name_font_size_adjustment, "position": name_adjustment},
+            }
+            layout_report["Address"] = {
+                "font_size": address_font_size,
+                "lines": len(final_address_lines),
+                "fits": address_found,
+                "adjustments": {"font_size": address_font_size_adjustment, "position": address_adjustment},
+            }
             
             # Now render Company Name and Address dynamically
             if final_company_lines or final_address_lines:
@@ -1890,7 +1685,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                             total_width = 0
                             for segment_text, _, _ in segments:
                                 if segment_text:
-                                    font_obj = fitz.Font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
+                                    font_obj = get_font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
                                     total_width += font_obj.text_length(segment_text, company_font_size)
                             
                             x_pos = center_x - total_width / 2
@@ -1955,7 +1750,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                             total_width = 0
                             for segment_text, _, _ in segments:
                                 if segment_text:
-                                    font_obj = fitz.Font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
+                                    font_obj = get_font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
                                     total_width += font_obj.text_length(segment_text, address_font_size)
                             
                             # Apply alignment based on address_alignment setting
@@ -2053,26 +1848,23 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             
             # ✅ ADDED: Font size reduction logic to prevent x-coordinate overflow
             max_width = management_rect.width - 10  # Leave 5pt margin on each side (87.9 to 580 = 492.1pt width)
-            print(f"🔍 [CERTIFICATE] Management line overflow protection: max_width={max_width:.1f}pt")
+            logger.debug("🔍 [CERTIFICATE] Management line overflow protection: max_width=%.1fpt", max_width)
             
-            while management_font_size >= 8:  # Minimum font size
-                font_obj = fitz.Font(fontname="Times-BoldItalic")
-                text_width = font_obj.text_length(management_line, management_font_size)
-                
-                if text_width <= max_width:
-                    print(f"✅ [CERTIFICATE] Management line fits at {management_font_size}pt (width: {text_width:.1f}pt)")
-                    break  # Text fits!
-                
-                print(f"🔍 [CERTIFICATE] Management line too wide at {management_font_size}pt (width: {text_width:.1f}pt > {max_width:.1f}pt), reducing to {management_font_size - 0.5}pt")
-                management_font_size -= 0.5  # Reduce font size
+            # ✅ UPDATED: Solve for the largest fitting size (0.5pt steps, min 8pt) from the 1pt width
+            font_obj = get_font(fontname="Times-BoldItalic")
+            management_font_size, management_fits = fit_single_line(font_obj.text_length(management_line, 1), max_width, management_font_size, 8, 0.5)
+            if management_fits and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("✅ [CERTIFICATE] Management line fits at %spt (width: %.1fpt)", management_font_size, font_obj.text_length(management_line, management_font_size))
             
             # Ensure minimum font size
             if management_font_size < 8:
                 management_font_size = 8
-                print(f"⚠️ [CERTIFICATE] Management line forced to minimum font size 8pt")
+                logger.warning("⚠️ [CERTIFICATE] Management line forced to minimum font size 8pt")
+            
+            layout_report["Management System"] = {"font_size": management_font_size, "lines": 1}
             
             # Calculate text width for centering with final font size
-            font_obj = fitz.Font(fontname="Times-BoldItalic")  # Use bold italic font
+            font_obj = get_font(fontname="Times-BoldItalic")  # Use bold italic font
             text_width = font_obj.text_length(management_line, management_font_size)
             start_x = center_x - text_width / 2
             
@@ -2092,7 +1884,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             # ✅ NEW: Render ISO Standard with centered positioning (like softcopy)
             # Get ISO Standard coordinates
             iso_rect = coords["ISO Standard"]
-            print(f"🔍 [CERTIFICATE DEBUG] ISO Standard coordinates: {iso_rect}")
+            logger.debug("🔍 [CERTIFICATE DEBUG] ISO Standard coordinates: %s", iso_rect)
             
             # Use expanded ISO for display
             iso_text = expanded_iso
@@ -2105,7 +1897,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             center_y = (iso_rect.y0 + iso_rect.y1) / 2 + iso_font_size/3  # Adjust for baseline
             
             # Calculate text width for centering
-            font_obj = fitz.Font(fontname=iso_fontname)
+            font_obj = get_font(fontname=iso_fontname)
             text_width = font_obj.text_length(iso_text, iso_font_size)
             start_x = center_x - text_width / 2
             
@@ -2119,8 +1911,9 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                 color=iso_color
             )
             
-            print(f"🔍 [CERTIFICATE DEBUG] ISO Standard final rendering: text='{iso_text}', font_size={iso_font_size}pt, center=({center_x:.1f}, {center_y:.1f})")
-            print(f"✅ [CERTIFICATE] ISO Standard field processed successfully")
+            logger.debug("🔍 [CERTIFICATE DEBUG] ISO Standard final rendering: text='%s', font_size=%spt, center=(%.1f, %.1f)", iso_text, iso_font_size, center_x, center_y)
+            layout_report["ISO Standard"] = {"font_size": iso_font_size, "lines": 1}
+            logger.debug("✅ [CERTIFICATE] ISO Standard field processed successfully")
             
             # Skip the normal field processing since we handled it above
             continue
@@ -2135,9 +1928,9 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             
         rect = coords[field]
         if field == "Scope":
-            print(f"[CHECK] IN LOOP: rect for Scope type={type(rect).__name__}, value={rect}")
+            logger.debug("[CHECK] IN LOOP: rect for Scope type=%s, value=%s", type(rect).__name__, rect)
             if isinstance(rect, dict):
-                print(f"[WARN] rect is dict; keys={list(rect.keys())}, scope_layout={scope_layout}")
+                logger.debug("[WARN] rect is dict; keys=%s, scope_layout=%s", list(rect.keys()), scope_layout)
                 rect = rect["long"] if estimated_lines >= 24 else rect["short"]
         
         # Template-specific starting font size for Scope
@@ -2146,7 +1939,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
         else:
             # ✅ ADDED: Defensive check for font_starts dictionary
             if font_starts is None:
-                print(f"⚠️ [CERTIFICATE] Font_starts dictionary is None - using default for field '{field}'")
+                logger.warning("⚠️ [CERTIFICATE] Font_starts dictionary is None - using default for field '%s'", field)
                 start_size = 30
             else:
                 start_size = font_starts.get(field, 30)  # Use existing logic for other cases
@@ -2158,13 +1951,10 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
 
         
         # Reduce font size if it doesn't fit, but ensure minimum size
-        while font_size >= 12:  # Increased minimum from 10 to 12
-            text_height = get_text_height(text, font_size, fontname, rect.width)
-            limit = rect.height if field != "Company Name" else rect.height * 2
-
-            if text_height <= limit:
-                break
-            font_size -= 1
+        limit = rect.height if field != "Company Name" else rect.height * 2
+        # ✅ UPDATED: Bisect over the 1pt size steps instead of trying each one (memoised per text and box)
+        height_key = layout_key("text_height", text, rect, fontname, None, start_size, 12, limit)
+        font_size, _ = layout_cache.memoize(height_key, lambda: fit_font_size(start_size, 12, 1, lambda size: get_text_height(text, size, fontname, rect.width) <= limit))  # Increased minimum from 10 to 12
         
 
         
@@ -2197,7 +1987,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                             continue
                         
                         test_line = current_line + (" " if current_line else "") + word
-                        font_obj = fitz.Font(fontname=fontname)
+                        font_obj = get_font(fontname=fontname)
                         
                         if font_obj.text_length(test_line, font_size) <= rect.width:
                             current_line = test_line
@@ -2210,7 +2000,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                         lines.append(current_line)
                     
                     # Calculate total height
-                    if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_nonaccredited_other", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+                    if geometry.scope_spacing == "tight":
                         line_height = font_size * 1.1
                     else:
                         line_height = font_size * 1.2
@@ -2228,15 +2018,15 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
         # ✅ USER CONTROL: Check if user wants to force font size (bypass optimization)
         force_font_size = values.get("Force Font Size", "").strip().lower()
         if force_font_size in ["true", "1", "yes", "force"]:
-            print(f"🔍 [CERTIFICATE DEBUG] User requested force font size: {font_size}pt (bypassing optimization)")
+            logger.debug("🔍 [CERTIFICATE DEBUG] User requested force font size: %spt (bypassing optimization)", font_size)
             # Use the exact font size without optimization - just split text into lines
             lines = text.split('\n') if '\n' in text or '\r\n' in text else [text]
         else:
             # Use optimized font calculation
             min_font_size = 4  # Allow font size to go below 8pt if needed
             original_font_size = font_size
-            font_size, lines = calculate_optimal_font_size_with_line_breaks(text, rect, fontname, template_type, min_font_size, font_size)
-            print(f"🔍 [CERTIFICATE DEBUG] Binary search result: {font_size}pt (optimized from {original_font_size}pt)")
+            font_size, lines = calculate_optimal_font_size_with_line_breaks(text, rect, fontname, geometry.scope_spacing, min_font_size, font_size)
+            logger.debug("🔍 [CERTIFICATE DEBUG] Binary search result: %spt (optimized from %spt)", font_size, original_font_size)
             
             # ✅ USER CONTROL: Apply Force Font Size as relative adjustment
             try:
@@ -2244,21 +2034,21 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                 if force_adjustment != 0:
                     original_optimized_font = font_size
                     font_size += force_adjustment
-                    print(f"🔍 [CERTIFICATE DEBUG] Force Font Size adjustment: {original_optimized_font}pt + {force_adjustment}pt = {font_size}pt")
+                    logger.debug("🔍 [CERTIFICATE DEBUG] Force Font Size adjustment: %spt + %spt = %spt", original_optimized_font, force_adjustment, font_size)
             except (ValueError, TypeError):
-                print(f"🔍 [CERTIFICATE DEBUG] Invalid Force Font Size value: '{force_font_size}' - treating as 0")
+                logger.debug("🔍 [CERTIFICATE DEBUG] Invalid Force Font Size value: '%s' - treating as 0", force_font_size)
         
         # ✅ UPDATED: Apply Excel font size adjustment AFTER optimization (user override)
         if scope_font_size_adjustment != 0:
             optimized_scope_font = font_size
             font_size += scope_font_size_adjustment
-            print(f"🔍 [CERTIFICATE DEBUG] Scope Font Size adjustment AFTER optimization: {optimized_scope_font}pt + {scope_font_size_adjustment}pt = {font_size}pt")
+            logger.debug("🔍 [CERTIFICATE DEBUG] Scope Font Size adjustment AFTER optimization: %spt + %spt = %spt", optimized_scope_font, scope_font_size_adjustment, font_size)
         
         # ✅ HORIZONTAL OVERFLOW FIX: Re-wrap lines if font size increased
         if scope_font_size_adjustment != 0:
-            print(f"🔍 [SCOPE HORIZONTAL] Checking horizontal overflow at increased font size: {font_size}pt")
+            logger.debug("🔍 [SCOPE HORIZONTAL] Checking horizontal overflow at increased font size: %spt", font_size)
             
-            font_obj = fitz.Font(fontname=fontname)
+            font_obj = get_font(fontname=fontname)
             rewrapped_lines = []
             rewrap_count = 0
             
@@ -2277,39 +2067,29 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                 else:
                     # Line overflows - re-wrap it
                     rewrap_count += 1
-                    print(f"🔍 [SCOPE HORIZONTAL] Re-wrapping line {line_idx + 1}: '{line[:40]}...' (width: {line_width:.1f}pt > {rect.width:.1f}pt)")
-                    
-                    words = line.split()
-                    current_line = ""
-                    
-                    for word in words:
-                        test_line = current_line + (" " if current_line else "") + word
-                        test_width = font_obj.text_length(test_line, font_size)
-                        
-                        if test_width <= rect.width:
-                            current_line = test_line
-                        else:
-                            if current_line:
-                                rewrapped_lines.append(current_line)
-                            current_line = word
+                    logger.debug("🔍 [SCOPE HORIZONTAL] Re-wrapping line %s: '%s...' (width: %.1fpt > %.1fpt)", line_idx + 1, line[:40], line_width, rect.width)
                     
-                    if current_line:
-                        rewrapped_lines.append(current_line)
+                    rewrapped_lines.extend(WordWrapper(line, fontname).wrap(font_size, rect.width))
             
             # Update lines with re-wrapped content
             original_line_count = len(lines)
             lines = rewrapped_lines
             new_line_count = len(lines)
             
-            print(f"✅ [SCOPE HORIZONTAL] Re-wrapping complete: {original_line_count} → {new_line_count} lines ({rewrap_count} lines re-wrapped)")
+            logger.debug("✅ [SCOPE HORIZONTAL] Re-wrapping complete: %s → %s lines (%s lines re-wrapped)", original_line_count, new_line_count, rewrap_count)
         
         # Calculate final total height for overflow checking
-        if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_nonaccredited_other", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+        if geometry.scope_spacing == "tight":
             line_height = font_size * 1.1
         else:
             line_height = font_size * 1.2
         total_height = len(lines) * line_height
 
+        layout_report[field] = {"font_size": font_size, "lines": len(lines), "overflow": total_height > rect.height}
+        if field == "Scope":
+            layout_report[field]["layout"] = scope_layout
+            layout_report[field]["adjustments"] = {"font_size": scope_font_size_adjustment, "position": scope_adjustment, "force_font_size": force_font_size}
+
         # ✅ NEW: Binary search in font_utils handles overflow optimization automatically
         # No need for manual overflow handling - the shared function finds optimal font size
 
@@ -2320,7 +2100,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             if line:  # Non-empty line
                 display_line = line.replace('*', '•')
                 if line != display_line:
-                    print(f"🔄 [CERTIFICATE BULLET] Replaced '{line}' with '{display_line}'")
+                    logger.debug("🔄 [CERTIFICATE BULLET] Replaced '%s' with '%s'", line, display_line)
                 optimized_lines.append(display_line)
             else:
                 optimized_lines.append(line)  # Preserve empty lines
@@ -2332,7 +2112,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
         
         # Calculate total height and position vertically based on template type
         # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
-        if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_nonaccredited_other", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+        if geometry.scope_spacing == "tight":
             line_height = font_size * 1.1  # Tight spacing for large/logo templates
         else:  # standard templates
             line_height = font_size * 1.2  # Loose spacing for standard templates
@@ -2341,39 +2121,39 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
         
         # 🔍 DEBUG: Check for line breaks and template type
         has_line_breaks = '\n' in text or '\r\n' in text
-        print(f"🔍 [CERTIFICATE DEBUG] Template type: {template_type}")
-        print(f"🔍 [CERTIFICATE DEBUG] Has line breaks: {has_line_breaks}")
-        print(f"🔍 [CERTIFICATE DEBUG] Rect coordinates: y0={rect.y0}, y1={rect.y1}, height={rect.height}")
-        print(f"🔍 [CERTIFICATE DEBUG] Text height from binary search: {total_height}pt")
-        print(f"🔍 [CERTIFICATE DEBUG] Font size from binary search: {font_size}pt")
+        logger.debug("🔍 [CERTIFICATE DEBUG] Template type: %s", template_type)
+        logger.debug("🔍 [CERTIFICATE DEBUG] Has line breaks: %s", has_line_breaks)
+        logger.debug("🔍 [CERTIFICATE DEBUG] Rect coordinates: y0=%s, y1=%s, height=%s", rect.y0, rect.y1, rect.height)
+        logger.debug("🔍 [CERTIFICATE DEBUG] Text height from binary search: %spt", total_height)
+        logger.debug("🔍 [CERTIFICATE DEBUG] Font size from binary search: %spt", font_size)
         
-        if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_nonaccredited_other", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+        if geometry.scope_alignment == "top":
             # Large/Logo template: start from top with no margin
             # If explicit line breaks, hard-code 7pt top offset (same as softcopy)
             if has_line_breaks:
                 start_y = rect.y0 + 7 + scope_adjustment  # 7pt offset + Excel adjustment
-                print(f"🔍 [CERTIFICATE DEBUG] Large/Logo template with line breaks: start_y = {rect.y0} + 7 + {scope_adjustment} = {start_y}")
+                logger.debug("🔍 [CERTIFICATE DEBUG] Large/Logo template with line breaks: start_y = %s + 7 + %s = %s", rect.y0, scope_adjustment, start_y)
             else:
                 start_y = rect.y0 + scope_adjustment  # Start at exact top of box + Excel adjustment
-                print(f"🔍 [CERTIFICATE DEBUG] Large/Logo template without line breaks: start_y = {rect.y0} + {scope_adjustment} = {start_y}")
+                logger.debug("🔍 [CERTIFICATE DEBUG] Large/Logo template without line breaks: start_y = %s + %s = %s", rect.y0, scope_adjustment, start_y)
             
             # Check if text would overflow bottom
             if start_y + total_height > rect.y1:
                 # If overflow, adjust to fit within bounds
                 old_start_y = start_y
                 start_y = rect.y1 - total_height - 2  # 2pt margin from bottom
-                print(f"⚠️ [CERTIFICATE DEBUG] Overflow detected! Adjusted start_y from {old_start_y} to {start_y}")
+                logger.warning("⚠️ [CERTIFICATE DEBUG] Overflow detected! Adjusted start_y from %s to %s", old_start_y, start_y)
             else:
-                print(f"✅ [CERTIFICATE DEBUG] No overflow: start_y={start_y}, end_y={start_y + total_height}, rect.y1={rect.y1}")
+                logger.debug("✅ [CERTIFICATE DEBUG] No overflow: start_y=%s, end_y=%s, rect.y1=%s", start_y, start_y + total_height, rect.y1)
         else:
             # Standard template: top-align when explicit line breaks; otherwise center
             if has_line_breaks:
                 # Hard-code 7pt top offset for explicit line breaks (same as softcopy) + Excel adjustment
                 start_y = rect.y0 + 7 + scope_adjustment
-                print(f"🔍 [CERTIFICATE DEBUG] Standard template with line breaks: start_y = {rect.y0} + 7 + {scope_adjustment} = {start_y}")
+                logger.debug("🔍 [CERTIFICATE DEBUG] Standard template with line breaks: start_y = %s + 7 + %s = %s", rect.y0, scope_adjustment, start_y)
             else:
                 start_y = rect.y0 + (rect.height - total_height) / 2 + line_height/2 + scope_adjustment  # Adjust for baseline + Excel adjustment
-                print(f"🔍 [CERTIFICATE DEBUG] Standard template without line breaks: start_y = {rect.y0} + {(rect.height - total_height) / 2 + line_height/2 + scope_adjustment} = {start_y}")
+                logger.debug("🔍 [CERTIFICATE DEBUG] Standard template without line breaks: start_y = %s + %s = %s", rect.y0, (rect.height - total_height) / 2 + line_height / 2 + scope_adjustment, start_y)
         
         # ✅ BULLET ALIGNMENT: Helper function to detect bullet lines
         def is_bullet_line(line):
@@ -2387,7 +2167,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
         bullet_char_width = 0
         longest_bullet_line = None
         longest_word_count = 0
-        font_obj = fitz.Font(fontname=fontname)
+        font_obj = get_font(fontname=fontname)
         
         # Find the longest bullet line by word count
         for line in lines:
@@ -2410,17 +2190,18 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             # Use the leftmost coordinate from centering the longest line
             bullet_left_coord = centered_leftmost
             
-            print(f"🔍 [CERTIFICATE BULLET] Longest bullet line: '{longest_bullet_line[:50]}...' ({longest_word_count} words)")
-            print(f"🔍 [CERTIFICATE BULLET] Longest line width: {longest_line_width:.1f}pt")
-            print(f"🔍 [CERTIFICATE BULLET] Centered leftmost coordinate: {centered_leftmost:.1f}pt")
-            print(f"🔍 [CERTIFICATE BULLET] All bullets will align to: {bullet_left_coord:.1f}pt")
+            logger.debug("🔍 [CERTIFICATE BULLET] Longest bullet line: '%s...' (%s words)", longest_bullet_line[:50], longest_word_count)
+            logger.debug("🔍 [CERTIFICATE BULLET] Longest line width: %.1fpt", longest_line_width)
+            logger.debug("🔍 [CERTIFICATE BULLET] Centered leftmost coordinate: %.1fpt", centered_leftmost)
+            logger.debug("🔍 [CERTIFICATE BULLET] All bullets will align to: %.1fpt", bullet_left_coord)
         else:
             bullet_left_coord = rect.x0 + bullet_char_width
-            print(f"🔍 [CERTIFICATE BULLET] No bullets found, using default left coordinate: {bullet_left_coord:.1f}pt")
+            logger.debug("🔍 [CERTIFICATE BULLET] No bullets found, using default left coordinate: %.1fpt", bullet_left_coord)
         
-        print(f"🔍 [SCOPE BULLETS] Total lines: {len(lines)}")
-        print(f"🔍 [SCOPE BULLETS] Bullet lines detected: {sum(1 for l in lines if is_bullet_line(l))}")
-        print(f"🔍 [SCOPE BULLETS] Non-bullet lines: {sum(1 for l in lines if not is_bullet_line(l) and l.strip())}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("🔍 [SCOPE BULLETS] Total lines: %s", len(lines))
+            logger.debug("🔍 [SCOPE BULLETS] Bullet lines detected: %s", sum(1 for l in lines if is_bullet_line(l)))
+            logger.debug("🔍 [SCOPE BULLETS] Non-bullet lines: %s", sum(1 for l in lines if not is_bullet_line(l) and l.strip()))
         
         # ✅ SIMPLIFIED: Scope rendering with consistent centering
         current_y = start_y
@@ -2453,7 +2234,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                                fontsize=bullet_font_size, fontname=fontname, color=color)
                 
                 # Calculate position for text after bullet
-                font_obj = fitz.Font(fontname=fontname)
+                font_obj = get_font(fontname=fontname)
                 bullet_width = font_obj.text_length(first_word + " ", bullet_font_size)
                 text_start_x = start_x + bullet_width
                 
@@ -2462,7 +2243,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                     safe_insert_text(page, (text_start_x, current_y), rest_of_text, 
                                    fontsize=font_size, fontname=fontname, color=color)
                 
-                print(f"🔍 [CERTIFICATE BULLET] Line {i+1} left-aligned to {start_x:.1f}pt: '{first_word}' ({bullet_font_size:.1f}pt) + '{rest_of_text[:30]}...' ({font_size}pt)")
+                logger.debug("🔍 [CERTIFICATE BULLET] Line %s left-aligned to %.1fpt: '%s' (%.1fpt) + '%s...' (%spt)", i + 1, start_x, first_word, bullet_font_size, rest_of_text[:30], font_size)
             elif is_last_line:
                 # ✅ LAST LINE: Center align for balanced appearance
                 center_x = (rect.x0 + rect.x1) / 2
@@ -2474,14 +2255,14 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                     total_width = 0
                     for segment_text, _, _ in segments:
                         if segment_text:
-                            font_obj = fitz.Font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
+                            font_obj = get_font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
                             total_width += font_obj.text_length(segment_text, font_size)
                     
                     start_x = center_x - total_width / 2
                     render_mixed_format_text(page, (start_x, current_y), line, font_size, color)
                 else:
                     # Standard rendering for non-bold text
-                    font_obj = fitz.Font(fontname=fontname)
+                    font_obj = get_font(fontname=fontname)
                     text_width = font_obj.text_length(line, font_size)
                     start_x = center_x - text_width / 2
                     
@@ -2495,7 +2276,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                     )
                 # ✅ Safe string handling for debug output
                 safe_line = str(line) if line is not None else ""
-                print(f"🔍 [CERTIFICATE] Last line centered: '{safe_line[:50]}{'...' if len(safe_line) > 50 else ''}'")
+                logger.debug("🔍 [CERTIFICATE] Last line centered: '%s%s'", safe_line[:50], '...' if len(safe_line) > 50 else '')
             else:
                 # ✅ INTERMEDIATE LINES: Center align for consistency
                 center_x = (rect.x0 + rect.x1) / 2
@@ -2507,14 +2288,14 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                     total_width = 0
                     for segment_text, _, _ in segments:
                         if segment_text:
-                            font_obj = fitz.Font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
+                            font_obj = get_font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
                             total_width += font_obj.text_length(segment_text, font_size)
                     
                     start_x = center_x - total_width / 2
                     render_mixed_format_text(page, (start_x, current_y), line, font_size, color)
                 else:
                     # Standard rendering for non-bold text
-                    font_obj = fitz.Font(fontname=fontname)
+                    font_obj = get_font(fontname=fontname)
                     text_width = font_obj.text_length(line, font_size)
                     start_x = center_x - text_width / 2
                     
@@ -2529,55 +2310,51 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                 
                 # ✅ Safe string handling for debug output
                 safe_line = str(line) if line is not None else ""
-                print(f"🔍 [CERTIFICATE] Line {i+1} centered: '{safe_line[:50]}{'...' if len(safe_line) > 50 else ''}'")
+                logger.debug("🔍 [CERTIFICATE] Line %s centered: '%s%s'", i + 1, safe_line[:50], '...' if len(safe_line) > 50 else '')
             
             # Update current_y consistently for all lines
             # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
-            if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_nonaccredited_other", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+            if geometry.scope_spacing == "tight":
                 current_y += font_size * 1.1  # Tight spacing for large/logo templates
             else:  # standard templates
                 current_y += font_size * 1.2  # Loose spacing for standard templates
         
-        print(f"🎯 [SCOPE SUMMARY] Final rendering method: CENTERED")
-        print(f"🎯 [SCOPE SUMMARY] Scope field '{field}' processed successfully")
-        print(f"🔍 [CERTIFICATE DEBUG] ===== SCOPE ANALYSIS COMPLETE =====")
-        print(f"🔍 [CERTIFICATE DEBUG] Binary search result: font_size={font_size:.1f}pt, lines={len(lines)}")
-        print(f"🔍 [CERTIFICATE DEBUG] Line height: {line_height:.1f}pt")
-        print(f"🔍 [CERTIFICATE DEBUG] Total text height: {total_height:.1f}pt")
-        print(f"🔍 [CERTIFICATE DEBUG] Available rect height: {rect.height:.1f}pt")
-        print(f"🔍 [CERTIFICATE DEBUG] Rect boundaries: y0={rect.y0:.1f}, y1={rect.y1:.1f}")
-        print(f"🔍 [CERTIFICATE DEBUG] Final coordinates used: start_y={start_y:.1f}, end_y={start_y + total_height:.1f}")
-        print(f"🔍 [CERTIFICATE DEBUG] Space utilization: {((start_y + total_height - rect.y0) / rect.height) * 100:.1f}%")
-        print(f"🔍 [CERTIFICATE DEBUG] Remaining space: {rect.y1 - (start_y + total_height):.1f}pt")
-        print(f"🔍 [CERTIFICATE DEBUG] Binary search working: {'YES' if font_size < 20 else 'NO'} (font reduced from 20pt to {font_size:.1f}pt)")
-        print(f"🔍 [CERTIFICATE DEBUG] ===== END SCOPE ANALYSIS =====")
+        logger.debug("🎯 [SCOPE SUMMARY] Final rendering method: CENTERED")
+        logger.debug("🎯 [SCOPE SUMMARY] Scope field '%s' processed successfully", field)
+        logger.debug("🔍 [CERTIFICATE DEBUG] ===== SCOPE ANALYSIS COMPLETE =====")
+        logger.debug("🔍 [CERTIFICATE DEBUG] Binary search result: font_size=%.1fpt, lines=%s", font_size, len(lines))
+        logger.debug("🔍 [CERTIFICATE DEBUG] Line height: %.1fpt", line_height)
+        logger.debug("🔍 [CERTIFICATE DEBUG] Total text height: %.1fpt", total_height)
+        logger.debug("🔍 [CERTIFICATE DEBUG] Available rect height: %.1fpt", rect.height)
+        logger.debug("🔍 [CERTIFICATE DEBUG] Rect boundaries: y0=%.1f, y1=%.1f", rect.y0, rect.y1)
+        logger.debug("🔍 [CERTIFICATE DEBUG] Final coordinates used: start_y=%.1f, end_y=%.1f", start_y, start_y + total_height)
+        logger.debug("🔍 [CERTIFICATE DEBUG] Space utilization: %.1f%%", (start_y + total_height - rect.y0) / rect.height * 100)
+        logger.debug("🔍 [CERTIFICATE DEBUG] Remaining space: %.1fpt", rect.y1 - (start_y + total_height))
+        logger.debug("🔍 [CERTIFICATE DEBUG] Binary search working: %s (font reduced from 20pt to %.1fpt)", 'YES' if font_size < 20 else 'NO', font_size)
+        logger.debug("🔍 [CERTIFICATE DEBUG] ===== END SCOPE ANALYSIS =====")
 
     # ✅ ADDED: Insert logo if available and using any logo template type
-    if logo_image and template_type.startswith("logo"):
+    if logo_data and template_type.startswith("logo") and not dry_run:
         try:
-            # ✅ ADDED: Defensive check for logo_coords
-            if logo_coords is None:
-                print(f"⚠️ [CERTIFICATE] Logo_coords is None - skipping logo insertion")
+            # Logo area from the template geometry
+            logo_rect = geometry.logo
+            if logo_rect:
+                # Use the smart positioning function directly with the loaded logo bytes
+                insert_logo_with_smart_positioning(page, logo_data, logo_rect)
+                logger.debug("✅ [CERTIFICATE] Logo inserted for template type: %s", template_type)
             else:
-                # Get logo coordinates from logo_coords
-                logo_rect = logo_coords.get("logo")
-                if logo_rect:
-                    # Use the smart positioning function directly with the loaded logo_image
-                    insert_logo_with_smart_positioning(page, logo_image, logo_rect)
-                    print(f"✅ [CERTIFICATE] Logo inserted for template type: {template_type}")
-                else:
-                    print(f"⚠️ [CERTIFICATE] Logo coordinates not found in logo_coords for template: {template_type}")
+                logger.warning("⚠️ [CERTIFICATE] Logo coordinates not found in template geometry for template: %s", template_type)
         except Exception as logo_insert_error:
-            print(f"❌ [CERTIFICATE] Error inserting logo: {logo_insert_error}")
+            logger.error("❌ [CERTIFICATE] Error inserting logo: %s", logo_insert_error)
 
     # ✅ ADDED: Process Extra Line field
     extra_line_text = values.get("Extra Line", "").strip()
     if extra_line_text:
-        print(f"🔍 [CERTIFICATE] Processing Extra Line: '{extra_line_text}'")
+        logger.debug("🔍 [CERTIFICATE] Processing Extra Line: '%s'", extra_line_text)
         
         # Calculate Extra Line position (0pt gap below scope)
         # Use the same scope_rect that was used for scope rendering
-        if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other"]:
+        if geometry.extra_line_scope == "fixed":
             scope_rect = coords["Scope"]  # Single rectangle for large templates
         else:
             # For standard/logo templates, use the stored original coordinates
@@ -2612,7 +2389,7 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
             else:
                 # Center-aligned bold text rendering
                 center_x = (extra_line_rect.x0 + extra_line_rect.x1) / 2
-                font_obj = fitz.Font(fontname="Times-Bold")
+                font_obj = get_font(fontname="Times-Bold")
                 text_width = font_obj.text_length(extra_line_text, 12)
                 start_x = center_x - text_width / 2
                 
@@ -2625,31 +2402,54 @@ def generate_certificate(base_pdf_path: str, output_pdf_path: str, values: Dict[
                     color=(0, 0, 0)
                 )
             
-            print(f"🔍 [CERTIFICATE] Extra Line rendered at: {extra_line_rect}")
+            logger.debug("🔍 [CERTIFICATE] Extra Line rendered at: %s", extra_line_rect)
         except Exception as extra_line_error:
-            print(f"❌ [CERTIFICATE] Error rendering Extra Line: {extra_line_error}")
-            print(f"🔍 [CERTIFICATE] Extra Line coordinates: {extra_line_rect}")
-            print(f"🔍 [CERTIFICATE] Extra Line text: '{extra_line_text}'")
+            logger.error("❌ [CERTIFICATE] Error rendering Extra Line: %s", extra_line_error)
+            logger.debug("🔍 [CERTIFICATE] Extra Line coordinates: %s", extra_line_rect)
+            logger.debug("🔍 [CERTIFICATE] Extra Line text: '%s'", extra_line_text)
             # Continue without Extra Line rather than failing completely
     else:
-        print(f"🔍 [CERTIFICATE] No Extra Line - skipping")
+        logger.debug("🔍 [CERTIFICATE] No Extra Line - skipping")
+
+    if dry_run:
+        doc.close()
+        logger.debug("[CERTIFICATE] Layout check complete (%s fields laid out)", len(layout_report))
+        return {
+            "success": True,
+            "output_path": None,
+            "overflow_warnings": overflow_warnings,
+            "template_type": template_type,
+            "layout": layout_report
+        }
 
     # ✅ ADDED: Robust return structure - always save and return
     try:
-        doc.save(output_pdf_path)
+        # ✅ UPDATED: Save with the output profile (print keeps complete fonts)
+        save_profile = resolve_save_profile(save_profile, "certificate")
+        pdf_bytes = None
+        if output_pdf_path is None:
+            # ✅ ADDED: In-memory render - serialise straight to bytes
+            pdf_bytes = serialize_pdf(doc, save_profile)
+            output_size = len(pdf_bytes)
+        else:
+            output_size = save_pdf(doc, output_pdf_path, save_profile)
         doc.close()
         
-        print(f"[CERTIFICATE] Certificate PDF generated successfully: {output_pdf_path}")
+        logger.debug("[CERTIFICATE] Certificate PDF generated successfully: %s (%s bytes, %s profile)", output_pdf_path or "in memory", output_size, save_profile)
         
         # Return tracking information
         return {
             "success": True,
             "output_path": output_pdf_path,
+            "pdf": pdf_bytes,
             "overflow_warnings": overflow_warnings,
-            "template_type": template_type
+            "template_type": template_type,
+            "layout": layout_report,
+            "output_size": output_size,
+            "save_profile": save_profile
         }
     except Exception as save_error:
-        print(f"❌ [CERTIFICATE] Error saving PDF: {save_error}")
+        logger.error("❌ [CERTIFICATE] Error saving PDF: %s", save_error)
         # Still return a result dict even if save fails
         return {
             "success": False,
@@ -1,8 +1,11 @@
 import fitz  # PyMuPDF
 import pypdf
 import os
+import logging
 from datetime import datetime
 
+logger = logging.getLogger(__name__)
+
 def extract_text_from_pdf(pdf_path, coords, use_ocr_fallback=False):
     """Extract text from specific coordinates using text blocks, with optional OCR fallback."""
     extracted_data = {}
@@ -26,7 +29,7 @@ def extract_text_from_pdf(pdf_path, coords, use_ocr_fallback=False):
             # Remove double spaces caused by removal
             cleaned_text = ' '.join(cleaned_text.split())
             if cleaned_text != block_text:
-                print(f"[INFO] Watermark removed for '{field_name}': '{cleaned_text}'")
+                logger.info("[INFO] Watermark removed for '%s': '%s'", field_name, cleaned_text)
 
             # Fallback to OCR if the block text looks like junk (single letters or too short)
             if use_ocr_fallback and (len(cleaned_text) < 10 or "\n" in cleaned_text or any(len(w) <= 2 for w in cleaned_text.split())):
@@ -37,21 +40,21 @@ def extract_text_from_pdf(pdf_path, coords, use_ocr_fallback=False):
                     pix = page.get_pixmap(clip=rect)
                     img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
                     ocr_text = pytesseract.image_to_string(img).strip()
-                    print(f"🔁 OCR fallback used for '{field_name}'")
+                    logger.debug("🔁 OCR fallback used for '%s'", field_name)
                     extracted_data[field_name] = ocr_text
                 except (ImportError, Exception) as e:
-                    print(f"⚠️ OCR not available ({str(e)}), using block text for '{field_name}'")
+                    logger.warning("⚠️ OCR not available (%s), using block text for '%s'", str(e), field_name)
                     extracted_data[field_name] = cleaned_text
             else:
                 extracted_data[field_name] = cleaned_text
             
-            print(f"🔍 Extracted '{field_name}' from rect({rect.x0}, {rect.y0}, {rect.x1}, {rect.y1}): '{extracted_data[field_name]}'")
+            logger.debug("🔍 Extracted '%s' from rect(%s, %s, %s, %s): '%s'", field_name, rect.x0, rect.y0, rect.x1, rect.y1, extracted_data[field_name])
             
         doc.close()
         return extracted_data
 
     except Exception as e:
-        print(f"❌ Error extracting text: {str(e)}")
+        logger.error("❌ Error extracting text: %s", str(e))
         return {}
 
 def extract_text_from_pdf_pypdf(pdf_path, coords):
@@ -68,10 +71,10 @@ def extract_text_from_pdf_pypdf(pdf_path, coords):
             page_text = page.extract_text()
             
             # For now, let's extract all text and print it to see the structure
-            print(f"📄 Full page text from pypdf:")
-            print("=" * 50)
-            print(page_text)
-            print("=" * 50)
+            logger.debug("📄 Full page text from pypdf:")
+            logger.debug("%s", '=' * 50)
+            logger.debug("%s", page_text)
+            logger.debug("%s", '=' * 50)
             
             # For each field, we'll need to manually parse the text
             # This is a simplified approach - we'll extract based on keywords
@@ -81,11 +84,11 @@ def extract_text_from_pdf_pypdf(pdf_path, coords):
                     lines = page_text.split('\n')
                     for line in lines:
                         if any(keyword in line.lower() for keyword in ['infotech', 'tech', 'ltd', 'inc', 'corp']):
-                            print(f"[DEBUG] Company Name candidate line: {line}")
+                            logger.debug("[DEBUG] Company Name candidate line: %s", line)
                             extracted_data[field_name] = line.strip()
                             break
                     else:
-                        print(f"[DEBUG] No company name found in lines: {lines}")
+                        logger.debug("[DEBUG] No company name found in lines: %s", lines)
                         extracted_data[field_name] = "Company name not found"
                         
                 elif field_name == "Address":
@@ -93,14 +96,14 @@ def extract_text_from_pdf_pypdf(pdf_path, coords):
                     lines = page_text.split('\n')
                     found = False
                     for line in lines:
-                        print(f"[DEBUG] Address candidate line: {line}")
+                        logger.debug("[DEBUG] Address candidate line: %s", line)
                         if any(keyword in line.lower() for keyword in ['jalgaon', 'mumbai', 'delhi', 'bangalore']):
-                            print(f"[DEBUG] Address matched: {line}")
+                            logger.debug("[DEBUG] Address matched: %s", line)
                             extracted_data[field_name] = line.strip()
                             found = True
                             break
                     if not found:
-                        print(f"[DEBUG] No address found in lines: {lines}")
+                        logger.debug("[DEBUG] No address found in lines: %s", lines)
                         extracted_data[field_name] = "Address not found"
                         
                 elif field_name == "ISO Standard":
@@ -115,29 +118,29 @@ def extract_text_from_pdf_pypdf(pdf_path, coords):
                 elif field_name == "Scope":
                     # Look for scope section - try multiple approaches
                     scope_text = "Scope not found"
-                    print(f"[DEBUG] Full page text for Scope search: {page_text}")
+                    logger.debug("[DEBUG] Full page text for Scope search: %s", page_text)
                     # Method 1: Look for the pets text (since that's what we saw in the image)
                     if "pets are more than animals" in page_text.lower():
                         scope_start = page_text.lower().find("pets are more than animals")
                         scope_text = page_text[scope_start:scope_start+1000]  # Get 1000 chars after
-                        print(f"[DEBUG] Scope found by pets phrase: {scope_text}")
+                        logger.debug("[DEBUG] Scope found by pets phrase: %s", scope_text)
                     # Method 2: Look for "scope" keyword
                     elif "scope" in page_text.lower():
                         scope_start = page_text.lower().find("scope")
                         scope_text = page_text[scope_start:scope_start+500]  # Get 500 chars after scope
-                        print(f"[DEBUG] Scope found by 'scope' keyword: {scope_text}")
+                        logger.debug("[DEBUG] Scope found by 'scope' keyword: %s", scope_text)
                     # Method 3: Look for "valid for the following" (common in certificates)
                     elif "valid for the following" in page_text.lower():
                         scope_start = page_text.lower().find("valid for the following")
                         scope_text = page_text[scope_start:scope_start+800]  # Get 800 chars after
-                        print(f"[DEBUG] Scope found by 'valid for the following': {scope_text}")
+                        logger.debug("[DEBUG] Scope found by 'valid for the following': %s", scope_text)
                     # Method 4: Look for any long paragraph that might be scope
                     else:
                         lines = page_text.split('\n')
                         for i, line in enumerate(lines):
-                            print(f"[DEBUG] Scope candidate line: {line}")
+                            logger.debug("[DEBUG] Scope candidate line: %s", line)
                             if len(line.strip()) > 100:  # Long line might be scope
-                                print(f"[DEBUG] Scope matched long line: {line}")
+                                logger.debug("[DEBUG] Scope matched long line: %s", line)
                                 scope_text = line.strip()
                                 break
                     extracted_data[field_name] = scope_text.strip()
@@ -155,12 +158,12 @@ def extract_text_from_pdf_pypdf(pdf_path, coords):
                     else:
                         extracted_data[field_name] = "Management system not found"
                 
-                print(f"🔍 Extracted '{field_name}' using pypdf: '{extracted_data[field_name]}'")
+                logger.debug("🔍 Extracted '%s' using pypdf: '%s'", field_name, extracted_data[field_name])
             
         return extracted_data
 
     except Exception as e:
-        print(f"❌ Error extracting text with pypdf: {str(e)}")
+        logger.error("❌ Error extracting text with pypdf: %s", str(e))
         return {}
 
 def get_text_height(text, fontsize, fontname, max_width):
@@ -191,8 +194,8 @@ def insert_centered_textbox(page, rect, text, fontname, fontsize, color):
     
     # Use exact center - insert_text positions by baseline, so center_y should work
     # Debug: Print text insertion coordinates
-    print(f"🔍 DEBUG: Text insertion coordinates: ({center_x:.2f}, {center_y:.2f})")
-    print(f"🔍 DEBUG: Rectangle center: ({center_x:.2f}, {center_y:.2f})")
+    logger.debug("🔍 DEBUG: Text insertion coordinates: (%.2f, %.2f)", center_x, center_y)
+    logger.debug("🔍 DEBUG: Rectangle center: (%.2f, %.2f)", center_x, center_y)
     
     # Use insert_text instead of insert_textbox for better reliability
     page.insert_text(
@@ -233,8 +236,8 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
         color = (0, 0, 0)  # Black
         
         # Insert extracted data from draft
-        print(f"🔍 DEBUG: Extracted data keys: {list(extracted_data.keys())}")
-        print(f"🔍 DEBUG: Available coords keys: {list(coords.keys())}")
+        logger.debug("🔍 DEBUG: Extracted data keys: %s", list(extracted_data.keys()))
+        logger.debug("🔍 DEBUG: Available coords keys: %s", list(coords.keys()))
         
         # Handle Company Name and Address combination first
         company_name = extracted_data.get("Company Name", "")
@@ -243,7 +246,7 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
             combined_text = f"{company_name}\n{address}"
             if "Company Name and Address" in coords:
                 rect = coords["Company Name and Address"]
-                print(f"🔍 DEBUG: Processing combined 'Company Name and Address' with text: '{combined_text[:50]}...'")
+                logger.debug("🔍 DEBUG: Processing combined 'Company Name and Address' with text: '%s...'", combined_text[:50])
                 start_size = 30
                 font_size = start_size
                 # Reduce font size if needed to fit
@@ -253,12 +256,12 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
                         break
                     font_size -= 1
                 # Debug: Print rectangle coordinates
-                print(f"🔍 DEBUG: Green rectangle coordinates: {rect}")
+                logger.debug("🔍 DEBUG: Green rectangle coordinates: %s", rect)
                 # Center horizontally using text width
                 try:
                     font_obj = fitz.Font(fontname=fontname)
                 except Exception as e:
-                    print(f"⚠️ Font '{fontname}' not available for Company Name and Address, using Times-Bold. Error: {e}")
+                    logger.warning("⚠️ Font '%s' not available for Company Name and Address, using Times-Bold. Error: %s", fontname, e)
                     fontname = "Times-Bold"
                     font_obj = fitz.Font(fontname=fontname)
                 lines = combined_text.split("\n")
@@ -270,14 +273,14 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
                     start_x = center_x - text_width / 2
                     y = start_y + i * font_size
                     page.insert_text((start_x, y), line, fontsize=font_size, fontname=fontname, color=color)
-            print(f"✅ Company Name and Address: Font size {font_size}pt (centered)")
+            logger.info("✅ Company Name and Address: Font size %spt (centered)", font_size)
             # page.draw_rect(rect, color=(0, 1, 0), width=2)  # Green rectangle - commented out
 
         # Process ISO Standard and Scope, then management_system after ISO Standard
         iso_standard_text = extracted_data.get("ISO Standard", "")
         if iso_standard_text and "ISO Standard" in coords:
             rect = coords["ISO Standard"]
-            print(f"🔍 DEBUG: Processing field 'ISO Standard' with text: '{iso_standard_text[:50]}...'")
+            logger.debug("🔍 DEBUG: Processing field 'ISO Standard' with text: '%s...'", iso_standard_text[:50])
             start_size = 30
             font_size = start_size
             while font_size >= 10:
@@ -285,11 +288,11 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
                 if text_height <= rect.height:
                     break
                 font_size -= 1
-            print(f"🔍 DEBUG: Green rectangle coordinates for ISO Standard: {rect}")
+            logger.debug("🔍 DEBUG: Green rectangle coordinates for ISO Standard: %s", rect)
             try:
                 font_obj = fitz.Font(fontname=fontname)
             except Exception as e:
-                print(f"⚠️ Font '{fontname}' not available for ISO Standard, using Times-Bold. Error: {e}")
+                logger.warning("⚠️ Font '%s' not available for ISO Standard, using Times-Bold. Error: %s", fontname, e)
                 fontname = "Times-Bold"
                 font_obj = fitz.Font(fontname=fontname)
             text_width = font_obj.text_length(iso_standard_text, font_size)
@@ -297,7 +300,7 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
             center_y = (rect.y0 + rect.y1) / 2 + font_size/3
             start_x = center_x - text_width / 2
             page.insert_text((start_x, center_y), iso_standard_text, fontsize=font_size, fontname=fontname, color=color)
-            print(f"✅ ISO Standard: Font size {font_size}pt (centered)")
+            logger.info("✅ ISO Standard: Font size %spt (centered)", font_size)
             # page.draw_rect(rect, color=(0, 1, 0), width=2)  # Green rectangle - commented out
 
         # management_system after ISO Standard
@@ -310,7 +313,7 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
             try:
                 font_obj = fitz.Font(fontname=fontname)
             except Exception as e:
-                print(f"⚠️ Font '{fontname}' not available for management_system, using Times-Bold. Error: {e}")
+                logger.warning("⚠️ Font '%s' not available for management_system, using Times-Bold. Error: %s", fontname, e)
                 fontname = "Times-Bold"
                 font_obj = fitz.Font(fontname=fontname)
             center_x = (rect.x0 + rect.x1) / 2
@@ -318,7 +321,7 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
             text_width = font_obj.text_length(management_text, fontsize)
             start_x = center_x - text_width / 2
             page.insert_text((start_x, center_y), management_text, fontsize=fontsize, fontname=fontname, color=color)
-            print(f"✅ management_system: Font size {fontsize}pt ({fontname}, centered)")
+            logger.info("✅ management_system: Font size %spt (%s, centered)", fontsize, fontname)
             # page.draw_rect(rect, color=(0, 1, 0), width=2)  # Green rectangle - commented out
 
         # Scope
@@ -326,7 +329,7 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
         if scope_text and "Scope" in coords:
             rect = coords["Scope"]
             fontname = "Times-Bold"  # Ensure Scope is not italic
-            print(f"🔍 DEBUG: Processing field 'Scope' with text: '{scope_text[:50]}...'")
+            logger.debug("🔍 DEBUG: Processing field 'Scope' with text: '%s...'", scope_text[:50])
             start_size = 9
             font_size = start_size
             while font_size >= 8:
@@ -334,24 +337,24 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
                 if text_height <= rect.height:
                     break
                 font_size -= 1
-            print(f"🔍 DEBUG: Green rectangle coordinates for Scope: {rect}")
+            logger.debug("🔍 DEBUG: Green rectangle coordinates for Scope: %s", rect)
             try:
                 font_obj = fitz.Font(fontname=fontname)
                 # Print the font style for Scope
-                print(f"[INFO] Using font for Scope: {fontname}")
+                logger.info("[INFO] Using font for Scope: %s", fontname)
                 if 'Bold' in fontname and 'Italic' in fontname:
-                    print("[INFO] Scope font style: Bold Italic")
+                    logger.info("[INFO] Scope font style: Bold Italic")
                 elif 'Bold' in fontname:
-                    print("[INFO] Scope font style: Bold")
+                    logger.info("[INFO] Scope font style: Bold")
                 elif 'Italic' in fontname:
-                    print("[INFO] Scope font style: Italic")
+                    logger.info("[INFO] Scope font style: Italic")
                 else:
-                    print("[INFO] Scope font style: Regular")
+                    logger.info("[INFO] Scope font style: Regular")
             except Exception as e:
-                print(f"⚠️ Font '{fontname}' not available for Scope, using Times-Bold. Error: {e}")
+                logger.warning("⚠️ Font '%s' not available for Scope, using Times-Bold. Error: %s", fontname, e)
                 fontname = "Times-Bold"
                 font_obj = fitz.Font(fontname=fontname)
-                print(f"[INFO] Fallback font for Scope: {fontname} (Bold)")
+                logger.info("[INFO] Fallback font for Scope: %s (Bold)", fontname)
             # PowerPoint-style centering with automatic font size reduction
             words = scope_text.split()
             lines = []
@@ -375,7 +378,7 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
                 start_x = center_x - text_width / 2
                 y = start_y + i * line_height
                 page.insert_text((start_x, y), line, fontsize=font_size, fontname=fontname, color=color)
-            print(f"✅ Scope: Font size {font_size}pt (centered)")
+            logger.info("✅ Scope: Font size %spt (centered)", font_size)
             # page.draw_rect(rect, color=(0, 1, 0), width=2)  # Green rectangle - commented out
         
         # Insert date fields with Bodoni MT 14pt font
@@ -385,10 +388,10 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
                 manual_fontname = "BodoniMT"  # Remove space from font name
                 try:
                     test_font = fitz.Font(fontname=manual_fontname)
-                    print(f"[INFO] Using font for manual fields: {manual_fontname}")
+                    logger.info("[INFO] Using font for manual fields: %s", manual_fontname)
                 except:
                     manual_fontname = "Times-Roman"
-                    print(f"[INFO] Bodoni MT not found. Falling back to: {manual_fontname}")
+                    logger.info("[INFO] Bodoni MT not found. Falling back to: %s", manual_fontname)
                 manual_font_size = 14  # Static and fixed size
                 # To get Bodoni MT font: On Windows, it is often pre-installed. If not, you can download it from Microsoft Store or trusted font sites. On Mac, it's usually included. For Linux, you may need to manually install the .ttf file and register it with your system fonts.
                 # Calculate center position for proper centering
@@ -404,17 +407,17 @@ def generate_final_certificate(draft_pdf_path, output_pdf_path, extracted_data,
                     (start_x, center_y), value,
                     fontsize=manual_font_size, fontname=manual_fontname, color=color
                 )
-                print(f"✅ {field}: {value} (Bodoni MT 14pt, left-aligned)")
+                logger.info("✅ %s: %s (Bodoni MT 14pt, left-aligned)", field, value)
         
         # Save the final certificate
         doc.save(output_pdf_path)
         doc.close()
         
-        print(f"✅ Final certificate saved at: {output_pdf_path}")
+        logger.info("✅ Final certificate saved at: %s", output_pdf_path)
         return True
         
     except Exception as e:
-        print(f"❌ Error generating final certificate: {str(e)}")
+        logger.error("❌ Error generating final certificate: %s", str(e))
         return False
 
 def extract_from_draft_pdf(draft_pdf_path):
@@ -429,13 +432,16 @@ def extract_from_draft_pdf(draft_pdf_path):
     }
     # Try PyMuPDF rectangle-based extraction first, fallback to pypdf if needed
     try:
-        print("[INFO] Trying PyMuPDF rectangle-based extraction for all fields...")
+        logger.info("[INFO] Trying PyMuPDF rectangle-based extraction for all fields...")
         return extract_text_from_pdf(draft_pdf_path, draft_coords)
     except Exception as e:
-        print(f"⚠️ PyMuPDF failed, trying pypdf keyword/phrase extraction: {str(e)}")
+        logger.warning("⚠️ PyMuPDF failed, trying pypdf keyword/phrase extraction: %s", str(e))
         return extract_text_from_pdf_pypdf(draft_pdf_path, draft_coords)
 
 if __name__ == "__main__":
+    from rise.service_logging import configure_logging
+    configure_logging()
+
     # Example usage
     draft_pdf = "path/to/draft.pdf"
     final_template = "Final.pdf"  # Use Final.pdf from same directory
@@ -457,6 +463,6 @@ if __name__ == "__main__":
     success = generate_final_certificate(draft_pdf, output_pdf, extracted_data, date_fields)
     
     if success:
-        print("🎉 Final certificate generated successfully!")
+        logger.info("🎉 Final certificate generated successfully!")
     else:
-        print("❌ Failed to generate final certificate") 
\ No newline at end of file
+        logger.error("❌ Failed to generate final certificate") 
\ No newline at end of file
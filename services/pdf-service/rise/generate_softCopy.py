@@ -1,11 +1,21 @@
+import logging
 from docx import Document
 import fitz  # PyMuPDF
 from typing import Dict
 from .font_utils import calculate_optimal_font_size_with_line_breaks
-import unidecode
-import ftfy
+from .pdf_utils import open_layout_scratch, open_template, resolve_save_profile, save_pdf, serialize_pdf
+from .logo_cache import logo_cache
+from .font_registry import get_font
+from .text_wrap import WordWrapper
+from .fit_solver import candidate_font_sizes, fit_font_size, fit_single_line
+from .layout_cache import layout_cache, layout_key
+from .template_geometry import get_geometry
+from .text_prep import safe_insert_text
 import chardet
 from urllib.parse import quote
+
+logger = logging.getLogger(__name__)
+
 #CraftApp - Copy
 def parse_excel_adjustment(value):
     """Parse Excel adjustment value (position adjustment)"""
@@ -27,105 +37,26 @@ def parse_excel_font_size(value):
     except (ValueError, TypeError):
         return 0
 
-def safe_insert_text(page, position, text, **kwargs):
-    """Safely insert text handling Unicode characters that might cause ByteString errors."""
-    try:
-        # 🔍 DEBUG: Analyze text at start
-        # Check for any apostrophe-like character (regular apostrophe or smart quotes)
-        has_regular_apostrophe = "'" in text  # U+0027
-        # Check for smart quotes using their Unicode code points
-        has_right_single_quote = '\u2019' in text  # RIGHT SINGLE QUOTATION MARK
-        has_left_single_quote = '\u2018' in text   # LEFT SINGLE QUOTATION MARK
-        has_apostrophe = has_regular_apostrophe or has_right_single_quote or has_left_single_quote
-        
-        print(f"🔍 [SAFE_INSERT] Analyzing text: '{text[:50]}...'")
-        print(f"🔍 [SAFE_INSERT] Regular apostrophe ('): {has_regular_apostrophe}")
-        print(f"🔍 [SAFE_INSERT] Right quote (U+2019): {has_right_single_quote}")
-        print(f"🔍 [SAFE_INSERT] Left quote (U+2018): {has_left_single_quote}")
-        print(f"🔍 [SAFE_INSERT] Has apostrophe-like character: {has_apostrophe}")
-        
-        # First try with the original text
-        # 🔍 DEBUG: Check for special dash characters
-        if '–' in text or '—' in text or '·' in text:
-            for i, char in enumerate(text):
-                if char in ['–', '—', '·', '-', '−']:
-                    print(f"🔍 [SAFE_INSERT] Found dash/dot at pos {i}: '{char}' (Unicode: {ord(char)}) in text: '{text[:50]}...'")
-        
-        # 🔍 DEBUG: Check for apostrophes (regular or smart quotes)
-        if has_apostrophe:
-            print(f"🔍 [SAFE_INSERT] ✓ Apostrophe-like character found in text!")
-            for i, char in enumerate(text):
-                if char in ["'", '\u2019', '\u2018']:
-                    print(f"🔍 [SAFE_INSERT] Found apostrophe at pos {i}: '{char}' (Unicode: {ord(char)}) in text: '{text[:50]}...'")
-        else:
-            print(f"🔍 [SAFE_INSERT] ✗ No apostrophe found in text")
-        
-        # ✅ ENHANCED: Detect special characters that need special handling
-        special_chars = ['–', '—', '·', '\u2019', '\u2018', '"', '"', '…', '€', '£', '¥', '©', '®', '™']
-        has_special_chars = any(char in text for char in special_chars)
-        
-        if has_special_chars:
-            print(f"🔍 [SAFE_INSERT] Special characters detected in text: '{text[:50]}...'")
-            
-            # Fix text encoding issues first
-            fixed_text = ftfy.fix_text(text)
-            if fixed_text != text:
-                print(f"🔍 [SAFE_INSERT] Text encoding fixed: '{text[:30]}...' → '{fixed_text[:30]}...'")
-                text = fixed_text
-            
-            # ✅ CHANGED: Keep original font (Times-Bold) - special chars will be replaced with ASCII equivalents below
-            # No font switching needed since we replace special characters with ASCII equivalents
-            print(f"🔍 [SAFE_INSERT] Keeping original font '{kwargs.get('fontname', 'Times-Roman')}' - special chars will be replaced with ASCII equivalents")
-        elif has_apostrophe:
-            # ✅ CHANGED: Keep original font (Times-Bold) - apostrophes will be replaced with ASCII equivalents below
-            # No font switching needed since we replace apostrophes with ASCII equivalents
-            print(f"🔍 [SAFE_INSERT] Keeping original font '{kwargs.get('fontname', 'Times-Roman')}' - apostrophes will be replaced with ASCII equivalents")
-        
-        # Replace problematic Unicode characters with ASCII equivalents for Times font compatibility
-        text = text.replace('–', '-')  # En dash (U+2013) → hyphen
-        text = text.replace('—', '-')  # Em dash (U+2015) → hyphen
-        
-        # Replace smart quotes with straight apostrophes for better font compatibility
-        text = text.replace('\u2019', "'")  # Right single quotation mark (U+2019) → apostrophe
-        text = text.replace('\u2018', "'")  # Left single quotation mark (U+2018) → apostrophe
-        text = text.replace('\u201D', '"')  # Right double quotation mark (U+201D) → straight quote
-        text = text.replace('\u201C', '"')  # Left double quotation mark (U+201C) → straight quote
-        
-        page.insert_text(position, text, **kwargs)
-    except Exception as e:
-        if "ByteString" in str(e) or "character at index" in str(e):
-            print(f"⚠️ [SOFTCOPY] Unicode text error, using safe encoding: {e}")
-            # Try with UTF-8 encoding that ignores problematic characters
-            safe_text = text.encode('utf-8', errors='ignore').decode('utf-8')
-            try:
-                page.insert_text(position, safe_text, **kwargs)
-            except Exception as e2:
-                print(f"⚠️ [SOFTCOPY] UTF-8 encoding failed, using ASCII fallback: {e2}")
-                # Final fallback: Use unidecode for ASCII conversion
-                ascii_text = unidecode.unidecode(text)
-                print(f"🔍 [SAFE_INSERT] ASCII fallback text: '{ascii_text}'")
-                page.insert_text(position, ascii_text, **kwargs)
-        else:
-            # Re-raise if it's not a Unicode/ByteString error
-            raise e
+import io
 import os
-import tempfile
 import requests
 import json
 from PIL import Image
 import qrcode
 # FastAPI imports removed since they're not needed anymore
 
-def generate_certification_qr_code(cert_data: dict, size: int = 300) -> Image.Image:
+# ✅ ADDED: "vector" draws the QR modules as PDF rectangles, "raster" embeds a PNG image
+QR_RENDER_MODE = os.getenv("QR_RENDER_MODE", "vector").strip().lower()
+
+def build_certification_qr_url(cert_data: dict) -> str:
     """
-    Generate a QR code containing certification information that opens a URL when scanned.
+    Build the verification URL encoded in the certificate QR code.
     
     Args:
         cert_data: Dictionary containing certification information
-        size: Size of the QR code image in pixels
     
     Returns:
-        PIL Image object of the generated QR code
+        The verification URL with the certificate details as query parameters
     """
     # Create a URL with certification data as query parameters
     # Using a temporary URL that works immediately (you can change this later)
@@ -162,11 +93,11 @@ def generate_certification_qr_code(cert_data: dict, size: int = 300) -> Image.Im
     
     # Create the final URL
     if params:
-        qr_url = f"{base_url}?{'&'.join(params)}"
-    else:
-        qr_url = base_url
-    
-    
+        return f"{base_url}?{'&'.join(params)}"
+    return base_url
+
+def build_certification_qr(cert_data: dict) -> qrcode.QRCode:
+    """Build the fitted QRCode object for the certification URL."""
     # Create QR code instance with minimal border for better space utilization
     qr = qrcode.QRCode(
         version=1,
@@ -176,8 +107,22 @@ def generate_certification_qr_code(cert_data: dict, size: int = 300) -> Image.Im
     )
     
     # Add the URL to the QR code
-    qr.add_data(qr_url)
+    qr.add_data(build_certification_qr_url(cert_data))
     qr.make(fit=True)
+    return qr
+
+def generate_certification_qr_code(cert_data: dict, size: int = 300) -> Image.Image:
+    """
+    Generate a QR code containing certification information that opens a URL when scanned.
+    
+    Args:
+        cert_data: Dictionary containing certification information
+        size: Size of the QR code image in pixels
+    
+    Returns:
+        PIL Image object of the generated QR code
+    """
+    qr = build_certification_qr(cert_data)
     
     # Create image from the QR code
     qr_image = qr.make_image(fill_color="black", back_color="white")
@@ -216,23 +161,76 @@ def add_qr_code_to_pdf(pdf_document, qr_image: Image.Image, x: float, y: float,
     qr_x = x
     qr_y = y
     
-    # Create a temporary file for the QR code image
-    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as tmp_file:
-        qr_image.save(tmp_file.name, 'PNG')
-        tmp_file_path = tmp_file.name
+    # ✅ UPDATED: Encode the QR code image in memory instead of through a temporary PNG file
+    png_buffer = io.BytesIO()
+    qr_image.save(png_buffer, 'PNG')
+    png_bytes = png_buffer.getvalue()
+    
+    # Add image to PDF
+    for page_num in range(len(pdf_document)):
+        page = pdf_document[page_num]
+        page.insert_image(
+            rect=[qr_x, qr_y, qr_x + width, qr_y + height],  # Use exact allocated dimensions
+            stream=png_bytes
+        )
+
+def generate_certification_qr_matrix(cert_data: dict) -> list[list[bool]]:
+    """
+    Generate the QR module matrix (including the 1-module quiet border) for the certification URL.
     
-    try:
-        # Add image to PDF
-        for page_num in range(len(pdf_document)):
-            page = pdf_document[page_num]
-            page.insert_image(
-                rect=[qr_x, qr_y, qr_x + width, qr_y + height],  # Use exact allocated dimensions
-                filename=tmp_file_path
-            )
-    finally:
-        # Clean up temporary file
-        if os.path.exists(tmp_file_path):
-            os.unlink(tmp_file_path)
+    Args:
+        cert_data: Dictionary containing certification information
+    
+    Returns:
+        Rows of booleans, True for a dark module
+    """
+    return build_certification_qr(cert_data).get_matrix()
+
+def add_qr_code_vector_to_pdf(pdf_document, qr_matrix: list[list[bool]], x: float, y: float, width: float, height: float):
+    """
+    Draw a QR module matrix as vector rectangles on every page - no image, no temp file.
+    
+    Horizontal runs of dark modules are merged into one rectangle and all of them are filled
+    as a single path, so the QR stays crisp at any zoom or print resolution.
+    
+    Args:
+        pdf_document: PyMuPDF document object
+        qr_matrix: Rows of booleans from generate_certification_qr_matrix
+        x, y: Top-left coordinates
+        width, height: Dimensions for the QR code (modules are stretched to fill them)
+    """
+    rows = len(qr_matrix)
+    cols = len(qr_matrix[0]) if rows else 0
+    if not rows or not cols:
+        return
+    module_w = width / cols
+    module_h = height / rows
+    
+    # Collect dark runs once; the same rectangles are drawn on every page
+    runs = []
+    for row_index, row in enumerate(qr_matrix):
+        col = 0
+        while col < cols:
+            if row[col]:
+                start = col
+                while col < cols and row[col]:
+                    col += 1
+                runs.append(fitz.Rect(
+                    x + start * module_w, y + row_index * module_h,
+                    x + col * module_w, y + (row_index + 1) * module_h,
+                ))
+            else:
+                col += 1
+    
+    for page in pdf_document:
+        shape = page.new_shape()
+        # White background (quiet zone and light modules), as the raster image had
+        shape.draw_rect(fitz.Rect(x, y, x + width, y + height))
+        shape.finish(fill=(1, 1, 1), color=None, width=0)
+        for run in runs:
+            shape.draw_rect(run)
+        shape.finish(fill=(0, 0, 0), color=None, width=0)
+        shape.commit()
 
 def find_font_path(font_basename: str) -> str | None:
     """Return full path to a font file in ../fonts (case-insensitive), or None."""
@@ -271,8 +269,8 @@ def resolve_font(preferred_font: str, fallback_font: str = "Times-Roman") -> Dic
 def _font_obj(resolved_font: Dict[str, str | None]):
     """Create font object from resolved font dict."""
     if resolved_font["fontfile"]:
-        return fitz.Font(file=resolved_font["fontfile"])
-    return fitz.Font(fontname=resolved_font["fontname"])
+        return get_font(fontfile=resolved_font["fontfile"])
+    return get_font(fontname=resolved_font["fontname"])
 
 # ISO Standards Mapping - Convert short names to full versions with years
 ISO_STANDARDS_MAPPING = {
@@ -475,20 +473,12 @@ def get_iso_standard_code(iso_standard: str) -> str:
 
 def get_text_height(text: str, fontsize: float, fontname: str, max_width: float) -> float:
     """Estimate the height of a text block when wrapped to fit max_width."""
-    font = fitz.Font(fontname=fontname)
-    words = text.split()
-    lines = []
-    current_line = ""
-    for word in words:
-        test_line = current_line + (" " if current_line else "") + word
-        if font.text_length(test_line, fontsize) <= max_width:
-            current_line = test_line
-        else:
-            lines.append(current_line)
-            current_line = word
-    if current_line:
-        lines.append(current_line)
-    return len(lines) * fontsize * 1.2  # Approximate line height with spacing
+    wrapper = WordWrapper(text, fontname)
+    line_count = len(wrapper.wrap(fontsize, max_width))
+    # A first word that is already too wide has always been counted with an extra (empty) line
+    if wrapper.words and not wrapper.fits(0, 1, fontsize, max_width):
+        line_count += 1
+    return line_count * fontsize * 1.2  # Approximate line height with spacing
 
 def insert_centered_textbox(
     page: fitz.Page,
@@ -578,10 +568,10 @@ def render_optional_fields(page, values, key_coords, value_coords, font_settings
     language = values.get("Language", "").strip().lower()
     if language == "s":
         display_labels = spanish_field_labels
-        print(f"🔍 [SOFTCOPY] Using Spanish field labels")
+        logger.debug("🔍 [SOFTCOPY] Using Spanish field labels")
     else:
         display_labels = english_field_labels
-        print(f"🔍 [SOFTCOPY] Using English field labels")
+        logger.debug("🔍 [SOFTCOPY] Using English field labels")
 
     # Filter available fields (non-empty) with special handling for surveillance group
     available_fields = []
@@ -600,7 +590,7 @@ def render_optional_fields(page, values, key_coords, value_coords, font_settings
             if surveillance_value and surveillance_label:
                 # ✅ NEW: For surveillance date fields, display Excel input as-is
                 surveillance_value = display_excel_date_as_is(surveillance_value)
-                print(f"🔍 [SOFTCOPY] Surveillance date field '{surveillance_label}' displayed as-is: '{surveillance_value}'")
+                logger.debug("🔍 [SOFTCOPY] Surveillance date field '%s' displayed as-is: '%s'", surveillance_label, surveillance_value)
                 available_fields.append((surveillance_label, surveillance_value))
         else:
             value = values.get(field, "").strip()
@@ -608,7 +598,7 @@ def render_optional_fields(page, values, key_coords, value_coords, font_settings
                 # ✅ NEW: For date fields, display Excel input as-is
                 if field in ["Issue Date", "Expiry Date", "Original Issue Date", "Initial Registration Date", "Recertification Date", "Surveillance/ Expiry Date", "Surveillance Due Date"]:
                     value = display_excel_date_as_is(value)
-                    print(f"🔍 [SOFTCOPY] Date field '{field}' displayed as-is: '{value}'")
+                    logger.debug("🔍 [SOFTCOPY] Date field '%s' displayed as-is: '%s'", field, value)
                 available_fields.append((field, value))
 
     # Calculate starting position using formula: (6 - available_count) + 1
@@ -643,7 +633,7 @@ def render_optional_fields(page, values, key_coords, value_coords, font_settings
             # ✅ ADDED: Capture Issue Date coordinates for dynamic revision positioning
             if field == "Issue Date":
                 issue_date_coords = value_coords[coord_index]
-                print(f"🔍 [DYNAMIC] Issue Date found at position {coord_index + 1}, coordinates: {issue_date_coords}")
+                logger.debug("🔍 [DYNAMIC] Issue Date found at position %s, coordinates: %s", coord_index + 1, issue_date_coords)
 
             # Insert at respective coordinates using (x, y) points
             safe_insert_text(
@@ -664,9 +654,9 @@ def render_optional_fields(page, values, key_coords, value_coords, font_settings
                 color=font_settings['color']
             )
 
-            print(f"   ✅ Rendered successfully at position {coord_index + 1}")
+            logger.debug("   ✅ Rendered successfully at position %s", coord_index + 1)
         else:
-            print(f"⚠️ [SOFTCOPY] Warning: Coordinate index {coord_index} out of bounds")
+            logger.warning("⚠️ [SOFTCOPY] Warning: Coordinate index %s out of bounds", coord_index)
 
     # ✅ ADDED: Return Issue Date coordinates for dynamic revision positioning
     return {
@@ -674,19 +664,24 @@ def render_optional_fields(page, values, key_coords, value_coords, font_settings
     }
 
 
-def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str, str], template_type: str = "standard", mode: str = "softcopy") -> Dict[str, any]:
+def generate_softcopy(base_pdf_path: str | bytes, output_pdf_path: str | None, values: Dict[str, str], template_type: str = "standard", mode: str = "softcopy", dry_run: bool = False, save_profile: str | None = None) -> Dict[str, any]:
     """
     Generate PDF with unified logic for both softcopy and printable modes.
 
     Args:
-        base_pdf_path: Path to the PDF template
-        output_pdf_path: Path where the generated PDF will be saved
+        base_pdf_path: Path to the PDF template, or the template PDF bytes
+        output_pdf_path: Path where the generated PDF will be saved, or None to return the
+            PDF bytes in the result ("pdf") without touching disk
         values: Dictionary of field values
         template_type: Template type (e.g., "standard", "large", "logo")
         mode: "softcopy" or "printable" - determines template name mapping
+        dry_run: Only fit the fields - lay them out on a blank scratch page without reading
+            the template, placing the logo/QR code or writing output_pdf_path
+        save_profile: Output profile ("web" or "print"); defaults to the mode's profile
     
     Returns:
-        Dict containing success status and overflow warnings
+        Dict containing success status, overflow warnings, the per-field layout and the
+        saved output size
     """
     
     def map_to_printable_template(template_type: str) -> str:
@@ -717,16 +712,19 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
     # Map template type based on mode
     if mode == "printable":
         template_name = map_to_printable_template(template_type)
-        print(f"🔍 [UNIFIED] Template mapping: {template_type} → {template_name} (mode: {mode})")
+        logger.debug("🔍 [UNIFIED] Template mapping: %s → %s (mode: %s)", template_type, template_name, mode)
         # Keep original template_type for coordinate selection
     else:
         template_name = template_type
-        print(f"🔍 [UNIFIED] Using original template type: {template_type} (mode: {mode})")
+        logger.debug("🔍 [UNIFIED] Using original template type: %s (mode: %s)", template_type, mode)
 
     
     # Initialize tracking for overflow warnings
     overflow_warnings = []
-    doc = fitz.open(base_pdf_path)
+    # ✅ ADDED: Chosen font sizes, line counts and adjustments per field (returned as "layout")
+    layout_report = {}
+    # ✅ ADDED: Template may be a file path or in-memory bytes from the template cache
+    doc = open_layout_scratch() if dry_run else open_template(base_pdf_path)
     page = doc[0]
 
     # --- Register Bodoni (BOD_R.TTF) once and use a clean alias ---
@@ -757,14 +755,14 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
     scope_font_size_adjustment = parse_excel_font_size(values.get("Scope Font Size", ""))
     force_font_size = values.get("Force Font Size", "").strip().lower()
     
-    print(f"🔍 [SOFTCOPY DEBUG] Excel adjustments loaded:")
-    print(f"  Name Adjustment: {name_adjustment}pt")
-    print(f"  Name Font Size: {name_font_size_adjustment}pt")
-    print(f"  Address Adjustment: {address_adjustment}pt")
-    print(f"  Address Font Size: {address_font_size_adjustment}pt")
-    print(f"  Scope Adjustment: {scope_adjustment}pt")
-    print(f"  Scope Font Size: {scope_font_size_adjustment}pt")
-    print(f"  Force Font Size: {force_font_size}")
+    logger.debug("🔍 [SOFTCOPY DEBUG] Excel adjustments loaded:")
+    logger.debug("  Name Adjustment: %spt", name_adjustment)
+    logger.debug("  Name Font Size: %spt", name_font_size_adjustment)
+    logger.debug("  Address Adjustment: %spt", address_adjustment)
+    logger.debug("  Address Font Size: %spt", address_font_size_adjustment)
+    logger.debug("  Scope Adjustment: %spt", scope_adjustment)
+    logger.debug("  Scope Font Size: %spt", scope_font_size_adjustment)
+    logger.debug("  Force Font Size: %s", force_font_size)
     
     # ✅ ADDED: Font weight preservation system
     def detect_font_weight(text):
@@ -854,7 +852,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                 continue
                 
             # Calculate text width
-            font_obj = fitz.Font(fontname=font_name)
+            font_obj = get_font(fontname=font_name)
             text_width = font_obj.text_length(segment_text, font_size)
             
             # Check if we need to wrap (if max_width is specified)
@@ -883,7 +881,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
     logo_filename = values.get("Logo", "").strip()
     
     # Process logo if specified and available
-    logo_image = None
+    logo_data = None
     if logo_lookup and len(logo_lookup) > 0:
         try:
             # Convert uploaded file to PIL Image
@@ -901,7 +899,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                     if filename.lower() == logo_filename_lower:
                         logo_file = file
                         matched_filename = filename
-                        print(f"✅ [SOFTCOPY] Using exact logo match: '{logo_filename}' → '{filename}'")
+                        logger.debug("✅ [SOFTCOPY] Using exact logo match: '%s' → '%s'", logo_filename, filename)
                         break
                 
                 # If no exact match, try partial match (filename without extension or contains)
@@ -915,7 +913,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                         if logo_filename_lower in filename_lower or filename_base == logo_base:
                             logo_file = file
                             matched_filename = filename
-                            print(f"✅ [SOFTCOPY] Using partial logo match: '{logo_filename}' → '{filename}'")
+                            logger.debug("✅ [SOFTCOPY] Using partial logo match: '%s' → '%s'", logo_filename, filename)
                             break
             
             # Only use fallback if no match was found
@@ -926,95 +924,39 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                     if filename.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
                         logo_file = file
                         matched_filename = filename
-                        print(f"⚠️ [SOFTCOPY] No match found for '{logo_filename}', using first valid image file: '{filename}'")
+                        logger.warning("⚠️ [SOFTCOPY] No match found for '%s', using first valid image file: '%s'", logo_filename, filename)
                         break
                 
                 if not logo_file:
-                    print(f"⚠️ [SOFTCOPY] No valid image files found in logo_lookup: {list(logo_lookup.keys())}")
+                    logger.warning("⚠️ [SOFTCOPY] No valid image files found in logo_lookup: %s", list(logo_lookup.keys()))
             else:
                 # Log which file was actually used
-                print(f"🔍 [SOFTCOPY] Selected logo file: '{matched_filename}' (requested: '{logo_filename}')")
+                logger.debug("🔍 [SOFTCOPY] Selected logo file: '%s' (requested: '%s')", matched_filename, logo_filename)
             
-            if logo_file and hasattr(logo_file, 'file'):
+            # ✅ UPDATED: Keep the raw bytes - decoding happens in logo_cache, only on a cache miss
+            if isinstance(logo_file, (bytes, bytearray, memoryview)):
+                # ✅ ADDED: Render jobs carry logos as plain bytes (see render_backend)
+                logo_data = bytes(logo_file)
+                logger.debug("✅ [SOFTCOPY] Logo image loaded successfully")
+            elif logo_file and hasattr(logo_file, 'file'):
                 # Reset file pointer
                 logo_file.file.seek(0)
                 # Read file content
-                logo_content = logo_file.file.read()
-                # Convert to PIL Image
-                logo_image = Image.open(io.BytesIO(logo_content))
-                print(f"✅ [SOFTCOPY] Logo image loaded successfully")
+                logo_data = logo_file.file.read()
+                logger.debug("✅ [SOFTCOPY] Logo image loaded successfully")
             else:
-                logo_image = None
-                print(f"⚠️ [SOFTCOPY] Logo file has no file attribute or is None")
+                logo_data = None
+                logger.warning("⚠️ [SOFTCOPY] Logo file has no file attribute or is None")
         except Exception as logo_error:
-            logo_image = None
-            print(f"❌ [SOFTCOPY] Error loading logo image: {logo_error}")
+            logo_data = None
+            logger.error("❌ [SOFTCOPY] Error loading logo image: %s", logo_error)
     else:
-        logo_image = None
-
-    # Standard template coordinates
-    standard_coords = {
-        "management_system": fitz.Rect(87.9, 185, 580, 226.6),
-        "Company Name and Address": fitz.Rect(87.9, 239, 580, 315),
-        "ISO Standard": fitz.Rect(194.9, 334, 460.3, 370),
-        "Scope": {
-            "short": fitz.Rect(87.9, 386, 580, 475),    # <24 lines
-            "long": fitz.Rect(87.9, 373, 580, 486)      # 24-30 lines
-        },
-        "certification_code": fitz.Rect(253, 757, 285, 762)  # ✅ UPDATED: Certification code coordinates
-    }
-    
-    # Large template coordinates (for >11 lines)
-    large_coords = {
-        "management_system": fitz.Rect(87.9, 185, 580, 226.6),  # Same as standard
-        "Company Name and Address": fitz.Rect(87.9, 229, 580, 295),  # Increased top by 10pt (239->229, 295->285)
-        "ISO Standard": fitz.Rect(194.9, 300, 460.3, 336),  # Same as standard
-        "Scope": fitz.Rect(85, 354, 577, 536),  # Much larger for >30 lines
-        "certification_code": fitz.Rect(253, 757, 285, 762)  # ✅ UPDATED: Certification code coordinates
-    }
-    
-    # Logo template coordinates (when Logo = "yes")
-    logo_coords = {
-        "management_system": fitz.Rect(87.9, 175, 580, 216.6),  # Shifted up by 10pt from standard
-        "logo": fitz.Rect(87.9, 206.6, 580, 242.6),  # Logo area: below management_system, above company name
-        "Company Name and Address": fitz.Rect(87.9, 262.6, 580, 355),  # Lowered y-coordinates
-        "ISO Standard": fitz.Rect(194.9, 334, 460.3, 370),  # Same as standard (not lowered)
-        "Scope": {
-            "short": fitz.Rect(87.9, 386, 580, 475),    # Updated scope coordinates for logo template
-            "long": fitz.Rect(87.9, 373, 580, 486)      # Updated scope coordinates for logo template
-        },
-        "certification_code": fitz.Rect(253, 757, 285, 762)  # ✅ UPDATED: Certification code coordinates
-    }
+        logo_data = None
 
-    # ✅ ADDED: Defensive checks for coordinate dictionaries
-    if standard_coords is None:
-        print(f"⚠️ [SOFTCOPY] standard_coords is None - cannot continue")
-        raise ValueError("standard_coords is None - cannot generate soft copy")
-    
-    if large_coords is None:
-        print(f"⚠️ [SOFTCOPY] large_coords is None - cannot continue")
-        raise ValueError("large_coords is None - cannot generate soft copy")
-    
-    if logo_coords is None:
-        print(f"⚠️ [SOFTCOPY] logo_coords is None - cannot continue")
-        raise ValueError("logo_coords is None - cannot generate soft copy")
-    
-    # Select coordinates based on original template type (for coordinate logic)
-    if original_template_type in ["standard", "standard_eco", "standard_nonaccredited", "standard_other", "standard_other_eco", "standard_nonaccredited_other"]:
-        coords = standard_coords
-    elif original_template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other"]:
-        coords = large_coords
-    elif original_template_type in ["logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
-        # ✅ ADDED: Logo template coordinates for all logo variants
-        coords = logo_coords
-    else:
-        # Fallback to standard coordinates for unknown template types
-        coords = standard_coords
-    
-    # ✅ ADDED: Defensive check for selected coords
-    if coords is None:
-        raise ValueError("Selected coords is None - cannot generate soft copy")
-       
+    # ✅ UPDATED: Template geometry comes from the compiled registry (see template_geometry.py)
+    # Coordinates and layout rules are selected by the original template type
+    geometry = get_geometry(original_template_type, mode)
+    coords = geometry.coords()
 
     font_starts = {
         "Company Name and Address": 45,  # Company Name starts from 45pt
@@ -1025,81 +967,23 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
     }
 
     # --- Optional Fields Configuration ---
-    # ✅ ADDED: Template-specific optional field coordinates
-    
-    # Large template optional field coordinates (6 fields)
-    large_optional_key_coordinates = [
-        fitz.Rect(175.5, 522, 343, 530),    # Row 1: Certificate Number
-        fitz.Rect(175.5, 538, 343, 548),    # Row 2: Initial Registration Date
-        fitz.Rect(175.5, 556, 343, 566),    # Row 3: Original Issue Date
-        fitz.Rect(175.5, 574, 343, 584),    # Row 4: Issue Date
-        fitz.Rect(175.5, 592, 343, 602),    # Row 5: Surveillance Group (only 1 field present)
-        fitz.Rect(175.5, 610, 343, 620)     # Row 6: Recertification Date
-    ]
-
-    large_optional_value_coordinates = [
-        fitz.Rect(362.1, 522, 446.4, 530),    # Row 1: Certificate Number value
-        fitz.Rect(362.1, 538, 446.4, 548),    # Row 2: Initial Registration Date value
-        fitz.Rect(362.1, 556, 446.4, 566),    # Row 3: Original Issue Date value
-        fitz.Rect(362.1, 574, 446.4, 584),    # Row 4: Issue Date value
-        fitz.Rect(362.1, 592, 446.4, 602),    # Row 5: Surveillance Group value (only 1 field present)
-        fitz.Rect(362.1, 610, 446.4, 620)     # Row 6: Recertification Date value
-    ]
-
-    # Standard template optional field coordinates (6 fields for ≤11 lines)
-    # Positioned higher up on the page for shorter content
-    standard_optional_key_coordinates = [
-        fitz.Rect(175.5, 499.1, 343, 509.1),    # Row 1: Certificate Number
-        fitz.Rect(175.5, 516.9, 343, 526.9),    # Row 2: Initial Registration Date
-        fitz.Rect(175.5, 535.1, 343, 545.1),    # Row 3: Original Issue Date
-        fitz.Rect(175.5, 553.9, 343, 563.9),    # Row 4: Issue Date
-        fitz.Rect(175.5, 571.6, 343, 581.6),    # Row 5: Surveillance Group (only 1 field present)
-        fitz.Rect(175.5, 589.3, 343, 599.3)     # Row 6: Recertification Date
-    ]
-
-    standard_optional_value_coordinates = [
-        fitz.Rect(362.1, 499.1, 446.4, 509.1),    # Row 1: Value for Certificate Number
-        fitz.Rect(362.1, 516.9, 446.4, 526.9),    # Row 2: Value for Initial Registration Date
-        fitz.Rect(362.1, 535.1, 446.4, 545.1),    # Row 3: Value for Original Issue Date
-        fitz.Rect(362.1, 553.9, 446.4, 563.9),    # Row 4: Value for Issue Date
-        fitz.Rect(362.1, 571.6, 446.4, 581.6),    # Row 5: Value for Surveillance Group (only 1 field present)
-        fitz.Rect(362.1, 589.3, 446.4, 599.3)     # Row 6: Value for Recertification Date
-    ]
-
-    # Select optional field coordinates based on original template type
-    if original_template_type in ["standard", "standard_eco", "standard_nonaccredited", "standard_other", "standard_other_eco", "standard_nonaccredited_other"]:
-        optional_key_coordinates = standard_optional_key_coordinates
-        optional_value_coordinates = standard_optional_value_coordinates
-    elif original_template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other"]:
-        optional_key_coordinates = large_optional_key_coordinates
-        optional_value_coordinates = large_optional_value_coordinates
-    elif original_template_type in ["logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
-        # Logo template uses standard optional field coordinates
-        optional_key_coordinates = standard_optional_key_coordinates
-        optional_value_coordinates = standard_optional_value_coordinates
-    else:
-        # Fallback to standard coordinates for unknown template types
-        optional_key_coordinates = standard_optional_key_coordinates
-        optional_value_coordinates = standard_optional_value_coordinates
+    # ✅ UPDATED: Optional field rows (6 key/value rects) come with the template geometry
+    optional_key_coordinates = geometry.optional_keys
+    optional_value_coordinates = geometry.optional_values
 
     # ✅ ADDED: Adjust scope coordinates based on whether Initial Registration Date is present
     # This affects the available space for scope text
     initial_registration_date = values.get("Initial Registration Date", "")
-    if initial_registration_date and template_type == "large":
+    if initial_registration_date and geometry.initial_registration_scope is not None:
         # When Initial Registration Date is present, reduce scope height to accommodate the extra field
-        print(f"🔍 [SOFTCOPY] Initial Registration Date present - adjusting scope coordinates for large template")
-        # Adjust scope coordinates: reduce height by 16 units (same as field spacing)
+        logger.debug("🔍 [SOFTCOPY] Initial Registration Date present - adjusting scope coordinates for large template")
+        # Scope height reduced by 16 units (same as field spacing)
         original_scope = coords["Scope"]
-        adjusted_scope = fitz.Rect(
-            original_scope.x0, 
-            original_scope.y0, 
-            original_scope.x1, 
-            original_scope.y1 - 16  # Reduce height by 16 units
-        )
+        adjusted_scope = geometry.initial_registration_scope
         coords["Scope"] = adjusted_scope
-        print(f"🔍 [SOFTCOPY] Scope coordinates adjusted: {original_scope} → {adjusted_scope}")
+        logger.debug("🔍 [SOFTCOPY] Scope coordinates adjusted: %s → %s", original_scope, adjusted_scope)
     else:
-        print(f"🔍 [SOFTCOPY] Using standard scope coordinates (Initial Registration Date not present)")
+        logger.debug("🔍 [SOFTCOPY] Using standard scope coordinates (Initial Registration Date not present)")
 
     # Font settings for optional fields
     # Use Bodoni if registered, otherwise standard Times
@@ -1114,7 +998,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
     # Optional: Validate that the font is actually available
     def _assert_valid_fontname(name: str):
         try:
-            _ = fitz.Font(fontname=name)
+            _ = get_font(fontname=name)
         except Exception as e:
             raise RuntimeError(f"Font alias '{name}' is not available: {e}")
     
@@ -1123,30 +1007,9 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
     
     # --- End Optional Fields Configuration ---
 
-    # ✅ ADDED: Template-specific Revision field configuration
-    
-    # Large template revision field coordinates (matching Issue Date Y coordinates)
-    large_revision_coordinates = fitz.Rect(446, 574, 456, 584)
-    
-    # Standard template revision field coordinates (matching Issue Date Y coordinates)
-    # Positioned to match Issue Date field positioning
-    standard_revision_coordinates = fitz.Rect(446, 553.9, 456, 563.9)
-    
-    # Select revision field coordinates based on template type
-    if template_type == "standard":
-        revision_coordinates = standard_revision_coordinates
-    else:  # large template
-        revision_coordinates = large_revision_coordinates
-    
-    # ✅ ADDED: Validate that coordinates are properly set
-    if not optional_key_coordinates or not optional_value_coordinates:
-        raise ValueError(f"Optional field coordinates not properly configured for template type: {template_type}")
-    
-    if not revision_coordinates:
-        raise ValueError(f"Revision field coordinates not properly configured for template type: {template_type}")
-    
-    
-    
+    # ✅ UPDATED: Revision field fallback position comes with the template geometry
+    revision_coordinates = geometry.revision
+
     # Font settings for revision field (same as optional fields)
     revision_font_settings = {
         "fontname": resolved_optional_fontname,
@@ -1177,40 +1040,21 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
     estimated_lines = max(1, (scope_words * 8) // 60)  # Rough estimate: 8 chars per word, 60 chars per line
 
     # Determine which coordinate set to use (lines win over words)
-    if original_template_type in ["standard", "standard_eco", "standard_nonaccredited", "standard_other", "standard_other_eco", "standard_nonaccredited_other"]:
-        # Standard template: dynamic coordinates based on content length
-        if estimated_lines >= 24:  # Long content condition
-            scope_rect = coords["Scope"]["long"]
-            scope_layout = "long"
-        else:  # Short content condition
-            scope_rect = coords["Scope"]["short"]
-            scope_layout = "short"
-    elif original_template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other"]:
+    if geometry.scope_fit == "fixed":
         # Large template: fixed large coordinates
         scope_rect = coords["Scope"]
         scope_layout = "large"
-    elif original_template_type in ["logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
-        # Logo template: dynamic coordinates based on content length
+    else:
+        # Standard/logo template: dynamic coordinates based on content length
         if estimated_lines >= 24:  # Long content condition
             scope_rect = coords["Scope"]["long"]
             scope_layout = "long"
         else:  # Short content condition
             scope_rect = coords["Scope"]["short"]
             scope_layout = "short"
-            print(f"🎯 [SOFTCOPY] Scope: {estimated_lines} lines (<24) -> selected SHORT scope coordinates")
-            print(f"🔍 [SOFTCOPY] Logo template - Short content: {scope_words} words, ~{estimated_lines} lines")
-            print(f"🔍 [SOFTCOPY] Using coordinates: {scope_rect}")
-    else:
-        # Fallback to standard coordinates for unknown template types
-        if estimated_lines >= 24:
-            scope_rect = coords["Scope"]["long"]
-            scope_layout = "long"
-        else:
-            scope_rect = coords["Scope"]["short"]
-            scope_layout = "short"
-        print(f"⚠️ [SOFTCOPY] Unknown template type '{template_type}' -> fallback to standard scope coordinates")
-        print(f"🔍 [SOFTCOPY] Fallback template - Content: {scope_words} words, ~{estimated_lines} lines")
-        print(f"🔍 [SOFTCOPY] Using coordinates: {scope_rect}")
+        if not geometry.known:
+            logger.warning("⚠️ [SOFTCOPY] Unknown template type '%s' -> fallback to standard scope coordinates", template_type)
+        logger.debug("🎯 [SOFTCOPY] Scope: %s lines -> selected %s scope coordinates: %s", estimated_lines, scope_layout.upper(), scope_rect)
 
     # Store original scope coordinates before modification for Extra Line processing
     original_scope_coords = coords["Scope"].copy() if isinstance(coords["Scope"], dict) else coords["Scope"]
@@ -1221,7 +1065,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
     # ✅ NEW: Adjust scope coordinates when Extra Line is present with dynamic height logic
     extra_line = values.get("Extra Line", "").strip()
     if extra_line:
-        print(f"🔍 [SOFTCOPY] Extra Line present - using dynamic scope height based on content length")
+        logger.debug("🔍 [SOFTCOPY] Extra Line present - using dynamic scope height based on content length")
         
         # Calculate content length to determine appropriate scope height
         scope_text = values.get("Scope", "")
@@ -1230,34 +1074,34 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
         
         if estimated_lines < 24:
             # Short scope: 89pt height (same as standard short scope)
-            scope_rect = fitz.Rect(87.9, 386, 580, 475)  # Height: 89pt
-            print(f"🔍 [SOFTCOPY] Extra Line - Short scope: {estimated_lines} lines, 89pt height")
+            scope_rect = geometry.extra_line_scopes["short"]  # Height: 89pt
+            logger.debug("🔍 [SOFTCOPY] Extra Line - Short scope: %s lines, 89pt height", estimated_lines)
         elif estimated_lines <= 30:
             # Long scope: 113pt height (same as standard long scope)
-            scope_rect = fitz.Rect(87.9, 373, 580, 486)  # Height: 113pt
-            print(f"🔍 [SOFTCOPY] Extra Line - Long scope: {estimated_lines} lines, 113pt height")
+            scope_rect = geometry.extra_line_scopes["long"]  # Height: 113pt
+            logger.debug("🔍 [SOFTCOPY] Extra Line - Long scope: %s lines, 113pt height", estimated_lines)
         else:
             # Large scope: 182pt height for >30 lines (same as large template)
-            scope_rect = fitz.Rect(85, 354, 577, 536)    # Height: 182pt
-            print(f"🔍 [SOFTCOPY] Extra Line - Large scope: {estimated_lines} lines, 182pt height")
+            scope_rect = geometry.extra_line_scopes["large"]  # Height: 182pt
+            logger.debug("🔍 [SOFTCOPY] Extra Line - Large scope: %s lines, 182pt height", estimated_lines)
         
         # Update the scope coordinates with dynamic height
         coords["Scope"] = scope_rect
-        print(f"🔍 [SOFTCOPY] Extra Line scope coordinates set to: {scope_rect}")
+        logger.debug("🔍 [SOFTCOPY] Extra Line scope coordinates set to: %s", scope_rect)
         
     else:
-        print(f"🔍 [SOFTCOPY] No Extra Line - using standard scope coordinates")
+        logger.debug("🔍 [SOFTCOPY] No Extra Line - using standard scope coordinates")
 
     # Management system will be generated during ISO Standard field processing
     # (same timing as certificate generation)
 
     # Process each field
-    print(f"🔍 [SOFTCOPY DEBUG] Processing {len(values)} fields from Excel data")
+    logger.debug("🔍 [SOFTCOPY DEBUG] Processing %s fields from Excel data", len(values))
     for field, text in values.items():
-        print(f"🔍 [SOFTCOPY DEBUG] Field: '{field}' = '{text}'")
+        logger.debug("🔍 [SOFTCOPY DEBUG] Field: '%s' = '%s'", field, text)
         if field in ["Certificate Number", "Original Issue Date", "Issue Date", "Surveillance/ Expiry Date", "Recertification Date", "Initial Registration Date", "Surveillance Due Date", "Expiry Date"]:
             # Skip individual processing - handled by batch renderer
-            print(f"🔍 [SOFTCOPY] Skipping individual processing for '{field}' - will be handled by optional fields renderer")
+            logger.debug("🔍 [SOFTCOPY] Skipping individual processing for '%s' - will be handled by optional fields renderer", field)
             continue
         elif field == "Company Name":
             # Handle Company Name and Address together - SAME LOGIC AS generate_certificate
@@ -1265,17 +1109,17 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
             address_text = values.get("Address", "")
 
             # ENHANCED DEBUG: Detailed Company Name and Address processing analysis
-            print(f"🔍 [SOFTCOPY DEBUG] Processing Company Name: '{company_text}'")
-            print(f"🔍 [SOFTCOPY DEBUG] Processing Address: '{address_text}'")
-            print(f"🔍 [SOFTCOPY DEBUG] Company Name length: {len(company_text)} characters")
-            print(f"🔍 [SOFTCOPY DEBUG] Address length: {len(address_text)} characters")
+            logger.debug("🔍 [SOFTCOPY DEBUG] Processing Company Name: '%s'", company_text)
+            logger.debug("🔍 [SOFTCOPY DEBUG] Processing Address: '%s'", address_text)
+            logger.debug("🔍 [SOFTCOPY DEBUG] Company Name length: %s characters", len(company_text))
+            logger.debug("🔍 [SOFTCOPY DEBUG] Address length: %s characters", len(address_text))
            
             # Check for Excel line breaks in both company and address text
-            print(f"🔍 [SOFTCOPY DEBUG] Checking for line breaks in Company Name...")
-            print(f"🔍 [SOFTCOPY DEBUG] Company Name contains \\n: {chr(10) in company_text}")
-            print(f"🔍 [SOFTCOPY DEBUG] Company Name contains \\r\\n: {chr(13)+chr(10) in company_text}")
-            print(f"🔍 [SOFTCOPY DEBUG] Address contains \\n: {chr(10) in address_text}")
-            print(f"🔍 [SOFTCOPY DEBUG] Address contains \\r\\n: {chr(13)+chr(10) in address_text}")
+            logger.debug("🔍 [SOFTCOPY DEBUG] Checking for line breaks in Company Name...")
+            logger.debug("🔍 [SOFTCOPY DEBUG] Company Name contains \\n: %s", chr(10) in company_text)
+            logger.debug("🔍 [SOFTCOPY DEBUG] Company Name contains \\r\\n: %s", chr(13) + chr(10) in company_text)
+            logger.debug("🔍 [SOFTCOPY DEBUG] Address contains \\n: %s", chr(10) in address_text)
+            logger.debug("🔍 [SOFTCOPY DEBUG] Address contains \\r\\n: %s", chr(13) + chr(10) in address_text)
 
             # PRE-PROCESS: Apply line break logic BEFORE font size calculation
             # This ensures both font calculation and rendering use the same processed text
@@ -1299,10 +1143,10 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
             company_processed_lines = process_text_with_line_breaks(company_text, "Company")
             address_processed_lines = process_text_with_line_breaks(address_text, "Address")
             
-            print(f"🔍 [SOFTCOPY DEBUG] Company Name processed lines: {len(company_processed_lines)}")
-            print(f"🔍 [SOFTCOPY DEBUG] Company Name lines: {company_processed_lines}")
-            print(f"🔍 [SOFTCOPY DEBUG] Address processed lines: {len(address_processed_lines)}")
-            print(f"🔍 [SOFTCOPY DEBUG] Address lines: {address_processed_lines}")
+            logger.debug("🔍 [SOFTCOPY DEBUG] Company Name processed lines: %s", len(company_processed_lines))
+            logger.debug("🔍 [SOFTCOPY DEBUG] Company Name lines: %s", company_processed_lines)
+            logger.debug("🔍 [SOFTCOPY DEBUG] Address processed lines: %s", len(address_processed_lines))
+            logger.debug("🔍 [SOFTCOPY DEBUG] Address lines: %s", address_processed_lines)
             
             # ✅ ADDED: Determine address alignment based on Excel column or line count
             address_alignment_column = values.get("Address alignment", "").strip().lower()
@@ -1310,116 +1154,107 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
             
             if address_alignment_column == "center":
                 address_alignment = "center"
-                print(f"🔍 [SOFTCOPY] Address: Excel column specifies CENTERED alignment")
+                logger.debug("🔍 [SOFTCOPY] Address: Excel column specifies CENTERED alignment")
             elif address_alignment_column == "left":
                 address_alignment = "left"
-                print(f"🔍 [SOFTCOPY] Address: Excel column specifies LEFT alignment")
+                logger.debug("🔍 [SOFTCOPY] Address: Excel column specifies LEFT alignment")
             else:
                 # Default logic: always center unless Excel column specifies otherwise
                 address_alignment = "center"  # Default: always center
-                print(f"🔍 [SOFTCOPY] Address: No Excel column value - using CENTERED alignment (default)")
+                logger.debug("🔍 [SOFTCOPY] Address: No Excel column value - using CENTERED alignment (default)")
 
            
 
             rect = coords["Company Name and Address"]
-            print(f"🔍 [SOFTCOPY DEBUG] Company Name and Address coordinates: {rect}")
-            print(f"🔍 [SOFTCOPY DEBUG] Rectangle width: {rect.width:.1f}pt, height: {rect.height:.1f}pt")
+            logger.debug("🔍 [SOFTCOPY DEBUG] Company Name and Address coordinates: %s", rect)
+            logger.debug("🔍 [SOFTCOPY DEBUG] Rectangle width: %.1fpt, height: %.1fpt", rect.width, rect.height)
            
 
             # Check if address text is empty or None
-            print(f"🔍 [SOFTCOPY DEBUG] Address text empty: {not address_text or address_text.strip() == ''}")
+            logger.debug("🔍 [SOFTCOPY DEBUG] Address text empty: %s", not address_text or address_text.strip() == '')
 
             # ✅ UPDATED: Dynamic Company Name font sizing based on line count
             # First, determine if Company Name will be single line or multi-line
             company_lines_count = len([line for line in company_processed_lines if line.strip()])
-            print(f"🔍 [SOFTCOPY DEBUG] Company Name non-empty lines count: {company_lines_count}")
+            logger.debug("🔍 [SOFTCOPY DEBUG] Company Name non-empty lines count: %s", company_lines_count)
             
             # Set initial font size based on line count
             if company_lines_count <= 1:
                 company_font_size = 35  # Single line - start with 35pt
-                print(f"🔍 [SOFTCOPY DEBUG] Single line Company Name - starting font size: {company_font_size}pt")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Single line Company Name - starting font size: %spt", company_font_size)
             else:
                 company_font_size = 30  # Multiple lines - start with 30pt
-                print(f"🔍 [SOFTCOPY DEBUG] Multi-line Company Name - starting font size: {company_font_size}pt")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Multi-line Company Name - starting font size: %spt", company_font_size)
             
             address_font_size = 13.6
-            print(f"🔍 [SOFTCOPY DEBUG] Address starting font size: {address_font_size}pt")
+            logger.debug("🔍 [SOFTCOPY DEBUG] Address starting font size: %spt", address_font_size)
             
             # Variables to store the final wrapped lines and font sizes
             final_company_lines = []
             final_address_lines = []
             
-            # ✅ IMPROVED: Different logic for single line vs multi-line company names
-            if company_lines_count <= 1:
-                # NO cmd+enter in Excel: Force single line, use font reduction only
+            # ✅ UPDATED: Company Name fit is memoised - the printable and later renders of the same record reuse it
+            def fit_company_name(company_font_size):
+                final_company_lines = []
                 
-                while company_font_size >= 8:  # Minimum font size
-                    # Check if entire company name fits in one line at current font size
-                    font_obj = fitz.Font(fontname=fontname)
-                    text_width = font_obj.text_length(company_text, company_font_size)
-                    
-                    if text_width <= rect.width - 10:  # Leave margin
+                # ✅ IMPROVED: Different logic for single line vs multi-line company names
+                if company_lines_count <= 1:
+                    # NO cmd+enter in Excel: Force single line, use font reduction only
+                
+                    # ✅ UPDATED: Solve for the largest fitting size (1pt steps, min 8pt) from the 1pt width
+                    font_obj = get_font(fontname=fontname)
+                    company_font_size, company_fits = fit_single_line(font_obj.text_length(company_text, 1), rect.width - 10, company_font_size, 8, 1)  # Leave margin
+                    if company_fits:
                         # Text fits in one line - use this font size
                         final_company_lines = [company_text]  # Single line
-                        break
-                    else:
-                        # Text too wide - reduce font size and try again
-                        company_font_size -= 1
                 
-                # If we reached minimum font size and still doesn't fit, use the minimum
-                if company_font_size < 8:
-                    company_font_size = 8
-                    final_company_lines = [company_text]
+                    # If we reached minimum font size and still doesn't fit, use the minimum
+                    if company_font_size < 8:
+                        company_font_size = 8
+                        final_company_lines = [company_text]
                 
-            else:
-                # cmd+enter present in Excel: Allow word wrapping up to 2 lines
+                else:
+                    # cmd+enter present in Excel: Allow word wrapping up to 2 lines
+                
+                    # ✅ ADDED: Measure each company line's words once for all candidate sizes
+                    company_wrappers = {line: WordWrapper(line, fontname) for line in company_processed_lines if line.strip()}
                 
-                while company_font_size >= 8:  # Minimum font size
-                    company_lines = []
+                    def wrap_company(font_size):
+                        company_lines = []
                     
-                    # Process each pre-processed line with word wrapping
-                    for processed_line in company_processed_lines:
-                        if not processed_line.strip():  # Empty line - preserve it
-                            company_lines.append("")  # Add empty line to maintain spacing
-                            continue
+                        # Process each pre-processed line with word wrapping
+                        for processed_line in company_processed_lines:
+                            if not processed_line.strip():  # Empty line - preserve it
+                                company_lines.append("")  # Add empty line to maintain spacing
+                                continue
                         
-                        # Non-empty line - apply word wrapping
-                        words = processed_line.split()
-                        current_line = ""
-                        
-                        for word in words:
-                            test_line = current_line + (" " if current_line else "") + word
-                            font_obj = fitz.Font(fontname=fontname)
-                            if font_obj.text_length(test_line, company_font_size) <= rect.width - 10:  # Leave margin
-                                current_line = test_line
-                            else:
-                                if current_line:
-                                    company_lines.append(current_line)
-                                current_line = word
-                        
-                        if current_line:
-                            company_lines.append(current_line)
-                    
-                    # ✅ UPDATED: Allow Company Name to use up to 2 lines (after line breaks + word wrapping)
-                    if len(company_lines) <= 2:
-                        final_company_lines = company_lines.copy()
-                        break
-                    
-                    # Reduce Company Name font size
-                    company_font_size -= 1
+                            # Non-empty line - apply word wrapping
+                            company_lines.extend(company_wrappers[processed_line].wrap(font_size, rect.width - 10))  # Leave margin
+                        return company_lines
+                
+                    # ✅ UPDATED: Allow Company Name to use up to 2 lines (after line breaks + word wrapping),
+                    # bisecting over the 1pt size steps (min 8pt) instead of trying each one
+                    company_font_size, company_fits = fit_font_size(company_font_size, 8, 1, lambda size: len(wrap_company(size)) <= 2)
+                    if company_fits:
+                        final_company_lines = wrap_company(company_font_size)
+                return company_font_size, tuple(final_company_lines)
+            
+            company_key = layout_key("softcopy_company", company_processed_lines, rect, fontname, None, company_font_size)
+            company_font_size, final_company_lines = layout_cache.memoize(company_key, lambda: fit_company_name(company_font_size))
+            final_company_lines = list(final_company_lines)
             
             # ✅ UPDATED: Apply Excel font size adjustment AFTER optimization (user override)
             if name_font_size_adjustment != 0:
                 optimized_company_font = company_font_size
                 company_font_size += name_font_size_adjustment
-                print(f"🔍 [SOFTCOPY DEBUG] Company Name Font Size adjustment AFTER optimization: {optimized_company_font}pt + {name_font_size_adjustment}pt = {company_font_size}pt")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Company Name Font Size adjustment AFTER optimization: %spt + %spt = %spt", optimized_company_font, name_font_size_adjustment, company_font_size)
 
             # Calculate Company Name height (dynamic based on template and address lines)
             if len(final_company_lines) > 1:
                 # Multi-line: Use fixed height allocation based on template and address lines
                 address_lines_count = len(address_processed_lines)
                 
-                if original_template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other"]:
+                if geometry.company_block == "large":
                     # Large template - new height allocation rules
                     if address_lines_count == 1:
                         company_height = 42  # Name +8, Address -5 (was 34)
@@ -1427,7 +1262,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                         company_height = 33  # Name +8, Address -5 (was 25)
                     else:  # 3+ lines
                         company_height = 19  # Name 19pt, Address 37pt (fits in 56pt total)
-                elif original_template_type in ["standard", "standard_eco", "standard_nonaccredited", "standard_other", "standard_other_eco", "standard_nonaccredited_other"]:
+                elif geometry.company_block == "standard":
                     # Standard template
                     if address_lines_count == 1:
                         company_height = 45  # More space for company name when address is single line
@@ -1442,12 +1277,12 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                     else:  # 3+ lines
                         company_height = 19  # Name 19pt, Address 37pt (same as large)
                 
-                print(f"🔍 [SOFTCOPY DEBUG] Multi-line company name: {address_lines_count} address lines, allocated {company_height}pt height")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Multi-line company name: %s address lines, allocated %spt height", address_lines_count, company_height)
             else:
                 # Single line: dynamic height based on template and address lines
                 address_lines_count = len(address_processed_lines)
                 
-                if original_template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other"]:
+                if geometry.company_block == "large":
                     # Large template - new height allocation rules
                     if address_lines_count == 1:
                         company_height = 42  # Name +8, Address -5 (was 34)
@@ -1455,7 +1290,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                         company_height = 33  # Name +8, Address -5 (was 25)
                     else:  # 3+ lines
                         company_height = 19  # Name 19pt, Address 37pt (fits in 56pt total)
-                elif original_template_type in ["standard", "standard_eco", "standard_nonaccredited", "standard_other", "standard_other_eco", "standard_nonaccredited_other"]:
+                elif geometry.company_block == "standard":
                     # Standard template
                     if address_lines_count == 1:
                         company_height = 45  # More space for company name when address is single line
@@ -1470,7 +1305,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                     else:  # 3+ lines
                         company_height = 19  # Name 19pt, Address 37pt (same as large)
                 
-                print(f"🔍 [SOFTCOPY DEBUG] Single line company name: {address_lines_count} address lines, allocated {company_height}pt height")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Single line company name: %s address lines, allocated %spt height", address_lines_count, company_height)
 
             # Reduce company font size to fit within adaptive height allocation
             original_company_font = company_font_size
@@ -1482,7 +1317,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                 required_font_size = company_height / (1.002 * len(final_company_lines))
                 if required_font_size < company_font_size:
                     company_font_size = required_font_size
-                    print(f"🔍 [SOFTCOPY DEBUG] Multi-line font reduced to {company_font_size:.1f}pt to fit {company_height}pt height")
+                    logger.debug("🔍 [SOFTCOPY DEBUG] Multi-line font reduced to %.1fpt to fit %spt height", company_font_size, company_height)
             else:
                 # Single line: Calculate required font size to fit allocated height
                 # Single line needs: font_size * 1.0 (no spacing)
@@ -1490,12 +1325,12 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                 required_font_size = company_height
                 if required_font_size < company_font_size:
                     company_font_size = required_font_size
-                    print(f"🔍 [SOFTCOPY DEBUG] Single line font reduced to {company_font_size:.1f}pt to fit {company_height}pt height")
+                    logger.debug("🔍 [SOFTCOPY DEBUG] Single line font reduced to %.1fpt to fit %spt height", company_font_size, company_height)
             
             # Ensure minimum font size
             if company_font_size < 8:
                 company_font_size = 8
-                print(f"🔍 [SOFTCOPY DEBUG] Font size limited to minimum 8pt")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Font size limited to minimum 8pt")
 
             # Now find font size for Address to fit in remaining space
             remaining_height = rect.height - company_height  # No margin - address starts right after company name
@@ -1504,18 +1339,18 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
             min_address_font = 9.0  # Increased minimum font size (+3pt)
             min_address_height = len(address_processed_lines) * min_address_font * 1.05  # Address uses 1.05 line spacing
             
-            print(f"🔍 [SOFTCOPY DEBUG] Remaining height for Address: {remaining_height:.1f}pt")
-            print(f"🔍 [SOFTCOPY DEBUG] Minimum Address height needed: {min_address_height:.1f}pt")
+            logger.debug("🔍 [SOFTCOPY DEBUG] Remaining height for Address: %.1fpt", remaining_height)
+            logger.debug("🔍 [SOFTCOPY DEBUG] Minimum Address height needed: %.1fpt", min_address_height)
             
             # Check if we need adaptive logic (Address height constraint)
             if min_address_height > remaining_height:
-                print(f"🔍 [SOFTCOPY DEBUG] Address height constraint detected - switching to adaptive mode")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Address height constraint detected - switching to adaptive mode")
                 
                 # Calculate required space for Address at minimum font
                 required_address_space = min_address_height  # No margin
                 max_company_height = rect.height - required_address_space
                 
-                print(f"🔍 [SOFTCOPY DEBUG] Maximum Company Name height allowed: {max_company_height:.1f}pt")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Maximum Company Name height allowed: %.1fpt", max_company_height)
                 
                 # Reduce Company Name font size to fit
                 original_company_font = company_font_size
@@ -1525,12 +1360,12 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                         # Multi-line: Use fixed height allocation based on template and address lines
                         address_lines_count = len(address_processed_lines)
                         
-                        if original_template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other"]:
+                        if geometry.company_block == "large":
                             if address_lines_count == 1:
                                 test_company_height = 42  # Name +8, Address -5 (was 34)
                             else:
                                 test_company_height = 25  # Less space when address is multi-line (was 20)
-                        elif original_template_type in ["standard", "standard_eco", "standard_nonaccredited", "standard_other", "standard_other_eco", "standard_nonaccredited_other"]:
+                        elif geometry.company_block == "standard":
                             if address_lines_count == 1:
                                 test_company_height = 50  # More space for company name when address is single line (was 45)
                             else:
@@ -1547,12 +1382,12 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                         # Single line: dynamic height based on template and address lines
                         address_lines_count = len(address_processed_lines)
                         
-                        if original_template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other"]:
+                        if geometry.company_block == "large":
                             if address_lines_count == 1:
                                 test_company_height = 34
                             else:
                                 test_company_height = 25
-                        elif original_template_type in ["standard", "standard_eco", "standard_nonaccredited", "standard_other", "standard_other_eco", "standard_nonaccredited_other"]:
+                        elif geometry.company_block == "standard":
                             if address_lines_count == 1:
                                 test_company_height = 45
                             else:
@@ -1574,12 +1409,12 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                     # Multi-line: Use fixed height allocation based on template and address lines
                     address_lines_count = len(address_processed_lines)
                     
-                    if original_template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other"]:
+                    if geometry.company_block == "large":
                         if address_lines_count == 1:
                             company_height = 42  # Name +8, Address -5 (was 34)
                         else:
                             company_height = 25  # Less space when address is multi-line (was 20)
-                    elif original_template_type in ["standard", "standard_eco", "standard_nonaccredited", "standard_other", "standard_other_eco", "standard_nonaccredited_other"]:
+                    elif geometry.company_block == "standard":
                         if address_lines_count == 1:
                             company_height = 45  # More space for company name when address is single line
                         else:
@@ -1596,14 +1431,14 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                     # Single line: dynamic height based on template and address lines
                     address_lines_count = len(address_processed_lines)
                     
-                    if original_template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other"]:
+                    if geometry.company_block == "large":
                         if address_lines_count == 1:
                             company_height = 42  # Name +8, Address -5 (same as large)
                         elif address_lines_count == 2:
                             company_height = 33  # Name +8, Address -5 (same as large)
                         else:  # 3+ lines
                             company_height = 19  # Name 19pt, Address 37pt (same as large)
-                    elif original_template_type in ["standard", "standard_eco", "standard_nonaccredited", "standard_other", "standard_other_eco", "standard_nonaccredited_other"]:
+                    elif geometry.company_block == "standard":
                         if address_lines_count == 1:
                             company_height = 45
                         else:
@@ -1618,12 +1453,12 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                             company_height = 19  # Name 19pt, Address 37pt (same as large)
                 remaining_height = rect.height - company_height
                 
-                print(f"🔍 [SOFTCOPY DEBUG] Adaptive mode: Company font reduced from {original_company_font}pt to {company_font_size}pt")
-                print(f"🔍 [SOFTCOPY DEBUG] New remaining height for Address: {remaining_height:.1f}pt")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Adaptive mode: Company font reduced from %spt to %spt", original_company_font, company_font_size)
+                logger.debug("🔍 [SOFTCOPY DEBUG] New remaining height for Address: %.1fpt", remaining_height)
                 
                 # If still can't fit, use fallback strategy
                 if remaining_height < min_address_height:
-                    print(f"🔍 [SOFTCOPY DEBUG] Fallback mode: Reducing both fonts proportionally")
+                    logger.debug("🔍 [SOFTCOPY DEBUG] Fallback mode: Reducing both fonts proportionally")
                     # Calculate proportional reduction
                     total_required = company_height + min_address_height + 2
                     reduction_factor = rect.height / total_required
@@ -1641,12 +1476,12 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                         # Multi-line: Use fixed height allocation based on template and address lines
                         address_lines_count = len(address_processed_lines)
                         
-                        if original_template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other"]:
+                        if geometry.company_block == "large":
                             if address_lines_count == 1:
                                 company_height = 42  # Name +8, Address -5 (was 34)
                             else:
                                 company_height = 20  # Less space when address is multi-line
-                        elif original_template_type in ["standard", "standard_eco", "standard_nonaccredited", "standard_other", "standard_other_eco", "standard_nonaccredited_other"]:
+                        elif geometry.company_block == "standard":
                             if address_lines_count == 1:
                                 company_height = 45  # More space for company name when address is single line
                             else:
@@ -1661,14 +1496,14 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                         # Single line: dynamic height based on template and address lines
                         address_lines_count = len(address_processed_lines)
                         
-                        if original_template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other"]:
+                        if geometry.company_block == "large":
                             if address_lines_count == 1:
                                 company_height = 42  # Name +8, Address -5 (same as large)
                             elif address_lines_count == 2:
                                 company_height = 33  # Name +8, Address -5 (same as large)
                             else:  # 3+ lines
                                 company_height = 19  # Name 19pt, Address 37pt (same as large)
-                        elif original_template_type in ["standard", "standard_eco", "standard_nonaccredited", "standard_other", "standard_other_eco", "standard_nonaccredited_other"]:
+                        elif geometry.company_block == "standard":
                             if address_lines_count == 1:
                                 company_height = 45
                             else:
@@ -1681,111 +1516,129 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                                 company_height = 20  # Less space when address is multi-line (same as large)
                     remaining_height = rect.height - company_height
                     
-                    print(f"🔍 [SOFTCOPY DEBUG] Fallback: Company {company_font_size:.1f}pt, Address {address_font_size:.1f}pt")
+                    logger.debug("🔍 [SOFTCOPY DEBUG] Fallback: Company %.1fpt, Address %.1fpt", company_font_size, address_font_size)
            
 
-            address_font_size_attempts = 0
-            while address_font_size >= 6:  # Minimum font size
-                address_font_size_attempts += 1
+            max_address_width = rect.width - 10  # Leave margin
 
-                # Process Address using pre-processed lines with word wrapping
-                address_lines = []
-                max_address_width = rect.width - 10  # Leave margin
+            # ✅ UPDATED: Address fit is memoised - the printable and later renders of the same record reuse it
+            def fit_address(address_font_size):
+                # ✅ ADDED: Measure each address line's words once for all candidate sizes
+                address_wrappers = {line: WordWrapper(line, fontname) for line in address_processed_lines if line.strip()}
+                address_layouts = {}
 
-                # Process each pre-processed address line with word wrapping
-                for line_idx, processed_line in enumerate(address_processed_lines):
-                    if not processed_line.strip():  # Empty line - preserve it
-                        address_lines.append("")  # Add empty line to maintain spacing
-                        continue
-                    
-                    # Non-empty line - apply word wrapping
-                    words = processed_line.split()
-                    current_line = ""
-                    original_line_wrapped = False
-
-                    for word in words:
-                        test_line = current_line + (" " if current_line else "") + word
-                        font_obj = fitz.Font(fontname=fontname)
-                        test_width = font_obj.text_length(test_line, address_font_size)
-                        if test_width <= max_address_width:  # Leave margin
-                            current_line = test_line
-                        else:
-                            # Line too wide - wrap it
-                            if current_line:
-                                # Log the wrapped line before adding it
-                                line_width = font_obj.text_length(current_line, address_font_size)
-                                print(f"🔍 [SOFTCOPY ADDRESS WIDTH] Line wrapped at {address_font_size:.1f}pt: '{current_line[:50]}{'...' if len(current_line) > 50 else ''}' (width: {line_width:.1f}pt <= {max_address_width:.1f}pt)")
-                                address_lines.append(current_line)
-                                original_line_wrapped = True
-                            # Check if single word itself is too wide
-                            word_width = font_obj.text_length(word, address_font_size)
-                            if word_width > max_address_width:
-                                print(f"⚠️ [SOFTCOPY ADDRESS WIDTH] Single word exceeds width: '{word}' (width: {word_width:.1f}pt > {max_address_width:.1f}pt) - will be truncated")
-                            current_line = word
-
-                    if current_line:
-                        # Log final line of this processed segment only if it was wrapped or might overflow
-                        line_width = font_obj.text_length(current_line, address_font_size)
-                        if original_line_wrapped or line_width > max_address_width:
-                            print(f"🔍 [SOFTCOPY ADDRESS WIDTH] Final line segment at {address_font_size:.1f}pt: '{current_line[:50]}{'...' if len(current_line) > 50 else ''}' (width: {line_width:.1f}pt)")
-                        address_lines.append(current_line)
-
-                # Calculate Address height
-                # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
-                if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_nonaccredited_other", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
-                    address_height = len(address_lines) * address_font_size * 1.1  # Tight spacing for large/logo templates
-                else:  # standard templates
-                    address_height = len(address_lines) * address_font_size * 1.2  # Loose spacing for standard templates
-                
-                print(f"🔍 [SOFTCOPY DEBUG] Address font {address_font_size:.1f}pt: {len(address_lines)} lines, height {address_height:.1f}pt, remaining {remaining_height:.1f}pt")
+                def layout_address(font_size):
+                    """Wrapped address lines and their height at font_size (each size is laid out once)."""
+                    if font_size in address_layouts:
+                        return address_layouts[font_size]
+                    # Process Address using pre-processed lines with word wrapping
+                    address_lines = []
 
-                # Check if Address fits in remaining space
-                if address_height <= remaining_height:
-                    final_address_lines = address_lines.copy()
-                    
-                    # ✅ ADDED: Final width check for all address lines (only when solution found)
-                    font_obj = fitz.Font(fontname=fontname)
-                    overflow_detected = False
-                    print(f"🔍 [SOFTCOPY ADDRESS WIDTH] Final width check at {address_font_size:.1f}pt (max width: {max_address_width:.1f}pt):")
-                    for line_idx, line in enumerate(final_address_lines):
-                        if line.strip():  # Only check non-empty lines
-                            line_width = font_obj.text_length(line, address_font_size)
-                            if line_width > max_address_width:
-                                overflow_detected = True
-                                print(f"  ❌ Line {line_idx + 1} exceeds: '{line[:50]}{'...' if len(line) > 50 else ''}' (width: {line_width:.1f}pt > {max_address_width:.1f}pt)")
-                            else:
-                                print(f"  ✅ Line {line_idx + 1} fits: '{line[:50]}{'...' if len(line) > 50 else ''}' (width: {line_width:.1f}pt <= {max_address_width:.1f}pt)")
-                    
-                    if overflow_detected:
-                        print(f"⚠️ [SOFTCOPY ADDRESS WIDTH] ⚠️ WARNING: Some address lines exceed available width at {address_font_size:.1f}pt")
-                    
-                    break
-                else:
-                    print(f"❌ [SOFTCOPY] Address too tall: {address_height:.1f}pt > {remaining_height:.1f}pt, reducing font size")
+                    # Process each pre-processed address line with word wrapping
+                    for line_idx, processed_line in enumerate(address_processed_lines):
+                        if not processed_line.strip():  # Empty line - preserve it
+                            address_lines.append("")  # Add empty line to maintain spacing
+                            continue
+
+                        # Non-empty line - apply word wrapping
+                        wrapped_lines = address_wrappers[processed_line].wrap(font_size, max_address_width)
+                        font_obj = address_wrappers[processed_line].metrics
+                        for wrapped_idx, current_line in enumerate(wrapped_lines):
+                            line_width = font_obj.text_length(current_line, font_size)
+                            if wrapped_idx < len(wrapped_lines) - 1:
+                                logger.debug("🔍 [SOFTCOPY ADDRESS WIDTH] Line wrapped at %.1fpt: '%s%s' (width: %.1fpt <= %.1fpt)", font_size, current_line[:50], '...' if len(current_line) > 50 else '', line_width, max_address_width)
+                            elif len(wrapped_lines) > 1 or line_width > max_address_width:
+                                # Log final line of this processed segment only if it was wrapped or might overflow
+                                logger.debug("🔍 [SOFTCOPY ADDRESS WIDTH] Final line segment at %.1fpt: '%s%s' (width: %.1fpt)", font_size, current_line[:50], '...' if len(current_line) > 50 else '', line_width)
+                            if " " not in current_line and line_width > max_address_width:
+                                logger.warning("⚠️ [SOFTCOPY ADDRESS WIDTH] Single word exceeds width: '%s' (width: %.1fpt > %.1fpt) - will be truncated", current_line, line_width, max_address_width)
+                        address_lines.extend(wrapped_lines)
+
+                    # Calculate Address height
+                    # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
+                    if geometry.address_spacing == "tight":
+                        address_height = len(address_lines) * font_size * 1.1  # Tight spacing for large/logo templates
+                    else:  # standard templates
+                        address_height = len(address_lines) * font_size * 1.2  # Loose spacing for standard templates
+
+                    address_layouts[font_size] = (address_lines, address_height)
+                    return address_lines, address_height
+
+                def address_fits(font_size):
+                    address_lines, address_height = layout_address(font_size)
+                    logger.debug("🔍 [SOFTCOPY DEBUG] Address font %.1fpt: %s lines, height %.1fpt, remaining %.1fpt", font_size, len(address_lines), address_height, remaining_height)
+                    # Check if Address fits in remaining space
+                    if address_height <= remaining_height:
+                        return True
+                    logger.error("❌ [SOFTCOPY] Address too tall: %.1fpt > %.1fpt, reducing font size", address_height, remaining_height)
+                    return False
 
-                # Reduce Address font size
-                address_font_size -= 0.5
+                # ✅ UPDATED: Bisect over the 0.5pt size steps (min 6pt) instead of laying out every size
+                address_sizes, _ = candidate_font_sizes(address_font_size, 6, 0.5)
+                address_font_size, address_found = fit_font_size(address_font_size, 6, 0.5, address_fits)
+                if address_found:
+                    address_lines, address_height = layout_address(address_font_size)
+                elif address_sizes:
+                    # Nothing fits - keep the smallest size's layout, as the old decrement loop did
+                    address_lines, address_height = layout_address(address_sizes[-1])
+                else:
+                    return address_font_size, False, None, None
+                return address_font_size, address_found, tuple(address_lines), address_height
+
+            address_family = "tight" if geometry.address_spacing == "tight" else "loose"
+            address_key = layout_key("softcopy_address", address_processed_lines, rect, fontname, address_family, address_font_size, remaining_height)
+            address_font_size, address_found, address_lines, address_height = layout_cache.memoize(address_key, lambda: fit_address(address_font_size))
+            if address_found:
+                final_address_lines = list(address_lines)
+                
+                # ✅ ADDED: Final width check for all address lines (only when solution found)
+                font_obj = get_font(fontname=fontname)
+                overflow_detected = False
+                logger.debug("🔍 [SOFTCOPY ADDRESS WIDTH] Final width check at %.1fpt (max width: %.1fpt):", address_font_size, max_address_width)
+                for line_idx, line in enumerate(final_address_lines):
+                    if line.strip():  # Only check non-empty lines
+                        line_width = font_obj.text_length(line, address_font_size)
+                        if line_width > max_address_width:
+                            overflow_detected = True
+                            logger.error("  ❌ Line %s exceeds: '%s%s' (width: %.1fpt > %.1fpt)", line_idx + 1, line[:50], '...' if len(line) > 50 else '', line_width, max_address_width)
+                        else:
+                            logger.debug("  ✅ Line %s fits: '%s%s' (width: %.1fpt <= %.1fpt)", line_idx + 1, line[:50], '...' if len(line) > 50 else '', line_width, max_address_width)
+                
+                if overflow_detected:
+                    logger.warning("⚠️ [SOFTCOPY ADDRESS WIDTH] ⚠️ WARNING: Some address lines exceed available width at %.1fpt", address_font_size)
             
             # ✅ UPDATED: Apply Excel font size adjustment AFTER optimization (user override)
             if address_font_size_adjustment != 0:
                 optimized_address_font = address_font_size
                 address_font_size += address_font_size_adjustment
-                print(f"🔍 [SOFTCOPY DEBUG] Address Font Size adjustment AFTER optimization: {optimized_address_font}pt + {address_font_size_adjustment}pt = {address_font_size}pt")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Address Font Size adjustment AFTER optimization: %spt + %spt = %spt", optimized_address_font, address_font_size_adjustment, address_font_size)
+
+            layout_report["Company Name"] = {
+                "font_size": company_font_size,
+                "lines": len(final_company_lines),
+                "adjustments": {"font_size": name_font_size_adjustment, "position": name_adjustment},
+            }
+            layout_report["Address"] = {
+                "font_size": address_font_size,
+                "lines": len(final_address_lines),
+                "fits": address_found,
+                "adjustments": {"font_size": address_font_size_adjustment, "position": address_adjustment},
+            }
 
             # Now render Company Name and Address dynamically
             if final_company_lines or final_address_lines:
 
                 # ENHANCED DEBUG: Final rendering analysis
-                print(f"🔍 [SOFTCOPY DEBUG] Final Company Name lines: {final_company_lines}")
-                print(f"🔍 [SOFTCOPY DEBUG] Final Company Name font size: {company_font_size}pt")
-                print(f"🔍 [SOFTCOPY DEBUG] Final Address lines: {final_address_lines}")
-                print(f"🔍 [SOFTCOPY DEBUG] Final Address font size: {address_font_size}pt")
-                print(f"🔍 [SOFTCOPY DEBUG] Company Name height: {company_height:.1f}pt")
-                print(f"🔍 [SOFTCOPY DEBUG] Address height: {address_height:.1f}pt")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Final Company Name lines: %s", final_company_lines)
+                logger.debug("🔍 [SOFTCOPY DEBUG] Final Company Name font size: %spt", company_font_size)
+                logger.debug("🔍 [SOFTCOPY DEBUG] Final Address lines: %s", final_address_lines)
+                logger.debug("🔍 [SOFTCOPY DEBUG] Final Address font size: %spt", address_font_size)
+                logger.debug("🔍 [SOFTCOPY DEBUG] Company Name height: %.1fpt", company_height)
+                logger.debug("🔍 [SOFTCOPY DEBUG] Address height: %.1fpt", address_height)
 
                 # Calculate total height
                 total_height = company_height + address_height
-                print(f"🔍 [SOFTCOPY DEBUG] Total height: {total_height:.1f}pt")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Total height: %.1fpt", total_height)
 
                 # No top margin - start at exact rectangle top + Excel adjustment
                 start_y = rect.y0 + name_adjustment  # Start at exact top of box + Excel adjustment
@@ -1802,7 +1655,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                     if has_multiple_lines:
                         # Multi-line: Use total allocated height divided by number of lines
                         line_height = company_height / len(final_company_lines)
-                        print(f"🔍 [RENDERING DEBUG] Multi-line: company_height={company_height}pt, lines={len(final_company_lines)}, line_height={line_height}pt")
+                        logger.debug("🔍 [RENDERING DEBUG] Multi-line: company_height=%spt, lines=%s, line_height=%spt", company_height, len(final_company_lines), line_height)
                     else:
                         # Single line: dynamic height based on template and address lines
                         address_lines_count = len(final_address_lines)
@@ -1827,7 +1680,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                             total_width = 0
                             for segment_text, _, _ in segments:
                                 if segment_text:
-                                    font_obj = fitz.Font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
+                                    font_obj = get_font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
                                     total_width += font_obj.text_length(segment_text, company_font_size)
                             
                             x_pos = center_x - total_width / 2
@@ -1893,7 +1746,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                                 total_width = 0
                                 for segment_text, _, _ in segments:
                                     if segment_text:
-                                        font_obj = fitz.Font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
+                                        font_obj = get_font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
                                         total_width += font_obj.text_length(segment_text, address_font_size)
                                 
                                 # Apply alignment based on address_alignment setting
@@ -1924,16 +1777,16 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
 
                
             else:
-                print(f"⚠️ [SOFTCOPY] No company or address lines to render")
+                logger.warning("⚠️ [SOFTCOPY] No company or address lines to render")
 
         elif field in ["ISO Standard", "ISO", "Standard", "iso_standard", "iso standard"]:
             # Handle ISO Standard with SAME LOGIC AS generate_certificate
-            print(f"🔍 [SOFTCOPY DEBUG] Processing ISO Standard (field='{field}'): '{text}'")
+            logger.debug("🔍 [SOFTCOPY DEBUG] Processing ISO Standard (field='%s'): '%s'", field, text)
             # Expand ISO standard if needed
             expanded_text = expand_iso_standard(text)
             if expanded_text != text:
                 text = expanded_text
-                print(f"🔍 [SOFTCOPY DEBUG] ISO Standard expanded: '{text}'")
+                logger.debug("🔍 [SOFTCOPY DEBUG] ISO Standard expanded: '%s'", text)
 
             # After processing ISO Standard, render the management system line
             iso_standard_text = text
@@ -1989,26 +1842,23 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
             # ✅ ADDED: Font size reduction logic to prevent x-coordinate overflow
             management_font_size = 15  # Start with default font size
             max_width = management_rect.width - 10  # Leave 5pt margin on each side (87.9 to 580 = 492.1pt width)
-            print(f"🔍 [SOFTCOPY] Management line overflow protection: max_width={max_width:.1f}pt")
+            logger.debug("🔍 [SOFTCOPY] Management line overflow protection: max_width=%.1fpt", max_width)
             
-            while management_font_size >= 8:  # Minimum font size
-                font_obj = fitz.Font(fontname="Times-BoldItalic")
-                text_width = font_obj.text_length(management_line, management_font_size)
-                
-                if text_width <= max_width:
-                    print(f"✅ [SOFTCOPY] Management line fits at {management_font_size}pt (width: {text_width:.1f}pt)")
-                    break  # Text fits!
-                
-                print(f"🔍 [SOFTCOPY] Management line too wide at {management_font_size}pt (width: {text_width:.1f}pt > {max_width:.1f}pt), reducing to {management_font_size - 0.5}pt")
-                management_font_size -= 0.5  # Reduce font size
+            # ✅ UPDATED: Solve for the largest fitting size (0.5pt steps, min 8pt) from the 1pt width
+            font_obj = get_font(fontname="Times-BoldItalic")
+            management_font_size, management_fits = fit_single_line(font_obj.text_length(management_line, 1), max_width, management_font_size, 8, 0.5)
+            if management_fits and logger.isEnabledFor(logging.DEBUG):
+                logger.debug("✅ [SOFTCOPY] Management line fits at %spt (width: %.1fpt)", management_font_size, font_obj.text_length(management_line, management_font_size))
             
             # Ensure minimum font size
             if management_font_size < 8:
                 management_font_size = 8
-                print(f"⚠️ [SOFTCOPY] Management line forced to minimum font size 8pt")
+                logger.warning("⚠️ [SOFTCOPY] Management line forced to minimum font size 8pt")
             
+            layout_report["Management System"] = {"font_size": management_font_size, "lines": 1}
+
             # Calculate text width for centering with final font size
-            font_obj = fitz.Font(fontname="Times-BoldItalic")  # Use bold italic font
+            font_obj = get_font(fontname="Times-BoldItalic")  # Use bold italic font
             text_width = font_obj.text_length(management_line, management_font_size)
             start_x = center_x - text_width / 2
 
@@ -2031,19 +1881,22 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
             start_size = font_starts.get("ISO Standard", 80)
             font_size = start_size
             
-            print(f"🔍 [SOFTCOPY DEBUG] ISO Standard coordinates: {rect}")
-            print(f"🔍 [SOFTCOPY DEBUG] ISO Standard starting font size: {start_size}pt")
+            logger.debug("🔍 [SOFTCOPY DEBUG] ISO Standard coordinates: %s", rect)
+            logger.debug("🔍 [SOFTCOPY DEBUG] ISO Standard starting font size: %spt", start_size)
 
             # Reduce font size if it doesn't fit, but ensure minimum size
-            while font_size >= 12:  # Increased minimum from 10 to 12
+            def iso_fits(font_size):
                 text_height = get_text_height(text, font_size, fontname, rect.width)
                 limit = rect.height
                 
-                print(f"🔍 [SOFTCOPY DEBUG] Font size {font_size}pt: text_height={text_height:.1f}pt, limit={limit:.1f}pt")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Font size %spt: text_height=%.1fpt, limit=%.1fpt", font_size, text_height, limit)
+                return text_height <= limit
 
-                if text_height <= limit:
-                    break
-                font_size -= 1
+            # ✅ UPDATED: Bisect over the 1pt size steps instead of trying each one (memoised per text and box)
+            iso_key = layout_key("text_height", text, rect, fontname, None, start_size, 12, rect.height)
+            font_size, _ = layout_cache.memoize(iso_key, lambda: fit_font_size(start_size, 12, 1, iso_fits))  # Increased minimum from 10 to 12
+
+            layout_report["ISO Standard"] = {"font_size": font_size, "lines": 1}
 
             # Perfect centering for ISO Standard - both horizontal and vertical
             center_x = (rect.x0 + rect.x1) / 2
@@ -2051,12 +1904,12 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
 
             # 🔍 DEBUG: Check font availability and rendering
             try:
-                test_font = fitz.Font(fontname=fontname)
-                print(f"🔍 [SOFTCOPY DEBUG] ISO Standard font '{fontname}' loaded successfully")
+                test_font = get_font(fontname=fontname)
+                logger.debug("🔍 [SOFTCOPY DEBUG] ISO Standard font '%s' loaded successfully", fontname)
             except Exception as font_error:
-                print(f"⚠️ [SOFTCOPY DEBUG] Font '{fontname}' failed to load: {font_error}")
+                logger.warning("⚠️ [SOFTCOPY DEBUG] Font '%s' failed to load: %s", fontname, font_error)
                 fontname = "Times-Roman"  # Fallback to Times-Roman
-                print(f"🔍 [SOFTCOPY DEBUG] Using fallback font: {fontname}")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Using fallback font: %s", fontname)
 
             # ✅ ENHANCED: Use mixed format text rendering for bold detection
             if '**' in text or '__' in text:
@@ -2065,14 +1918,14 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                 total_width = 0
                 for segment_text, _, _ in segments:
                     if segment_text:
-                        font_obj = fitz.Font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
+                        font_obj = get_font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
                         total_width += font_obj.text_length(segment_text, font_size)
                 
                 start_x = center_x - total_width / 2
                 render_mixed_format_text(page, (start_x, center_y), text, font_size, color)
             else:
                 # Standard rendering for non-bold text
-                font_obj = fitz.Font(fontname=fontname)
+                font_obj = get_font(fontname=fontname)
                 text_width = font_obj.text_length(text, font_size)
                 start_x = center_x - text_width / 2
 
@@ -2085,12 +1938,12 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                     fontname=fontname,
                     color=color
                 )
-                print(f"🔍 [SOFTCOPY DEBUG] ISO Standard rendered using insert_text method")
+                logger.debug("🔍 [SOFTCOPY DEBUG] ISO Standard rendered using insert_text method")
 
             # Print font size for ISO Standard
-            print(f"📏 [SOFTCOPY] ISO Standard: {font_size}pt (centered)")
-            print(f"🔍 [SOFTCOPY DEBUG] ISO Standard final rendering: text='{text}', font_size={font_size}pt, center=({center_x:.1f}, {center_y:.1f})")
-            print(f"✅ [SOFTCOPY] ISO Standard field processed successfully")
+            logger.debug("📏 [SOFTCOPY] ISO Standard: %spt (centered)", font_size)
+            logger.debug("🔍 [SOFTCOPY DEBUG] ISO Standard final rendering: text='%s', font_size=%spt, center=(%.1f, %.1f)", text, font_size, center_x, center_y)
+            logger.debug("✅ [SOFTCOPY] ISO Standard field processed successfully")
             
             # ✅ MODIFIED: Render certification code below ISO Standard with different coordinates for non-accredited
             try:
@@ -2100,7 +1953,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                 # Get the certification code for this ISO standard
                 cert_code = get_iso_standard_code(text)
                 if cert_code:
-                    print(f"🔍 [SOFTCOPY] ISO Standard '{text}' maps to certification code: '{cert_code}'")
+                    logger.debug("🔍 [SOFTCOPY] ISO Standard '%s' maps to certification code: '%s'", text, cert_code)
                     
                     # ✅ ENHANCED: Use different coordinates based on accreditation status AND country
                     country = (values.get("Country") or values.get("country") or "").strip()
@@ -2109,22 +1962,22 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                         # Keep current logic for "Other" country
                         if accreditation == "no":
                             # Non-accredited: Move code to the right
-                            code_rect = fitz.Rect(335, 757, 390, 762)  # Updated coordinates
-                            print(f"🔍 [SOFTCOPY] Other country, Non-accredited certificate - using right position")
+                            code_rect = geometry.certification_codes["other_nonaccredited"]
+                            logger.debug("🔍 [SOFTCOPY] Other country, Non-accredited certificate - using right position")
                         else:
                             # Accredited: Use original position
-                            code_rect = coords["certification_code"]  # Original: (253, 757, 285, 762)
-                            print(f"🔍 [SOFTCOPY] Other country, Accredited certificate - using standard position")
+                            code_rect = geometry.certification_codes["other"]
+                            logger.debug("🔍 [SOFTCOPY] Other country, Accredited certificate - using standard position")
                     else:
                         # Non-"Other" country: Same x logic, but increase y by 8 points
                         if accreditation == "no":
                             # Non-accredited: Move code to the right + down 8 points + 5pt left
-                            code_rect = fitz.Rect(330, 765, 385, 770)  # y + 8, x - 5
-                            print(f"🔍 [SOFTCOPY] Non-Other country, Non-accredited certificate - using right position + 8pt down + 5pt left")
+                            code_rect = geometry.certification_codes["default_nonaccredited"]  # y + 8, x - 5
+                            logger.debug("🔍 [SOFTCOPY] Non-Other country, Non-accredited certificate - using right position + 8pt down + 5pt left")
                         else:
                             # Accredited: Use original x position + down 8 points
-                            code_rect = fitz.Rect(253, 765, 285, 770)  # y + 8
-                            print(f"🔍 [SOFTCOPY] Non-Other country, Accredited certificate - using standard position + 8pt down")
+                            code_rect = geometry.certification_codes["default"]  # y + 8
+                            logger.debug("🔍 [SOFTCOPY] Non-Other country, Accredited certificate - using standard position + 8pt down")
                     
                     # ✅ FIXED: Use reliable font that's available in PyMuPDF
                     reliable_font = "helv"  # Helvetica - always available in PyMuPDF
@@ -2139,13 +1992,13 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                         color=(0, 0, 0)  # Black color
                         )
                     
-                    print(f"✅ [SOFTCOPY] Certification code '{cert_code}' rendered at coordinates {code_rect}")
-                    print(f"📏 [SOFTCOPY] Certification code: 5pt {reliable_font} font")
+                    logger.debug("✅ [SOFTCOPY] Certification code '%s' rendered at coordinates %s", cert_code, code_rect)
+                    logger.debug("📏 [SOFTCOPY] Certification code: 5pt %s font", reliable_font)
                 else:
-                    print(f"⚠️ [SOFTCOPY] No certification code found for ISO Standard: '{text}'")
+                    logger.warning("⚠️ [SOFTCOPY] No certification code found for ISO Standard: '%s'", text)
             except Exception as code_error:
-                print(f"⚠️ [SOFTCOPY] Error rendering certification code: {code_error}")
-                print(f"⚠️ [SOFTCOPY] Soft copy will be generated without certification code")
+                logger.warning("⚠️ [SOFTCOPY] Error rendering certification code: %s", code_error)
+                logger.warning("⚠️ [SOFTCOPY] Soft copy will be generated without certification code")
 
         elif field == "Scope":
             # Handle Scope with SAME ADVANCED LOGIC AS generate_certificate
@@ -2159,19 +2012,10 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
             else:
                 start_size = font_starts.get("Scope", 20)  # Large template or standard long scope: max 20pt
             
-            font_size = start_size
-            iteration_count = 0
-
             # Reduce font size if it doesn't fit, but ensure minimum size
-            while font_size >= 12:  # Increased minimum from 10 to 12
-                iteration_count += 1
-                text_height = get_text_height(text, font_size, fontname, rect.width)
-                limit = rect.height
-                
-
-                if text_height <= limit:
-                    break
-                font_size -= 1
+            # ✅ UPDATED: Bisect over the 1pt size steps instead of trying each one (memoised per text and box)
+            scope_key = layout_key("text_height", text, rect, fontname, None, start_size, 12, rect.height)
+            font_size, _ = layout_cache.memoize(scope_key, lambda: fit_font_size(start_size, 12, 1, lambda size: get_text_height(text, size, fontname, rect.width) <= rect.height))  # Increased minimum from 10 to 12
 
             # PowerPoint-style centering with automatic font size reduction
             original_font_size = font_size
@@ -2180,35 +2024,22 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
             # ✅ ADDED: Force Font Size logic
             if force_font_size in ["true", "1", "yes", "force"]:
                 # Force font size - bypass optimization
-                print(f"🔍 [SOFTCOPY DEBUG] Force Font Size enabled - using {font_size}pt without optimization")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Force Font Size enabled - using %spt without optimization", font_size)
                 # Simple word wrapping for forced font size
-                words = text.split()
-                lines = []
-                current_line = ""
-                for word in words:
-                    test_line = current_line + (" " if current_line else "") + word
-                    font_obj = fitz.Font(fontname=fontname)
-                    if font_obj.text_length(test_line, font_size) <= rect.width:
-                        current_line = test_line
-                    else:
-                        if current_line:
-                            lines.append(current_line)
-                        current_line = word
-                if current_line:
-                    lines.append(current_line)
+                lines = WordWrapper(text, fontname).wrap(font_size, rect.width)
             else:
                 # Use shared optimized font calculation
                 min_font_size = 4  # Allow font size to go below 8pt if needed
                 original_font_size = font_size  # Pass current font size as starting point
-                print(f"🔍 [SOFTCOPY DEBUG] Starting font optimization: {original_font_size}pt → shared function")
-                font_size, lines = calculate_optimal_font_size_with_line_breaks(text, rect, fontname, template_type, min_font_size, original_font_size)
+                logger.debug("🔍 [SOFTCOPY DEBUG] Starting font optimization: %spt → shared function", original_font_size)
+                font_size, lines = calculate_optimal_font_size_with_line_breaks(text, rect, fontname, geometry.scope_spacing, min_font_size, original_font_size)
                 
                 # Apply relative font size adjustment if force_font_size is a number
                 try:
                     if force_font_size.replace('.', '').replace('-', '').isdigit():
                         relative_adjustment = float(force_font_size)
                         font_size += relative_adjustment
-                        print(f"🔍 [SOFTCOPY DEBUG] Applied relative font size adjustment: {relative_adjustment}pt")
+                        logger.debug("🔍 [SOFTCOPY DEBUG] Applied relative font size adjustment: %spt", relative_adjustment)
                 except ValueError:
                     pass  # Invalid number, ignore
             
@@ -2216,13 +2047,13 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
             if scope_font_size_adjustment != 0:
                 optimized_scope_font = font_size
                 font_size += scope_font_size_adjustment
-                print(f"🔍 [SOFTCOPY DEBUG] Scope Font Size adjustment AFTER optimization: {optimized_scope_font}pt + {scope_font_size_adjustment}pt = {font_size}pt")
+                logger.debug("🔍 [SOFTCOPY DEBUG] Scope Font Size adjustment AFTER optimization: %spt + %spt = %spt", optimized_scope_font, scope_font_size_adjustment, font_size)
             
             # ✅ HORIZONTAL OVERFLOW FIX: Re-wrap lines if font size increased
             if scope_font_size_adjustment != 0:
-                print(f"🔍 [SCOPE HORIZONTAL] Checking horizontal overflow at increased font size: {font_size}pt")
+                logger.debug("🔍 [SCOPE HORIZONTAL] Checking horizontal overflow at increased font size: %spt", font_size)
                 
-                font_obj = fitz.Font(fontname=fontname)
+                font_obj = get_font(fontname=fontname)
                 rewrapped_lines = []
                 rewrap_count = 0
                 
@@ -2241,34 +2072,19 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                     else:
                         # Line overflows - re-wrap it
                         rewrap_count += 1
-                        print(f"🔍 [SCOPE HORIZONTAL] Re-wrapping line {line_idx + 1}: '{line[:40]}...' (width: {line_width:.1f}pt > {rect.width:.1f}pt)")
-                        
-                        words = line.split()
-                        current_line = ""
-                        
-                        for word in words:
-                            test_line = current_line + (" " if current_line else "") + word
-                            test_width = font_obj.text_length(test_line, font_size)
-                            
-                            if test_width <= rect.width:
-                                current_line = test_line
-                            else:
-                                if current_line:
-                                    rewrapped_lines.append(current_line)
-                                current_line = word
+                        logger.debug("🔍 [SCOPE HORIZONTAL] Re-wrapping line %s: '%s...' (width: %.1fpt > %.1fpt)", line_idx + 1, line[:40], line_width, rect.width)
                         
-                        if current_line:
-                            rewrapped_lines.append(current_line)
+                        rewrapped_lines.extend(WordWrapper(line, fontname).wrap(font_size, rect.width))
                 
                 # Update lines with re-wrapped content
                 original_line_count = len(lines)
                 lines = rewrapped_lines
                 new_line_count = len(lines)
                 
-                print(f"✅ [SCOPE HORIZONTAL] Re-wrapping complete: {original_line_count} → {new_line_count} lines ({rewrap_count} lines re-wrapped)")
+                logger.debug("✅ [SCOPE HORIZONTAL] Re-wrapping complete: %s → %s lines (%s lines re-wrapped)", original_line_count, new_line_count, rewrap_count)
             
             # Calculate final total height for overflow checking
-            if original_template_type in ["large", "large_eco", "large_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+            if geometry.scope_spacing == "tight":
                 line_height = font_size * 1.1
             else:
                 line_height = font_size * 1.2
@@ -2300,6 +2116,14 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                     lines = lines[:max_lines]
 
 
+            layout_report["Scope"] = {
+                "font_size": font_size,
+                "lines": len(lines),
+                "layout": scope_layout,
+                "overflow": total_height > rect.height,
+                "adjustments": {"font_size": scope_font_size_adjustment, "position": scope_adjustment, "force_font_size": force_font_size},
+            }
+
             # ✅ ENHANCED: Use optimized lines from font calculation
             # Replace all asterisks with bullet points for display in the optimized lines
             optimized_lines = []
@@ -2307,7 +2131,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                 if line:  # Non-empty line
                     display_line = line.replace('*', '•')
                     if line != display_line:
-                        print(f"🔄 [SOFTCOPY BULLET] Replaced '{line}' with '{display_line}'")
+                        logger.debug("🔄 [SOFTCOPY BULLET] Replaced '%s' with '%s'", line, display_line)
                     optimized_lines.append(display_line)
                 else:
                     optimized_lines.append(line)  # Preserve empty lines
@@ -2317,13 +2141,13 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
 
             # Calculate total height and position vertically based on template type
             # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
-            if original_template_type in ["large", "large_eco", "large_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+            if geometry.scope_spacing == "tight":
                 line_height = font_size * 1.1  # Tight spacing for large/logo templates
             else:  # standard templates
                 line_height = font_size * 1.2  # Loose spacing for standard templates
             total_height = len(lines) * line_height
             
-            if original_template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+            if geometry.scope_alignment == "top":
                 # Large/Logo template: start from top with no margin + Excel adjustment
                 start_y = rect.y0 + scope_adjustment
                 
@@ -2344,10 +2168,10 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                 if has_line_breaks:
                     # If explicit line breaks, hard-code 7pt top offset + Excel adjustment
                     start_y = rect.y0 + 7 + scope_adjustment
-                    print(f"🔍 [SOFTCOPY DEBUG] Line breaks detected: start_y = {rect.y0} + 7 + {scope_adjustment} = {start_y}")
+                    logger.debug("🔍 [SOFTCOPY DEBUG] Line breaks detected: start_y = %s + 7 + %s = %s", rect.y0, scope_adjustment, start_y)
                 else:
                     # No line breaks - use calculated position
-                    print(f"🔍 [SOFTCOPY DEBUG] No line breaks: start_y = {start_y}")
+                    logger.debug("🔍 [SOFTCOPY DEBUG] No line breaks: start_y = %s", start_y)
 
            
 
@@ -2365,7 +2189,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
             bullet_char_width = 0
             longest_bullet_line = None
             longest_word_count = 0
-            font_obj = fitz.Font(fontname=fontname)
+            font_obj = get_font(fontname=fontname)
             
             # Find the longest bullet line by word count
             for line in lines:
@@ -2388,17 +2212,18 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                 # Use the leftmost coordinate from centering the longest line
                 bullet_left_coord = centered_leftmost
                 
-                print(f"🔍 [SOFTCOPY BULLET] Longest bullet line: '{longest_bullet_line[:50]}...' ({longest_word_count} words)")
-                print(f"🔍 [SOFTCOPY BULLET] Longest line width: {longest_line_width:.1f}pt")
-                print(f"🔍 [SOFTCOPY BULLET] Centered leftmost coordinate: {centered_leftmost:.1f}pt")
-                print(f"🔍 [SOFTCOPY BULLET] All bullets will align to: {bullet_left_coord:.1f}pt")
+                logger.debug("🔍 [SOFTCOPY BULLET] Longest bullet line: '%s...' (%s words)", longest_bullet_line[:50], longest_word_count)
+                logger.debug("🔍 [SOFTCOPY BULLET] Longest line width: %.1fpt", longest_line_width)
+                logger.debug("🔍 [SOFTCOPY BULLET] Centered leftmost coordinate: %.1fpt", centered_leftmost)
+                logger.debug("🔍 [SOFTCOPY BULLET] All bullets will align to: %.1fpt", bullet_left_coord)
             else:
                 bullet_left_coord = rect.x0 + bullet_char_width
-                print(f"🔍 [SOFTCOPY BULLET] No bullets found, using default left coordinate: {bullet_left_coord:.1f}pt")
+                logger.debug("🔍 [SOFTCOPY BULLET] No bullets found, using default left coordinate: %.1fpt", bullet_left_coord)
             
-            print(f"🔍 [SCOPE BULLETS] Total lines: {len(lines)}")
-            print(f"🔍 [SCOPE BULLETS] Bullet lines detected: {sum(1 for l in lines if is_bullet_line(l))}")
-            print(f"🔍 [SCOPE BULLETS] Non-bullet lines: {sum(1 for l in lines if not is_bullet_line(l) and l.strip())}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("🔍 [SCOPE BULLETS] Total lines: %s", len(lines))
+                logger.debug("🔍 [SCOPE BULLETS] Bullet lines detected: %s", sum(1 for l in lines if is_bullet_line(l)))
+                logger.debug("🔍 [SCOPE BULLETS] Non-bullet lines: %s", sum(1 for l in lines if not is_bullet_line(l) and l.strip()))
             
             # ✅ SIMPLIFIED: Scope rendering with consistent centering
             current_y = start_y
@@ -2431,7 +2256,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                                    fontsize=bullet_font_size, fontname=fontname, color=color)
                     
                     # Calculate position for text after bullet
-                    font_obj = fitz.Font(fontname=fontname)
+                    font_obj = get_font(fontname=fontname)
                     bullet_width = font_obj.text_length(first_word + " ", bullet_font_size)
                     text_start_x = start_x + bullet_width
                     
@@ -2440,7 +2265,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                         safe_insert_text(page, (text_start_x, current_y), rest_of_text, 
                                        fontsize=font_size, fontname=fontname, color=color)
                     
-                    print(f"🔍 [SOFTCOPY BULLET] Line {i+1} left-aligned to {start_x:.1f}pt: '{first_word}' ({bullet_font_size:.1f}pt) + '{rest_of_text[:30]}...' ({font_size}pt)")
+                    logger.debug("🔍 [SOFTCOPY BULLET] Line %s left-aligned to %.1fpt: '%s' (%.1fpt) + '%s...' (%spt)", i + 1, start_x, first_word, bullet_font_size, rest_of_text[:30], font_size)
                 elif is_last_line:
                     # ✅ LAST LINE: Center align for balanced appearance
                     center_x = (rect.x0 + rect.x1) / 2
@@ -2452,14 +2277,14 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                         total_width = 0
                         for segment_text, _, _ in segments:
                             if segment_text:
-                                font_obj = fitz.Font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
+                                font_obj = get_font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
                                 total_width += font_obj.text_length(segment_text, font_size)
                         
                         start_x = center_x - total_width / 2
                         render_mixed_format_text(page, (start_x, current_y), line, font_size, color)
                     else:
                         # Standard rendering for non-bold text
-                        font_obj = fitz.Font(fontname=fontname)
+                        font_obj = get_font(fontname=fontname)
                         text_width = font_obj.text_length(line, font_size)
                         start_x = center_x - text_width / 2
                         
@@ -2482,14 +2307,14 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                         total_width = 0
                         for segment_text, _, _ in segments:
                             if segment_text:
-                                font_obj = fitz.Font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
+                                font_obj = get_font(fontname="Times-Bold" if "**" in segment_text or "__" in segment_text else "Times-Roman")
                                 total_width += font_obj.text_length(segment_text, font_size)
                         
                         start_x = center_x - total_width / 2
                         render_mixed_format_text(page, (start_x, current_y), line, font_size, color)
                     else:
                         # Standard rendering for non-bold text
-                        font_obj = fitz.Font(fontname=fontname)
+                        font_obj = get_font(fontname=fontname)
                         text_width = font_obj.text_length(line, font_size)
                         start_x = center_x - text_width / 2
                         safe_insert_text(
@@ -2503,13 +2328,13 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                 
                 # Update current_y consistently for all lines
                 # Template-specific line spacing: 1.1 for large/logo, 1.2 for standard
-                if original_template_type in ["large", "large_eco", "large_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]:
+                if geometry.scope_spacing == "tight":
                     current_y += font_size * 1.1  # Tight spacing for large/logo templates
                 else:  # standard templates
                     current_y += font_size * 1.2  # Loose spacing for standard templates
 
             # Print font size for Scope
-            print(f"📏 [SOFTCOPY] Scope: {font_size}pt")
+            logger.debug("📏 [SOFTCOPY] Scope: %spt", font_size)
 
     # Render optional fields with dynamic positioning
     optional_fields_result = render_optional_fields(
@@ -2523,9 +2348,9 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
     # ✅ ADDED: Extract Issue Date coordinates for dynamic revision positioning
     issue_date_coords = optional_fields_result.get("issue_date_coords")
     if issue_date_coords:
-        print(f"🔍 [DYNAMIC] Retrieved Issue Date coordinates: {issue_date_coords}")
+        logger.debug("🔍 [DYNAMIC] Retrieved Issue Date coordinates: %s", issue_date_coords)
     else:
-        print(f"⚠️ [DYNAMIC] Issue Date coordinates not found - using fallback")
+        logger.warning("⚠️ [DYNAMIC] Issue Date coordinates not found - using fallback")
 
     # ✅ ADDED: Shared Logo Functions for Phase 5
     def insert_logo_into_pdf(page, logo_file, logo_rect):
@@ -2534,65 +2359,57 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
         """
         try:
             # Convert logo file to image
-            logo_image = convert_file_to_image(logo_file)
+            logo_data = read_logo_file_bytes(logo_file)
             
             # Use smart positioning logic
-            insert_logo_with_smart_positioning(page, logo_image, logo_rect)
+            insert_logo_with_smart_positioning(page, logo_data, logo_rect)
             
-            print(f"✅ [LOGO] Logo inserted successfully: {logo_file.filename if hasattr(logo_file, 'filename') else 'unknown'}")
+            logger.debug("✅ [LOGO] Logo inserted successfully: %s", logo_file.filename if hasattr(logo_file, 'filename') else 'unknown')
         except Exception as e:
-            print(f"❌ [LOGO] Failed to insert logo: {e}")
+            logger.error("❌ [LOGO] Failed to insert logo: %s", e)
 
-    def convert_file_to_image(file):
+    def read_logo_file_bytes(file):
         """
-        Convert uploaded file to PIL Image
+        Read the raw bytes of an uploaded logo file
         """
         try:
-            from PIL import Image
-            import io
-            
             if hasattr(file, 'file'):
                 # Reset file pointer
                 file.file.seek(0)
                 # Read file content
-                file_content = file.file.read()
-                # Convert to PIL Image
-                logo_image = Image.open(io.BytesIO(file_content))
-                return logo_image
+                return file.file.read()
             else:
                 raise ValueError("File object has no file attribute")
         except Exception as e:
-            print(f"❌ [LOGO] Error converting file to image: {e}")
+            logger.error("❌ [LOGO] Error reading logo file: %s", e)
             raise
 
-    def insert_logo_with_smart_positioning(page, logo_image, logo_rect):
+    def insert_logo_with_smart_positioning(page, logo_data, logo_rect):
         """
         Smart logo insertion that handles different aspect ratios
         """
         try:
-            # Convert PIL Image to bytes for PyMuPDF
-            img_byte_arr = io.BytesIO()
-            logo_image.save(img_byte_arr, format='PNG')
-            img_byte_arr = img_byte_arr.getvalue()
+            # ✅ UPDATED: PNG bytes come from logo_cache - decoded and re-encoded once per logo and rect
+            prepared = logo_cache.prepare(logo_data, logo_rect, fit=False)
             
             # Insert logo into PDF at specified coordinates
-            page.insert_image(logo_rect, stream=img_byte_arr)
-            print(f"🔍 [SOFTCOPY] Logo inserted successfully at coordinates: {logo_rect}")
+            page.insert_image(prepared.rect, stream=prepared.image_bytes)
+            logger.debug("🔍 [SOFTCOPY] Logo inserted successfully at coordinates: %s", logo_rect)
         except Exception as e:
-            print(f"❌ [SOFTCOPY] Error inserting logo: {e}")
+            logger.error("❌ [SOFTCOPY] Error inserting logo: %s", e)
 
     # ✅ UPDATED: Insert logo if available and using any logo template type
-    if logo_image and template_type.startswith("logo"):
+    if logo_data and template_type.startswith("logo") and not dry_run:
         try:
-            # Get logo coordinates from logo_coords
-            logo_rect = logo_coords.get("logo")
+            # Logo area from the template geometry
+            logo_rect = geometry.logo
             if logo_rect:
                 # Use the new shared logo function
-                insert_logo_with_smart_positioning(page, logo_image, logo_rect)
+                insert_logo_with_smart_positioning(page, logo_data, logo_rect)
             else:
-                print("⚠️ [SOFTCOPY] Logo coordinates not found in logo_coords")
+                logger.warning("⚠️ [SOFTCOPY] Logo coordinates not found in template geometry")
         except Exception as logo_insert_error:
-            print(f"❌ [SOFTCOPY] Error inserting logo: {logo_insert_error}")
+            logger.error("❌ [SOFTCOPY] Error inserting logo: %s", logo_insert_error)
 
     # ✅ ADDED: Render Revision field with dynamic positioning
     if revision and revision.strip():
@@ -2602,12 +2419,12 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                 # Use dynamic coordinates based on actual Issue Date position
                 revision_x = 446  # Keep same X coordinates as before
                 revision_y = issue_date_coords.y0  # Use Issue Date Y position
-                print(f"🔍 [DYNAMIC] Using dynamic revision coordinates: ({revision_x}, {revision_y})")
+                logger.debug("🔍 [DYNAMIC] Using dynamic revision coordinates: (%s, %s)", revision_x, revision_y)
             else:
                 # Fallback to static coordinates
                 revision_x = revision_coordinates.x0
                 revision_y = revision_coordinates.y0
-                print(f"🔍 [DYNAMIC] Using fallback revision coordinates: ({revision_x}, {revision_y})")
+                logger.debug("🔍 [DYNAMIC] Using fallback revision coordinates: (%s, %s)", revision_x, revision_y)
             
             # Insert revision text at specified coordinates
             safe_insert_text(
@@ -2618,11 +2435,11 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                 fontname=revision_font_settings["fontname"],
                 color=revision_font_settings["color"]
             )
-            print(f"✅ [DYNAMIC] Revision field rendered successfully at ({revision_x}, {revision_y})")
+            logger.debug("✅ [DYNAMIC] Revision field rendered successfully at (%s, %s)", revision_x, revision_y)
         except Exception as e:
-            print(f"⚠️ [SOFTCOPY] Warning: Could not render Revision field: {e}")
+            logger.warning("⚠️ [SOFTCOPY] Warning: Could not render Revision field: %s", e)
     else:
-        print(f"🔍 [SOFTCOPY] No Revision field to render (empty or missing)")
+        logger.debug("🔍 [SOFTCOPY] No Revision field to render (empty or missing)")
 
     # Success message with optional fields summary
     optional_fields_list = [
@@ -2640,11 +2457,11 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
     # ✅ ADDED: Process Extra Line field
     extra_line_text = values.get("Extra Line", "").strip()
     if extra_line_text:
-        print(f"🔍 [SOFTCOPY] Processing Extra Line: '{extra_line_text}'")
+        logger.debug("🔍 [SOFTCOPY] Processing Extra Line: '%s'", extra_line_text)
         
         # Calculate Extra Line position (0pt gap below scope)
         # Use the same scope_rect that was used for scope rendering
-        if template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other"]:
+        if geometry.extra_line_scope == "fixed":
             scope_rect = coords["Scope"]  # Single rectangle for large templates
         else:
             # For standard/logo templates, use the stored original coordinates
@@ -2679,7 +2496,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
             else:
                 # Center-aligned bold text rendering
                 center_x = (extra_line_rect.x0 + extra_line_rect.x1) / 2
-                font_obj = fitz.Font(fontname="Times-Bold")
+                font_obj = get_font(fontname="Times-Bold")
                 text_width = font_obj.text_length(extra_line_text, 12)
                 start_x = center_x - text_width / 2
                 
@@ -2692,14 +2509,14 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
                     color=(0, 0, 0)
                 )
             
-            print(f"🔍 [SOFTCOPY] Extra Line rendered at: {extra_line_rect}")
+            logger.debug("🔍 [SOFTCOPY] Extra Line rendered at: %s", extra_line_rect)
         except Exception as extra_line_error:
-            print(f"❌ [SOFTCOPY] Error rendering Extra Line: {extra_line_error}")
-            print(f"🔍 [SOFTCOPY] Extra Line coordinates: {extra_line_rect}")
-            print(f"🔍 [SOFTCOPY] Extra Line text: '{extra_line_text}'")
+            logger.error("❌ [SOFTCOPY] Error rendering Extra Line: %s", extra_line_error)
+            logger.debug("🔍 [SOFTCOPY] Extra Line coordinates: %s", extra_line_rect)
+            logger.debug("🔍 [SOFTCOPY] Extra Line text: '%s'", extra_line_text)
             # Continue without Extra Line rather than failing completely
     else:
-        print(f"🔍 [SOFTCOPY] No Extra Line - skipping")
+        logger.debug("🔍 [SOFTCOPY] No Extra Line - skipping")
     
     # Generate and add QR code with certification information
     
@@ -2740,7 +2557,7 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
         
         for field in surveillance_group_fields:
             if field in values and values[field]:
-                print(f"🔍 [SOFTCOPY] QR Code using surveillance field: '{field}' = '{values[field]}'")
+                logger.debug("🔍 [SOFTCOPY] QR Code using surveillance field: '%s' = '%s'", field, values[field])
                 return values[field]
         return ""
     
@@ -2758,58 +2575,85 @@ def generate_softcopy(base_pdf_path: str, output_pdf_path: str, values: Dict[str
     # ✅ ADDED: Log the formatted dates for debugging
     
     
-    try:
-        # Generate QR code with larger size for better space utilization
-        qr_image = generate_certification_qr_code(cert_data, size=400)
-        
-        # Debug: Show what data is being encoded
-        qr_text = "\n".join([f"{key}: {value}" for key, value in cert_data.items() if value])
+    # ✅ UPDATED: Dry runs only fit text - no QR code
+    if not dry_run:
+        try:
+            # ✅ UPDATED: Vector QR by default; raster PNG only when QR_RENDER_MODE=raster
+            if QR_RENDER_MODE == "raster":
+                # Generate QR code with larger size for better space utilization
+                qr_image = generate_certification_qr_code(cert_data, size=400)
+            else:
+                qr_matrix = generate_certification_qr_matrix(cert_data)
         
+            # Debug: Show what data is being encoded
+            qr_text = "\n".join([f"{key}: {value}" for key, value in cert_data.items() if value])
         
-        # ✅ ADDED: Static QR code coordinates - same for all templates of same type
         
-        # ✅ UPDATED: Large template QR code coordinates (all large templates use same position)
-        if original_template_type in ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other"]:
-            qr_x = 488.7  # Same X position for all large templates
-            qr_y = 541    # Updated Y position for all large templates (moved up by 20pt)
-            qr_width = 78.7   # Same width for all large templates
-            qr_height = 74    # Same height for all large templates
-        else:  # standard/logo template (all standard and logo templates use same position)
-            # ✅ UPDATED: Standard template QR code coordinates (all standard/logo templates use same position)
-            qr_x = 488.7  # Same X position for all standard/logo templates
-            qr_y = 514    # Same Y position for all standard/logo templates
-            qr_width = 78.7   # Same width for all standard/logo templates
-            qr_height = 74    # Same height for all standard/logo templates
+            # ✅ UPDATED: Static QR code position from the template geometry (one per family)
+            qr_x, qr_y, qr_width, qr_height = geometry.qr
         
-        print(f"🔍 [QR CODE] Static positioning - Template type: {original_template_type}, QR code at ({qr_x}, {qr_y})")
+            logger.debug("🔍 [QR CODE] Static positioning - Template type: %s, QR code at (%s, %s)", original_template_type, qr_x, qr_y)
         
-        # Add QR code to PDF at template-specific coordinates
-        add_qr_code_to_pdf(
-            pdf_document=doc,
-            qr_image=qr_image,
-            x=qr_x,
-            y=qr_y,
-            width=qr_width,
-            height=qr_height
-        )
+            # Add QR code to PDF at template-specific coordinates
+            if QR_RENDER_MODE == "raster":
+                add_qr_code_to_pdf(
+                    pdf_document=doc,
+                    qr_image=qr_image,
+                    x=qr_x,
+                    y=qr_y,
+                    width=qr_width,
+                    height=qr_height
+                )
+            else:
+                add_qr_code_vector_to_pdf(
+                    pdf_document=doc,
+                    qr_matrix=qr_matrix,
+                    x=qr_x,
+                    y=qr_y,
+                    width=qr_width,
+                    height=qr_height
+                )
         
         
         
-    except Exception as e:
-        print(f"⚠️ [SOFTCOPY] Warning: Could not add QR code: {e}")
-        print(f"⚠️ [SOFTCOPY] PDF will be generated without QR code")
+        except Exception as e:
+            logger.warning("⚠️ [SOFTCOPY] Warning: Could not add QR code: %s", e)
+            logger.warning("⚠️ [SOFTCOPY] PDF will be generated without QR code")
+
+    if dry_run:
+        doc.close()
+        logger.debug("✅ [SOFTCOPY] Layout check complete (%s fields laid out)", len(layout_report))
+        return {
+            "success": True,
+            "output_path": None,
+            "overflow_warnings": overflow_warnings,
+            "template_type": template_type,
+            "layout": layout_report
+        }
 
-    doc.save(output_pdf_path)
+    # ✅ UPDATED: Save with the output profile (web: subset fonts, compressed, object streams)
+    save_profile = resolve_save_profile(save_profile, mode)
+    pdf_bytes = None
+    if output_pdf_path is None:
+        # ✅ ADDED: In-memory render - serialise straight to bytes
+        pdf_bytes = serialize_pdf(doc, save_profile)
+        output_size = len(pdf_bytes)
+    else:
+        output_size = save_pdf(doc, output_pdf_path, save_profile)
     doc.close()
     
-    print(f"✅ [SOFTCOPY] Soft copy PDF generated successfully: {output_pdf_path}")
+    logger.info("✅ [SOFTCOPY] Soft copy PDF generated successfully: %s (%s bytes, %s profile)", output_pdf_path or "in memory", output_size, save_profile)
     
     # Return tracking information
     return {
         "success": True,
         "output_path": output_pdf_path,
+        "pdf": pdf_bytes,
         "overflow_warnings": overflow_warnings,
-        "template_type": template_type
+        "template_type": template_type,
+        "layout": layout_report,
+        "output_size": output_size,
+        "save_profile": save_profile
     }
 
 
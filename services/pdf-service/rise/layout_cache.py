@@ -0,0 +1,107 @@
+"""
+Per-process memo of text layout results.
+
+A record is usually rendered several times in a row (draft certificate, soft copy,
+printable), and each render fits the same company name, address, ISO standard and scope
+text into the same rectangles with the same fonts. Fit results (chosen font size, wrapped
+lines, heights) are memoised here, keyed by everything the fit depends on, so the later
+renders of a record skip the measuring and wrapping entirely.
+
+Keys hold the text exactly as the renderers pass it to the fitting code (after their own
+cleanup and line splitting), the rectangle, the font, the line-spacing family of the
+template and the fit parameters. User adjustments (font size offsets, position shifts) are
+applied on top of the cached fit, so they are only part of a key where they change what is
+being fitted.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+def rect_key(rect) -> tuple:
+    """Exact (x0, y0, x1, y1) of a fitz.Rect, usable in a cache key."""
+    return (rect.x0, rect.y0, rect.x1, rect.y1)
+
+
+def layout_key(kind: str, text, rect, fontname: str, family: str | None = None, *params) -> tuple:
+    """
+    Build a layout cache key.
+
+    Args:
+        kind: Which fit this is (e.g. "lines", "company", "address"); results of different
+            fitting code never share entries
+        text: Text being fitted (a string, or a list of pre-split lines)
+        rect: Target rectangle (fitz.Rect)
+        fontname: Font used for measuring
+        family: Line-spacing family that affects the fit ("tight"/"loose", from the template geometry), if any
+        *params: Remaining fit inputs (start size, minimum size, limits...)
+
+    Returns:
+        tuple: Hashable key
+    """
+    if isinstance(text, list):
+        text = tuple(text)
+    return (kind, text, rect_key(rect), fontname, family, *params)
+
+
+class LayoutCache:
+    """Thread-safe LRU of layout results, bounded by entry count."""
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Args:
+            max_entries: Maximum number of layout results kept (0 disables the cache)
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def memoize(self, key: tuple, compute):
+        """
+        Return the cached result for key, calling compute() only on a miss.
+
+        Results must be immutable (tuples, numbers, strings) since they are shared
+        between renders.
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Fit outside the lock so other renders are not held up
+        result = compute()
+
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = result
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Cache counters for health/diagnostic endpoints."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Process-wide cache shared by soft copy, printable and certificate rendering
+layout_cache = LayoutCache(max_entries=int(os.getenv("LAYOUT_CACHE_SIZE", "4096")))
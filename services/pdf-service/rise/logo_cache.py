@@ -0,0 +1,158 @@
+"""
+Per-process cache of prepared logo images.
+
+Placing a logo means decoding the upload with PIL, working out the aspect-fit placement
+inside the template's logo rectangle and re-encoding the image as PNG for PyMuPDF.
+Repeated certificates for the same client use the same logo in the same rectangle, so the
+prepared result is cached by (content hash, target rect, fit mode) and later renders go
+straight to page.insert_image.
+"""
+
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+import fitz
+
+
+class PreparedLogo:
+    """PNG bytes ready for page.insert_image plus the rectangle to place them in."""
+
+    __slots__ = ("image_bytes", "placement", "width", "height")
+
+    def __init__(self, image_bytes: bytes, placement: tuple, width: int, height: int):
+        self.image_bytes = image_bytes
+        self.placement = placement  # (x0, y0, x1, y1)
+        self.width = width
+        self.height = height
+
+    @property
+    def rect(self) -> fitz.Rect:
+        return fitz.Rect(self.placement)
+
+
+def fit_logo_placement(logo_width: int, logo_height: int, logo_rect) -> tuple:
+    """
+    Aspect-fit a logo inside a rectangle, centred along the axis with spare room.
+
+    Args:
+        logo_width: Logo width in pixels
+        logo_height: Logo height in pixels
+        logo_rect: Target rectangle (fitz.Rect)
+
+    Returns:
+        tuple: (x0, y0, x1, y1) of the placed logo
+    """
+    logo_aspect = logo_width / logo_height
+    rect_aspect = logo_rect.width / logo_rect.height
+
+    if logo_aspect > rect_aspect:
+        # More horizontal than the rectangle: fit width, centre vertically
+        new_width = logo_rect.width
+        new_height = logo_height * (logo_rect.width / logo_width)
+        x = logo_rect.x0
+        y = logo_rect.y0 + (logo_rect.height - new_height) / 2
+    elif logo_aspect < rect_aspect:
+        # More vertical than the rectangle: fit height, centre horizontally
+        new_width = logo_width * (logo_rect.height / logo_height)
+        new_height = logo_rect.height
+        x = logo_rect.x0 + (logo_rect.width - new_width) / 2
+        y = logo_rect.y0
+    else:
+        # Same aspect ratio: scale to fit, centre both ways
+        scale_factor = min(logo_rect.width / logo_width, logo_rect.height / logo_height)
+        new_width = logo_width * scale_factor
+        new_height = logo_height * scale_factor
+        x = logo_rect.x0 + (logo_rect.width - new_width) / 2
+        y = logo_rect.y0 + (logo_rect.height - new_height) / 2
+
+    return (x, y, x + new_width, y + new_height)
+
+
+class LogoCache:
+    """Thread-safe LRU of PreparedLogo entries, bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            max_entries: Maximum number of prepared logos kept
+            max_bytes: Maximum total size of the cached PNG bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def prepare(self, logo_data: bytes, logo_rect, fit: bool = True) -> PreparedLogo:
+        """
+        Return the prepared logo for these bytes and target rectangle, decoding only on a miss.
+
+        Args:
+            logo_data: Raw uploaded logo bytes (any format PIL can read)
+            logo_rect: Target rectangle (fitz.Rect)
+            fit: True to aspect-fit inside the rectangle, False to hand the whole
+                rectangle to insert_image
+
+        Returns:
+            PreparedLogo
+        """
+        digest = hashlib.sha256(logo_data).hexdigest()
+        key = (digest, tuple(round(v, 3) for v in logo_rect), fit)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        # Decode and re-encode outside the lock so other renders are not held up
+        from PIL import Image
+        logo_image = Image.open(io.BytesIO(logo_data))
+        img_buffer = io.BytesIO()
+        logo_image.save(img_buffer, format='PNG')
+        placement = fit_logo_placement(logo_image.width, logo_image.height, logo_rect) if fit else tuple(logo_rect)
+        entry = PreparedLogo(img_buffer.getvalue(), placement, logo_image.width, logo_image.height)
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous.image_bytes)
+            self._entries[key] = entry
+            self._bytes += len(entry.image_bytes)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.image_bytes)
+                self.evictions += 1
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """Cache counters for health/diagnostic endpoints."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+# Process-wide cache shared by soft copy and certificate rendering
+logo_cache = LogoCache(
+    max_entries=int(os.getenv("LOGO_CACHE_SIZE", "256")),
+    max_bytes=int(os.getenv("LOGO_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
@@ -0,0 +1,225 @@
+"""
+Shared PDF document helpers for PDF generation.
+Lets soft copy and certificate generation open templates from a path or from memory,
+lets batch modes clone parsed templates and merge finished certificates, gives
+dry-run layout checks a blank page to lay text out on, and saves rendered PDFs with an
+output profile.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import fitz
+
+logger = logging.getLogger(__name__)
+
+
+def open_template(template_source):
+    """
+    Open a PDF template given a filesystem path, the raw PDF bytes, or an open document.
+
+    Args:
+        template_source: Path to the template, its contents as bytes/bytearray/memoryview,
+            or an already opened fitz.Document
+
+    Returns:
+        fitz.Document: The opened template document
+    """
+    if isinstance(template_source, fitz.Document):
+        # Already opened (e.g. a clone_template copy)
+        return template_source
+    if isinstance(template_source, (bytes, bytearray, memoryview)):
+        # A memoryview (e.g. over a template_store mmap) is read in place, without a copy
+        return fitz.open(stream=template_source, filetype="pdf")
+    return fitz.open(template_source)
+
+
+def open_layout_scratch(width: float = 595, height: float = 842):
+    """
+    Blank one-page document standing in for a template during dry-run layout checks.
+
+    Field positions are absolute, so an empty A4 page takes the same text as the real
+    template without reading or parsing any template PDF.
+
+    Returns:
+        fitz.Document: A new in-memory document with one blank page
+    """
+    doc = fitz.open()
+    doc.new_page(width=width, height=height)
+    return doc
+
+
+# Parsed templates kept per thread (MuPDF documents must not be shared across threads)
+_parsed_templates = threading.local()
+MAX_PARSED_TEMPLATES = 32
+
+
+def clone_template(template_source, key=None):
+    """
+    Return a fresh one-document copy of a template, parsing each template at most once per thread.
+
+    Used by batch renders: the template is parsed the first time it is seen and every further
+    row gets a cheap page clone instead of a full re-parse.
+
+    Args:
+        template_source: Path to the template, or its contents as bytes
+        key: Cache key for the template (defaults to the path, or a hash of the bytes)
+
+    Returns:
+        fitz.Document: A new document holding a copy of the template's pages
+    """
+    if key is None:
+        if isinstance(template_source, (bytes, bytearray, memoryview)):
+            key = hashlib.sha1(template_source).hexdigest()
+        else:
+            key = template_source
+
+    cache = getattr(_parsed_templates, "documents", None)
+    if cache is None:
+        cache = _parsed_templates.documents = OrderedDict()
+
+    parsed = cache.get(key)
+    if parsed is None:
+        parsed = open_template(template_source)
+        cache[key] = parsed
+        while len(cache) > MAX_PARSED_TEMPLATES:
+            _, evicted = cache.popitem(last=False)
+            evicted.close()
+    else:
+        cache.move_to_end(key)
+
+    doc = fitz.open()
+    doc.insert_pdf(parsed)
+    return doc
+
+
+class PdfMerger:
+    """
+    Builds one PDF from rendered certificates, appended in order.
+
+    A batch appends each row's PDF as it finishes instead of holding every row until the end.
+    The merged document is a MuPDF document like any other: create, fill, serialise and close
+    a merger on one thread.
+    """
+
+    __slots__ = ("document", "pages")
+
+    def __init__(self):
+        self.document = fitz.open()
+        self.pages = 0
+
+    def add(self, pdf_content: bytes):
+        """Append a rendered PDF's pages."""
+        with fitz.open(stream=pdf_content, filetype="pdf") as parsed:
+            self.document.insert_pdf(parsed)
+        self.pages = self.document.page_count
+
+    def tobytes(self, profile: str) -> bytes:
+        """Serialise the merged document with an output profile (see serialize_pdf)."""
+        # Every row carries its own copy of the template's fonts and images - always merge
+        # identical objects so the batch holds one copy (lossless under either profile)
+        return serialize_pdf(self.document, profile, dedupe=True)
+
+    def close(self):
+        self.document.close()
+
+
+def merge_pdfs(pdf_documents, profile: str = "print") -> bytes:
+    """
+    Concatenate rendered PDFs into one document, in the order given.
+
+    Args:
+        pdf_documents: Iterable of PDF bytes
+        profile: Output profile for the merged PDF (a key of SAVE_PROFILES)
+
+    Returns:
+        bytes: The merged PDF
+    """
+    merger = PdfMerger()
+    try:
+        for source in pdf_documents:
+            merger.add(source)
+        return merger.tobytes(profile)
+    finally:
+        merger.close()
+
+
+# ✅ ADDED: Output profiles applied when a rendered PDF is saved
+SAVE_PROFILES = {
+    # Smallest file for email and archiving: drop unused and duplicate objects, compress
+    # every stream, subset embedded fonts to the glyphs used and pack objects into streams
+    "web": {
+        "subset_fonts": True,
+        "options": {"garbage": 4, "deflate": True, "deflate_images": True, "deflate_fonts": True, "use_objstms": 1},
+    },
+    # Fidelity first: complete embedded fonts and a classic cross-reference table for print
+    # workflows; only unused objects are dropped and content streams compressed (lossless)
+    "print": {
+        "subset_fonts": False,
+        "options": {"garbage": 1, "deflate": True},
+    },
+}
+
+# Profile used per render kind when the request does not choose one (PDF_SAVE_PROFILE overrides all)
+DEFAULT_SAVE_PROFILES = {"softcopy": "web", "printable": "print", "certificate": "print"}
+
+
+def resolve_save_profile(profile: str | None = None, kind: str = "softcopy") -> str:
+    """
+    Pick the output profile for a render.
+
+    Args:
+        profile: Requested profile name, or None/"" for the default
+        kind: "softcopy", "printable" or "certificate" (selects the default)
+
+    Returns:
+        str: A key of SAVE_PROFILES
+
+    Raises:
+        ValueError: If the profile is unknown
+    """
+    name = (profile or os.getenv("PDF_SAVE_PROFILE", "") or DEFAULT_SAVE_PROFILES.get(kind, "print")).strip().lower()
+    if name not in SAVE_PROFILES:
+        raise ValueError(f"Unknown save profile '{name}' - expected one of {', '.join(SAVE_PROFILES)}")
+    return name
+
+
+def serialize_pdf(doc, profile: str, dedupe: bool = False) -> bytes:
+    """
+    Serialise a rendered document in memory with an output profile.
+
+    Args:
+        doc: The rendered fitz.Document
+        profile: A key of SAVE_PROFILES
+        dedupe: Merge identical objects and streams (garbage=4) whatever the profile says
+
+    Returns:
+        bytes: The PDF
+    """
+    settings = SAVE_PROFILES[profile]
+    if settings["subset_fonts"]:
+        try:
+            doc.subset_fonts()
+        except Exception as e:
+            # Keep the full fonts rather than failing the render
+            logger.warning("⚠️ [PDF] Font subsetting skipped: %s", e)
+    options = settings["options"]
+    if dedupe:
+        options = {**options, "garbage": max(options.get("garbage", 0), 4)}
+    return doc.tobytes(**options)
+
+
+def save_pdf(doc, output_path: str, profile: str) -> int:
+    """
+    Save a rendered document to a file with an output profile (see serialize_pdf).
+
+    Returns:
+        int: Size of the saved PDF in bytes
+    """
+    pdf_bytes = serialize_pdf(doc, profile)
+    with open(output_path, "wb") as pdf_file:
+        pdf_file.write(pdf_bytes)
+    return len(pdf_bytes)
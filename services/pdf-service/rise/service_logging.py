@@ -0,0 +1,189 @@
+"""
+Leveled, non-blocking logging for the PDF service.
+
+Modules log through logging.getLogger(__name__). configure_logging() puts a single
+QueueHandler on the root logger: callers only enqueue the record, and a QueueListener
+thread formats it and writes it to stdout, so a render never waits on terminal or
+container log I/O. When the queue is full, records are dropped (and counted) instead of
+blocking the caller.
+
+Configure with:
+    LOG_LEVEL       Root level (default INFO)
+    LOG_LEVELS      Per-module levels, e.g. "rise.generate_softCopy=DEBUG,main=WARNING"
+    LOG_FORMAT      "text" (default) or "json" (one JSON object per line)
+    LOG_QUEUE_SIZE  Maximum queued records before new ones are dropped (default 10000)
+
+Debug diagnostics are only built when enabled: messages use lazy %-style arguments,
+and expensive diagnostic blocks are guarded with logger.isEnabledFor(logging.DEBUG).
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "pid": record.process,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking or raising."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_levels(spec: str) -> dict:
+    """
+    Parse a LOG_LEVELS spec ("module=LEVEL,module=LEVEL") into {module: level}.
+
+    Raises:
+        ValueError: If an entry is malformed or names an unknown level
+    """
+    levels = {}
+    for entry in (spec or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        name, sep, level = entry.partition("=")
+        level = level.strip().upper()
+        if not sep or not name.strip() or not isinstance(logging.getLevelName(level), int):
+            raise ValueError(f"Invalid LOG_LEVELS entry: '{entry}'")
+        levels[name.strip()] = level
+    return levels
+
+
+class _LoggingState:
+    """The queue, handler and listener installed in this process."""
+
+    __slots__ = ("pid", "handler", "listener", "level", "levels", "log_format")
+
+    def __init__(self, pid: int, handler: DroppingQueueHandler, listener, level: str, levels: dict, log_format: str):
+        self.pid = pid
+        self.handler = handler
+        self.listener = listener
+        self.level = level
+        self.levels = levels
+        self.log_format = log_format
+
+
+_state = None
+_lock = threading.Lock()
+
+
+def configure_logging(level: str | None = None, levels: str | None = None, log_format: str | None = None, stream=None):
+    """
+    Install the queue handler on the root logger (once per process).
+
+    Args:
+        level: Root level; defaults to LOG_LEVEL
+        levels: Per-module levels spec; defaults to LOG_LEVELS
+        log_format: "text" or "json"; defaults to LOG_FORMAT
+        stream: Where the listener writes (defaults to stdout)
+    """
+    global _state
+    with _lock:
+        if _state is not None and _state.pid == os.getpid():
+            return
+
+        level = (level or os.getenv("LOG_LEVEL", "INFO")).strip().upper()
+        module_levels = parse_levels(levels if levels is not None else os.getenv("LOG_LEVELS", ""))
+        log_format = (log_format or os.getenv("LOG_FORMAT", "text")).strip().lower()
+
+        output = logging.StreamHandler(stream or sys.stdout)
+        if log_format == "json":
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter(TEXT_FORMAT))
+
+        log_queue = queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000")))
+        handler = DroppingQueueHandler(log_queue)
+        listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=False)
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            if isinstance(existing, DroppingQueueHandler):
+                root.removeHandler(existing)
+        root.addHandler(handler)
+        root.setLevel(level)
+        for name, module_level in module_levels.items():
+            logging.getLogger(name).setLevel(module_level)
+
+        listener.start()
+        _state = _LoggingState(os.getpid(), handler, listener, level, module_levels, log_format)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _state
+    with _lock:
+        if _state is None or _state.pid != os.getpid():
+            return
+        _state.listener.stop()
+        logging.getLogger().removeHandler(_state.handler)
+        _state = None
+
+
+def _reset_after_fork():
+    # The listener thread does not survive fork; give the child its own queue and listener
+    global _state, _lock
+    _lock = threading.Lock()
+    if _state is not None:
+        levels = ",".join(f"{name}={module_level}" for name, module_level in _state.levels.items())
+        configure_logging(_state.level, levels, _state.log_format)
+
+
+def _pause_before_fork():
+    # Stop (and drain) the listener so no thread is writing to stdout while the process forks
+    if _state is not None and _state.pid == os.getpid():
+        _state.listener.stop()
+
+
+def _resume_after_fork_in_parent():
+    if _state is not None and _state.pid == os.getpid():
+        _state.listener.start()
+
+
+def logging_stats() -> dict:
+    """Logging configuration and queue counters for health/diagnostic endpoints."""
+    if _state is None:
+        return {"configured": False}
+    return {
+        "configured": True,
+        "level": _state.level,
+        "levels": dict(_state.levels),
+        "queued": _state.handler.queue.qsize(),
+        "dropped": _state.handler.dropped,
+    }
+
+
+atexit.register(shutdown_logging)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=_pause_before_fork, after_in_parent=_resume_after_fork_in_parent,
+                        after_in_child=_reset_after_fork)
@@ -0,0 +1,407 @@
+"""
+Declarative geometry for the certificate templates.
+
+Every position the renderers draw at - field rectangles, the scope boxes, the optional
+field rows, the revision slot, the QR code, the logo area - is declared once here per
+template family (standard, large, logo). How each renderer maps a template_type onto
+those families and onto its layout rules (company/address split, line spacing, scope
+alignment...) is declared per mode in MODE_SPECS.
+
+At import the spec is compiled into one immutable TemplateGeometry record per
+(template_type, mode) and validated, so a render does a single dict lookup instead of
+rebuilding fitz.Rect tables and testing membership in long lists of template types.
+
+The template groups are kept exactly as each renderer has always used them, including
+where the soft copy and certificate renderers differ (e.g. "large_other_nonaccredited"
+vs "large_nonaccredited_other").
+"""
+
+import threading
+from types import MappingProxyType
+
+import fitz
+
+# A4 portrait in points - every declared rectangle must lie on the page
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+
+# --- Template type groups (as tested by the renderers) ---
+STANDARD_TYPES = ("standard", "standard_eco", "standard_nonaccredited", "standard_other", "standard_other_eco", "standard_nonaccredited_other")
+LARGE_TYPES = ("large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other")
+LOGO_TYPES = ("logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited")
+
+CERTIFICATE_STANDARD_TYPES = ("standard", "standard_eco", "standard_nonaccredited")
+CERTIFICATE_LARGE_TYPES = ("large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_nonaccredited_other")
+CERTIFICATE_LOGO_TYPES = ("logo", "logo_nonaccredited", "logo_other", "logo_nonaccredited_other")
+
+# Templates whose address block and certificate scope use tight (1.1) line spacing
+TIGHT_ADDRESS_TYPES = CERTIFICATE_LARGE_TYPES + LOGO_TYPES
+# Templates whose soft copy scope uses tight (1.1) line spacing
+SOFTCOPY_TIGHT_SCOPE_TYPES = ("large", "large_eco", "large_nonaccredited") + LOGO_TYPES
+
+# Every template type the service selects (records are compiled for these up front)
+KNOWN_TEMPLATE_TYPES = tuple(dict.fromkeys(
+    STANDARD_TYPES + ("standard_other_nonaccredited",) + LARGE_TYPES + LOGO_TYPES + CERTIFICATE_LOGO_TYPES
+))
+
+# --- Family geometry: (x0, y0, x1, y1) in points ---
+STANDARD_OPTIONAL_KEYS = (
+    (175.5, 499.1, 343, 509.1),    # Row 1: Certificate Number
+    (175.5, 516.9, 343, 526.9),    # Row 2: Initial Registration Date
+    (175.5, 535.1, 343, 545.1),    # Row 3: Original Issue Date
+    (175.5, 553.9, 343, 563.9),    # Row 4: Issue Date
+    (175.5, 571.6, 343, 581.6),    # Row 5: Surveillance Group (only 1 field present)
+    (175.5, 589.3, 343, 599.3),    # Row 6: Recertification Date
+)
+STANDARD_OPTIONAL_VALUES = (
+    (362.1, 499.1, 446.4, 509.1),
+    (362.1, 516.9, 446.4, 526.9),
+    (362.1, 535.1, 446.4, 545.1),
+    (362.1, 553.9, 446.4, 563.9),
+    (362.1, 571.6, 446.4, 581.6),
+    (362.1, 589.3, 446.4, 599.3),
+)
+LARGE_OPTIONAL_KEYS = (
+    (175.5, 522, 343, 530),
+    (175.5, 538, 343, 548),
+    (175.5, 556, 343, 566),
+    (175.5, 574, 343, 584),
+    (175.5, 592, 343, 602),
+    (175.5, 610, 343, 620),
+)
+LARGE_OPTIONAL_VALUES = (
+    (362.1, 522, 446.4, 530),
+    (362.1, 538, 446.4, 548),
+    (362.1, 556, 446.4, 566),
+    (362.1, 574, 446.4, 584),
+    (362.1, 592, 446.4, 602),
+    (362.1, 610, 446.4, 620),
+)
+
+FAMILY_SPECS = {
+    "standard": {
+        "fields": {
+            "management_system": (87.9, 185, 580, 226.6),
+            "Company Name and Address": (87.9, 239, 580, 315),
+            "ISO Standard": (194.9, 334, 460.3, 370),
+            "Scope": {
+                "short": (87.9, 386, 580, 475),    # <24 lines
+                "long": (87.9, 373, 580, 486),     # 24-30 lines
+            },
+        },
+        "optional_keys": STANDARD_OPTIONAL_KEYS,
+        "optional_values": STANDARD_OPTIONAL_VALUES,
+        "qr": (488.7, 514, 78.7, 74),  # x, y, width, height
+    },
+    "large": {
+        "fields": {
+            "management_system": (87.9, 185, 580, 226.6),
+            "Company Name and Address": (87.9, 229, 580, 295),
+            "ISO Standard": (194.9, 300, 460.3, 336),
+            "Scope": (85, 354, 577, 536),          # >30 lines
+        },
+        # Scope when an Initial Registration Date row takes space from it
+        "initial_registration_scope": {
+            "softcopy": (85, 354, 577, 520),
+            "certificate": (85, 351, 577, 520),
+        },
+        "optional_keys": LARGE_OPTIONAL_KEYS,
+        "optional_values": LARGE_OPTIONAL_VALUES,
+        "qr": (488.7, 541, 78.7, 74),
+    },
+    "logo": {
+        "fields": {
+            "management_system": (87.9, 175, 580, 216.6),
+            "logo": (87.9, 206.6, 580, 242.6),     # Below management_system, above company name
+            "Company Name and Address": (87.9, 262.6, 580, 355),
+            "ISO Standard": (194.9, 334, 460.3, 370),
+            "Scope": {
+                "short": (87.9, 386, 580, 475),
+                "long": (87.9, 373, 580, 486),
+            },
+        },
+        "optional_keys": STANDARD_OPTIONAL_KEYS,
+        "optional_values": STANDARD_OPTIONAL_VALUES,
+        "qr": (488.7, 514, 78.7, 74),
+    },
+}
+
+# Revision slot used when no Issue Date row fixes its position
+REVISION_RECTS = {
+    "standard": (446, 553.9, 456, 563.9),
+    "large": (446, 574, 456, 584),
+}
+
+# ISO certification code position by country ("Other" or not) and accreditation
+CERTIFICATION_CODE_RECTS = {
+    "other": (253, 757, 285, 762),
+    "other_nonaccredited": (335, 757, 390, 762),
+    "default": (253, 765, 285, 770),
+    "default_nonaccredited": (330, 765, 385, 770),
+}
+
+# --- Per-mode rules: role -> ({value: template types}, value for any other type) ---
+SOFTCOPY_RULES = {
+    "family": ({"standard": STANDARD_TYPES, "large": LARGE_TYPES, "logo": LOGO_TYPES}, "standard"),
+    "company_block": ({"large": LARGE_TYPES, "standard": STANDARD_TYPES}, "logo"),
+    "scope_fit": ({"fixed": LARGE_TYPES}, "sized"),
+    "address_spacing": ({"tight": TIGHT_ADDRESS_TYPES}, "loose"),
+    "scope_spacing": ({"tight": SOFTCOPY_TIGHT_SCOPE_TYPES}, "loose"),
+    "scope_alignment": ({"top": LARGE_TYPES + LOGO_TYPES}, "centered"),
+    "extra_line_scope": ({"fixed": LARGE_TYPES}, "sized"),
+    "initial_registration": ({"reduced": ("large",)}, None),
+    "revision": ({"standard": ("standard",)}, "large"),
+}
+
+# Printables are drawn by the soft copy renderer on print templates
+RENDERER_FOR_MODE = {"softcopy": "softcopy", "printable": "softcopy", "certificate": "certificate"}
+
+MODE_SPECS = {
+    "softcopy": SOFTCOPY_RULES,
+    "printable": SOFTCOPY_RULES,
+    "certificate": {
+        "family": ({"standard": CERTIFICATE_STANDARD_TYPES, "large": CERTIFICATE_LARGE_TYPES, "logo": CERTIFICATE_LOGO_TYPES}, "standard"),
+        "company_block": ({"large": CERTIFICATE_LARGE_TYPES, "standard": STANDARD_TYPES}, "logo"),
+        "scope_fit": ({"sized": CERTIFICATE_STANDARD_TYPES + CERTIFICATE_LOGO_TYPES}, "fixed"),
+        "address_spacing": ({"tight": TIGHT_ADDRESS_TYPES}, "loose"),
+        "scope_spacing": ({"tight": TIGHT_ADDRESS_TYPES}, "loose"),
+        "scope_alignment": ({"top": TIGHT_ADDRESS_TYPES}, "centered"),
+        "extra_line_scope": ({"fixed": LARGE_TYPES}, "sized"),
+        "initial_registration": ({"reduced": CERTIFICATE_LARGE_TYPES}, None),
+        "revision": ({}, None),
+    },
+}
+
+ROLE_VALUES = {
+    "family": set(FAMILY_SPECS),
+    "company_block": {"standard", "large", "logo"},
+    "scope_fit": {"sized", "fixed"},
+    "address_spacing": {"tight", "loose"},
+    "scope_spacing": {"tight", "loose"},
+    "scope_alignment": {"top", "centered"},
+    "extra_line_scope": {"sized", "fixed"},
+    "initial_registration": {"reduced", None},
+    "revision": set(REVISION_RECTS) | {None},
+}
+REQUIRED_FIELDS = ("management_system", "Company Name and Address", "ISO Standard", "Scope")
+
+
+class TemplateGeometry:
+    """Compiled, read-only geometry and layout rules for one template_type in one mode."""
+
+    __slots__ = (
+        "template_type", "mode", "known", "family", "fields", "optional_keys", "optional_values",
+        "qr", "logo", "revision", "initial_registration_scope", "extra_line_scopes", "certification_codes",
+        "company_block", "scope_fit", "address_spacing", "scope_spacing", "scope_alignment", "extra_line_scope",
+    )
+
+    def __init__(self, **attributes):
+        for name in self.__slots__:
+            object.__setattr__(self, name, attributes[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"TemplateGeometry is read-only (tried to set '{name}')")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"TemplateGeometry is read-only (tried to delete '{name}')")
+
+    def coords(self) -> dict:
+        """Working copy of the field rectangles for one render (renderers narrow "Scope" in place)."""
+        working = dict(self.fields)
+        if not isinstance(working["Scope"], fitz.Rect):
+            working["Scope"] = dict(working["Scope"])
+        return working
+
+    def __repr__(self):
+        return f"TemplateGeometry({self.template_type!r}, {self.mode!r}, family={self.family!r})"
+
+
+def _rect(box, where: str) -> fitz.Rect:
+    if len(box) != 4:
+        raise ValueError(f"Template geometry: {where} must be (x0, y0, x1, y1), got {box!r}")
+    return fitz.Rect(box)
+
+
+def _fields(spec: dict, family: str):
+    fields = {}
+    for name, box in spec.items():
+        if isinstance(box, dict):
+            fields[name] = MappingProxyType({variant: _rect(variant_box, f"{family}.{name}.{variant}") for variant, variant_box in box.items()})
+        else:
+            fields[name] = _rect(box, f"{family}.{name}")
+    return MappingProxyType(fields)
+
+
+def _select(rules: dict, role: str, template_type: str):
+    choices, default = rules[role]
+    for value, members in choices.items():
+        if template_type in members:
+            return value
+    return default
+
+
+class GeometryRegistry:
+    """All compiled TemplateGeometry records, looked up by (template_type, mode)."""
+
+    def __init__(self, family_specs: dict, mode_specs: dict, template_types=KNOWN_TEMPLATE_TYPES):
+        self.family_specs = family_specs
+        self.mode_specs = mode_specs
+        self._families = {
+            family: {
+                "fields": _fields(spec["fields"], family),
+                "optional_keys": tuple(_rect(box, f"{family}.optional_keys") for box in spec["optional_keys"]),
+                "optional_values": tuple(_rect(box, f"{family}.optional_values") for box in spec["optional_values"]),
+                "qr": tuple(spec["qr"]),
+                "initial_registration_scope": {
+                    mode: _rect(box, f"{family}.initial_registration_scope.{mode}")
+                    for mode, box in spec.get("initial_registration_scope", {}).items()
+                },
+            }
+            for family, spec in family_specs.items()
+        }
+        self._revisions = {name: _rect(box, f"revision.{name}") for name, box in REVISION_RECTS.items()}
+        self._certification_codes = MappingProxyType({name: _rect(box, f"certification_code.{name}") for name, box in CERTIFICATION_CODE_RECTS.items()})
+        self._logo = self._families["logo"]["fields"]["logo"]
+        self._extra_line_scopes = MappingProxyType({
+            "short": self._families["standard"]["fields"]["Scope"]["short"],
+            "long": self._families["standard"]["fields"]["Scope"]["long"],
+            "large": self._families["large"]["fields"]["Scope"],
+        })
+        self._known = frozenset(template_types)
+        self._records = {}
+        self._lock = threading.Lock()
+        for mode in mode_specs:
+            for template_type in template_types:
+                self._records[(template_type, mode)] = self._compile(template_type, mode)
+
+    def _compile(self, template_type: str, mode: str) -> TemplateGeometry:
+        rules = self.mode_specs[mode]
+        family = _select(rules, "family", template_type)
+        family_geometry = self._families[family]
+        revision = _select(rules, "revision", template_type)
+        reduced = _select(rules, "initial_registration", template_type) == "reduced"
+        return TemplateGeometry(
+            template_type=template_type,
+            mode=mode,
+            known=template_type in self._known,
+            family=family,
+            fields=family_geometry["fields"],
+            optional_keys=family_geometry["optional_keys"],
+            optional_values=family_geometry["optional_values"],
+            qr=family_geometry["qr"],
+            # Any logo template draws its logo in the logo family's area
+            logo=self._logo if template_type.startswith("logo") else None,
+            revision=self._revisions[revision] if revision else None,
+            initial_registration_scope=family_geometry["initial_registration_scope"].get(RENDERER_FOR_MODE[mode]) if reduced else None,
+            extra_line_scopes=self._extra_line_scopes,
+            certification_codes=self._certification_codes,
+            company_block=_select(rules, "company_block", template_type),
+            scope_fit=_select(rules, "scope_fit", template_type),
+            address_spacing=_select(rules, "address_spacing", template_type),
+            scope_spacing=_select(rules, "scope_spacing", template_type),
+            scope_alignment=_select(rules, "scope_alignment", template_type),
+            extra_line_scope=_select(rules, "extra_line_scope", template_type),
+        )
+
+    def get(self, template_type: str, mode: str = "softcopy") -> TemplateGeometry:
+        """
+        Geometry for a template_type as drawn by the given renderer.
+
+        Args:
+            template_type: Template type chosen by template selection (unknown types get
+                the renderer's fallback geometry, compiled once and kept)
+            mode: "softcopy", "printable" or "certificate"
+
+        Returns:
+            TemplateGeometry: Shared, read-only record
+        """
+        record = self._records.get((template_type, mode))
+        if record is None:
+            if mode not in self.mode_specs:
+                raise ValueError(f"Unknown geometry mode '{mode}' - expected one of {', '.join(self.mode_specs)}")
+            with self._lock:
+                record = self._records.get((template_type, mode))
+                if record is None:
+                    record = self._compile(template_type, mode)
+                    self._records[(template_type, mode)] = record
+        return record
+
+    def validate(self) -> list[str]:
+        """
+        Check the spec: every rule names a declared value, every rectangle is non-empty and
+        on the page, optional key/value rows line up and every family has its fields.
+
+        Returns:
+            list[str]: Problems found (empty when the geometry is valid)
+        """
+        problems = []
+
+        def check_rect(rect, where):
+            if rect.is_empty or rect.x0 < 0 or rect.y0 < 0 or rect.x1 > PAGE_WIDTH or rect.y1 > PAGE_HEIGHT:
+                problems.append(f"{where}: {tuple(rect)} is empty or off the {PAGE_WIDTH}x{PAGE_HEIGHT} page")
+
+        for family, geometry in self._families.items():
+            for name in REQUIRED_FIELDS:
+                if name not in geometry["fields"]:
+                    problems.append(f"{family}: missing field '{name}'")
+            for name, rect in geometry["fields"].items():
+                variants = rect.items() if not isinstance(rect, fitz.Rect) else [(None, rect)]
+                for variant, variant_rect in variants:
+                    check_rect(variant_rect, f"{family}.{name}" + (f".{variant}" if variant else ""))
+            keys, values = geometry["optional_keys"], geometry["optional_values"]
+            if len(keys) != len(values):
+                problems.append(f"{family}: {len(keys)} optional key rows but {len(values)} value rows")
+            for row, (key_rect, value_rect) in enumerate(zip(keys, values), start=1):
+                check_rect(key_rect, f"{family}.optional_keys[{row}]")
+                check_rect(value_rect, f"{family}.optional_values[{row}]")
+                if (key_rect.y0, key_rect.y1) != (value_rect.y0, value_rect.y1) or key_rect.x1 > value_rect.x0:
+                    problems.append(f"{family}: optional row {row} key and value are not side by side")
+            x, y, width, height = geometry["qr"]
+            check_rect(fitz.Rect(x, y, x + width, y + height), f"{family}.qr")
+            for mode, rect in geometry["initial_registration_scope"].items():
+                check_rect(rect, f"{family}.initial_registration_scope.{mode}")
+        for name, rect in {**self._revisions, **self._certification_codes}.items():
+            check_rect(rect, name)
+        if "logo" not in self._families["logo"]["fields"]:
+            problems.append("logo: missing field 'logo'")
+
+        for mode, rules in self.mode_specs.items():
+            for role, allowed in ROLE_VALUES.items():
+                if role not in rules:
+                    problems.append(f"{mode}: no rule for '{role}'")
+                    continue
+                choices, default = rules[role]
+                for value in (*choices, default):
+                    if value not in allowed:
+                        problems.append(f"{mode}.{role}: unknown value {value!r}")
+                seen = {}
+                for value, members in choices.items():
+                    for template_type in members:
+                        if seen.setdefault(template_type, value) != value:
+                            problems.append(f"{mode}.{role}: '{template_type}' is both {seen[template_type]!r} and {value!r}")
+            for template_type in self._known:
+                record = self._records[(template_type, mode)]
+                if _select(rules, "initial_registration", template_type) == "reduced" and record.initial_registration_scope is None:
+                    problems.append(f"{mode}: '{template_type}' reduces its scope but family '{record.family}' declares no reduced scope")
+        return problems
+
+    def stats(self) -> dict:
+        return {"families": len(self._families), "modes": len(self.mode_specs), "records": len(self._records)}
+
+
+def build_registry(family_specs: dict = FAMILY_SPECS, mode_specs: dict = MODE_SPECS) -> GeometryRegistry:
+    """Compile and validate a geometry spec, raising ValueError listing every problem."""
+    registry = GeometryRegistry(family_specs, mode_specs)
+    problems = registry.validate()
+    if problems:
+        raise ValueError("Invalid template geometry:\n  " + "\n  ".join(problems))
+    return registry
+
+
+# Process-wide registry shared by the soft copy, printable and certificate renderers
+geometry_registry = build_registry()
+
+
+def get_geometry(template_type: str, mode: str = "softcopy") -> TemplateGeometry:
+    """Shorthand for geometry_registry.get()."""
+    return geometry_registry.get(template_type, mode)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Equivalence tests for rise.fit_solver and the font calculations built on it.
+
+Each solver is checked against the decrement loop it replaced, written out here with
+fitz.Font measurements exactly as the layout code used to do it, so any change in the
+chosen font size or line breaks shows up as a failure.
+"""
+
+import fitz
+import pytest
+
+from rise.fit_solver import candidate_font_sizes, fit_font_size, fit_single_line
+from rise.font_utils import calculate_optimal_font_size_with_line_breaks, calculate_standard_font_size
+
+FONTNAME = "Times-Roman"
+LARGE_TEMPLATES = ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]
+
+SAMPLE_TEXTS = [
+    "Sample Company Ltd.",
+    "ACME Precision Engineering & Manufacturing Private Limited",
+    "Plot No. 42, Industrial Estate Phase II, Sector 18, Gurugram, Haryana 122015, India",
+    "Design, Development, Manufacturing and Supply of Precision Machined Components, Sheet Metal Fabrication, Assemblies and Sub-Assemblies for Automotive, Aerospace and General Engineering Applications",
+    "Provision of IT Services",
+    "Trading and Distribution of Industrial Chemicals,\nSolvents and Laboratory Reagents\nincluding Warehousing and Logistics",
+    "Unit 7\n\nRiverside Business Park, Long Road, Manchester M1 2AB",
+    "Supercalifragilisticexpialidociousandevenlongerwordthatcannotwrap at all",
+    "Fabricación y comercialización de productos metálicos, incluyendo diseño y montaje",
+    "",
+]
+
+RECTS = [fitz.Rect(60, 300, 540, 330), fitz.Rect(80, 400, 520, 520), fitz.Rect(100, 200, 300, 260), fitz.Rect(50, 600, 560, 720)]
+
+
+def legacy_wrap(text, font_obj, font_size, max_width):
+    """The classic greedy word wrap, re-measuring each test line."""
+    lines = []
+    current_line = ""
+    for word in text.split():
+        test_line = current_line + (" " if current_line else "") + word
+        if font_obj.text_length(test_line, fontsize=font_size) <= max_width:
+            current_line = test_line
+        else:
+            if current_line:
+                lines.append(current_line)
+            current_line = word
+    if current_line:
+        lines.append(current_line)
+    return lines
+
+
+def line_height_factor(template_type):
+    return 1.1 if template_type in LARGE_TEMPLATES else 1.2
+
+
+def legacy_standard_font_size(text, rect, fontname, template_type, min_font_size=4, original_font_size=20):
+    font_obj = fitz.Font(fontname=fontname)
+    font_size = original_font_size
+    lines = []
+    while font_size >= min_font_size:
+        current_lines = legacy_wrap(text, font_obj, font_size, rect.width)
+        if len(current_lines) * font_size * line_height_factor(template_type) <= rect.height:
+            lines = current_lines
+            break
+        font_size -= 0.5
+    return font_size, lines
+
+
+def legacy_optimal_font_size_with_line_breaks(text, rect, fontname, template_type, min_font_size=4, original_font_size=20):
+    if '\n' not in text and '\r\n' not in text:
+        return legacy_standard_font_size(text, rect, fontname, template_type, min_font_size, original_font_size)
+
+    font_obj = fitz.Font(fontname=fontname)
+    text_lines = text.split('\n')
+    min_font_for_lines = []
+    for line in text_lines:
+        if not line.strip():
+            min_font_for_lines.append(original_font_size)
+            continue
+        line_font = original_font_size
+        while line_font >= min_font_size:
+            if font_obj.text_length(line, fontsize=line_font) <= rect.width:
+                break
+            line_font -= 0.5
+        min_font_for_lines.append(max(line_font, min_font_size))
+    optimal_font_size = min(min_font_for_lines)
+
+    def layout(font_size):
+        lines = []
+        for line in text_lines:
+            if not line.strip():
+                lines.append("")
+            elif font_obj.text_length(line, fontsize=font_size) <= rect.width:
+                lines.append(line)
+            else:
+                lines.extend(legacy_wrap(line, font_obj, font_size, rect.width))
+        return lines
+
+    lines = layout(optimal_font_size)
+    total_height = len(lines) * optimal_font_size * line_height_factor(template_type)
+    if total_height <= rect.height:
+        return optimal_font_size, lines
+
+    utilization_pct = (total_height / rect.height) * 100.0 if rect.height else 100.0
+    readable_floor = max(min_font_size, 7) if utilization_pct > 134.8 else max(min_font_size, 10)
+    low = readable_floor
+    high = max(optimal_font_size, readable_floor)
+    best_fit_font = readable_floor
+    best_fit_lines = lines
+    while high - low > 0.5:
+        mid = (high + low) / 2.0
+        candidate_lines = layout(mid)
+        if len(candidate_lines) * mid * line_height_factor(template_type) <= rect.height:
+            best_fit_font = mid
+            best_fit_lines = candidate_lines
+            low = mid
+        else:
+            high = mid
+    return best_fit_font, best_fit_lines
+
+
+def legacy_fit(start, minimum, step, fits):
+    """The decrement loop fit_font_size replaces."""
+    size = start
+    while size >= minimum:
+        if fits(size):
+            return size, True
+        size -= step
+    return size, False
+
+
+@pytest.mark.parametrize("start,minimum,step", [(30, 8, 1), (13.6, 6, 0.5), (20, 12, 1), (15, 8, 0.5), (5, 6, 0.5), (8, 8, 1)])
+def test_fit_font_size_matches_decrement_loop(start, minimum, step):
+    sizes, _ = candidate_font_sizes(start, minimum, step)
+    # Every threshold position, including "fits everywhere" and "fits nowhere"
+    thresholds = [start + 1] + sizes + [minimum - 1]
+    for threshold in thresholds:
+        fits = lambda size: size <= threshold
+        assert fit_font_size(start, minimum, step, fits) == legacy_fit(start, minimum, step, fits)
+
+
+@pytest.mark.parametrize("start,minimum,step", [(30, 8, 1), (15, 8, 0.5), (20, 4, 0.5)])
+def test_fit_single_line_matches_measured_loop(start, minimum, step):
+    font_obj = fitz.Font(fontname=FONTNAME)
+    for text in SAMPLE_TEXTS:
+        for max_width in (40, 150.5, 200, 470, 482.1, 1000):
+            expected = legacy_fit(start, minimum, step, lambda size: font_obj.text_length(text, fontsize=size) <= max_width)
+            assert fit_single_line(font_obj.text_length(text, fontsize=1), max_width, start, minimum, step) == expected
+
+
+# The legacy code picked the line spacing from a template type; the solvers take the family
+@pytest.mark.parametrize("template_type,line_spacing", [("standard", "loose"), ("large", "tight")])
+def test_standard_font_size_matches_legacy(template_type, line_spacing):
+    for text in SAMPLE_TEXTS:
+        for rect in RECTS:
+            for start in (15, 20, 30):
+                expected = legacy_standard_font_size(text, rect, FONTNAME, template_type, 4, start)
+                assert calculate_standard_font_size(text, rect, FONTNAME, line_spacing, 4, start) == expected
+
+
+@pytest.mark.parametrize("template_type,line_spacing", [("standard", "loose"), ("logo", "tight")])
+def test_optimal_font_size_with_line_breaks_matches_legacy(template_type, line_spacing):
+    for text in SAMPLE_TEXTS:
+        for rect in RECTS:
+            for start in (15, 20):
+                expected = legacy_optimal_font_size_with_line_breaks(text, rect, FONTNAME, template_type, 4, start)
+                assert calculate_optimal_font_size_with_line_breaks(text, rect, FONTNAME, line_spacing, 4, start) == expected
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for rise.font_registry: fonts load once per process and measured widths match
+fitz.Font.text_length exactly, including characters outside the preloaded table.
+"""
+
+import os
+import threading
+
+import fitz
+import pytest
+
+from rise.font_registry import FONTS_DIR, FontRegistry, font_registry, get_font
+
+BODONI = os.path.join(FONTS_DIR, "BOD_R.TTF")
+SAMPLES = [
+    "ACME Manufacturing (Pvt.) Ltd.",
+    "Unit 4, Zürich Straße – Ω 12/3 “quoted” €100",
+    "ISO 9001:2015 · Société Générale · Łódź",
+    "漢字 mixed with ASCII",
+    "",
+]
+
+
+@pytest.mark.parametrize("fontname, fontfile", [("helv", None), ("Times-Bold", None), (None, BODONI)])
+@pytest.mark.parametrize("text", SAMPLES)
+@pytest.mark.parametrize("fontsize", [7, 11, 23.5])
+def test_widths_match_fitz(fontname, fontfile, text, fontsize):
+    reference = fitz.Font(fontfile=fontfile) if fontfile else fitz.Font(fontname=fontname)
+    metrics = FontRegistry().get(fontname=fontname, fontfile=fontfile)
+    assert metrics.text_length(text, fontsize) == reference.text_length(text, fontsize=fontsize)
+    assert metrics.word_width(text) * fontsize == pytest.approx(reference.text_length(text, fontsize=fontsize))
+
+
+def test_each_font_is_loaded_once():
+    registry = FontRegistry()
+    assert registry.get("helv") is registry.get("helv")
+    # The same file through a different path is the same font
+    relative = os.path.relpath(BODONI)
+    assert registry.get(fontfile=BODONI) is registry.get(fontfile=relative)
+    assert registry.stats() == {"fonts": 2}
+    assert get_font("helv") is font_registry.get("helv")
+
+
+def test_unknown_fonts_raise_like_fitz():
+    with pytest.raises(Exception):
+        FontRegistry().get(fontfile=os.path.join(FONTS_DIR, "missing.ttf"))
+    with pytest.raises(TypeError):
+        FontRegistry().get("helv").text_length(b"bytes")
+
+
+def test_preload_and_concurrent_measurement():
+    registry = FontRegistry()
+    registry.preload()
+    assert registry.stats()["fonts"] == 14 + 4
+    metrics = registry.get(fontfile=BODONI)
+    reference = fitz.Font(fontfile=BODONI).text_length("ĀĒĪŌŪ漢字", fontsize=11)
+    results = []
+
+    def measure():
+        # Characters outside the preloaded table are looked up under the font's lock
+        results.append(metrics.text_length("ĀĒĪŌŪ漢字", 11))
+
+    threads = [threading.Thread(target=measure) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [reference] * 8
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests for rise.layout_cache: keys cover everything a fit depends on, the LRU stays
+bounded, and a cached layout is identical to a freshly computed one.
+"""
+
+import fitz
+
+from rise.font_utils import _fit_with_line_breaks, calculate_optimal_font_size_with_line_breaks
+from rise.generate_certificate import generate_certificate
+from rise.generate_softCopy import generate_softcopy
+from rise.layout_cache import LayoutCache, layout_cache, layout_key
+from rise.template_geometry import geometry_registry
+
+RECT = fitz.Rect(50, 100, 550, 160)
+
+
+def test_keys_cover_every_fit_input():
+    base = layout_key("lines", "ACME Ltd", RECT, "helv", "tight", 12, 30)
+    assert base == layout_key("lines", "ACME Ltd", fitz.Rect(50, 100, 550, 160), "helv", "tight", 12, 30)
+    # Pre-split lines become hashable and match the equivalent tuple
+    assert layout_key("company", ["ACME", "Ltd"], RECT, "helv") == layout_key("company", ("ACME", "Ltd"), RECT, "helv")
+    hash(layout_key("company", ["ACME", "Ltd"], RECT, "helv"))
+    for changed in (
+        layout_key("address", "ACME Ltd", RECT, "helv", "tight", 12, 30),
+        layout_key("lines", "ACME Ltd.", RECT, "helv", "tight", 12, 30),
+        layout_key("lines", "ACME Ltd", fitz.Rect(50, 100, 550, 160.5), "helv", "tight", 12, 30),
+        layout_key("lines", "ACME Ltd", RECT, "tiro", "tight", 12, 30),
+        layout_key("lines", "ACME Ltd", RECT, "helv", "loose", 12, 30),
+        layout_key("lines", "ACME Ltd", RECT, "helv", "tight", 12, 28),
+    ):
+        assert changed != base
+
+
+def test_memoize_computes_once_and_evicts_least_recently_used():
+    cache = LayoutCache(max_entries=2)
+    calls = []
+
+    def compute(value):
+        calls.append(value)
+        return value
+
+    assert cache.memoize(("a",), lambda: compute(1)) == 1
+    assert cache.memoize(("a",), lambda: compute(99)) == 1
+    cache.memoize(("b",), lambda: compute(2))
+    cache.memoize(("a",), lambda: compute(99))  # "a" is now the most recent
+    cache.memoize(("c",), lambda: compute(3))  # evicts "b"
+    assert cache.memoize(("a",), lambda: compute(99)) == 1
+    assert cache.memoize(("b",), lambda: compute(4)) == 4
+    assert calls == [1, 2, 3, 4]
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 4, 2)
+    assert stats["hit_rate"] == round(3 / 7, 4)
+
+    cache.clear()
+    assert cache.stats()["entries"] == 0
+
+
+def test_zero_entries_disables_caching():
+    cache = LayoutCache(max_entries=0)
+    calls = []
+    for _ in range(3):
+        cache.memoize(("a",), lambda: calls.append(1) or len(calls))
+    assert calls == [1, 1, 1] and cache.stats()["entries"] == 0
+
+
+def test_cached_fit_matches_fresh_fit_and_is_not_shared_mutable():
+    text = "Northern Precision Engineering & Fabrication Services\nUnit 7, Riverside Industrial Estate"
+    layout_cache.clear()
+    first_size, first_lines = calculate_optimal_font_size_with_line_breaks(text, RECT, "helv", "loose", 10, 28)
+    hits = layout_cache.stats()["hits"]
+    first_lines.append("caller's own change")
+    cached_size, cached_lines = calculate_optimal_font_size_with_line_breaks(text, RECT, "helv", "loose", 10, 28)
+
+    assert layout_cache.stats()["hits"] == hits + 1
+    fresh_size, fresh_lines = _fit_with_line_breaks(text, RECT, "helv", "loose", 10, 28)
+    assert (cached_size, tuple(cached_lines)) == (first_size, fresh_lines) == (fresh_size, fresh_lines)
+
+
+def test_repeated_render_reuses_every_fit():
+    values = {
+        "Company Name": "Northern Precision Engineering & Fabrication Services Limited",
+        "Address": "Unit 7, Riverside Industrial Estate, 14 Mill Lane, Huddersfield HD1 3AB, United Kingdom",
+        "ISO Standard": "ISO 9001:2015",
+        "Scope": "Design, manufacture and supply of precision machined components " * 3,
+        "Certificate Number": "LC-1",
+    }
+    layout_cache.clear()
+    first = generate_softcopy(None, None, dict(values), "standard", dry_run=True)
+    misses = layout_cache.stats()["misses"]
+    second = generate_softcopy(None, None, dict(values), "standard", dry_run=True)
+
+    assert layout_cache.stats()["misses"] == misses and layout_cache.stats()["hits"] > 0
+    assert second["layout"] == first["layout"] and second["overflow_warnings"] == first["overflow_warnings"]
+
+
+def test_scope_fit_spacing_comes_from_the_template_geometry():
+    values = {
+        "Company Name": "Spacing Family Ltd",
+        "Address": "1 Example Road",
+        "ISO Standard": "ISO 9001:2015",
+        "Scope": "Design and supply of components\nInstallation and servicing of equipment",
+        "Certificate Number": "LC-2",
+    }
+    # Types whose spacing the old hand-written list got wrong for one of the renderers
+    for render, template_type, mode in ((generate_softcopy, "large_other", "softcopy"),
+                                        (generate_certificate, "large_nonaccredited_other", "certificate")):
+        layout_cache.clear()
+        render(None, None, dict(values), template_type, dry_run=True)
+        families = {key[4] for key in layout_cache._entries if key[0] == "lines"}
+        assert families == {geometry_registry.get(template_type, mode).scope_spacing}, template_type
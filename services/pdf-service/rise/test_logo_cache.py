@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for rise.logo_cache: prepared logos are cached by content hash, target rectangle
+and fit mode, and the LRU stays within its entry and byte bounds.
+"""
+
+import io
+
+import fitz
+import pytest
+from PIL import Image
+
+from rise.logo_cache import LogoCache, fit_logo_placement
+
+
+def png(width: int, height: int, color=(200, 30, 30)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("size, rect, expected", [
+    # Wider than the rectangle: full width, centred vertically
+    ((400, 100), fitz.Rect(0, 0, 200, 100), (0, 25, 200, 75)),
+    # Taller than the rectangle: full height, centred horizontally
+    ((100, 400), fitz.Rect(10, 10, 210, 110), (97.5, 10, 122.5, 110)),
+    # Same aspect ratio: fills the rectangle exactly
+    ((300, 150), fitz.Rect(50, 20, 250, 120), (50, 20, 250, 120)),
+])
+def test_fit_logo_placement(size, rect, expected):
+    assert fit_logo_placement(*size, rect) == pytest.approx(expected)
+
+
+def test_same_logo_and_rect_is_prepared_once():
+    cache = LogoCache()
+    logo, rect = png(400, 100), fitz.Rect(0, 0, 200, 100)
+    first = cache.prepare(logo, rect)
+    # Equal bytes from another upload hit the same entry
+    assert cache.prepare(bytes(logo), fitz.Rect(0, 0, 200, 100)) is first
+    assert (first.width, first.height) == (400, 100) and first.rect == fitz.Rect(0, 25, 200, 75)
+    assert Image.open(io.BytesIO(first.image_bytes)).format == "PNG"
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+
+def test_rect_fit_mode_and_content_are_part_of_the_key():
+    cache = LogoCache()
+    logo, rect = png(400, 100), fitz.Rect(0, 0, 200, 100)
+    fitted = cache.prepare(logo, rect)
+    stretched = cache.prepare(logo, rect, fit=False)
+    moved = cache.prepare(logo, fitz.Rect(0, 0, 300, 100))
+    recoloured = cache.prepare(png(400, 100, (0, 0, 0)), rect)
+
+    assert stretched.placement == (0, 0, 200, 100) and fitted.placement != stretched.placement
+    assert moved.placement == pytest.approx((0, 12.5, 300, 87.5))
+    assert recoloured is not fitted
+    assert cache.stats()["entries"] == 4 and cache.stats()["hits"] == 0
+
+
+def test_lru_evicts_by_entries_and_bytes():
+    cache = LogoCache(max_entries=2)
+    rect = fitz.Rect(0, 0, 100, 100)
+    logos = [png(10 + index, 10) for index in range(3)]
+    for logo in logos:
+        cache.prepare(logo, rect)
+    assert cache.stats()["entries"] == 2 and cache.stats()["evictions"] == 1
+    # The oldest logo was evicted, the newest two are still hits
+    cache.prepare(logos[2], rect)
+    cache.prepare(logos[1], rect)
+    assert cache.stats()["hits"] == 2
+    cache.prepare(logos[0], rect)
+    assert cache.stats()["misses"] == 4
+
+    # Room for either logo on its own, but not both
+    small = LogoCache(max_bytes=max(len(cache.prepare(logo, rect).image_bytes) for logo in logos[:2]))
+    small.prepare(logos[0], rect)
+    small.prepare(logos[1], rect)
+    assert small.stats()["entries"] == 1 and small.stats()["bytes"] <= small.max_bytes
+
+    small.clear()
+    assert small.stats()["entries"] == 0 and small.stats()["bytes"] == 0
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Tests for the output profiles and in-memory serialisation in rise.pdf_utils.
+"""
+
+import os
+
+import fitz
+import pytest
+
+from rise.pdf_utils import resolve_save_profile, save_pdf, serialize_pdf
+
+BODONI = os.path.join(os.path.dirname(__file__), "..", "fonts", "BOD_R.TTF")
+
+
+def render_with_bodoni():
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_font(fontname="BodoniMT-Regular", fontfile=BODONI)
+    page.insert_text((72, 72), "Initial Registration Date: 01/01/2024", fontname="BodoniMT-Regular", fontsize=13)
+    return doc
+
+
+def test_web_profile_subsets_fonts_and_is_smaller(tmp_path):
+    sizes = {}
+    for profile in ("print", "web"):
+        output_path = str(tmp_path / f"{profile}.pdf")
+        with render_with_bodoni() as doc:
+            sizes[profile] = save_pdf(doc, output_path, profile)
+        assert sizes[profile] == os.path.getsize(output_path)
+        with fitz.open(output_path) as saved:
+            assert saved[0].get_text().strip() == "Initial Registration Date: 01/01/2024"
+    assert sizes["web"] < sizes["print"] / 2
+
+
+def test_serialize_matches_saved_file(tmp_path):
+    output_path = str(tmp_path / "saved.pdf")
+    with render_with_bodoni() as doc:
+        save_pdf(doc, output_path, "print")
+    with render_with_bodoni() as doc:
+        pdf_bytes = serialize_pdf(doc, "print")
+    with open(output_path, "rb") as saved, fitz.open(stream=pdf_bytes, filetype="pdf") as in_memory:
+        assert len(saved.read()) == len(pdf_bytes)
+        assert in_memory[0].get_text().strip() == "Initial Registration Date: 01/01/2024"
+
+
+def test_profile_defaults_and_validation(monkeypatch):
+    monkeypatch.delenv("PDF_SAVE_PROFILE", raising=False)
+    assert resolve_save_profile(None, "softcopy") == "web"
+    assert resolve_save_profile("", "printable") == "print"
+    assert resolve_save_profile(" WEB ", "certificate") == "web"
+    monkeypatch.setenv("PDF_SAVE_PROFILE", "print")
+    assert resolve_save_profile(None, "softcopy") == "print"
+    with pytest.raises(ValueError):
+        resolve_save_profile("screen", "softcopy")
@@ -5,7 +5,19 @@ This script demonstrates how the QR code will be generated and what data it will
 """
 
 import json
-from generate_softCopy import generate_certification_qr_code
+import os
+
+import fitz
+import pytest
+
+from rise.generate_softCopy import (
+    add_qr_code_vector_to_pdf,
+    display_excel_date_as_is,
+    generate_certification_qr_code,
+    generate_certification_qr_matrix,
+    generate_softcopy,
+)
+from rise.template_geometry import geometry_registry
 
 def test_qr_code_generation():
     """Test the QR code generation with sample certification data."""
@@ -66,5 +78,52 @@ def test_qr_code_generation():
     
     print("🧪 [TEST] ===== END TEST =====")
 
+
+# ✅ ADDED: The default (vector) QR must come out module-for-module identical to the qrcode matrix
+SAMPLE_CERT_DATA = {
+    "certification_body": "Americo",
+    "accreditation_body": "UAF",
+    "certificate_number": "CERT-2024-001",
+    "company_name": "Sample Company Ltd.",
+    "certificate_standard": "ISO 9001:2015",
+    "issue_date": "15/01/2024",
+    "expiry_date": "14/01/2027",
+}
+
+
+def sample_modules(page, rect, rows: int, cols: int, dpi: int = 600) -> list[list[bool]]:
+    """Rasterise a page region and read every module's centre pixel (dark = True)."""
+    pixmap = page.get_pixmap(dpi=dpi, clip=rect, colorspace=fitz.csGRAY, alpha=False)
+    modules = []
+    for row in range(rows):
+        y = int((row + 0.5) * pixmap.height / rows)
+        modules.append([pixmap.pixel(int((col + 0.5) * pixmap.width / cols), y)[0] < 128 for col in range(cols)])
+    return modules
+
+
+@pytest.mark.parametrize("width, height", [(78.7, 74), (60, 60), (41.3, 39.9)])
+def test_vector_qr_matches_qrcode_matrix(width, height):
+    matrix = generate_certification_qr_matrix(SAMPLE_CERT_DATA)
+    with fitz.open() as doc:
+        page = doc.new_page()
+        add_qr_code_vector_to_pdf(doc, matrix, 100.25, 200.5, width, height)
+        rect = fitz.Rect(100.25, 200.5, 100.25 + width, 200.5 + height)
+        assert sample_modules(page, rect, len(matrix), len(matrix[0])) == matrix
+
+
+def test_rendered_softcopy_carries_the_certificate_qr():
+    values = {"Company Name": "Sample Company Ltd.", "ISO Standard": "ISO 9001:2015",
+              "Certificate Number": "CERT-2024-001", "Issue Date": "15/01/2024", "Expiry Date": "14/01/2027"}
+    template_path = os.path.join(os.path.dirname(__file__), "..", "templates", "default-draft.pdf")
+    result = generate_softcopy(template_path, None, values, "standard")
+
+    cert_data = {**SAMPLE_CERT_DATA, "issue_date": display_excel_date_as_is("15/01/2024"),
+                 "expiry_date": display_excel_date_as_is("14/01/2027")}
+    matrix = generate_certification_qr_matrix(cert_data)
+    x, y, width, height = geometry_registry.get("standard", "softcopy").qr
+    with fitz.open(stream=result["pdf"], filetype="pdf") as doc:
+        assert sample_modules(doc[0], fitz.Rect(x, y, x + width, y + height), len(matrix), len(matrix[0])) == matrix
+
+
 if __name__ == "__main__":
     test_qr_code_generation()
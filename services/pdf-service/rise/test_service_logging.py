@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests for rise.service_logging.
+"""
+
+import io
+import json
+import logging
+import queue
+
+import pytest
+
+from rise.service_logging import DroppingQueueHandler, JsonFormatter, parse_levels
+
+
+def test_parse_levels():
+    assert parse_levels("rise.generate_softCopy=debug, main=WARNING,") == {"rise.generate_softCopy": "DEBUG", "main": "WARNING"}
+    assert parse_levels("") == {}
+    for spec in ("main", "main=LOUD", "=INFO"):
+        with pytest.raises(ValueError):
+            parse_levels(spec)
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    logger = logging.getLogger("test_service_logging.dropping")
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        for index in range(5):
+            logger.warning("record %s", index)
+    finally:
+        logger.removeHandler(handler)
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_disabled_debug_is_not_formatted():
+    class Expensive:
+        calls = 0
+
+        def __str__(self):
+            Expensive.calls += 1
+            return "expensive"
+
+    stream = io.StringIO()
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(JsonFormatter())
+    logger = logging.getLogger("test_service_logging.lazy")
+    logger.propagate = False
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    try:
+        logger.debug("🔍 [TEST] %s", Expensive())
+        assert Expensive.calls == 0
+        logger.info("✅ [TEST] %s", Expensive())
+    finally:
+        logger.removeHandler(handler)
+    assert Expensive.calls == 1
+    entry = json.loads(stream.getvalue())
+    assert entry["level"] == "INFO" and entry["message"] == "✅ [TEST] expensive"
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for rise.template_geometry.
+
+The compiled records are checked against the template type lists the renderers used to
+test inline, so a change to the spec that moves any template onto different coordinates
+or layout rules shows up as a failure.
+"""
+
+import copy
+
+import fitz
+import pytest
+
+from rise.generate_certificate import generate_certificate
+from rise.generate_softCopy import generate_softcopy
+from rise.template_geometry import FAMILY_SPECS, KNOWN_TEMPLATE_TYPES, MODE_SPECS, build_registry, geometry_registry, get_geometry
+
+TEMPLATE_TYPES = KNOWN_TEMPLATE_TYPES + ("unknown_template",)
+
+# The inline lists the renderers tested before the registry
+SOFTCOPY_STANDARD = ["standard", "standard_eco", "standard_nonaccredited", "standard_other", "standard_other_eco", "standard_nonaccredited_other"]
+SOFTCOPY_LARGE = ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_other_nonaccredited", "large_nonaccredited_other"]
+SOFTCOPY_LOGO = ["logo", "logo_nonaccredited", "logo_other", "logo_other_nonaccredited"]
+CERTIFICATE_STANDARD = ["standard", "standard_eco", "standard_nonaccredited"]
+CERTIFICATE_LARGE = ["large", "large_eco", "large_nonaccredited", "large_other", "large_other_eco", "large_nonaccredited_other"]
+CERTIFICATE_LOGO = ["logo", "logo_nonaccredited", "logo_other", "logo_nonaccredited_other"]
+TIGHT_LIST = CERTIFICATE_LARGE + SOFTCOPY_LOGO
+
+
+def legacy_softcopy(template_type):
+    family = "large" if template_type in SOFTCOPY_LARGE else "logo" if template_type in SOFTCOPY_LOGO else "standard"
+    return {
+        "family": family,
+        "company_block": "large" if template_type in SOFTCOPY_LARGE else "standard" if template_type in SOFTCOPY_STANDARD else "logo",
+        "scope_fit": "fixed" if template_type in SOFTCOPY_LARGE else "sized",
+        "address_spacing": "tight" if template_type in TIGHT_LIST else "loose",
+        "scope_spacing": "tight" if template_type in ["large", "large_eco", "large_nonaccredited"] + SOFTCOPY_LOGO else "loose",
+        "scope_alignment": "top" if template_type in SOFTCOPY_LARGE + SOFTCOPY_LOGO else "centered",
+        "revision": (446, 553.9, 456, 563.9) if template_type == "standard" else (446, 574, 456, 584),
+        "initial_registration_scope": (85, 354, 577, 520) if template_type == "large" else None,
+        "qr": (488.7, 541, 78.7, 74) if template_type in SOFTCOPY_LARGE else (488.7, 514, 78.7, 74),
+    }
+
+
+def legacy_certificate(template_type):
+    family = "standard"
+    if template_type in CERTIFICATE_LARGE:
+        family = "large"
+    elif template_type in CERTIFICATE_LOGO:
+        family = "logo"
+    return {
+        "family": family,
+        "company_block": "large" if template_type in CERTIFICATE_LARGE else "standard" if template_type in SOFTCOPY_STANDARD else "logo",
+        "scope_fit": "sized" if template_type in CERTIFICATE_STANDARD + CERTIFICATE_LOGO else "fixed",
+        "address_spacing": "tight" if template_type in TIGHT_LIST else "loose",
+        "scope_spacing": "tight" if template_type in TIGHT_LIST else "loose",
+        "scope_alignment": "top" if template_type in TIGHT_LIST else "centered",
+        "revision": None,
+        "initial_registration_scope": (85, 351, 577, 520) if template_type in CERTIFICATE_LARGE else None,
+        "qr": (488.7, 541, 78.7, 74) if family == "large" else (488.7, 514, 78.7, 74),
+    }
+
+
+def as_tuple(rect):
+    return None if rect is None else tuple(rect)
+
+
+def test_spec_is_valid():
+    assert geometry_registry.validate() == []
+
+
+@pytest.mark.parametrize("mode,legacy", [("softcopy", legacy_softcopy), ("printable", legacy_softcopy), ("certificate", legacy_certificate)])
+def test_records_match_inline_template_lists(mode, legacy):
+    for template_type in TEMPLATE_TYPES:
+        geometry = get_geometry(template_type, mode)
+        expected = legacy(template_type)
+        assert geometry.family == expected["family"], template_type
+        assert geometry.company_block == expected["company_block"], template_type
+        assert geometry.scope_fit == expected["scope_fit"], template_type
+        assert geometry.address_spacing == expected["address_spacing"], template_type
+        assert geometry.scope_spacing == expected["scope_spacing"], template_type
+        assert geometry.scope_alignment == expected["scope_alignment"], template_type
+        assert as_tuple(geometry.revision) == expected["revision"], template_type
+        assert as_tuple(geometry.initial_registration_scope) == expected["initial_registration_scope"], template_type
+        assert geometry.qr == expected["qr"], template_type
+        assert geometry.extra_line_scope == ("fixed" if template_type in SOFTCOPY_LARGE else "sized"), template_type
+        assert (geometry.logo is not None) == template_type.startswith("logo"), template_type
+        assert geometry.known == (template_type != "unknown_template")
+
+
+def test_records_are_read_only_and_coords_are_working_copies():
+    geometry = get_geometry("standard", "softcopy")
+    with pytest.raises(AttributeError):
+        geometry.family = "large"
+    with pytest.raises(TypeError):
+        geometry.fields["Scope"] = fitz.Rect(0, 0, 1, 1)
+
+    coords = geometry.coords()
+    coords["Scope"]["short"] = fitz.Rect(0, 0, 1, 1)
+    coords["Scope"] = fitz.Rect(0, 0, 1, 1)
+    assert tuple(get_geometry("standard", "softcopy").coords()["Scope"]["short"]) == (87.9, 386, 580, 475)
+    assert get_geometry("standard", "softcopy") is geometry
+
+
+def test_invalid_spec_is_rejected():
+    broken = copy.deepcopy(FAMILY_SPECS)
+    broken["large"]["fields"]["Scope"] = (85, 354, 577, 900)  # runs off the page
+    del broken["logo"]["fields"]["ISO Standard"]
+    with pytest.raises(ValueError) as error:
+        build_registry(broken, MODE_SPECS)
+    assert "large.Scope" in str(error.value)
+    assert "logo: missing field 'ISO Standard'" in str(error.value)
+
+
+def test_renders_leave_shared_geometry_untouched():
+    def snapshot():
+        return {
+            (template_type, mode): (
+                {name: tuple(rect) if isinstance(rect, fitz.Rect) else {k: tuple(v) for k, v in rect.items()} for name, rect in geometry.fields.items()},
+                [tuple(rect) for rect in geometry.optional_keys + geometry.optional_values],
+                as_tuple(geometry.initial_registration_scope),
+            )
+            for template_type in KNOWN_TEMPLATE_TYPES
+            for mode in MODE_SPECS
+            for geometry in [get_geometry(template_type, mode)]
+        }
+
+    before = snapshot()
+    values = {
+        "Company Name": "Acme Widgets International Ltd",
+        "Address": "12 Long Road, Springfield",
+        "ISO Standard": "ISO 9001:2015",
+        "Scope": "Design and manufacture of widgets " * 30,
+        "Certificate Number": "C-1",
+        "Initial Registration Date": "2020-01-01",
+        "Extra Line": "Extra line",
+    }
+    for template_type in ("standard", "large", "logo_other_nonaccredited"):
+        generate_softcopy(None, None, dict(values), template_type, "softcopy", dry_run=True)
+        generate_certificate(None, None, dict(values), template_type, dry_run=True)
+    assert snapshot() == before
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for rise.text_prep.
+"""
+
+import fitz
+
+from rise.text_prep import is_single_byte_font, prepare_text, safe_insert_text
+
+
+def test_ascii_text_is_returned_unchanged():
+    text = "Provision of consultancy services; ISO 9001:2015"
+    assert prepare_text(text, "Times-Bold") is text
+
+
+def test_dashes_and_smart_quotes_become_ascii():
+    assert prepare_text("Supply — “quoted” ‘text’ – café", "Times-Roman") == "Supply - \"quoted\" 'text' - café"
+    assert prepare_text("Supply — “quoted”", "F0") == "Supply - \"quoted\""
+
+
+def test_only_single_byte_fonts_transliterate():
+    assert is_single_byte_font("Times-Bold") and is_single_byte_font("tiro") and is_single_byte_font(None)
+    assert not is_single_byte_font("Bodoni") and not is_single_byte_font("symb")
+    assert prepare_text("Łódź café", "Times-Bold") == "Lódz café"
+    assert prepare_text("Łódź café", "Bodoni") == "Łódź café"
+
+
+def test_results_are_memoised():
+    prepare_text.cache_clear()
+    prepare_text("Nº 1 — “memo”", "Times-Roman")
+    prepare_text("Nº 1 — “memo”", "Times-Roman")
+    assert prepare_text.cache_info().hits == 1
+
+
+def test_safe_insert_text_draws_prepared_text():
+    doc = fitz.open()
+    page = doc.new_page()
+    safe_insert_text(page, (50, 50), "Łódź — “ok”", fontname="Times-Roman", fontsize=10)
+    assert page.get_text().strip() == 'Lódz - "ok"'
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for rise.text_wrap: WordWrapper must break lines exactly like the word-by-word loop
+it replaced, including widths that land exactly on (or one ulp below) a line's width.
+"""
+
+import math
+import os
+
+import fitz
+import pytest
+
+import rise.generate_softCopy as generate_softCopy
+from rise.font_registry import FONTS_DIR
+from rise.layout_cache import layout_cache
+from rise.text_wrap import WordWrapper
+
+TEXTS = [
+    "Northern Precision Engineering & Fabrication Services Limited",
+    "Unit 7, Riverside Industrial Estate, 14 Mill Lane, Huddersfield HD1 3AB, United Kingdom",
+    "Zürich Straße 12 – Société Générale (Suisse) S.A. «Département Łódź» €",
+    "Supercalifragilisticexpialidocious-Manufacturing-Holdings a b c",
+    "  leading   and trailing   whitespace  ",
+    "single",
+    "",
+]
+FONTS = ["Times-Roman", "Times-Bold", "Times-BoldItalic", "helv"]
+SIZES = [8, 11.5, 13.6, 30]
+WIDTHS = [20, 95.5, 180, 427.3, 2000]
+
+
+def legacy_wrap(text: str, fontname: str, fontsize: float, max_width: float) -> list[str]:
+    """The word-by-word loop the softcopy and certificate fitting code used before WordWrapper."""
+    font = fitz.Font(fontname=fontname)
+    lines = []
+    current_line = ""
+    for word in text.split():
+        test_line = current_line + (" " if current_line else "") + word
+        if font.text_length(test_line, fontsize) <= max_width:
+            current_line = test_line
+        else:
+            if current_line:
+                lines.append(current_line)
+            current_line = word
+    if current_line:
+        lines.append(current_line)
+    return lines
+
+
+@pytest.mark.parametrize("fontname", FONTS)
+@pytest.mark.parametrize("fontsize", SIZES)
+@pytest.mark.parametrize("text", TEXTS)
+def test_wrap_matches_legacy_loop(text, fontsize, fontname):
+    wrapper = WordWrapper(text, fontname)
+    for max_width in WIDTHS:
+        assert wrapper.wrap(fontsize, max_width) == legacy_wrap(text, fontname, fontsize, max_width)
+
+
+@pytest.mark.parametrize("fontname", FONTS)
+@pytest.mark.parametrize("fontsize", SIZES)
+@pytest.mark.parametrize("text", TEXTS[:4])
+def test_wrap_matches_legacy_loop_at_exact_boundaries(text, fontsize, fontname):
+    # Every prefix of words, measured exactly, is a width where the break is decided by <=
+    font = fitz.Font(fontname=fontname)
+    words = text.split()
+    wrapper = WordWrapper(text, fontname)
+    for end in range(1, len(words) + 1):
+        exact = font.text_length(" ".join(words[:end]), fontsize)
+        for max_width in (exact, math.nextafter(exact, 0), math.nextafter(exact, math.inf)):
+            assert wrapper.wrap(fontsize, max_width) == legacy_wrap(text, fontname, fontsize, max_width), (end, max_width)
+
+
+def legacy_text_height(text: str, fontsize: float, fontname: str, max_width: float) -> float:
+    """The old get_text_height loop (a too-wide first word also counted an empty line)."""
+    font = fitz.Font(fontname=fontname)
+    lines = []
+    current_line = ""
+    for word in text.split():
+        test_line = current_line + (" " if current_line else "") + word
+        if font.text_length(test_line, fontsize) <= max_width:
+            current_line = test_line
+        else:
+            lines.append(current_line)
+            current_line = word
+    if current_line:
+        lines.append(current_line)
+    return len(lines) * fontsize * 1.2
+
+
+@pytest.mark.parametrize("fontname", FONTS)
+@pytest.mark.parametrize("text", TEXTS)
+def test_text_height_matches_legacy_loop(text, fontname):
+    for fontsize in SIZES:
+        for max_width in WIDTHS:
+            assert (generate_softCopy.get_text_height(text, fontsize, fontname, max_width)
+                    == legacy_text_height(text, fontsize, fontname, max_width))
+
+
+class LegacyWordWrapper:
+    """WordWrapper interface backed by the legacy loop, to compare whole fitting paths."""
+
+    used = 0
+
+    def __init__(self, text: str, fontname: str):
+        self.text = text
+        self.fontname = fontname
+        self.metrics = fitz.Font(fontname=fontname)
+        self.words = text.split()
+
+    def fits(self, start: int, end: int, fontsize: float, max_width: float) -> bool:
+        return self.metrics.text_length(" ".join(self.words[start:end]), fontsize) <= max_width
+
+    def wrap(self, fontsize: float, max_width: float) -> list[str]:
+        LegacyWordWrapper.used += 1
+        return legacy_wrap(self.text, self.fontname, fontsize, max_width)
+
+
+RECORDS = [
+    # Company name with a manual line break (wrapped fit) and a long address
+    {"Company Name": "Northern Precision Engineering\nFabrication & Welding Services Limited",
+     "Address": "Unit 7, Riverside Industrial Estate, 14 Mill Lane, Huddersfield HD1 3AB, West Yorkshire, United Kingdom"},
+    # Single-line company name, address with its own line breaks
+    {"Company Name": "Zürich Straße Société Générale",
+     "Address": "Bahnhofstrasse 1\nCH-8001 Zürich, Switzerland and a very long continuation of the second address line"},
+    {"Company Name": "A\nB", "Address": "Short address"},
+]
+
+
+def rendered_lines(pdf_bytes: bytes) -> list:
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        return [(round(block[1], 2), block[4]) for block in doc[0].get_text("blocks")]
+
+
+@pytest.mark.parametrize("record", RECORDS)
+def test_softcopy_company_and_address_fits_match_legacy_loop(record, monkeypatch):
+    values = {**record, "ISO Standard": "ISO 9001:2015", "Certificate Number": "WRAP-1",
+              "Scope": "Design and manufacture of precision machined components for the aerospace industry"}
+    template_path = os.path.join(FONTS_DIR, "..", "templates", "default-draft.pdf")
+
+    def render():
+        layout_cache.clear()
+        dry_run = generate_softCopy.generate_softcopy(None, None, dict(values), "standard", dry_run=True)
+        layout_cache.clear()
+        rendered = generate_softCopy.generate_softcopy(template_path, None, dict(values), "standard")
+        return dry_run["layout"], rendered_lines(rendered["pdf"])
+
+    current = render()
+    monkeypatch.setattr(generate_softCopy, "WordWrapper", LegacyWordWrapper)
+    LegacyWordWrapper.used = 0
+    legacy = render()
+
+    assert LegacyWordWrapper.used > 0
+    assert current == legacy
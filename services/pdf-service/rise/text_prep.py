@@ -0,0 +1,99 @@
+"""
+Text preparation for PDF text insertion.
+
+Field text is normalised once per distinct (text, font) and memoised, so a value that is
+inserted line by line, or rendered again for the soft copy, printable and certificate of
+the same record, is only cleaned up the first time:
+
+1. ASCII fast path: plain ASCII without double quotes is used as-is.
+2. ftfy.fix_text repairs mojibake when the text contains one of the characters that
+   flagged it before (dashes, smart quotes, currency and trademark signs...).
+3. One translation table maps dashes and smart quotes to their ASCII equivalents.
+4. A cached per-font coverage check replaces the old exception-driven retries: base-14
+   fonts are written with a single-byte (WinAnsi) encoding and draw anything above
+   U+00FF as a middle dot, so for those fonts such characters are transliterated with
+   unidecode up front.
+"""
+
+import functools
+import os
+
+import fitz
+import ftfy
+import unidecode
+
+# Characters whose presence sends the text through ftfy first
+FTFY_TRIGGER_CHARS = frozenset('–—·’‘"…€£¥©®™')
+
+# Dashes and smart quotes -> ASCII, for Times font compatibility
+ASCII_TRANSLATION = str.maketrans({
+    "–": "-",   # En dash
+    "—": "-",   # Em dash
+    "’": "'",   # Right single quotation mark
+    "‘": "'",   # Left single quotation mark
+    "”": '"',   # Right double quotation mark
+    "“": '"',   # Left double quotation mark
+})
+
+# Base-14 text fonts (names and PyMuPDF aliases) written with a single-byte encoding.
+# Symbol and ZapfDingbats use their own encodings and are left alone.
+SINGLE_BYTE_FONTS = frozenset(
+    name
+    for alias, full_name in fitz.Base14_fontdict.items()
+    if not full_name.startswith(("Symbol", "ZapfDingbats"))
+    for name in (alias, full_name.lower())
+)
+
+
+@functools.lru_cache(maxsize=256)
+def is_single_byte_font(fontname: str | None) -> bool:
+    """
+    True when characters above U+00FF cannot be drawn with this font.
+
+    Fonts registered on the page from a font file (Bodoni...) are embedded as CID fonts
+    and draw whatever glyphs the file has, so they are never treated as single-byte.
+    """
+    return (fontname or "helv").lower() in SINGLE_BYTE_FONTS
+
+
+@functools.lru_cache(maxsize=int(os.getenv("TEXT_PREP_CACHE_SIZE", "8192")))
+def prepare_text(text: str, fontname: str | None = None) -> str:
+    """
+    Normalise text for insertion with the given font.
+
+    Args:
+        text: Text as laid out by the renderer
+        fontname: Font passed to page.insert_text (None means PyMuPDF's default, helv)
+
+    Returns:
+        str: Text safe to insert with that font
+    """
+    # Fast path: nothing to repair, translate or transliterate
+    if text.isascii() and '"' not in text:
+        return text
+
+    if not FTFY_TRIGGER_CHARS.isdisjoint(text):
+        text = ftfy.fix_text(text)
+    text = text.translate(ASCII_TRANSLATION)
+
+    if not text.isascii() and is_single_byte_font(fontname):
+        text = "".join(char if char <= "\xff" else unidecode.unidecode(char) for char in text)
+    return text
+
+
+def safe_insert_text(page, position, text, **kwargs):
+    """Insert text with page.insert_text after preparing it for the font (see prepare_text)."""
+    return page.insert_text(position, prepare_text(text, kwargs.get("fontname")), **kwargs)
+
+
+def text_prep_stats() -> dict:
+    """Memo counters for health/diagnostic endpoints."""
+    info = prepare_text.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "entries": info.currsize,
+        "max_entries": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+    }
@@ -0,0 +1,87 @@
+"""
+Greedy word wrapping on cached, scale-invariant word widths.
+
+The layout loops wrap the same text at many candidate font sizes. Instead of rebuilding
+"current_line + word" strings and re-measuring them at every size, each word (and the
+space) is measured once at 1 pt, and the line breaks for any size come from a binary
+search over the cumulative widths.
+
+Line breaks are identical to the classic loop
+
+    test_line = current_line + (" " if current_line else "") + word
+    if font.text_length(test_line, fontsize) <= max_width: ...
+
+because any candidate within floating point noise of the limit is re-checked with an
+exact text_length on the joined line.
+"""
+
+import numpy as np
+
+from .font_registry import get_font
+
+# Width (at 1 pt, relative to the line) below which prefix sums are not trusted to decide a break
+_TOLERANCE = 1e-9
+
+
+class WordWrapper:
+    """Words of one text in one font, ready to be wrapped at any font size."""
+
+    __slots__ = ("metrics", "words", "space_width", "_cumulative")
+
+    def __init__(self, text: str, fontname: str):
+        """
+        Args:
+            text: Text to wrap (split on whitespace like str.split())
+            fontname: Font used for measuring (see font_registry)
+        """
+        self.metrics = get_font(fontname=fontname)
+        self.words = text.split()
+        self.space_width = self.metrics.word_width(" ")
+        widths = np.fromiter((self.metrics.word_width(word) for word in self.words), dtype=float, count=len(self.words))
+        # _cumulative[i] = width of words[:i], each followed by a space (all at 1 pt)
+        self._cumulative = np.concatenate(([0.0], np.cumsum(widths + self.space_width)))
+
+    def fits(self, start: int, end: int, fontsize: float, max_width: float) -> bool:
+        """Exact check (same arithmetic as the classic loop) that words[start:end] fit on one line."""
+        return self.metrics.text_length(" ".join(self.words[start:end]), fontsize) <= max_width
+
+    def wrap(self, fontsize: float, max_width: float) -> list[str]:
+        """
+        Greedily wrap the words into lines no wider than max_width at the given font size.
+
+        A word wider than max_width on its own gets a line to itself, as before.
+
+        Args:
+            fontsize: Font size in points
+            max_width: Maximum line width in points
+
+        Returns:
+            list[str]: The wrapped lines
+        """
+        words = self.words
+        cumulative = self._cumulative
+        count = len(words)
+        limit = max_width / fontsize
+        tolerance = _TOLERANCE * (1.0 + abs(limit) + cumulative[-1])
+        lines = []
+        start = 0
+        while start < count:
+            # Line words[start:end] has width cumulative[end] - cumulative[start] - space
+            target = limit + cumulative[start] + self.space_width
+            surely_fits = int(np.searchsorted(cumulative, target - tolerance, side="right")) - 1
+            maybe_fits = int(np.searchsorted(cumulative, target + tolerance, side="right")) - 1
+            end = max(surely_fits, start)
+            # Borderline candidates are decided by the exact measurement
+            for candidate in range(max(surely_fits + 1, start + 1), min(maybe_fits, count) + 1):
+                if not self.fits(start, candidate, fontsize, max_width):
+                    break
+                end = candidate
+            end = min(max(end, start + 1), count)
+            lines.append(" ".join(words[start:end]))
+            start = end
+        return lines
+
+
+def wrap_text(text: str, fontname: str, fontsize: float, max_width: float) -> list[str]:
+    """Wrap text once at a single size (see WordWrapper.wrap)."""
+    return WordWrapper(text, fontname).wrap(fontsize, max_width)
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Pre-fork server entry point for the PDF service.
+
+`python main.py` runs a single uvicorn process. This entry point loads everything a render
+needs once, in a parent process, and then forks web workers that share it copy-on-write:
+
+- main and the rise modules (PyMuPDF, the generators and everything they import);
+- the ISO registry (ISO_STANDARDS_* tables) and the compiled template tables;
+- the base-14 and Bodoni fonts with their glyph advance tables (font_registry);
+- the template set (PRELOAD_TEMPLATES): local templates are mapped (TEMPLATE_SOURCE), and
+  missing remote ones are downloaded into the node's template store and stale ones
+  revalidated; the files are mapped once here.
+
+The parent binds the listening socket and then only supervises: every worker accepts on the
+shared socket, and a worker that dies is replaced. Job rows a dead (or killed) worker left
+running are put back in the queue when the parent reaps it. A new worker is a fork of the warm
+parent, so adding one costs little time and memory.
+
+Signals (to the parent):
+    SIGHUP           Graceful rolling restart: each worker is replaced by a fresh fork, and
+                     the old one is only stopped once its replacement is serving
+    SIGTTIN/SIGTTOU  One worker more / one worker fewer
+    SIGTERM/SIGINT   Graceful shutdown: workers finish in-flight requests, then exit
+
+Configure with:
+    HOST                  Bind address (default 0.0.0.0)
+    PORT                  Bind port (default 8000)
+    WEB_WORKERS           Number of web workers (default: number of CPUs)
+    PRELOAD_TEMPLATES     "all" (default), "none", or a comma-separated list of template names
+    GRACEFUL_TIMEOUT      Seconds a stopping worker gets to finish requests (default 30)
+    WORKER_READY_TIMEOUT  Seconds a new worker gets to start serving (default 60)
+
+Each web worker starts its own render process pool (RENDER_BACKEND "process", the default);
+those processes are spawned, not forked, and load their own copy of fonts and local templates
+once. RENDER_BACKEND "thread" or "inline" renders on the shared warm state instead.
+"""
+
+import asyncio
+import gc
+import logging
+import os
+import select
+import signal
+import socket
+import time
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+HANDLED_SIGNALS = (signal.SIGHUP, signal.SIGTERM, signal.SIGINT, signal.SIGTTIN, signal.SIGTTOU)
+
+
+def preload(template_spec: str = "all"):
+    """
+    Import the app and load fonts, glyph tables, the ISO registry and templates into this process.
+
+    Args:
+        template_spec: "all", "none", or a comma-separated list of template names
+
+    Returns:
+        The FastAPI app, ready to be served by forked workers
+    """
+    started = time.monotonic()
+    import main
+    from job_queue import job_queue
+    from render_backend import render_backend
+    from rise import generate_certificate, generate_softCopy
+    from rise.font_registry import font_registry
+    from rise.template_geometry import geometry_registry
+    from storage_client import storage_client
+    from template_source import template_source
+    from template_store import template_store
+    from template_resolver import template_resolver
+
+    geometry_problems = geometry_registry.validate()
+    if geometry_problems:
+        raise RuntimeError(f"Invalid template geometry: {'; '.join(geometry_problems)}")
+
+    # Fonts and glyph advance tables, plus the rise modules' import cost
+    render_backend.preload()
+    iso_entries = sum(
+        len(table)
+        for module in (generate_softCopy, generate_certificate)
+        for table in (module.ISO_STANDARDS_MAPPING, module.ISO_STANDARDS_CODES,
+                      module.ISO_STANDARDS_DESCRIPTIONS, module.ISO_STANDARDS_DESCRIPTIONS_SPANISH)
+    )
+
+    template_source.load()
+    spec = (template_spec or "").strip()
+    if spec.lower() == "all":
+        template_names = template_resolver.template_names()
+    elif spec.lower() in ("", "none"):
+        template_names = []
+    else:
+        template_names = [name.strip() for name in spec.split(",") if name.strip()]
+
+    async def download_templates():
+        results = await asyncio.gather(
+            *(main.download_template_from_supabase(name) for name in template_names), return_exceptions=True
+        )
+        if template_source.uses_supabase:
+            await main.refresh_stale_templates()
+        # Workers open their own pooled connections - none may be shared across fork
+        await storage_client.aclose()
+        return results
+
+    failed = []
+    if template_names:
+        for name, result in zip(template_names, asyncio.run(download_templates())):
+            if isinstance(result, Exception):
+                failed.append(name)
+                logger.warning("⚠️ [SERVER] Template %s not preloaded: %s", name, result)
+
+    # Rows left running by a previous run are requeued once here; a worker (re)starting next
+    # to busy siblings must not requeue their rows
+    job_queue.requeue_interrupted()
+    job_queue.requeue_on_start = False
+    job_queue.close()
+
+    logger.info(
+        "✅ [SERVER] Preloaded in %.1fs: %s fonts, %s ISO registry entries, %s/%s templates (%s bytes)",
+        time.monotonic() - started, font_registry.stats()["fonts"], iso_entries,
+        len(template_names) - len(failed), len(template_names), template_store.stats()["bytes"],
+    )
+    return main.app
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn server that tells the parent when it has started serving."""
+
+    def __init__(self, config: uvicorn.Config, ready_fd: int):
+        super().__init__(config)
+        self.ready_fd = ready_fd
+
+    async def startup(self, sockets=None):
+        await super().startup(sockets=sockets)
+        if not self.should_exit:
+            os.write(self.ready_fd, b"1")
+        os.close(self.ready_fd)
+
+
+class PreforkServer:
+    """Binds one socket, forks web workers from the warm parent and keeps them running."""
+
+    def __init__(self, app, host: str = "0.0.0.0", port: int = 8000, workers: int = 1,
+                 graceful_timeout: float = 30, ready_timeout: float = 60, job_queue=None):
+        """
+        Args:
+            app: ASGI app loaded (and warmed) in this process
+            host: Bind address
+            port: Bind port
+            workers: Number of web workers to keep running
+            graceful_timeout: Seconds a stopping worker gets before it is killed
+            ready_timeout: Seconds a new worker gets to start serving
+            job_queue: Queue whose rows an exited worker left running are requeued (optional)
+        """
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = max(1, workers)
+        self.graceful_timeout = graceful_timeout
+        self.ready_timeout = ready_timeout
+        self.job_queue = job_queue
+        self.socket = None
+        self._pids = {}  # pid -> read end of the worker's ready pipe (None once it is serving)
+        self._starting = {}  # pid -> deadline to start serving
+        self._retiring = {}  # pid -> deadline to exit before it is killed
+        self._restart_queue = []  # workers still to be replaced by the rolling restart
+        self._replacing = None  # (old pid, new pid) being swapped by the rolling restart
+        self._spawn_after = 0.0
+        self._signals = []
+        self._wakeup_read = None
+        self._wakeup_write = None
+        self._stopping = False
+
+    # ---- workers ---------------------------------------------------------
+
+    def spawn_worker(self) -> int:
+        """Fork one web worker serving on the shared socket; it reports on its ready pipe once serving."""
+        ready_read, ready_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_read)
+            self._run_worker(ready_write)
+        os.close(ready_write)
+        self._pids[pid] = ready_read
+        self._starting[pid] = time.monotonic() + self.ready_timeout
+        return pid
+
+    def _run_worker(self, ready_fd: int):
+        exit_code = 0
+        try:
+            # Drop the supervisor's signal handling; uvicorn installs its own while serving
+            signal.set_wakeup_fd(-1)
+            for sig in HANDLED_SIGNALS:
+                signal.signal(sig, signal.SIG_IGN if sig in (signal.SIGTERM, signal.SIGINT) else signal.SIG_DFL)
+            os.close(self._wakeup_read)
+            os.close(self._wakeup_write)
+            for fd in self._pids.values():
+                if fd is not None:
+                    os.close(fd)
+            config = uvicorn.Config(self.app, log_config=None, timeout_graceful_shutdown=self.graceful_timeout)
+            WorkerServer(config, ready_fd).run(sockets=[self.socket])
+        except BaseException:
+            logger.exception("❌ [SERVER] Worker %s crashed", os.getpid())
+            exit_code = 1
+        finally:
+            from rise.service_logging import shutdown_logging
+
+            shutdown_logging()
+            os._exit(exit_code)
+
+    def wait_ready(self, pid: int) -> bool:
+        """Block until a new worker is serving (or has failed to start). Only used before supervision starts."""
+        if pid not in self._starting:
+            return pid in self._pids
+        timeout = max(0.0, self._starting[pid] - time.monotonic())
+        readable, _, _ = select.select([self._pids[pid]], [], [], timeout)
+        return self._mark_started(pid, bool(readable))
+
+    def _mark_started(self, pid: int, readable: bool) -> bool:
+        ready_fd = self._pids[pid]
+        ready = readable and os.read(ready_fd, 1) == b"1"
+        os.close(ready_fd)
+        self._pids[pid] = None
+        del self._starting[pid]
+        if not ready:
+            logger.error("❌ [SERVER] Worker %s failed to start serving within %ss", pid, self.ready_timeout)
+            self.stop_worker(pid)
+            # A worker that cannot start is retried once a second, not in a tight loop
+            self._spawn_after = time.monotonic() + 1
+        return ready
+
+    def _check_starting(self, readable: list):
+        """Record workers that reported on their ready pipe or ran out of ready_timeout."""
+        now = time.monotonic()
+        for pid, deadline in list(self._starting.items()):
+            reported = self._pids[pid] in readable
+            if reported or now >= deadline:
+                self._mark_started(pid, reported)
+
+    def stop_worker(self, pid: int):
+        """Ask a worker to finish its requests and exit; it is killed if still running after graceful_timeout."""
+        self._retiring[pid] = time.monotonic() + self.graceful_timeout
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def _kill_overdue(self):
+        now = time.monotonic()
+        for pid, deadline in list(self._retiring.items()):
+            if now >= deadline:
+                logger.warning("⚠️ [SERVER] Worker %s still busy after %ss - killing it", pid, self.graceful_timeout)
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                self._retiring[pid] = float("inf")
+
+    def _wait_exit(self, pids: list):
+        remaining = set(pids)
+        while remaining:
+            for pid in list(remaining):
+                if self._reap(pid)[0]:
+                    remaining.discard(pid)
+            if remaining:
+                self._kill_overdue()
+                time.sleep(0.05)
+
+    def _reap(self, pid: int = -1) -> tuple[int, bool]:
+        """
+        Collect one exited worker (pid -1: any of them).
+
+        Returns:
+            tuple: (pid, whether it was asked to stop); pid is 0 if no worker has exited
+        """
+        try:
+            exited, _ = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            exited = pid if pid > 0 else 0
+        expected = exited in self._retiring
+        if exited:
+            ready_fd = self._pids.pop(exited, None)
+            if ready_fd is not None:
+                os.close(ready_fd)
+            if self._starting.pop(exited, None) is not None:
+                self._spawn_after = time.monotonic() + 1
+            self._retiring.pop(exited, None)
+            self._requeue_rows(exited)
+        return exited, expected
+
+    def _requeue_rows(self, pid: int):
+        if self.job_queue is None:
+            return
+        try:
+            self.job_queue.requeue_worker(pid)
+        except Exception as requeue_error:
+            logger.warning("⚠️ [SERVER] Could not requeue job rows of worker %s: %s", pid, requeue_error)
+        finally:
+            # Never carry an open database connection into the next fork
+            self.job_queue.close()
+
+    # ---- supervision -----------------------------------------------------
+
+    def rolling_restart(self):
+        """
+        Replace every worker with a fresh fork, one at a time, without dropping capacity.
+
+        Only schedules the restart: the supervision loop advances it (_advance_restart) between
+        handling signals and reaping workers, so nothing here waits on a worker.
+        """
+        current = self._replacing or ()
+        self._restart_queue = [pid for pid in self._pids
+                               if pid not in self._retiring and pid not in self._starting and pid not in current]
+        logger.info("✅ [SERVER] Rolling restart of %s workers", len(self._restart_queue) + bool(current))
+
+    def _advance_restart(self):
+        """Take the rolling restart as far as it can go without waiting."""
+        while self._replacing is not None or self._restart_queue:
+            if self._replacing is None:
+                old_pid = self._restart_queue.pop(0)
+                if old_pid in self._pids and old_pid not in self._retiring:
+                    self._replacing = (old_pid, self.spawn_worker())
+                continue
+            old_pid, new_pid = self._replacing
+            if new_pid in self._starting:
+                return
+            if new_pid not in self._pids or new_pid in self._retiring:
+                logger.error("❌ [SERVER] Rolling restart stopped: replacement for worker %s failed to start", old_pid)
+                self._replacing = None
+                self._restart_queue = []
+                return
+            if old_pid in self._pids:
+                # The next worker is only replaced once this one has exited
+                if old_pid not in self._retiring:
+                    self.stop_worker(old_pid)
+                return
+            logger.info("✅ [SERVER] Worker %s replaced by %s", old_pid, new_pid)
+            self._replacing = None
+
+    def scale(self, workers: int):
+        """Change the number of workers kept running."""
+        self.workers = max(1, workers)
+        active = [pid for pid in self._pids if pid not in self._retiring]
+        for pid in active[self.workers:]:
+            self.stop_worker(pid)
+        logger.info("✅ [SERVER] Scaling to %s workers", self.workers)
+
+    def _replace_missing(self):
+        active = [pid for pid in self._pids if pid not in self._retiring]
+        if len(active) < self.workers and time.monotonic() >= self._spawn_after:
+            for _ in range(self.workers - len(active)):
+                self.spawn_worker()
+
+    def _wait_for_events(self) -> list:
+        """Sleep until a signal, a ready pipe or the next deadline (at most a second)."""
+        now = time.monotonic()
+        upcoming = [deadline - now for deadline in (*self._starting.values(), *self._retiring.values(), self._spawn_after)
+                    if deadline > now]
+        timeout = min([1.0, *upcoming])
+        ready_fds = [self._pids[pid] for pid in self._starting]
+        readable, _, _ = select.select([self._wakeup_read, *ready_fds], [], [], timeout)
+        try:
+            os.read(self._wakeup_read, 512)
+        except BlockingIOError:
+            pass
+        return readable
+
+    def _handle_signal(self, signum, frame):
+        self._signals.append(signum)
+
+    def run(self):
+        """Bind the socket, fork the workers and supervise them until SIGTERM/SIGINT."""
+        self.socket = socket.socket(socket.AF_INET6 if ":" in self.host else socket.AF_INET)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.socket.bind((self.host, self.port))
+        self.socket.listen(2048)
+        self.socket.set_inheritable(True)
+
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        os.set_blocking(self._wakeup_write, False)
+        signal.set_wakeup_fd(self._wakeup_write)
+        for sig in HANDLED_SIGNALS:
+            signal.signal(sig, self._handle_signal)
+
+        # Keep the preloaded objects out of the collector so it never touches (and copies) their pages
+        gc.collect()
+        gc.freeze()
+        logger.info("✅ [SERVER] Listening on %s:%s with %s workers (parent %s)", self.host, self.port, self.workers, os.getpid())
+        try:
+            for _ in range(self.workers):
+                if not self.wait_ready(self.spawn_worker()):
+                    raise RuntimeError("A web worker failed to start - see the worker log above")
+
+            # Every step below returns without waiting on a worker, so signals are handled within a pass
+            while not self._stopping:
+                readable = self._wait_for_events()
+                while self._signals:
+                    signum = self._signals.pop(0)
+                    if signum in (signal.SIGTERM, signal.SIGINT):
+                        self._stopping = True
+                    elif signum == signal.SIGHUP:
+                        self.rolling_restart()
+                    elif signum == signal.SIGTTIN:
+                        self.scale(self.workers + 1)
+                    elif signum == signal.SIGTTOU:
+                        self.scale(self.workers - 1)
+                if self._stopping:
+                    break
+                self._check_starting(readable)
+                while True:
+                    pid, expected = self._reap()
+                    if not pid:
+                        break
+                    if not expected:
+                        logger.error("❌ [SERVER] Worker %s exited unexpectedly - replacing it", pid)
+                self._kill_overdue()
+                self._advance_restart()
+                self._replace_missing()
+        finally:
+            logger.info("✅ [SERVER] Shutting down %s workers", len(self._pids))
+            pids = list(self._pids)
+            for pid in pids:
+                self.stop_worker(pid)
+            self._wait_exit(pids)
+            self.socket.close()
+            signal.set_wakeup_fd(-1)
+            os.close(self._wakeup_read)
+            os.close(self._wakeup_write)
+
+
+def main():
+    app = preload(os.getenv("PRELOAD_TEMPLATES", "all"))
+    from job_queue import job_queue
+
+    server = PreforkServer(
+        app,
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        workers=int(os.getenv("WEB_WORKERS", "0")) or os.cpu_count() or 1,
+        graceful_timeout=float(os.getenv("GRACEFUL_TIMEOUT", "30")),
+        ready_timeout=float(os.getenv("WORKER_READY_TIMEOUT", "60")),
+        job_queue=job_queue,
+    )
+    server.run()
+
+
+if __name__ == "__main__":
+    main()
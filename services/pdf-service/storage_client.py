@@ -0,0 +1,85 @@
+"""
+Async, connection-pooled HTTP client for Supabase storage traffic.
+
+A single httpx.AsyncClient is shared per process so TLS connections are kept alive
+between template fetches, and a per-host semaphore bounds how many requests can be
+in flight against storage at once. Nothing here blocks the event loop.
+"""
+
+import asyncio
+import os
+from urllib.parse import urlsplit
+
+import httpx
+
+
+class StorageClient:
+    """Shared async HTTP client with keep-alive, bounded per-host concurrency and timeouts."""
+
+    def __init__(
+        self,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        per_host_concurrency: int = 8,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 20.0,
+        pool_timeout: float = 10.0,
+    ):
+        """
+        Args:
+            max_connections: Total open connections across all hosts
+            max_keepalive_connections: Idle connections kept alive for reuse
+            per_host_concurrency: Maximum in-flight requests to a single host
+            connect_timeout: Seconds allowed to establish a connection
+            read_timeout: Seconds allowed between received bytes
+            pool_timeout: Seconds to wait for a free pooled connection
+        """
+        self.per_host_concurrency = per_host_concurrency
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self._timeout = httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=read_timeout,
+            pool=pool_timeout,
+        )
+        self._client = None
+        self._host_semaphores = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(limits=self._limits, timeout=self._timeout)
+        return self._client
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.per_host_concurrency)
+            self._host_semaphores[host] = semaphore
+        return semaphore
+
+    async def get(self, url: str, headers: dict | None = None) -> httpx.Response:
+        """GET a URL through the shared pool, waiting for a per-host slot first."""
+        async with self._host_semaphore(url):
+            return await self._get_client().get(url, headers=headers)
+
+    async def aclose(self):
+        """Close pooled connections (called on application shutdown)."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._host_semaphores = {}
+
+
+# Process-wide client shared by every endpoint in this worker
+storage_client = StorageClient(
+    max_connections=int(os.getenv("STORAGE_MAX_CONNECTIONS", "20")),
+    max_keepalive_connections=int(os.getenv("STORAGE_MAX_KEEPALIVE", "10")),
+    per_host_concurrency=int(os.getenv("STORAGE_PER_HOST_CONCURRENCY", "8")),
+    connect_timeout=float(os.getenv("STORAGE_CONNECT_TIMEOUT", "5")),
+    read_timeout=float(os.getenv("STORAGE_READ_TIMEOUT", "20")),
+    pool_timeout=float(os.getenv("STORAGE_POOL_TIMEOUT", "10")),
+)
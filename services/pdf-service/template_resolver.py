@@ -0,0 +1,260 @@
+"""
+Table-driven selection of the Supabase template for a row.
+
+Every generation endpoint picks its template from the same handful of row fields (Extra
+Line, Scope length, Country, Logo, Accreditation, Size, Language). A row is normalised
+into a TemplateFeatures tuple once, and the (template_name, template_type) for each output
+family is a single dict lookup in a table compiled at import time from the declarative
+FAMILY_TEMPLATES below.
+
+Selection rules, in priority order:
+    - A logo (see LOGO_RULES) picks the logo template, whatever the scope length or size
+    - Extra Line, or a scope estimated at more than 11 lines, picks a large template
+    - Accreditation "no" picks the non-accredited variant
+    - Size "high" picks the regular variant, anything else the eco variant
+    - Country "Other" picks the Other variant of each of the above
+    - Language "s" prefixes the name with "S_" (certificate and softcopy only)
+"""
+
+import itertools
+import logging
+from typing import NamedTuple
+
+from rise.template_geometry import KNOWN_TEMPLATE_TYPES
+
+logger = logging.getLogger(__name__)
+
+# Estimated scope lines above which a large template is used
+STANDARD_MAX_LINES = 11
+
+
+class TemplateFeatures(NamedTuple):
+    """Normalised row fields that decide which template is used."""
+
+    large: bool          # Extra Line present, or scope estimated over STANDARD_MAX_LINES
+    other_country: bool  # Country == "Other"
+    logo: bool           # Row gets a logo template (see LOGO_RULES)
+    nonaccredited: bool  # Accreditation == "no"
+    high_size: bool      # Size == "high"
+    spanish: bool        # Language == "s"
+
+
+# (layout, country, grade) -> (template_name, template_type) per output family.
+# layout: standard | large | logo; country: default | other;
+# grade: high | eco | nonaccredited (logo templates: accredited | nonaccredited)
+FAMILY_TEMPLATES = {
+    "certificate": {
+        ("standard", "default", "high"): ("template_draft", "standard"),
+        ("standard", "default", "eco"): ("templateDraftStandardEco", "standard_eco"),
+        ("standard", "default", "nonaccredited"): ("templateDraftStandardNonAcc", "standard_nonaccredited"),
+        ("standard", "other", "high"): ("template_draft_other", "standard_other"),
+        ("standard", "other", "eco"): ("template_draft_other_eco", "standard_other_eco"),
+        ("standard", "other", "nonaccredited"): ("templateDraftStandardNonAccOther", "standard_nonaccredited_other"),
+        ("large", "default", "high"): ("template_draft_large", "large"),
+        ("large", "default", "eco"): ("templateDraftLargeEco", "large_eco"),
+        ("large", "default", "nonaccredited"): ("templateDraftLargeNonAcc", "large_nonaccredited"),
+        ("large", "other", "high"): ("template_draft_large_other", "large_other"),
+        ("large", "other", "eco"): ("template_draft_large_other_eco", "large_other_eco"),
+        ("large", "other", "nonaccredited"): ("templateDraftLargeNonAccOther", "large_nonaccredited_other"),
+        ("logo", "default", "accredited"): ("templateDraftLogo", "logo"),
+        ("logo", "default", "nonaccredited"): ("templateDraftLogoNonAcc", "logo_nonaccredited"),
+        ("logo", "other", "accredited"): ("templateDraftLogoOther", "logo_other"),
+        ("logo", "other", "nonaccredited"): ("templateDraftLogoNonAccOther", "logo_nonaccredited_other"),
+    },
+    "softcopy": {
+        ("standard", "default", "high"): ("template_softCopy", "standard"),
+        ("standard", "default", "eco"): ("templateSoftCopyStandardEco", "standard_eco"),
+        ("standard", "default", "nonaccredited"): ("templateSoftCopyStandardNonAcc", "standard_nonaccredited"),
+        ("standard", "other", "high"): ("template_softCopy_other", "standard_other"),
+        ("standard", "other", "eco"): ("template_softCopy_other_eco", "standard_other_eco"),
+        ("standard", "other", "nonaccredited"): ("templateSoftCopyStandardNonAccOther", "standard_nonaccredited_other"),
+        ("large", "default", "high"): ("template_SoftCopy_large", "large"),
+        ("large", "default", "eco"): ("templateSoftCopyLargeEco", "large_eco"),
+        ("large", "default", "nonaccredited"): ("templateSoftCopyLargeNonAcc", "large_nonaccredited"),
+        ("large", "other", "high"): ("template_softCopy_large_other", "large_other"),
+        ("large", "other", "eco"): ("template_softCopy_large_other_eco", "large_other_eco"),
+        ("large", "other", "nonaccredited"): ("templateSoftCopyLargeNonAccOther", "large_nonaccredited_other"),
+        ("logo", "default", "accredited"): ("templateSoftCopyLogo", "logo"),
+        ("logo", "default", "nonaccredited"): ("templateSoftCopyLogoNonAcc", "logo_nonaccredited"),
+        ("logo", "other", "accredited"): ("templateSoftCopyLogoOther", "logo_other"),
+        ("logo", "other", "nonaccredited"): ("templateSoftCopyLogoOtherNonAcc", "logo_other_nonaccredited"),
+    },
+    "printable": {
+        ("standard", "default", "high"): ("templatePrintableStandard", "standard"),
+        ("standard", "default", "eco"): ("templatePrintableStandardEco", "standard_eco"),
+        ("standard", "default", "nonaccredited"): ("templatePrintableStandardNonAcc", "standard_nonaccredited"),
+        ("standard", "other", "high"): ("templatePrintableStandardOther", "standard_other"),
+        ("standard", "other", "eco"): ("templatePrintableStandardOtherEco", "standard_other_eco"),
+        ("standard", "other", "nonaccredited"): ("templatePrintableOtherNonAcc", "standard_other_nonaccredited"),
+        ("large", "default", "high"): ("templateprintableLarge", "large"),
+        ("large", "default", "eco"): ("templateprintableLargeEco", "large_eco"),
+        ("large", "default", "nonaccredited"): ("templateprintableLargeNonAcc", "large_nonaccredited"),
+        ("large", "other", "high"): ("templateprintableLargeOther", "large_other"),
+        ("large", "other", "eco"): ("templateprintableLargeOtherEco", "large_other_eco"),
+        ("large", "other", "nonaccredited"): ("templateprintableLargeOtherNonAcc", "large_other_nonaccredited"),
+        ("logo", "default", "accredited"): ("templatePrintableLogo", "logo"),
+        ("logo", "default", "nonaccredited"): ("templatePrintableLogoNonAcc", "logo_nonaccredited"),
+        ("logo", "other", "accredited"): ("templatePrintableLogoOther", "logo_other"),
+        ("logo", "other", "nonaccredited"): ("templatePrintableLogoOtherNonAcc", "logo_other_nonaccredited"),
+    },
+}
+
+# How a row qualifies for a logo template:
+#   "uploaded": any logo was supplied with the request (or the row's Logo file was)
+#   "named": the row's Logo filename, lowercased, was supplied
+LOGO_RULES = {"certificate": "uploaded", "softcopy": "uploaded", "printable": "named"}
+
+# Template name prefix for Spanish rows, per family
+SPANISH_PREFIXES = {"certificate": "S_", "softcopy": "S_", "printable": ""}
+
+
+def _field(values: dict, key: str) -> str:
+    return (values.get(key) or "").strip()
+
+
+def estimate_scope_lines(scope: str) -> int:
+    """Rough scope length in lines: 8 chars per word, 60 chars per line."""
+    return max(1, (len(scope.split()) * 8) // 60)
+
+
+def template_key(features: TemplateFeatures) -> tuple[str, str, str]:
+    """The (layout, country, grade) entry of FAMILY_TEMPLATES a feature tuple selects."""
+    country = "other" if features.other_country else "default"
+    if features.logo:
+        return ("logo", country, "nonaccredited" if features.nonaccredited else "accredited")
+    layout = "large" if features.large else "standard"
+    if features.nonaccredited:
+        grade = "nonaccredited"
+    elif features.high_size:
+        grade = "high"
+    else:
+        grade = "eco"
+    return (layout, country, grade)
+
+
+def compile_tables(family_templates: dict, spanish_prefixes: dict) -> dict:
+    """
+    Expand FAMILY_TEMPLATES into {family: {TemplateFeatures: (template_name, template_type)}}.
+
+    Raises:
+        ValueError: If a feature combination has no template, a template is never
+            selected, or a template type has no geometry
+    """
+    problems = []
+    tables = {}
+    for family, templates in family_templates.items():
+        table = {}
+        used = set()
+        prefix = spanish_prefixes.get(family, "")
+        for flags in itertools.product((False, True), repeat=len(TemplateFeatures._fields)):
+            features = TemplateFeatures(*flags)
+            key = template_key(features)
+            if key not in templates:
+                problems.append(f"{family}: no template for {key}")
+                continue
+            used.add(key)
+            template_name, template_type = templates[key]
+            if features.spanish and prefix:
+                template_name = f"{prefix}{template_name}"
+            table[features] = (template_name, template_type)
+        for key, (template_name, template_type) in templates.items():
+            if key not in used:
+                problems.append(f"{family}: {template_name} is never selected")
+            if template_type not in KNOWN_TEMPLATE_TYPES:
+                problems.append(f"{family}: {template_name} has unknown template type '{template_type}'")
+        tables[family] = table
+    if problems:
+        raise ValueError("Invalid template table: " + "; ".join(problems))
+    return tables
+
+
+class TemplateResolver:
+    """Resolves rows to (template_name, template_type) through the compiled tables."""
+
+    def __init__(self, family_templates: dict = FAMILY_TEMPLATES, logo_rules: dict = LOGO_RULES, spanish_prefixes: dict = SPANISH_PREFIXES):
+        self.logo_rules = logo_rules
+        self.tables = compile_tables(family_templates, spanish_prefixes)
+
+    @property
+    def families(self) -> tuple:
+        return tuple(self.tables)
+
+    def features(self, family: str, values: dict, logo_lookup: dict, logo: str | None = None) -> TemplateFeatures:
+        """
+        Normalise a row into the fields that decide its template.
+
+        Args:
+            family: Output family ("certificate", "softcopy" or "printable")
+            values: Row field data
+            logo_lookup: Logos supplied with the request, keyed by filename
+            logo: Logo filename when it is not part of values (printable rows)
+        """
+        logo_name = (values.get("Logo") if logo is None else logo) or ""
+        if self.logo_rules[family] == "named":
+            has_logo = bool(logo_name.strip()) and logo_name.lower().strip() in logo_lookup
+        else:
+            has_logo = len(logo_lookup) > 0 or (bool(logo_name.strip()) and logo_name.strip() in logo_lookup)
+
+        return TemplateFeatures(
+            large=bool(_field(values, "Extra Line")) or estimate_scope_lines(values.get("Scope") or "") > STANDARD_MAX_LINES,
+            other_country=_field(values, "Country").lower() == "other",
+            logo=has_logo,
+            nonaccredited=_field(values, "Accreditation").lower() == "no",
+            high_size=_field(values, "Size").lower() == "high",
+            spanish=_field(values, "Language").lower() == "s",
+        )
+
+    def resolve(self, family: str, values: dict, logo_lookup: dict, logo: str | None = None) -> tuple[str, str]:
+        """
+        Pick the Supabase template for a row.
+
+        Returns:
+            tuple: (template_name, template_type)
+        """
+        if family not in self.tables:
+            raise ValueError(f"Unknown template family: {family}")
+        features = self.features(family, values, logo_lookup, logo)
+        template_name, template_type = self.tables[family][features]
+
+        tag = family.upper()
+        logo_name = ((values.get("Logo") if logo is None else logo) or "").strip()
+        if logo_name and not features.logo:
+            logger.warning("⚠️ [%s] Logo specified but file not found: %s - using regular template", tag, logo_name)
+        logger.debug("🔍 [%s] Template: %s (%s) for %s", tag, template_name, template_type, features)
+        return template_name, template_type
+
+    def resolve_batch(self, family: str, rows: list, logo_lookup: dict) -> tuple[list, dict]:
+        """
+        Resolve many rows at once.
+
+        Args:
+            family: Output family
+            rows: Row data keyed by spreadsheet column names
+            logo_lookup: Logos supplied with the request, keyed by filename
+
+        Returns:
+            tuple: ([(template_name, template_type) per row], {template_name: [row indices]})
+        """
+        resolved = []
+        groups = {}
+        for index, row in enumerate(rows):
+            template_name, template_type = self.resolve(family, row, logo_lookup)
+            resolved.append((template_name, template_type))
+            groups.setdefault(template_name, []).append(index)
+        return resolved, groups
+
+    def template_names(self, family: str | None = None) -> list:
+        """Every template name the tables can select (for one family, or all of them)."""
+        families = [family] if family else self.tables
+        return sorted({template_name for name in families for template_name, _ in self.tables[name].values()})
+
+    def stats(self) -> dict:
+        """Table sizes for health/diagnostic endpoints."""
+        return {
+            family: {"entries": len(table), "templates": len(set(table.values()))}
+            for family, table in self.tables.items()
+        }
+
+
+# Process-wide resolver shared by all generation endpoints
+template_resolver = TemplateResolver()
@@ -0,0 +1,118 @@
+"""
+Where certificate templates come from: a local directory, Supabase storage, or both.
+
+Local templates use the same naming scheme as Supabase storage: the template
+"template_softCopy" is <TEMPLATE_DIR>/template_softCopy.pdf. They are loaded (mapped
+read-only) once at startup, so a local hit never touches the network or the template
+store.
+
+- "supabase": every template comes from Supabase, through the template store (default)
+- "local":    only the local directory is used; Supabase is never contacted (air-gapped
+              deployments, benchmarks, tests)
+- "layered":  the local directory first, then Supabase for names it doesn't have
+
+Configure with:
+    TEMPLATE_SOURCE    "supabase" (default), "local" or "layered"
+    TEMPLATE_DIR       Local template directory (default: templates/ next to this file)
+    TEMPLATE_FALLBACK  Optional local template served for names the directory doesn't have
+                       (e.g. "default-draft"); "local" source only
+"""
+
+import logging
+import mmap
+import os
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateSource:
+    """Configured template source, with the local directory's templates loaded at startup."""
+
+    MODES = ("supabase", "local", "layered")
+
+    def __init__(self, mode: str = "supabase", directory: str | None = None, fallback: str | None = None):
+        """
+        Args:
+            mode: "supabase", "local" or "layered"
+            directory: Directory of <template_name>.pdf files (used by "local" and "layered")
+            fallback: Local template name served for unknown names in "local" mode
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown template source '{mode}' - expected one of {', '.join(self.MODES)}")
+        self.mode = mode
+        self.directory = directory
+        self.fallback = fallback or None
+        self._templates = None  # template name -> memoryview over the mapped file
+        self.local_hits = 0
+        self.fallback_hits = 0
+
+    @property
+    def uses_local(self) -> bool:
+        return self.mode in ("local", "layered")
+
+    @property
+    def uses_supabase(self) -> bool:
+        return self.mode in ("supabase", "layered")
+
+    def load(self) -> int:
+        """Map every <template_name>.pdf in the local directory (once per process). Returns the count."""
+        if self._templates is not None or not self.uses_local:
+            return len(self._templates or {})
+        templates = {}
+        if os.path.isdir(self.directory):
+            for filename in sorted(os.listdir(self.directory)):
+                template_name, extension = os.path.splitext(filename)
+                path = os.path.join(self.directory, filename)
+                if extension.lower() != ".pdf" or not os.path.isfile(path) or os.path.getsize(path) == 0:
+                    continue
+                with open(path, "rb") as template_file:
+                    templates[template_name] = memoryview(mmap.mmap(template_file.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            logger.warning("⚠️ [TEMPLATES] Template directory %s does not exist", self.directory)
+        if self.fallback and self.fallback not in templates:
+            raise ValueError(f"Fallback template '{self.fallback}' is not in {self.directory}")
+        self._templates = templates
+        logger.info("✅ [TEMPLATES] Loaded %s local templates from %s (%s source)", len(templates), self.directory, self.mode)
+        return len(templates)
+
+    def get_local(self, template_name: str) -> memoryview | None:
+        """Return a local template's bytes, or None when the local directory doesn't have it."""
+        if not self.uses_local:
+            return None
+        if self._templates is None:
+            self.load()
+        content = self._templates.get(template_name)
+        if content is not None:
+            self.local_hits += 1
+        elif self.mode == "local" and self.fallback:
+            self.fallback_hits += 1
+            logger.debug("🔍 [TEMPLATES] %s not in %s - using %s", template_name, self.directory, self.fallback)
+            content = self._templates[self.fallback]
+        return content
+
+    def templates(self) -> dict:
+        """Loaded local templates (name -> bytes view), e.g. to pre-initialise render workers with."""
+        return dict(self._templates or {})
+
+    def names(self) -> list:
+        """Names of the loaded local templates."""
+        return sorted(self._templates or {})
+
+    def stats(self) -> dict:
+        """Source configuration and counters for health/diagnostic endpoints."""
+        return {
+            "mode": self.mode,
+            "directory": self.directory if self.uses_local else None,
+            "local_templates": len(self._templates or {}),
+            "fallback": self.fallback,
+            "local_hits": self.local_hits,
+            "fallback_hits": self.fallback_hits,
+        }
+
+
+# Process-wide template source shared by every endpoint in this worker
+template_source = TemplateSource(
+    mode=os.getenv("TEMPLATE_SOURCE", "supabase").strip().lower(),
+    directory=os.getenv("TEMPLATE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")),
+    fallback=os.getenv("TEMPLATE_FALLBACK", "").strip(),
+)
@@ -0,0 +1,273 @@
+"""
+Persistent, content-addressed store of certificate template PDFs shared by every worker on a node.
+
+Templates are stored once under objects/<sha256> with a manifest mapping each template
+name (e.g. "template_softCopy", "S_templateDraftLogo") to its hash, the ETag storage
+returned and when it was last fetched or revalidated. Workers open the objects with a
+read-only mmap, so every process renders from the same page-cache pages instead of
+holding its own copy, and a restarted or recycled worker finds its templates already on
+disk instead of downloading them again.
+
+Entries older than the TTL are stale: they are still served, and main.py revalidates
+them against Supabase in the background (stale-while-revalidate). A template pushed
+through the admin endpoint is pinned: it is served as is and not revalidated until it is
+invalidated.
+
+Configure with:
+    TEMPLATE_STORE_DIR               Store directory (default <tmp>/pdf_service_templates)
+    TEMPLATE_STORE_TTL               Seconds before an entry is revalidated (default 300)
+    TEMPLATE_STORE_REFRESH_INTERVAL  Seconds between background refresh passes (default 60)
+"""
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+
+
+class StoredTemplate:
+    """A stored template: its bytes (a read-only view of the mmapped object) and validators."""
+
+    __slots__ = ("name", "digest", "content", "etag", "fetched_at", "pinned")
+
+    def __init__(self, name: str, digest: str, content: memoryview, etag: str | None, fetched_at: float, pinned: bool):
+        self.name = name
+        self.digest = digest
+        self.content = content
+        self.etag = etag
+        self.fetched_at = fetched_at
+        self.pinned = pinned
+
+
+class TemplateStore:
+    """Template bytes on disk under objects/<sha256>, plus a name -> {hash, etag, fetched_at} manifest."""
+
+    def __init__(self, root_dir: str, ttl_seconds: float = 300, refresh_interval: float = 60):
+        """
+        Args:
+            root_dir: Directory holding objects/ and manifest.json
+            ttl_seconds: How long an entry is served without revalidating against storage
+            refresh_interval: Seconds between background refresh passes
+        """
+        self.root_dir = root_dir
+        self.objects_dir = os.path.join(root_dir, "objects")
+        self.manifest_path = os.path.join(root_dir, "manifest.json")
+        self.ttl_seconds = ttl_seconds
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._manifest_version = None
+        self._maps = {}  # digest -> memoryview over this process's mmap of the object
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+        self.stored = 0
+        self.revalidations = 0
+
+    # ---- manifest --------------------------------------------------------
+
+    def _load_manifest(self) -> dict:
+        # Reload when another worker process has replaced the manifest
+        try:
+            stat = os.stat(self.manifest_path)
+            version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            version = None
+        if self._manifest is None or version != self._manifest_version:
+            os.makedirs(self.objects_dir, exist_ok=True)
+            if version is not None:
+                with open(self.manifest_path, "r") as manifest_file:
+                    self._manifest = json.load(manifest_file)
+            else:
+                self._manifest = {}
+            self._manifest_version = version
+            self._drop_stale_maps()
+        return self._manifest
+
+    def _save_manifest(self):
+        # Write-then-rename so a crash never leaves a truncated manifest behind
+        fd, tmp_path = tempfile.mkstemp(dir=self.root_dir, suffix=".json")
+        with os.fdopen(fd, "w") as manifest_file:
+            json.dump(self._manifest, manifest_file, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+        stat = os.stat(self.manifest_path)
+        self._manifest_version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    @contextlib.contextmanager
+    def _updating(self):
+        """Hold the in-process and the cross-process lock around a manifest read-modify-write."""
+        with self._lock:
+            os.makedirs(self.objects_dir, exist_ok=True)
+            with open(os.path.join(self.root_dir, "manifest.lock"), "a") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    # Another worker may have written since our last read
+                    self._manifest = None
+                    yield self._load_manifest()
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest)
+
+    def _open(self, digest: str) -> memoryview:
+        view = self._maps.get(digest)
+        if view is None:
+            with open(self._object_path(digest), "rb") as object_file:
+                view = memoryview(mmap.mmap(object_file.fileno(), 0, access=mmap.ACCESS_READ))
+            self._maps[digest] = view
+        return view
+
+    def _entry(self, name: str, record: dict) -> StoredTemplate:
+        return StoredTemplate(name, record["hash"], self._open(record["hash"]), record.get("etag"),
+                              record["fetched_at"], bool(record.get("pinned")))
+
+    def _drop_stale_maps(self):
+        # Another worker may have replaced or removed templates: stop holding maps of objects
+        # the manifest no longer references (their pages are freed once renders using them finish)
+        referenced = {record["hash"] for record in self._manifest.values()}
+        for digest in [digest for digest in self._maps if digest not in referenced]:
+            del self._maps[digest]
+
+    def _drop_unreferenced(self, manifest: dict):
+        referenced = {record["hash"] for record in manifest.values()}
+        for digest in os.listdir(self.objects_dir):
+            if digest not in referenced:
+                # Processes that still map the object keep their pages until they drop it
+                os.unlink(self._object_path(digest))
+                self._maps.pop(digest, None)
+
+    # ---- public API ------------------------------------------------------
+
+    def get(self, name: str) -> StoredTemplate | None:
+        """Return the stored template (fresh or stale), or None if it has never been stored."""
+        with self._lock:
+            record = self._load_manifest().get(name)
+            if record is None:
+                self.misses += 1
+                return None
+            try:
+                entry = self._entry(name, record)
+            except FileNotFoundError:
+                # Object removed by another worker after we read the manifest
+                self.misses += 1
+                return None
+            self.hits += 1
+            if not self.is_fresh(entry):
+                self.stale_hits += 1
+            return entry
+
+    def is_fresh(self, entry: StoredTemplate) -> bool:
+        """Whether an entry can be served without asking storage if it changed."""
+        return entry.pinned or (time.time() - entry.fetched_at) < self.ttl_seconds
+
+    def put(self, name: str, content: bytes, etag: str | None = None, pinned: bool = False) -> StoredTemplate:
+        """Store (or replace) a template; identical content is kept once. Returns the new entry."""
+        if not content:
+            raise ValueError(f"Template {name} is empty")
+        digest = hashlib.sha256(content).hexdigest()
+        with self._updating() as manifest:
+            object_path = self._object_path(digest)
+            if not os.path.exists(object_path):
+                fd, tmp_path = tempfile.mkstemp(dir=self.objects_dir)
+                with os.fdopen(fd, "wb") as object_file:
+                    object_file.write(content)
+                os.replace(tmp_path, object_path)
+            manifest[name] = {"hash": digest, "etag": etag, "fetched_at": time.time(), "size": len(content),
+                              "pinned": pinned}
+            self._save_manifest()
+            self._drop_unreferenced(manifest)
+            self.stored += 1
+            return self._entry(name, manifest[name])
+
+    def mark_revalidated(self, name: str) -> StoredTemplate | None:
+        """Record a 304 Not Modified answer: the stored bytes are fresh again."""
+        with self._updating() as manifest:
+            self.revalidations += 1
+            record = manifest.get(name)
+            if record is None:
+                return None
+            record["fetched_at"] = time.time()
+            self._save_manifest()
+            return self._entry(name, record)
+
+    def invalidate(self, name: str | None = None) -> list:
+        """Drop one template, or every template when no name is given. Returns the names removed."""
+        with self._updating() as manifest:
+            names = list(manifest) if name is None else [name] if name in manifest else []
+            for removed in names:
+                del manifest[removed]
+            if names:
+                self._save_manifest()
+                self._drop_unreferenced(manifest)
+            return names
+
+    def stale_names(self) -> list:
+        """Names of the stored, unpinned templates whose TTL has run out."""
+        with self._lock:
+            now = time.time()
+            return sorted(
+                name for name, record in self._load_manifest().items()
+                if not record.get("pinned") and now - record["fetched_at"] >= self.ttl_seconds
+            )
+
+    @contextlib.contextmanager
+    def refresh_lock(self):
+        """
+        Take the node-wide refresher lock without waiting.
+
+        Yields:
+            bool: True if this process holds the lock and should run the refresh pass
+        """
+        os.makedirs(self.root_dir, exist_ok=True)
+        with open(os.path.join(self.root_dir, "refresh.lock"), "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def list(self) -> list[dict]:
+        """All stored templates with their hash, size, ETag, age and whether they are pinned."""
+        with self._lock:
+            manifest = dict(self._load_manifest())
+        now = time.time()
+        return [
+            {"name": name, "sha256": record["hash"], "size": record.get("size"), "etag": record.get("etag"),
+             "age_seconds": round(now - record["fetched_at"], 1), "pinned": bool(record.get("pinned"))}
+            for name, record in sorted(manifest.items())
+        ]
+
+    def stats(self) -> dict:
+        """Store counters for health/diagnostic endpoints."""
+        with self._lock:
+            manifest = self._load_manifest()
+            return {
+                "dir": self.root_dir,
+                "templates": len(manifest),
+                "bytes": sum(record.get("size") or 0 for record in manifest.values()),
+                "mapped": len(self._maps),
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "stored": self.stored,
+                "revalidations": self.revalidations,
+            }
+
+
+# Node-wide store shared by every worker (each worker maps the same object files)
+template_store = TemplateStore(
+    os.getenv("TEMPLATE_STORE_DIR", os.path.join(tempfile.gettempdir(), "pdf_service_templates")),
+    ttl_seconds=float(os.getenv("TEMPLATE_STORE_TTL", "300")),
+    refresh_interval=float(os.getenv("TEMPLATE_STORE_REFRESH_INTERVAL", "60")),
+)
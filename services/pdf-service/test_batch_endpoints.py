@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch endpoints. Templates come from the local template directory (the
+Supabase URL points at a closed port), so no network access is needed.
+"""
+
+import asyncio
+import io
+import json
+import os
+import zipfile
+
+import fitz
+import pytest
+from fastapi.testclient import TestClient
+
+from template_source import TemplateSource
+
+os.environ.setdefault("NEXT_PUBLIC_SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("NEXT_PUBLIC_SUPABASE_ANON_KEY", "test")
+os.environ.setdefault("INTERNAL_TOKEN", "test")
+
+import main  # noqa: E402
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+
+def batch_rows() -> list:
+    return [
+        {"Company Name": "Alpha Ltd", "ISO Standard": "ISO 9001:2015", "Certificate Number": "B-1"},
+        {"Company Name": "", "ISO Standard": "ISO 9001:2015", "Certificate Number": "B-2"},
+        {"Company Name": "Gamma/Delta Ltd", "ISO Standard": "ISO 14001:2015", "Certificate Number": "B-3"},
+        {"Company Name": "Epsilon Ltd", "ISO Standard": "ISO 45001:2018", "Certificate Number": "B-4"},
+    ]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(main, "template_source", TemplateSource("local", TEMPLATES_DIR, fallback="default-draft"))
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def test_render_window_bounds_in_flight_rows_and_keeps_order():
+    in_flight, peak = 0, 0
+
+    async def render(index, row):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        # Later rows finish first
+        await asyncio.sleep(0.01 * (10 - index))
+        in_flight -= 1
+        return row
+
+    async def collect():
+        return [item async for item in main.render_rows_in_order(render, list("abcdefghij"), window=3)]
+
+    assert asyncio.run(collect()) == list(enumerate("abcdefghij"))
+    assert peak == 3
+
+
+def test_softcopy_batch_zip_holds_rows_in_order_with_error_entries(client):
+    response = client.post("/generate-softcopy/batch", headers={"x-internal-token": main.INTERNAL_TOKEN},
+                           data={"rows": json.dumps(batch_rows())})
+    assert response.status_code == 200, response.text
+
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        assert archive.namelist() == [
+            "0001_Alpha Ltd_softcopy.pdf",
+            "0003_Gamma_Delta Ltd_softcopy.pdf",
+            "0004_Epsilon Ltd_softcopy.pdf",
+            "manifest.json",
+        ]
+        with fitz.open(stream=archive.read("0003_Gamma_Delta Ltd_softcopy.pdf"), filetype="pdf") as doc:
+            assert "Gamma/Delta Ltd" in doc[0].get_text()
+        manifest = json.loads(archive.read("manifest.json"))
+
+    assert (manifest["rows"], manifest["rendered"], manifest["failed"]) == (4, 3, 1)
+    assert [item["row"] for item in manifest["results"]] == [0, 1, 2, 3]
+    failed = manifest["results"][1]
+    assert failed["filename"] is None and failed["error"] == "Company name is required"
+    assert all(item["error"] is None and item["output_size"] for i, item in enumerate(manifest["results"]) if i != 1)
+
+
+def test_printable_batch_merges_one_page_per_row_in_order(client):
+    rows = [row for row in batch_rows() if row["Company Name"]]
+    rows += [{"Company Name": f"Row {index} Ltd", "ISO Standard": "ISO 9001:2015", "Certificate Number": f"B-{index}"}
+             for index in range(5, 13)]
+    sizes = {}
+    for profile in ("print", "web"):
+        response = client.post("/generate-printable/batch", headers={"x-internal-token": main.INTERNAL_TOKEN},
+                               data={"rows": json.dumps(rows), "profile": profile})
+        assert response.status_code == 200, response.text
+        assert response.headers["X-PDF-Profile"] == profile and "X-Failed-Rows" not in response.headers
+        sizes[profile] = len(response.content)
+
+        with fitz.open(stream=response.content, filetype="pdf") as doc:
+            assert doc.page_count == len(rows)
+            for page, row in zip(doc, rows):
+                text = page.get_text()
+                assert row["Company Name"] in text and row["Certificate Number"] in text
+    assert sizes["web"] < sizes["print"]
+
+
+def test_batches_over_the_row_limit_are_rejected_before_rendering(client, monkeypatch):
+    monkeypatch.setattr(main.upload_limits, "max_rows", 3)
+    rendered = []
+    original = main.render_row_pdf
+
+    async def render_row_pdf(*args, **kwargs):
+        rendered.append(args[1])
+        return await original(*args, **kwargs)
+
+    monkeypatch.setattr(main, "render_row_pdf", render_row_pdf)
+    rows = [row for row in batch_rows() if row["Company Name"]] * 2
+    for endpoint in ("/generate-softcopy/batch", "/generate-printable/batch"):
+        response = client.post(endpoint, headers={"x-internal-token": main.INTERNAL_TOKEN},
+                               data={"rows": json.dumps(rows)})
+        assert response.status_code == 413 and "3 row limit" in response.json()["detail"]
+        assert client.post(endpoint, headers={"x-internal-token": main.INTERNAL_TOKEN},
+                           data={"rows": json.dumps(rows[:3])}).status_code == 200
+    assert sorted(rendered) == [0, 0, 1, 1, 2, 2]
+
+
+def test_printable_batch_pages_are_merged_on_one_thread_off_the_event_loop(client, monkeypatch):
+    import threading
+
+    from rise import pdf_utils
+
+    threads = []
+    original = pdf_utils.PdfMerger.add
+
+    def add(self, pdf_content):
+        threads.append(threading.current_thread())
+        return original(self, pdf_content)
+
+    monkeypatch.setattr(pdf_utils.PdfMerger, "add", add)
+    rows = [row for row in batch_rows() if row["Company Name"]]
+    response = client.post("/generate-printable/batch", headers={"x-internal-token": main.INTERNAL_TOKEN},
+                           data={"rows": json.dumps(rows)})
+    assert response.status_code == 200, response.text
+    assert len(threads) == len(rows) and len(set(threads)) == 1
+    assert threads[0].name.startswith("merge")
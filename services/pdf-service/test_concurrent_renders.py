@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Concurrency test: hundreds of simultaneous renders must each come back with their own content.
+
+Renders run in memory (template bytes in, PDF bytes out), so no two requests can share an
+output path. Every render gets a unique company name and certificate number, and each
+returned PDF is checked to hold exactly its own values.
+"""
+
+import asyncio
+import json
+import os
+
+import fitz
+import httpx
+
+from render_backend import RenderBackend
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "templates", "default-draft.pdf")
+RENDERS = int(os.getenv("CONCURRENCY_TEST_RENDERS", "200"))
+
+
+def row(index: int) -> dict:
+    return {
+        "Company Name": f"Company {index:04d} Ltd",
+        "Address": f"{index} Example Road",
+        "ISO Standard": "ISO 9001:2015",
+        "Scope": f"Scope for row {index} " * (1 + index % 7),
+        "Certificate Number": f"CERT-{index:04d}",
+        "Issue Date": "01/01/2024",
+    }
+
+
+def assert_own_content(index: int, pdf_bytes: bytes):
+    with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        text = doc[0].get_text()
+    assert f"Company {index:04d} Ltd" in text and f"CERT-{index:04d}" in text, f"render {index} holds another request's content"
+
+
+def test_simultaneous_backend_renders():
+    with open(TEMPLATE_PATH, "rb") as template_file:
+        template = template_file.read()
+    kinds = ("softcopy", "printable", "certificate")
+    # The default backend: renders run in separate processes, never several PyMuPDF renders per interpreter
+    backend = RenderBackend("process", workers=4)
+    backend.start({"default-draft": template})
+
+    async def render_all():
+        return await asyncio.gather(*(
+            backend.run({
+                "kind": kinds[index % 3],
+                "template": template,
+                "template_name": "default-draft",
+                "values": {**row(index), "logo_lookup": {}},
+                "template_type": "standard",
+                "clone_template": kinds[index % 3] == "printable",
+            })
+            for index in range(RENDERS)
+        ))
+
+    try:
+        results = asyncio.run(render_all())
+    finally:
+        backend.shutdown()
+    for index, result in enumerate(results):
+        assert result["success"] and result["output_path"] is None
+        assert_own_content(index, result["pdf"])
+
+
+def test_simultaneous_endpoint_renders():
+    os.environ.setdefault("NEXT_PUBLIC_SUPABASE_URL", "http://127.0.0.1:9")
+    os.environ.setdefault("NEXT_PUBLIC_SUPABASE_ANON_KEY", "test")
+    os.environ.setdefault("INTERNAL_TOKEN", "test")
+    import main
+
+    with open(TEMPLATE_PATH, "rb") as template_file:
+        template = template_file.read()
+    headers = {"x-internal-token": main.INTERNAL_TOKEN}
+    requests = RENDERS // 2
+
+    async def post(client, index):
+        files = {"template": ("custom.pdf", template, "application/pdf")}
+        if index % 2:
+            values = row(index)
+            response = await client.post("/generate-printable", headers=headers, files=files, data={
+                "company_name": values["Company Name"],
+                "address": values["Address"],
+                "iso_standard": values["ISO Standard"],
+                "scope": values["Scope"],
+                "certificate_number": values["Certificate Number"],
+            })
+        else:
+            response = await client.post("/generate-softcopy", headers=headers, files=files, data={"data": json.dumps(row(index))})
+        return response
+
+    async def post_all():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+            return await asyncio.gather(*(post(client, index) for index in range(requests)))
+
+    responses = asyncio.run(post_all())
+    for index, response in enumerate(responses):
+        assert response.status_code == 200, response.text
+        assert_own_content(index, response.content)
+
+
+def test_simultaneous_certificates_are_named_after_their_request(monkeypatch):
+    os.environ.setdefault("NEXT_PUBLIC_SUPABASE_URL", "http://127.0.0.1:9")
+    os.environ.setdefault("NEXT_PUBLIC_SUPABASE_ANON_KEY", "test")
+    os.environ.setdefault("INTERNAL_TOKEN", "test")
+    import main
+    from template_source import TemplateSource
+
+    monkeypatch.setattr(main, "template_source", TemplateSource("local", os.path.dirname(TEMPLATE_PATH), fallback="default-draft"))
+    with open(TEMPLATE_PATH, "rb") as template_file:
+        form = template_file.read()
+    headers = {"x-internal-token": main.INTERNAL_TOKEN}
+
+    async def post_all():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=120) as client:
+            return await asyncio.gather(*(
+                client.post("/generate-certificate", headers=headers, files={"form": ("form.pdf", form, "application/pdf")},
+                            data={"fields": json.dumps(row(index))})
+                for index in range(20)
+            ))
+
+    responses = asyncio.run(post_all())
+    for index, response in enumerate(responses):
+        assert response.status_code == 200, response.text
+        # One process serves every request, so the download name can't come from the pid
+        assert response.headers["content-disposition"] == f'attachment; filename="Company {index:04d} Ltd_certificate.pdf"'
+        assert_own_content(index, response.content)
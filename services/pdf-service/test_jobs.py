@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Tests for the /jobs endpoints: submit, poll, download, requeue after a restart or a lost lease, and pruning.
+Each test gets its own job database; templates come from the local template directory.
+"""
+
+import io
+import json
+import os
+import sqlite3
+import time
+import tracemalloc
+import zipfile
+
+import fitz
+import pytest
+from fastapi.testclient import TestClient
+
+from job_queue import JobQueue
+from template_source import TemplateSource
+
+os.environ.setdefault("NEXT_PUBLIC_SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("NEXT_PUBLIC_SUPABASE_ANON_KEY", "test")
+os.environ.setdefault("INTERNAL_TOKEN", "test")
+
+import main  # noqa: E402
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+HEADERS = {"x-internal-token": main.INTERNAL_TOKEN}
+
+ROWS = [
+    {"Company Name": "Queued One Ltd", "ISO Standard": "ISO 9001:2015", "Certificate Number": "J-1"},
+    {"Company Name": "", "ISO Standard": "ISO 9001:2015", "Certificate Number": "J-2"},
+    {"Company Name": "Queued Three Ltd", "ISO Standard": "ISO 14001:2015", "Certificate Number": "J-3"},
+]
+
+
+def new_queue(tmp_path) -> JobQueue:
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"), str(tmp_path / "artifacts"), concurrency=2)
+    queue.register_renderer("softcopy", lambda index, row, logos: main.render_job_row("softcopy", index, row, logos),
+                            main.finalize_softcopy_job)
+    queue.register_renderer("printable", lambda index, row, logos: main.render_job_row("printable", index, row, logos),
+                            main.finalize_printable_job)
+    return queue
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    queue = new_queue(tmp_path)
+    monkeypatch.setattr(main, "job_queue", queue)
+    monkeypatch.setattr(main, "template_source", TemplateSource("local", TEMPLATES_DIR, fallback="default-draft"))
+    yield queue
+    queue.close()
+
+
+def wait_for_job(client, job_id: str, timeout: float = 60) -> dict:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = client.get(f"/jobs/{job_id}", headers=HEADERS).json()
+        if status["status"] in ("done", "failed"):
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish: {status}")
+
+
+def test_softcopy_job_submit_status_and_download(queue):
+    with TestClient(main.app) as client:
+        submitted = client.post("/jobs", headers=HEADERS, data={"kind": "softcopy", "rows": json.dumps(ROWS)}).json()
+        assert submitted["status"] == "queued" and submitted["total"] == 3
+
+        status = wait_for_job(client, submitted["job_id"])
+        assert (status["status"], status["completed"], status["failed"], status["progress"]) == ("done", 2, 1, 1.0)
+        assert [row["status"] for row in status["rows"]] == ["done", "failed", "done"]
+        assert status["rows"][1]["error"] == "Company name is required"
+
+        download = client.get(submitted["download_url"], headers=HEADERS)
+        assert download.status_code == 200 and download.headers["content-type"] == "application/zip"
+        with zipfile.ZipFile(io.BytesIO(download.content)) as archive:
+            assert archive.namelist() == ["0001_Queued One Ltd_softcopy.pdf", "0003_Queued Three Ltd_softcopy.pdf",
+                                          "manifest.json"]
+
+        assert client.get("/jobs/unknown", headers=HEADERS).status_code == 404
+        assert client.delete(f"/jobs/{submitted['job_id']}", headers=HEADERS).status_code == 200
+        assert client.get(submitted["download_url"], headers=HEADERS).status_code == 404
+
+
+def test_printable_job_download_is_merged_in_row_order(queue):
+    rows = [row for row in ROWS if row["Company Name"]]
+    with TestClient(main.app) as client:
+        job_id = client.post("/jobs", headers=HEADERS, data={"kind": "printable", "rows": json.dumps(rows)}).json()["job_id"]
+        assert wait_for_job(client, job_id)["status"] == "done"
+        download = client.get(f"/jobs/{job_id}/download", headers=HEADERS)
+    with fitz.open(stream=download.content, filetype="pdf") as doc:
+        assert [row["Company Name"] in page.get_text() for page, row in zip(doc, rows)] == [True, True]
+        assert doc.page_count == 2
+
+
+def test_rows_interrupted_by_a_restart_are_requeued(queue):
+    job_id = queue.submit("softcopy", ROWS)
+    # A worker claimed a row and died before finishing it
+    assert queue._claim_row()[:2] == (job_id, 0)
+    assert queue.status(job_id)["rows"][0]["status"] == "running"
+    queue.close()
+
+    with TestClient(main.app) as client:
+        status = wait_for_job(client, job_id)
+    assert (status["status"], status["completed"], status["failed"]) == ("done", 2, 1)
+
+
+def test_finished_jobs_are_pruned_after_retention(queue):
+    with TestClient(main.app) as client:
+        job_id = client.post("/jobs", headers=HEADERS, data={"kind": "softcopy", "rows": json.dumps(ROWS[:1])}).json()["job_id"]
+        wait_for_job(client, job_id)
+        assert queue.prune() == []
+    # Queued (unfinished) jobs are kept however old they are
+    pending = queue.submit("softcopy", ROWS[:1])
+
+    assert queue.prune(now=time.time() + queue.retention_seconds + 1) == [job_id]
+    assert queue.status(job_id) is None and not os.path.exists(os.path.join(queue.artifact_dir, job_id))
+    assert queue.status(pending)["status"] == "queued" and queue.stats()["pruned"] == 1
+
+
+def test_rows_of_dead_workers_and_expired_leases_are_requeued(queue):
+    job_id = queue.submit("softcopy", ROWS)
+    queue._claim_row()
+    queue._claim_row()
+    with queue._lock:
+        # Row 1 belongs to a worker that has since exited
+        queue._db().execute("UPDATE job_rows SET worker_pid = -1 WHERE job_id = ? AND row_index = 1", (job_id,))
+
+    assert queue.requeue_worker(-1) == 1
+    assert [row["status"] for row in queue.status(job_id)["rows"]] == ["running", "queued", "queued"]
+
+    # A renewed lease keeps the row; one left unrenewed past the lease is requeued
+    assert queue.renew_leases() == 1
+    assert queue.requeue_expired() == 0
+    assert queue.requeue_expired(now=time.time() + queue.lease_seconds + 1) == 1
+    assert queue.status(job_id)["rows"][0]["status"] == "queued" and queue.stats()["requeued"] == 2
+
+
+def test_databases_from_before_leases_are_migrated(tmp_path):
+    with sqlite3.connect(tmp_path / "jobs.sqlite3") as db:
+        db.execute("CREATE TABLE job_rows (job_id TEXT NOT NULL, row_index INTEGER NOT NULL, data TEXT NOT NULL, "
+                   "status TEXT NOT NULL, template_name TEXT, overflow_warnings TEXT, error TEXT, pdf_path TEXT, "
+                   "PRIMARY KEY (job_id, row_index))")
+    queue = new_queue(tmp_path)
+    job_id = queue.submit("softcopy", ROWS[:1])
+    assert queue._claim_row()[:2] == (job_id, 0)
+    assert queue.requeue_worker(os.getpid()) == 1
+    queue.close()
+
+
+def test_softcopy_artifact_is_streamed_to_disk(tmp_path):
+    rows = []
+    for index in range(3):
+        pdf_path = tmp_path / f"{index + 1:04d}_Row_softcopy.pdf"
+        pdf_path.write_bytes(os.urandom(4 * 1024 * 1024))
+        rows.append({"row_index": index, "status": "done", "template_name": "template_softCopy",
+                     "overflow_warnings": [], "error": None, "pdf_path": str(pdf_path)})
+
+    tracemalloc.start()
+    try:
+        with open(tmp_path / "softcopies.zip", "wb") as artifact_file:
+            assert main.finalize_softcopy_job(rows, artifact_file) == ("softcopies.zip", "application/zip")
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # 12 MB of rows went through a bounded buffer instead of an in-memory archive
+    assert peak < 2 * 1024 * 1024
+    with zipfile.ZipFile(tmp_path / "softcopies.zip") as archive:
+        assert len(archive.namelist()) == 4 and archive.getinfo("0003_Row_softcopy.pdf").file_size == 4 * 1024 * 1024
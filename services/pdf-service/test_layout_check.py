@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for /layout/check: the dry run must report the same font sizes, line counts and
+overflow warnings as a real render of the same row, without touching any template.
+"""
+
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from render_backend import run_render_job
+from rise.layout_cache import layout_cache
+from template_source import TemplateSource
+
+os.environ.setdefault("NEXT_PUBLIC_SUPABASE_URL", "http://127.0.0.1:9")
+os.environ.setdefault("NEXT_PUBLIC_SUPABASE_ANON_KEY", "test")
+os.environ.setdefault("INTERNAL_TOKEN", "test")
+
+import main  # noqa: E402
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "templates", "default-draft.pdf")
+HEADERS = {"x-internal-token": main.INTERNAL_TOKEN}
+
+ROWS = [
+    {"Company Name": "Northern Precision Engineering & Fabrication Services Limited",
+     "Address": "Unit 7, Riverside Industrial Estate, 14 Mill Lane, Huddersfield HD1 3AB, West Yorkshire, United Kingdom",
+     "ISO Standard": "ISO 9001:2015", "Certificate Number": "LC-1", "Issue Date": "01/01/2024",
+     "Scope": "Design, manufacture and supply of precision machined components. " * 12},
+    {"Company Name": "Zürich Straße\nSociété Générale (Suisse) S.A.", "Address": "Bahnhofstrasse 1\nCH-8001 Zürich",
+     "ISO Standard": "ISO 14001:2015", "Certificate Number": "LC-2", "Name Font Size": "-2", "Address Font Size": "1",
+     "Scope": "Provision of banking services"},
+    {"Company Name": "Tiny Co", "ISO Standard": "ISO 45001:2018", "Certificate Number": "LC-3", "Scope": "Cleaning"},
+]
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # An empty local template directory: any attempt to load a template fails
+    monkeypatch.setattr(main, "template_source", TemplateSource("local", str(tmp_path)))
+
+    async def no_templates(template_name):
+        raise AssertionError(f"layout check fetched template {template_name}")
+
+    monkeypatch.setattr(main, "download_template_from_supabase", no_templates)
+    # Fit every field from scratch so the dry run can't reuse the real render's cached fits
+    monkeypatch.setattr(layout_cache, "max_entries", 0)
+    layout_cache.clear()
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def real_render(kind: str, row: dict) -> dict:
+    values, template_name, template_type = main.prepare_row(kind, row, {})
+    if kind == "certificate":
+        values["logo_lookup"] = {}
+    result = run_render_job({"kind": kind, "template": TEMPLATE_PATH, "template_name": template_name,
+                             "values": values, "template_type": template_type})
+    assert result["pdf"]
+    return result
+
+
+@pytest.mark.parametrize("kind", ["softcopy", "printable", "certificate"])
+def test_dry_run_matches_real_render_without_templates(client, kind):
+    response = client.post("/layout/check", headers=HEADERS, data={"rows": json.dumps(ROWS), "kind": kind})
+    assert response.status_code == 200, response.text
+    checked = response.json()["results"]
+    assert [result["error"] for result in checked] == [None] * len(ROWS)
+
+    for row, result in zip(ROWS, checked):
+        rendered = real_render(kind, row)
+        assert result["fields"] == rendered["layout"], row["Company Name"]
+        assert result["overflow_warnings"] == rendered["overflow_warnings"]
+        assert result["fields"]["Company Name"]["font_size"] and result["fields"]["Company Name"]["lines"]
+
+
+def test_single_row_and_row_errors(client):
+    response = client.post("/layout/check", headers=HEADERS, data={"rows": json.dumps({"Company Name": ""})})
+    assert response.status_code == 200
+    assert response.json()["results"][0]["error"] == "Company name is required"
+    assert client.post("/layout/check", headers=HEADERS, data={"rows": "[]"}).status_code == 400
+    assert client.post("/layout/check", headers=HEADERS, data={"rows": "[{}]", "kind": "draft"}).status_code == 400
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for logo_store and the /logos endpoints.
+"""
+
+import hashlib
+import multiprocessing
+import os
+
+from fastapi.testclient import TestClient
+
+from logo_store import LogoStore
+
+LOGO = b"\x89PNG\r\n\x1a\n" + b"logo-bytes" * 32
+OTHER_LOGO = b"\x89PNG\r\n\x1a\n" + b"other-logo" * 32
+
+
+def test_identical_logos_are_stored_once(tmp_path):
+    store = LogoStore(str(tmp_path))
+    digest = store.put("acme.png", LOGO)
+    assert digest == hashlib.sha256(LOGO).hexdigest()
+    assert store.put("acme-copy.png", LOGO) == digest
+    store.put("other.png", OTHER_LOGO)
+
+    assert sorted(os.listdir(tmp_path / "objects")) == sorted([digest, hashlib.sha256(OTHER_LOGO).hexdigest()])
+    assert [(item["filename"], item["size"]) for item in store.list()] == [
+        ("acme-copy.png", len(LOGO)), ("acme.png", len(LOGO)), ("other.png", len(OTHER_LOGO))
+    ]
+
+
+def test_resolve_by_filename_and_by_hash(tmp_path):
+    store = LogoStore(str(tmp_path))
+    digest = store.put("acme.png", LOGO)
+
+    assert store.resolve("acme.png") == ("acme.png", digest)
+    # A hash resolves to a filename pointing at it, so logo matching by name still works
+    assert store.resolve(digest) == ("acme.png", digest)
+    assert store.resolve(f" {digest.upper()} ") == ("acme.png", digest)
+    assert store.get(digest) == ("acme.png", LOGO)
+    assert store.resolve("missing.png") is None and store.resolve("0" * 64) is None
+
+    # Another worker's store sees the same index
+    assert LogoStore(str(tmp_path)).get("acme.png") == ("acme.png", LOGO)
+
+
+def test_object_is_deleted_once_nothing_points_at_it(tmp_path):
+    store = LogoStore(str(tmp_path))
+    digest = store.put("acme.png", LOGO)
+    store.put("acme-copy.png", LOGO)
+
+    assert store.delete("acme.png") and store.resolve(digest) == ("acme-copy.png", digest)
+    assert store.delete(digest) and store.resolve(digest) is None
+    assert os.listdir(tmp_path / "objects") == [] and not store.delete("acme.png")
+
+
+def put_and_delete(root_dir: str, worker: int, rounds: int):
+    store = LogoStore(root_dir)
+    for index in range(rounds):
+        store.put(f"{worker}-{index}.png", LOGO)
+        if index % 2:
+            store.delete(f"{worker}-{index}.png")
+
+
+def test_worker_processes_share_the_store_without_losing_updates(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=put_and_delete, args=(str(tmp_path), worker, 40)) for worker in range(4)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(60)
+        assert process.exitcode == 0
+
+    store = LogoStore(str(tmp_path))
+    expected = {f"{worker}-{index}.png" for worker in range(4) for index in range(0, 40, 2)}
+    assert {item["filename"] for item in store.list()} == expected
+    # Deletes never unlinked the object while other names still pointed at it
+    assert os.listdir(tmp_path / "objects") == [hashlib.sha256(LOGO).hexdigest()]
+
+
+def test_upload_and_fetch_through_endpoints(tmp_path, monkeypatch):
+    os.environ.setdefault("NEXT_PUBLIC_SUPABASE_URL", "http://127.0.0.1:9")
+    os.environ.setdefault("NEXT_PUBLIC_SUPABASE_ANON_KEY", "test")
+    os.environ.setdefault("INTERNAL_TOKEN", "test")
+    import main
+
+    monkeypatch.setattr(main, "logo_store", LogoStore(str(tmp_path)))
+    headers = {"x-internal-token": main.INTERNAL_TOKEN}
+    with TestClient(main.app) as client:
+        uploaded = client.post("/logos", headers=headers, files=[
+            ("logo_files", ("acme.png", LOGO, "image/png")),
+            ("logo_files", ("acme-again.png", LOGO, "image/png")),
+        ]).json()["logos"]
+        assert [item["sha256"] for item in uploaded] == [hashlib.sha256(LOGO).hexdigest()] * 2
+
+        by_hash = client.get(f"/logos/{uploaded[0]['sha256']}", headers=headers)
+        assert by_hash.status_code == 200 and by_hash.content == LOGO
+        assert client.get("/logos/acme-again.png", headers=headers).content == LOGO
+        assert client.get("/logos/missing.png", headers=headers).status_code == 404
+        assert len(client.get("/logos", headers=headers).json()["logos"]) == 2
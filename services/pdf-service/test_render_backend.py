@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests for render_backend: workers start with the local templates loaded, and jobs for
+those templates don't ship the template bytes.
+"""
+
+import asyncio
+import os
+
+import fitz
+
+import render_backend
+from render_backend import RenderBackend
+from template_source import TemplateSource
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+ROW = {"Company Name": "Preloaded Ltd", "ISO Standard": "ISO 9001:2015", "Certificate Number": "PRE-1", "logo_lookup": {}}
+
+
+def job(template) -> dict:
+    return {"kind": "softcopy", "template": template, "template_name": "default-draft", "values": dict(ROW),
+            "template_type": "standard"}
+
+
+def test_jobs_for_preloaded_templates_do_not_ship_them(monkeypatch):
+    source = TemplateSource("local", TEMPLATES_DIR)
+    source.load()
+    shipped = []
+    original = render_backend.run_render_job
+
+    def run_render_job(render_job):
+        shipped.append(render_job["template"])
+        return original(render_job)
+
+    monkeypatch.setattr(render_backend, "run_render_job", run_render_job)
+    backend = RenderBackend("thread", workers=1)
+    backend.start(source.templates())
+    try:
+        assert backend.stats()["preloaded_templates"] == len(source.names())
+        assert asyncio.run(backend.run(job(source.get_local("default-draft"))))["success"]
+        # An uploaded template that happens to share the name is not swapped for the preloaded one
+        custom = bytes(source.get_local("default-draft"))
+        assert asyncio.run(backend.run(job(custom)))["success"]
+    finally:
+        backend.shutdown()
+    assert shipped[0] is None and shipped[1] is custom
+
+
+def test_process_workers_render_from_their_preloaded_copy():
+    source = TemplateSource("local", TEMPLATES_DIR)
+    source.load()
+    backend = RenderBackend("process", workers=1)
+    backend.start(source.templates())
+    try:
+        result = asyncio.run(backend.run(job(source.get_local("default-draft"))))
+    finally:
+        backend.shutdown()
+    with fitz.open(stream=result["pdf"], filetype="pdf") as doc:
+        assert "Preloaded Ltd" in doc[0].get_text()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Tests for the pre-fork server: workers are forked from the warm parent, a SIGHUP replaces
+every worker without refusing requests, SIGTERM shuts everything down cleanly, and a job
+survives the worker rendering it being killed.
+"""
+
+import json
+import os
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+
+import httpx
+
+from server import PreforkServer
+
+SERVICE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def worker_pids(url: str, expected: int, timeout: float = 60) -> set:
+    """Poll /health (new connection each time) until `expected` distinct worker pids answered."""
+    pids = set()
+    deadline = time.monotonic() + timeout
+    while len(pids) < expected and time.monotonic() < deadline:
+        try:
+            pids.add(httpx.get(url, timeout=5).json()["pid"])
+        except httpx.TransportError:
+            time.sleep(0.1)
+    return pids
+
+
+def start_server(tmp_path, port: int, **extra_env) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "NEXT_PUBLIC_SUPABASE_URL": "http://127.0.0.1:9",
+        "NEXT_PUBLIC_SUPABASE_ANON_KEY": "test",
+        "INTERNAL_TOKEN": "test",
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "WEB_WORKERS": "2",
+        "PRELOAD_TEMPLATES": "none",
+        "JOBS_DB_PATH": str(tmp_path / "jobs.sqlite3"),
+        "JOBS_ARTIFACT_DIR": str(tmp_path / "artifacts"),
+        **extra_env,
+    }
+    return subprocess.Popen([sys.executable, "server.py"], cwd=SERVICE_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def test_prefork_workers_rolling_restart_and_shutdown(tmp_path):
+    port = free_port()
+    server = start_server(tmp_path, port)
+    url = f"http://127.0.0.1:{port}/health"
+    try:
+        first = worker_pids(url, 2)
+        assert len(first) == 2 and server.pid not in first
+
+        server.send_signal(signal.SIGHUP)
+        failures = 0
+        replaced = set()
+        deadline = time.monotonic() + 60
+        while len(replaced) < 2 and time.monotonic() < deadline:
+            try:
+                pid = httpx.get(url, timeout=5).json()["pid"]
+            except httpx.TransportError:
+                failures += 1
+                continue
+            if pid not in first:
+                replaced.add(pid)
+        assert len(replaced) == 2
+        assert failures == 0
+
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=60) == 0
+    finally:
+        if server.poll() is None:
+            server.kill()
+            server.wait()
+
+
+def test_rolling_restart_advances_without_waiting_on_workers(monkeypatch):
+    server = PreforkServer(app=None, workers=2)
+    server._pids = {101: None, 102: None}
+    spawned, stopped = [], []
+
+    def spawn_worker():
+        pid = 201 + len(spawned)
+        spawned.append(pid)
+        server._pids[pid] = -1
+        server._starting[pid] = float("inf")
+        return pid
+
+    def stop_worker(pid):
+        stopped.append(pid)
+        server._retiring[pid] = float("inf")
+
+    def started(pid):
+        del server._starting[pid]
+        server._pids[pid] = None
+
+    def exited(pid):
+        del server._pids[pid]
+        server._starting.pop(pid, None)
+        server._retiring.pop(pid, None)
+
+    monkeypatch.setattr(server, "spawn_worker", spawn_worker)
+    monkeypatch.setattr(server, "stop_worker", stop_worker)
+
+    server.rolling_restart()
+    server._advance_restart()
+    # Each step returns at once: the supervisor goes back to its signals while workers start and stop
+    assert (spawned, stopped) == ([201], [])
+    started(201)
+    server._advance_restart()
+    server._advance_restart()
+    assert (spawned, stopped) == ([201], [101])
+    exited(101)
+    server._advance_restart()
+    assert (spawned, stopped) == ([201, 202], [101])
+
+    # A replacement that never serves stops the restart and leaves the old worker running
+    exited(202)
+    server._advance_restart()
+    assert server._replacing is None and server._restart_queue == [] and 102 in server._pids
+    assert stopped == [101]
+
+
+def test_job_completes_after_its_worker_is_killed_mid_render(tmp_path):
+    port = free_port()
+    server = start_server(tmp_path, port, WEB_WORKERS="1", JOBS_CONCURRENCY="1", TEMPLATE_SOURCE="local",
+                          TEMPLATE_FALLBACK="default-draft")
+    base = f"http://127.0.0.1:{port}"
+    headers = {"x-internal-token": "test"}
+    rows = [{"Company Name": f"Killed {index} Ltd", "ISO Standard": "ISO 9001:2015", "Certificate Number": f"K-{index}"}
+            for index in range(30)]
+    try:
+        (first,) = worker_pids(f"{base}/health", 1)
+        job_id = httpx.post(f"{base}/jobs", headers=headers, data={"kind": "softcopy", "rows": json.dumps(rows)},
+                            timeout=30).json()["job_id"]
+
+        # Kill the worker once it has finished a row and is rendering the next one
+        running = None
+        deadline = time.monotonic() + 60
+        with sqlite3.connect(tmp_path / "jobs.sqlite3") as db:
+            while running is None and time.monotonic() < deadline:
+                done = db.execute("SELECT COUNT(*) FROM job_rows WHERE status = 'done'").fetchone()[0]
+                claimed = db.execute("SELECT worker_pid FROM job_rows WHERE status = 'running'").fetchone()
+                if done and claimed:
+                    running = claimed[0]
+                time.sleep(0.01)
+        assert running == first
+        os.kill(first, signal.SIGKILL)
+
+        status = None
+        deadline = time.monotonic() + 120
+        while time.monotonic() < deadline:
+            try:
+                status = httpx.get(f"{base}/jobs/{job_id}", headers=headers, timeout=5).json()
+            except httpx.TransportError:
+                time.sleep(0.1)
+                continue
+            if status["status"] in ("done", "failed"):
+                break
+            time.sleep(0.1)
+        assert (status["status"], status["completed"], status["failed"]) == ("done", len(rows), 0)
+        assert worker_pids(f"{base}/health", 1) != {first}
+
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=60) == 0
+    finally:
+        if server.poll() is None:
+            server.kill()
+            server.wait()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for template_resolver.
+
+Expected names are the ones the per-endpoint selection trees in main.py produced before
+they were replaced by the decision table.
+"""
+
+import copy
+
+import pytest
+
+from template_resolver import FAMILY_TEMPLATES, SPANISH_PREFIXES, TemplateResolver, compile_tables, template_resolver
+
+LONG_SCOPE = "word " * 90  # estimated at 12 lines
+
+
+def row(**fields):
+    values = {"Scope": "Short scope", "Size": "high", "Accreditation": "yes", "Country": "", "Logo": "", "Extra Line": "", "Language": ""}
+    values.update({key.replace("_", " ").title(): value for key, value in fields.items()})
+    return values
+
+
+@pytest.mark.parametrize("family,values,expected", [
+    ("certificate", row(), ("template_draft", "standard")),
+    ("certificate", row(size="low"), ("templateDraftStandardEco", "standard_eco")),
+    ("certificate", row(scope=LONG_SCOPE, accreditation=" NO "), ("templateDraftLargeNonAcc", "large_nonaccredited")),
+    ("certificate", row(extra_line="Extra", country="Other", size=""), ("template_draft_large_other_eco", "large_other_eco")),
+    ("certificate", row(country="other", accreditation="no"), ("templateDraftStandardNonAccOther", "standard_nonaccredited_other")),
+    ("certificate", row(language=" S "), ("S_template_draft", "standard")),
+    ("softcopy", row(extra_line="Extra"), ("template_SoftCopy_large", "large")),
+    ("softcopy", row(country="Other", size="high"), ("template_softCopy_other", "standard_other")),
+    ("softcopy", row(scope=LONG_SCOPE, country="Other", accreditation="no", language="s"), ("S_templateSoftCopyLargeNonAccOther", "large_nonaccredited_other")),
+    ("printable", row(country="Other", accreditation="no"), ("templatePrintableOtherNonAcc", "standard_other_nonaccredited")),
+    ("printable", row(extra_line="x", country="Other", accreditation="no"), ("templateprintableLargeOtherNonAcc", "large_other_nonaccredited")),
+    ("printable", row(language="s", size=""), ("templatePrintableStandardEco", "standard_eco")),
+])
+def test_resolves_legacy_template_names(family, values, expected):
+    assert template_resolver.resolve(family, values, {}) == expected
+
+
+def test_logo_rules():
+    lookup = {"acme.png": b"png"}
+    # Certificates and soft copies use the logo template whenever a logo was supplied
+    assert template_resolver.resolve("certificate", row(accreditation="no"), lookup) == ("templateDraftLogoNonAcc", "logo_nonaccredited")
+    assert template_resolver.resolve("softcopy", row(country="Other", accreditation="no", scope=LONG_SCOPE), lookup) == ("templateSoftCopyLogoOtherNonAcc", "logo_other_nonaccredited")
+    assert template_resolver.resolve("certificate", row(country="Other", accreditation="no"), lookup) == ("templateDraftLogoNonAccOther", "logo_nonaccredited_other")
+    # Printables only when the row names a supplied file (matched lowercased)
+    assert template_resolver.resolve("printable", row(), lookup, "ACME.png ") == ("templatePrintableLogo", "logo")
+    assert template_resolver.resolve("printable", row(), lookup, "other.png") == ("templatePrintableStandard", "standard")
+    assert template_resolver.resolve("printable", row(), lookup, "") == ("templatePrintableStandard", "standard")
+
+
+@pytest.mark.parametrize("family", ["certificate", "softcopy", "printable"])
+def test_missing_logo_falls_back_to_regular_template(family):
+    values = row(logo="missing.png", accreditation="no")
+    assert template_resolver.resolve(family, values, {}, "missing.png" if family == "printable" else None)[1] == "standard_nonaccredited"
+
+
+def test_batch_groups_rows_by_template():
+    rows = [row(), row(size="low"), row(), row(language="s")]
+    resolved, groups = template_resolver.resolve_batch("softcopy", rows, {})
+    assert [template_type for _, template_type in resolved] == ["standard", "standard_eco", "standard", "standard"]
+    assert groups == {"template_softCopy": [0, 2], "templateSoftCopyStandardEco": [1], "S_template_softCopy": [3]}
+
+
+def test_tables_cover_every_feature_combination():
+    for family, table in template_resolver.tables.items():
+        assert len(table) == 64, family
+        assert {name.removeprefix("S_") for name, _ in table.values()} == {name for name, _ in FAMILY_TEMPLATES[family].values()}
+
+
+def test_invalid_table_is_rejected():
+    broken = copy.deepcopy(FAMILY_TEMPLATES)
+    del broken["softcopy"][("large", "other", "eco")]
+    broken["printable"][("logo", "other", "accredited")] = ("templatePrintableLogoOther", "logo_sideways")
+    with pytest.raises(ValueError) as error:
+        compile_tables(broken, SPANISH_PREFIXES)
+    assert "softcopy: no template for ('large', 'other', 'eco')" in str(error.value)
+    assert "unknown template type 'logo_sideways'" in str(error.value)
+    with pytest.raises(ValueError):
+        TemplateResolver().resolve("draft", row(), {})
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for template_source, including a render served entirely from the local template
+directory (the Supabase URL points at a closed port, so any network access would fail).
+"""
+
+import json
+import os
+import shutil
+
+import fitz
+import pytest
+from fastapi.testclient import TestClient
+
+from template_source import TemplateSource
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    shutil.copy(os.path.join(TEMPLATES_DIR, "default-draft.pdf"), tmp_path / "template_softCopy.pdf")
+    shutil.copy(os.path.join(TEMPLATES_DIR, "default-draft.pdf"), tmp_path / "default-draft.pdf")
+    (tmp_path / "notes.txt").write_text("not a template")
+    return str(tmp_path)
+
+
+def test_modes_decide_where_templates_come_from(template_dir):
+    local = TemplateSource("local", template_dir)
+    assert local.load() == 2 and local.names() == ["default-draft", "template_softCopy"]
+    assert isinstance(local.get_local("template_softCopy"), memoryview)
+    assert local.get_local("template_draft") is None
+    assert not local.uses_supabase
+
+    layered = TemplateSource("layered", template_dir)
+    assert layered.get_local("template_softCopy") is not None and layered.uses_supabase
+
+    remote = TemplateSource("supabase", template_dir)
+    assert remote.get_local("template_softCopy") is None and remote.load() == 0
+
+    with pytest.raises(ValueError):
+        TemplateSource("s3", template_dir)
+
+
+def test_fallback_serves_unknown_names_in_local_mode(template_dir):
+    source = TemplateSource("local", template_dir, fallback="default-draft")
+    assert source.get_local("templateDraftLogo") == source.get_local("default-draft")
+    assert source.stats()["fallback_hits"] == 1
+    with pytest.raises(ValueError):
+        TemplateSource("local", template_dir, fallback="missing").load()
+
+
+def test_render_from_local_directory_without_network(monkeypatch):
+    os.environ.setdefault("NEXT_PUBLIC_SUPABASE_URL", "http://127.0.0.1:9")
+    os.environ.setdefault("NEXT_PUBLIC_SUPABASE_ANON_KEY", "test")
+    os.environ.setdefault("INTERNAL_TOKEN", "test")
+    import main
+
+    source = TemplateSource("local", TEMPLATES_DIR, fallback="default-draft")
+    monkeypatch.setattr(main, "template_source", source)
+    row = {"Company Name": "Offline Ltd", "ISO Standard": "ISO 9001:2015", "Certificate Number": "OFF-1"}
+    with TestClient(main.app) as client:
+        response = client.post("/generate-softcopy", headers={"x-internal-token": main.INTERNAL_TOKEN},
+                               data={"data": json.dumps(row)})
+    assert response.status_code == 200, response.text
+    with fitz.open(stream=response.content, filetype="pdf") as doc:
+        assert "Offline Ltd" in doc[0].get_text()
+    assert source.stats()["fallback_hits"] == 1
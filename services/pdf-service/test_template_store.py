@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Tests for template_store. Two TemplateStore instances on one directory stand in for two
+workers on the same node.
+"""
+
+import asyncio
+import fcntl
+import os
+import threading
+
+import fitz
+
+from template_source import TemplateSource
+from template_store import TemplateStore
+
+TEMPLATE_PATH = os.path.join(os.path.dirname(__file__), "templates", "default-draft.pdf")
+
+
+def template_bytes() -> bytes:
+    with open(TEMPLATE_PATH, "rb") as template_file:
+        return template_file.read()
+
+
+def test_templates_are_stored_once_and_shared_between_workers(tmp_path):
+    first, second = TemplateStore(str(tmp_path)), TemplateStore(str(tmp_path))
+    content = template_bytes()
+    stored = first.put("template_softCopy", content, '"v1"')
+    first.put("S_template_softCopy", content, '"v1"')
+
+    seen = second.get("template_softCopy")
+    assert seen.digest == stored.digest and seen.etag == '"v1"'
+    assert isinstance(seen.content, memoryview) and seen.content == content
+    assert os.listdir(tmp_path / "objects") == [stored.digest]
+    with fitz.open(stream=seen.content, filetype="pdf") as doc:
+        assert doc.page_count == 1
+
+
+def test_stale_entries_are_served_until_revalidated(tmp_path):
+    store = TemplateStore(str(tmp_path), ttl_seconds=0)
+    store.put("template_draft", template_bytes(), '"v1"')
+    stale = store.get("template_draft")
+    assert stale is not None and not store.is_fresh(stale)
+    assert store.stale_names() == ["template_draft"]
+
+    store.ttl_seconds = 60
+    store.mark_revalidated("template_draft")
+    assert store.is_fresh(store.get("template_draft")) and store.stale_names() == []
+    assert store.stats()["stale_hits"] == 1
+
+
+def test_push_pins_and_invalidate_removes_objects(tmp_path):
+    first, second = TemplateStore(str(tmp_path), ttl_seconds=0), TemplateStore(str(tmp_path), ttl_seconds=0)
+    first.put("template_draft", template_bytes(), '"v1"')
+    pushed = first.put("template_draft", template_bytes() + b"\n% pushed\n", pinned=True)
+
+    seen = second.get("template_draft")
+    assert seen.digest == pushed.digest and seen.pinned and second.is_fresh(seen)
+    assert second.stale_names() == [] and os.listdir(tmp_path / "objects") == [pushed.digest]
+
+    assert second.invalidate("template_draft") == ["template_draft"]
+    assert first.get("template_draft") is None and os.listdir(tmp_path / "objects") == []
+    assert first.invalidate("template_draft") == []
+
+
+def test_one_refresher_per_node(tmp_path):
+    first, second = TemplateStore(str(tmp_path)), TemplateStore(str(tmp_path))
+    with first.refresh_lock() as first_holds:
+        with second.refresh_lock() as second_holds:
+            assert first_holds and not second_holds
+    with second.refresh_lock() as second_holds:
+        assert second_holds
+
+
+def test_workers_drop_maps_of_objects_another_worker_replaced(tmp_path):
+    first, second = TemplateStore(str(tmp_path)), TemplateStore(str(tmp_path))
+    first.put("template_draft", template_bytes(), '"v1"')
+    first.put("template_softCopy", template_bytes() + b"\n% softcopy\n", '"v1"')
+    old = second.get("template_draft")
+    second.get("template_softCopy")
+    assert second.stats()["mapped"] == 2
+
+    replaced = first.put("template_draft", template_bytes() + b"\n% v2\n", '"v2"')
+    first.invalidate("template_softCopy")
+    assert second.get("template_draft").digest == replaced.digest
+    assert second.stats()["mapped"] == 1 and set(second._maps) == {replaced.digest}
+    # A render still holding the old entry keeps reading valid bytes
+    assert old.content[:5] == b"%PDF-"
+
+
+class StorageResponse:
+    status_code = 200
+    headers = {"ETag": '"v1"'}
+
+    def __init__(self, content: bytes):
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+
+def test_store_waits_happen_off_the_event_loop(tmp_path, monkeypatch):
+    os.environ.setdefault("NEXT_PUBLIC_SUPABASE_URL", "http://127.0.0.1:9")
+    os.environ.setdefault("NEXT_PUBLIC_SUPABASE_ANON_KEY", "test")
+    os.environ.setdefault("INTERNAL_TOKEN", "test")
+    import main
+
+    content = template_bytes()
+
+    async def storage_get(url, headers=None):
+        return StorageResponse(content)
+
+    monkeypatch.setattr(main, "template_store", TemplateStore(str(tmp_path)))
+    monkeypatch.setattr(main, "template_source", TemplateSource("supabase"))
+    monkeypatch.setattr(main.storage_client, "get", storage_get)
+
+    async def download_while_another_worker_holds_the_manifest():
+        ticks = 0
+        download = asyncio.create_task(main.download_template_from_supabase("template_softCopy"))
+        while not download.done() and ticks < 20:
+            await asyncio.sleep(0.01)
+            ticks += 1
+        # The download is parked on the lock in a thread while the loop keeps running
+        assert ticks == 20 and not download.done()
+        release.set()
+        return await download
+
+    os.makedirs(tmp_path / "objects", exist_ok=True)
+    release = threading.Event()
+    with open(tmp_path / "manifest.lock", "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        threading.Thread(target=lambda: (release.wait(10), fcntl.flock(lock_file, fcntl.LOCK_UN))).start()
+        stored = asyncio.run(download_while_another_worker_holds_the_manifest())
+    assert bytes(stored) == content
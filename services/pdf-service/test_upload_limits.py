@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for upload_limits.
+"""
+
+import inspect
+
+import pytest
+from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.testclient import TestClient
+
+from starlette.formparsers import MultiPartParser
+from starlette.requests import Request as StarletteRequest
+
+from upload_limits import UploadRoute, upload_limits
+
+app = FastAPI()
+app.router.route_class = UploadRoute
+
+
+@app.post("/upload")
+async def upload(request: Request, data: str = Form(...), logo_files: list[UploadFile] = File(None)):
+    form_data = await request.form()
+    files = form_data.getlist("logo_files")
+    return {
+        "data": data,
+        "same_form": all(any(upload is parsed for parsed in files) for upload in logo_files or []),
+        "in_memory": [upload._in_memory for upload in files],
+        "sizes": [len(await upload.read()) for upload in files],
+    }
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(upload_limits, "max_part_bytes", 4096)
+    monkeypatch.setattr(upload_limits, "max_total_bytes", 16384)
+    monkeypatch.setattr(upload_limits, "spool_bytes", 1024)
+    return upload_limits
+
+
+def post(client, *sizes):
+    files = [("logo_files", (f"logo{index}.png", b"x" * size, "image/png")) for index, size in enumerate(sizes)]
+    return client.post("/upload", data={"data": "row"}, files=files)
+
+
+def test_single_parse_spools_large_parts(limits):
+    with TestClient(app) as client:
+        response = post(client, 100, 3000)
+    assert response.status_code == 200
+    assert response.json() == {"data": "row", "same_form": True, "in_memory": [True, False], "sizes": [100, 3000]}
+
+
+def test_part_and_total_limits(limits):
+    with TestClient(app) as client:
+        too_big_part = post(client, 100, 5000)
+        too_big_body = post(client, *[4000] * 5)
+        # No Content-Length: the total limit is enforced while the body streams in
+        chunks = [
+            b'--b\r\nContent-Disposition: form-data; name="logo_files"; filename="logo%d.png"\r\n\r\n' % index + b"x" * 3000 + b"\r\n"
+            for index in range(6)
+        ]
+        chunked = client.post("/upload", content=iter(chunks), headers={"content-type": "multipart/form-data; boundary=b"})
+    assert too_big_part.status_code == 413 and "logo1.png" in too_big_part.json()["detail"]
+    assert too_big_body.status_code == 413
+    assert chunked.status_code == 413 and "Request body" in chunked.json()["detail"]
+    assert limits.stats()["rejected"] >= 3
+
+
+def test_starlette_internals_used_by_upload_limits_still_exist():
+    # UploadRequest overrides these private Starlette members; if an upgrade renames or
+    # reshapes them the single-pass parse would silently stop applying the limits
+    assert list(inspect.signature(StarletteRequest._get_form).parameters) == [
+        "self", "max_files", "max_fields", "max_part_size"
+    ]
+    assert StarletteRequest({"type": "http", "method": "POST", "headers": []})._form is None
+    assert {"max_files", "max_part_size"} <= set(inspect.signature(MultiPartParser.__init__).parameters)
+    parser = MultiPartParser({"content-type": "multipart/form-data; boundary=b"}, None)
+    assert hasattr(parser, "_current_part") and hasattr(MultiPartParser, "spool_max_size")
+    assert callable(MultiPartParser.on_part_begin) and callable(MultiPartParser.on_part_data)
+    assert "self.spool_max_size" in inspect.getsource(MultiPartParser.on_headers_finished)
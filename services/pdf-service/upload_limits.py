@@ -0,0 +1,185 @@
+"""
+Bounded, single-pass multipart parsing for the upload endpoints.
+
+Routes hand their endpoints an UploadRequest, whose multipart body is parsed exactly once:
+FastAPI resolves the Form/File parameters from that parse, and handlers that call
+request.form() again (to collect logo_files) get the same cached FormData. While the
+body streams in:
+
+- a request whose Content-Length is over the total limit is rejected before any of the
+  body is read;
+- file parts are spooled to a temporary file once they grow past the spool threshold, so
+  large logos don't sit in memory;
+- a file part over the per-part limit, or a body over the total limit, stops the parse
+  with 413 as soon as the limit is crossed, before the rest of the body is buffered.
+
+The batch endpoints also cap how many rows one request may render (check_rows); longer
+runs go through /jobs.
+
+Configure with:
+    UPLOAD_MAX_PART_BYTES   Largest single uploaded file (default 10 MB)
+    UPLOAD_MAX_TOTAL_BYTES  Largest multipart body (default 50 MB)
+    UPLOAD_SPOOL_BYTES      File parts above this size spool to disk (default 1 MB)
+    UPLOAD_MAX_FIELD_BYTES  Largest plain form field, e.g. batch rows JSON (default 8 MB)
+    UPLOAD_MAX_FILES        Most files per request (default 1000)
+    UPLOAD_MAX_ROWS         Most rows per batch request (default 2000)
+"""
+
+import logging
+import os
+import threading
+from contextlib import aclosing
+
+from fastapi import HTTPException, Request
+from fastapi.routing import APIRoute
+from python_multipart.multipart import parse_options_header
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+logger = logging.getLogger(__name__)
+
+
+class UploadTooLarge(MultiPartException):
+    """A file part or the whole body went over its limit (answered with 413)."""
+
+
+class UploadLimits:
+    """Size limits and spool threshold for multipart uploads, with rejection counters."""
+
+    __slots__ = ("max_part_bytes", "max_total_bytes", "spool_bytes", "max_field_bytes", "max_files", "max_rows",
+                 "_lock", "_parsed", "_rejected")
+
+    def __init__(self, max_part_bytes: int, max_total_bytes: int, spool_bytes: int,
+                 max_field_bytes: int, max_files: int, max_rows: int = 2000):
+        """
+        Args:
+            max_part_bytes: Largest single uploaded file
+            max_total_bytes: Largest multipart body
+            spool_bytes: File parts above this size are spooled to disk
+            max_field_bytes: Largest plain (non-file) form field
+            max_files: Most files per request
+            max_rows: Most rows one batch request may render
+        """
+        self.max_part_bytes = max_part_bytes
+        self.max_total_bytes = max_total_bytes
+        self.spool_bytes = spool_bytes
+        self.max_field_bytes = max_field_bytes
+        self.max_files = max_files
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._parsed = 0
+        self._rejected = 0
+
+    def check_content_length(self, headers):
+        """Reject a body declared larger than the total limit before reading any of it."""
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_total_bytes:
+            raise UploadTooLarge(f"Request body of {content_length} bytes exceeds the {self.max_total_bytes} byte limit")
+
+    def check_rows(self, rows: int):
+        """Reject a batch with more rows than max_rows (413) before anything is rendered."""
+        if rows > self.max_rows:
+            self.record(rejected=True)
+            raise HTTPException(status_code=413, detail=f"Batch of {rows} rows exceeds the {self.max_rows} row limit - "
+                                                        f"submit it as a job (/jobs) instead")
+
+    def record(self, rejected: bool):
+        with self._lock:
+            self._parsed += 1
+            if rejected:
+                self._rejected += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_part_bytes": self.max_part_bytes,
+                "max_total_bytes": self.max_total_bytes,
+                "spool_bytes": self.spool_bytes,
+                "max_field_bytes": self.max_field_bytes,
+                "max_files": self.max_files,
+                "max_rows": self.max_rows,
+                "parsed": self._parsed,
+                "rejected": self._rejected,
+            }
+
+
+class LimitedMultiPartParser(MultiPartParser):
+    """Starlette's streaming multipart parser with a per-file limit and a configurable spool threshold."""
+
+    def __init__(self, headers, stream, limits: UploadLimits):
+        super().__init__(headers, stream, max_files=limits.max_files, max_part_size=limits.max_field_bytes)
+        # Read by on_headers_finished when it creates each part's SpooledTemporaryFile
+        self.spool_max_size = limits.spool_bytes
+        self.limits = limits
+        self._current_part_bytes = 0
+
+    def on_part_begin(self) -> None:
+        super().on_part_begin()
+        self._current_part_bytes = 0
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._current_part.file is not None:
+            self._current_part_bytes += end - start
+            if self._current_part_bytes > self.limits.max_part_bytes:
+                raise UploadTooLarge(
+                    f"File '{self._current_part.file.filename}' exceeds the {self.limits.max_part_bytes} byte limit"
+                )
+        super().on_part_data(data, start, end)
+
+
+async def limited_stream(stream, max_total_bytes: int):
+    """Pass request body chunks through, stopping once more than max_total_bytes have arrived."""
+    received = 0
+    async for chunk in stream:
+        received += len(chunk)
+        if received > max_total_bytes:
+            raise UploadTooLarge(f"Request body exceeds the {max_total_bytes} byte limit")
+        yield chunk
+
+
+class UploadRequest(Request):
+    """Request whose multipart form is parsed once, in a single streaming pass, within upload_limits."""
+
+    async def _get_form(self, *, max_files: int | float = 1000, max_fields: int | float = 1000,
+                        max_part_size: int = 1024 * 1024):
+        if self._form is None:
+            content_type, _ = parse_options_header(self.headers.get("Content-Type"))
+            if content_type == b"multipart/form-data":
+                try:
+                    upload_limits.check_content_length(self.headers)
+                    async with aclosing(self.stream()) as stream:
+                        parser = LimitedMultiPartParser(
+                            self.headers, limited_stream(stream, upload_limits.max_total_bytes), upload_limits
+                        )
+                        self._form = await parser.parse()
+                except UploadTooLarge as exc:
+                    upload_limits.record(rejected=True)
+                    logger.warning("⚠️ [UPLOAD] Rejected %s: %s", self.url.path, exc.message)
+                    raise HTTPException(status_code=413, detail=exc.message)
+                except MultiPartException as exc:
+                    upload_limits.record(rejected=True)
+                    raise HTTPException(status_code=400, detail=exc.message)
+                upload_limits.record(rejected=False)
+        return await super()._get_form(max_files=max_files, max_fields=max_fields, max_part_size=max_part_size)
+
+
+class UploadRoute(APIRoute):
+    """APIRoute that hands its endpoint an UploadRequest (set as the app router's route_class)."""
+
+    def get_route_handler(self):
+        route_handler = super().get_route_handler()
+
+        async def upload_route_handler(request: Request):
+            return await route_handler(UploadRequest(request.scope, request.receive))
+
+        return upload_route_handler
+
+
+# Process-wide limits shared by every upload endpoint
+upload_limits = UploadLimits(
+    max_part_bytes=int(os.getenv("UPLOAD_MAX_PART_BYTES", str(10 * 1024 * 1024))),
+    max_total_bytes=int(os.getenv("UPLOAD_MAX_TOTAL_BYTES", str(50 * 1024 * 1024))),
+    spool_bytes=int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024))),
+    max_field_bytes=int(os.getenv("UPLOAD_MAX_FIELD_BYTES", str(8 * 1024 * 1024))),
+    max_files=int(os.getenv("UPLOAD_MAX_FILES", "1000")),
+    max_rows=int(os.getenv("UPLOAD_MAX_ROWS", "2000")),
+)